@@ -8,8 +8,9 @@ import httpx
 import uvicorn
 import sys
 from pydantic import BaseModel
-from celery import Celery
+from celery import Celery, chain
 from celery.result import AsyncResult
+from kombu import Queue
 from urllib.parse import quote_plus
 
 logging.basicConfig(
@@ -70,12 +71,21 @@ celery.conf.task_routes = {
 }
 celery.conf.task_create_missing_queues = False
 
+# Staged pipeline, must match the CELERY_PIPELINE / CELERY_QUEUE_* settings of the data-sinkers workers
+enable_pipeline = os.getenv('CELERY_PIPELINE', 'disable')
+queue_io = os.getenv('CELERY_QUEUE_IO', 'io')
+queue_cpu = os.getenv('CELERY_QUEUE_CPU', 'cpu')
+queue_llm = os.getenv('CELERY_QUEUE_LLM', 'llm')
+if enable_pipeline == "enable":
+    celery.conf.task_queues = [Queue('dataset'), Queue(queue_io), Queue(queue_cpu), Queue(queue_llm)]
+
 # Log Celery configuration
 logger.info("\n=== Celery Configuration ===")
 logger.info(f"Broker URL: {celery.conf.broker_url}")
 logger.info(f"Backend URL: {celery.conf.result_backend}")
 logger.info(f"Default queue: {celery.conf.task_default_queue}")
 logger.info(f"Task routes: {celery.conf.task_routes}")
+logger.info(f"Pipeline: {enable_pipeline}, io queue: {queue_io}, cpu queue: {queue_cpu}, llm queue: {queue_llm}")
 logger.info("Celery initialized successfully\n")
 
 class TaskRequest(BaseModel):
@@ -101,15 +111,38 @@ async def trigger_task(request: TaskRequest):
     logger.info(f"=====Data keys: {list(request.data.keys())}")
 
     try:
-        result = celery.send_task(
-            'tasks.process_data', 
-            args=[request.data],
-            queue='dataset'
-        )
+        if enable_pipeline == "enable":
+            result = send_pipeline(request.data)
+        else:
+            result = celery.send_task(
+                'tasks.process_data', 
+                args=[request.data],
+                queue='dataset'
+            )
         return {"task_id": result.id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def send_pipeline(data: Dict[str, Any]):
+    """
+    Delete and dry-run requests only touch metadata and go to the io queue as a single process_data task.
+    File ingestion is sent as fetch (io queue) -> parse (cpu queue) -> index (io queue), SQL ingestion as
+    extract (llm queue) -> index (io queue); the returned id is the index task, so /task_status reports the final result.
+    """
+    if data.get('operation') == "Delete" or data.get('dry_run', False):
+        return celery.send_task('tasks.process_data', args=[data], queue=queue_io)
+
+    source_type = data.get('source', {}).get('type')
+    if source_type in ("mysql", "postgres"):
+        stages = [celery.signature('tasks.extract_documents', args=[data], queue=queue_llm)]
+    else:
+        stages = [
+            celery.signature('tasks.fetch_documents', args=[data], queue=queue_io),
+            celery.signature('tasks.parse_documents', args=[data], queue=queue_cpu)
+        ]
+
+    return chain(*stages, celery.signature('tasks.index_documents', args=[data], queue=queue_io)).apply_async()
+
 @app.get("/task_status/{task_id}", response_model=TaskStatusResponse)
 async def get_task_status(task_id: str):
     task_result = AsyncResult(task_id, app=celery)
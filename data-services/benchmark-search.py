@@ -0,0 +1,323 @@
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import time
+import uuid
+from functools import lru_cache
+
+import numpy as np
+
+# vector_config reads the PGVECTOR_* environment at import time
+os.environ.setdefault('PGVECTOR_HOST', 'localhost')
+os.environ.setdefault('PGVECTOR_PORT', '5432')
+os.environ.setdefault('PGVECTOR_USER', 'postgres')
+os.environ.setdefault('PGVECTOR_PASSWORD', 'postgres')
+os.environ.setdefault('PGVECTOR_DATABASE', 'knowledge_vector')
+
+from langchain_core.embeddings import Embeddings
+from vector_sdk import Vector, Document
+from data_services.api.base import SearchType
+from data_services.retrieval.hybrid import hybrid_search, fuse_results, documents_to_results, get_rrf_k, FUSION_WEIGHTED
+
+VECTOR_WEIGHT = 0.7
+FULLTEXT_WEIGHT = 0.3
+
+
+class FakeEmbeddings(Embeddings):
+    """
+    Deterministic bag-of-words embeddings: every token maps to a fixed random vector seeded by its hash,
+    a text is the normalized sum of its tokens. Texts sharing tokens are close, like with a real model.
+    """
+
+    def __init__(self, dimension: int):
+        self.dimension = dimension
+
+    @lru_cache(maxsize=None)
+    def _token_vector(self, token: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha256(token.encode("utf-8")).digest()[:8], "big")
+        return np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+
+    def embed_array(self, text: str) -> np.ndarray:
+        vector = np.sum([self._token_vector(token) for token in text.split()], axis=0)
+        return vector / np.linalg.norm(vector)
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return [self.embed_array(text).tolist() for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_array(text).tolist()
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text: str) -> list[float]:
+        return self.embed_query(text)
+
+
+def build_corpus(rows: int, queries: int, seed: int, vocab_size: int = 20000, topics: int = 200, doc_tokens: int = 30):
+    """Documents drawn mostly from one topic's tokens, queries are a few tokens of a random document"""
+    rng = random.Random(seed)
+    vocab = [f"t{i:05d}" for i in range(vocab_size)]
+    topic_tokens = [rng.sample(vocab, 20) for _ in range(topics)]
+
+    texts = []
+    for _ in range(rows):
+        topic = topic_tokens[rng.randrange(topics)]
+        tokens = [rng.choice(topic) if rng.random() < 0.6 else rng.choice(vocab) for _ in range(doc_tokens)]
+        texts.append(" ".join(tokens))
+
+    query_texts = [" ".join(rng.sample(rng.choice(texts).split(), 3)) for _ in range(queries)]
+    return texts, query_texts
+
+
+def doc_id_for(i: int) -> str:
+    return str(uuid.UUID(int=i + 1))
+
+
+def exact_vector_results(doc_matrix: np.ndarray, query_vector: np.ndarray, texts: list[str], k: int):
+    """Brute-force cosine ground truth, shaped like the vector leg results"""
+    similarities = doc_matrix @ query_vector
+    top = np.argsort(-similarities)[:k]
+    return [
+        {
+            "content": texts[i],
+            "metadata": {"doc_id": doc_id_for(i)},
+            "score": float(similarities[i]),
+            "search_type": "vector",
+            "hybrid_score": 0.0
+        } for i in top
+    ]
+
+
+def exact_fulltext_ids(token_sets: list[set], query: str) -> set:
+    # plainto_tsquery requires every query term
+    terms = set(query.split())
+    return {doc_id_for(i) for i, tokens in enumerate(token_sets) if terms <= tokens}
+
+
+def recall_at_k(retrieved: list[str], relevant: set, k: int) -> float:
+    if not relevant:
+        return 1.0
+    return len(set(retrieved[:k]) & relevant) / min(k, len(relevant))
+
+
+def percentiles(latencies: list[float]) -> str:
+    p50, p95, p99 = np.percentile(np.array(latencies) * 1000, [50, 95, 99])
+    return f"p50={p50:.1f}ms p95={p95:.1f}ms p99={p99:.1f}ms"
+
+
+async def timed_queries(query_texts: list[str], search, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = [0.0] * len(query_texts)
+    outcomes = [None] * len(query_texts)
+
+    async def run_one(i: int, query: str):
+        async with semaphore:
+            start = time.perf_counter()
+            outcomes[i] = await search(query)
+            latencies[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(*(run_one(i, query) for i, query in enumerate(query_texts)))
+    return outcomes, latencies, len(query_texts) / (time.perf_counter() - start)
+
+
+async def load_collection(vector: Vector, texts: list[str], batch_size: int, index_config: dict) -> float:
+    documents = [Document(page_content=text, metadata={"doc_id": doc_id_for(i)}) for i, text in enumerate(texts)]
+    await vector.acreate(texts=documents[:1], defer_index=True, index_config=index_config)
+    for i in range(0, len(documents), batch_size):
+        await vector.abulk_add_texts(documents=documents[i:i + batch_size], defer_index=False)
+
+    start = time.perf_counter()
+    await vector.acreate_vector_index()
+    return time.perf_counter() - start
+
+
+async def index_size(vector: Vector) -> int:
+    processor = vector._vector_processor
+    conn = await processor._get_async_connection()
+    try:
+        return await conn.fetchval("SELECT coalesce(pg_relation_size(to_regclass($1)), 0)", processor.index_name) or 0
+    finally:
+        await processor._release_async_connection(conn)
+
+
+async def run_sdk(args, rows: int, index_config: dict):
+    embeddings = FakeEmbeddings(args.dimension)
+    texts, query_texts = build_corpus(rows, args.queries, args.seed)
+    collection_name = f"bench_search_{rows}_{uuid.uuid4().hex[:8]}"
+    vector = Vector(collection_name=collection_name, embedding=embeddings)
+
+    try:
+        index_seconds = await load_collection(vector, texts, args.batch_size, index_config)
+        size_mb = await index_size(vector) / 1024 / 1024
+        print(f"\nrows={rows} index={index_config} build={index_seconds:.2f}s index_size={size_mb:.1f}MB")
+
+        doc_matrix = np.vstack([embeddings.embed_array(text) for text in texts])
+        token_sets = [set(text.split()) for text in texts]
+        sweep = args.probes if index_config["index_type"] == "ivfflat" else args.ef_search
+        quantized = index_config.get("quantization", "none") != "none"
+
+        for mode, value, rerank_factor in [
+            (mode, value, rerank_factor)
+            for mode in args.modes
+            # Fulltext does not use the vector index, one pass is enough
+            for value in (sweep if mode != SearchType.FULLTEXT else [None])
+            for rerank_factor in (args.rerank_factor if quantized and mode != SearchType.FULLTEXT else [None])
+        ]:
+            params = {"probes": value} if index_config["index_type"] == "ivfflat" else {"ef_search": value}
+            if rerank_factor is not None:
+                # Only a search setting, the index is not rebuilt
+                await vector.areindex({**index_config, "rerank_factor": rerank_factor})
+
+            async def search(query: str):
+                return await hybrid_search(
+                    vector,
+                    query=query,
+                    search_type=mode,
+                    limit=args.k,
+                    hybrid_threshold=None,
+                    vector_weight=VECTOR_WEIGHT,
+                    fulltext_weight=FULLTEXT_WEIGHT,
+                    fusion=FUSION_WEIGHTED,
+                    **params
+                )
+
+            outcomes, latencies, qps = await timed_queries(query_texts, search, args.concurrency)
+
+            recalls = []
+            for query, outcome in zip(query_texts, outcomes):
+                retrieved = [r["metadata"].get("doc_id") for r in outcome["result"]]
+                if mode == SearchType.FULLTEXT:
+                    relevant = exact_fulltext_ids(token_sets, query)
+                else:
+                    exact_vector = exact_vector_results(doc_matrix, embeddings.embed_array(query), texts, args.k)
+                    if mode == SearchType.VECTOR:
+                        relevant = {r["metadata"]["doc_id"] for r in exact_vector}
+                    else:
+                        # The fulltext leg is exact, only the approximate vector leg can lose results
+                        fulltext = await vector.asearch_by_full_text(query=query, top_k=args.k)
+                        fused = fuse_results(
+                            {"vector": exact_vector, "fulltext": documents_to_results(fulltext, "fulltext")},
+                            weights={"vector": VECTOR_WEIGHT, "fulltext": FULLTEXT_WEIGHT},
+                            fusion=FUSION_WEIGHTED,
+                            limit=args.k,
+                            rrf_k=get_rrf_k()
+                        )
+                        relevant = {r["metadata"]["doc_id"] for r in fused}
+                recalls.append(recall_at_k(retrieved, relevant, args.k))
+
+            setting = "" if value is None else f" {next(iter(params))}={value}"
+            if rerank_factor is not None:
+                setting += f" rerank_factor={rerank_factor}"
+            print(
+                f"mode={mode.value}{setting} queries={len(query_texts)} concurrency={args.concurrency} "
+                f"{percentiles(latencies)} qps={qps:.0f} recall@{args.k}={np.mean(recalls):.4f}"
+            )
+    finally:
+        if not args.keep:
+            await vector.adelete()
+
+
+async def run_http(args, rows: int, index_config: dict):
+    """Latency and QPS through data-services, recall is not reported since the server embeds with its own model"""
+    import httpx
+
+    texts, query_texts = build_corpus(rows, args.queries, args.seed)
+    collection_name = f"bench_search_{rows}_{uuid.uuid4().hex[:8]}"
+    sweep = args.probes if index_config["index_type"] == "ivfflat" else args.ef_search
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=600) as client:
+        documents = [{"page_content": text, "metadata": {"doc_id": doc_id_for(i)}} for i, text in enumerate(texts)]
+        response = await client.post("/vector/create_collection", json={
+            "collection_name": collection_name,
+            "documents": documents[:1],
+            "index": index_config
+        })
+        response.raise_for_status()
+        try:
+            for i in range(0, len(documents), args.batch_size):
+                response = await client.post(f"/vector/{collection_name}/add_documents", json={
+                    "documents": documents[i:i + args.batch_size],
+                    "bulk": True
+                })
+                response.raise_for_status()
+            print(f"\nrows={rows} index={index_config} url={args.url}")
+
+            for mode in args.modes:
+                for value in (sweep if mode != SearchType.FULLTEXT else [None]):
+                    params = {"probes": value} if index_config["index_type"] == "ivfflat" else {"ef_search": value}
+
+                    async def search(query: str):
+                        response = await client.post(f"/vector/{collection_name}/search", json={
+                            "query": query,
+                            "search_type": mode.value,
+                            "limit": args.k,
+                            "hybrid_threshold": 0.0,
+                            **params
+                        })
+                        response.raise_for_status()
+                        return response.json()
+
+                    _, latencies, qps = await timed_queries(query_texts, search, args.concurrency)
+                    setting = "" if value is None else f" {next(iter(params))}={value}"
+                    print(
+                        f"mode={mode.value}{setting} queries={len(query_texts)} concurrency={args.concurrency} "
+                        f"{percentiles(latencies)} qps={qps:.0f}"
+                    )
+        finally:
+            if not args.keep:
+                await client.request("DELETE", "/vector/delete_collection", json={"collection_name": collection_name})
+
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure search latency, QPS and recall@k on synthetic pgvector collections")
+    parser.add_argument("--sizes", type=int_list, default=[10000, 100000], help="comma separated collection sizes")
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--modes", default="vector,fulltext,hybrid", help="comma separated search types")
+    parser.add_argument("--index-type", choices=["hnsw", "ivfflat"], default="hnsw")
+    parser.add_argument("--m", type=int, default=16)
+    parser.add_argument("--ef-construction", type=int, default=64)
+    parser.add_argument("--lists", type=int, default=100)
+    parser.add_argument("--ef-search", type=int_list, default=[40, 100, 200], help="hnsw.ef_search values to sweep")
+    parser.add_argument("--probes", type=int_list, default=[1, 10, 20], help="ivfflat.probes values to sweep")
+    parser.add_argument("--quantization", default="none", help="comma separated index quantizations: none, halfvec, binary")
+    parser.add_argument("--rerank-factor", type=int_list, default=[4], help="candidates per result to re-rank exactly, quantized indexes only")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="benchmark a running data-services instead of calling vector_sdk in process")
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark collections")
+    args = parser.parse_args()
+
+    args.modes = [SearchType(mode) for mode in args.modes.split(",")]
+    index_configs = []
+    for quantization in args.quantization.split(","):
+        index_config = {"index_type": args.index_type, "quantization": quantization}
+        if args.index_type == "ivfflat":
+            index_config["lists"] = args.lists
+        else:
+            index_config.update(m=args.m, ef_construction=args.ef_construction)
+        index_configs.append(index_config)
+
+    async def run_all():
+        for rows in args.sizes:
+            for index_config in index_configs:
+                if args.url:
+                    await run_http(args, rows, index_config)
+                else:
+                    await run_sdk(args, rows, index_config)
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
@@ -18,9 +18,23 @@ class SearchType(str, Enum):
     MEMORY = "memory"
     KG = "kg"
 
+class VectorIndexParams(BaseModel):
+    # "hnsw" (m, ef_construction) or "ivfflat" (lists)
+    index_type: str = "hnsw"
+    m: int = 16
+    ef_construction: int = 64
+    lists: int = 100
+    # collection defaults for searches, a search request may override them
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+    # "none", "halfvec" or "binary", quantized indexes re-rank rerank_factor * limit candidates exactly
+    quantization: str = "none"
+    rerank_factor: int = 4
+
 class CreateRequest(BaseModel):
     documents: List[DocumentModel]
     collection_name: str
+    index: Optional[VectorIndexParams] = None
 
 class AddTextsRequest(BaseModel):
     documents: List[DocumentModel]
@@ -66,12 +80,20 @@ class MemoryGetAllRequest(BaseModel):
     agent_id: Optional[str] = None
     run_id: Optional[str] = None
     filters: Optional[Dict[str, Any]] = None
-    limit: int = 100
+    limit: int = Field(100, ge=1, le=10000)
+    # next_cursor of the previous page
+    cursor: Optional[str] = None
 
 class MemoryDeleteRequest(BaseModel):
     user_id: Optional[str] = None
     agent_id: Optional[str] = None
     run_id: Optional[str] = None
+    # ids to delete, restricted to user_id when set, instead of the whole scope
+    memory_ids: Optional[List[str]] = None
+    # only memories whose metadata contains these key/values
+    metadata: Optional[Dict[str, Any]] = None
+    # remove the history of the deleted memories instead of recording DELETE events
+    purge_history: bool = False
 
 class MemoryResponse(BaseModel):
     status: str
@@ -91,6 +113,34 @@ class KnowledgePyramidSearchRequest(BaseModel):
     memory_threshold: float = 0.1
     fulltext_weight: Optional[float] = 0.5
     vector_weight: Optional[float] = 0.5
+    # hybrid fusion: "weighted" (normalized scores) or "rrf", default from HYBRID_FUSION
+    fusion: Optional[str] = None
+    # vector index search overrides, hnsw.ef_search / ivfflat.probes
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+    # filter on document metadata, e.g. {"datasource": {"$in": ["mysql"]}}, not applied to memories
+    metadata_filter: Optional[Dict[str, Any]] = None
+
+class KnowledgePyramidMultiSearchRequest(BaseModel):
+    collection_names: List[str]
+    query: str
+    search_type: SearchType = SearchType.VECTOR
+    # results per collection, limits overrides it for single collections
+    limit: int = 10
+    limits: Optional[Dict[str, int]] = None
+    hybrid_threshold: float = 0.1
+    memory_threshold: float = 0.1
+    fulltext_weight: Optional[float] = 0.5
+    vector_weight: Optional[float] = 0.5
+    fusion: Optional[str] = None
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+    metadata_filter: Optional[Dict[str, Any]] = None
+    # "grouped" per collection or "global" one ranked list across collections
+    merge: str = "grouped"
+    total_limit: Optional[int] = None
+    # seconds for the whole request, default from MULTI_SEARCH_TIMEOUT
+    timeout: Optional[float] = None
 
 class KnowledgePyramidDeleteRequest(BaseModel):
     documents: List[str]
@@ -99,6 +149,7 @@ class KnowledgePyramidDeleteRequest(BaseModel):
 ## vector
 class VectorAddDocumentsRequest(BaseModel):
     documents: List[DocumentModel]
+    bulk: bool = False
 
 class VectorSearchRequest(BaseModel):
     query: str
@@ -107,6 +158,23 @@ class VectorSearchRequest(BaseModel):
     hybrid_threshold: float = 0.1
     fulltext_weight: Optional[float] = 0.5
     vector_weight: Optional[float] = 0.5
+    fusion: Optional[str] = None
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+    metadata_filter: Optional[Dict[str, Any]] = None
+
+class VectorBatchSearchRequest(BaseModel):
+    queries: List[str]
+    search_type: SearchType = SearchType.VECTOR
+    # results per query
+    limit: int = 10
+    hybrid_threshold: float = 0.1
+    fulltext_weight: Optional[float] = 0.5
+    vector_weight: Optional[float] = 0.5
+    fusion: Optional[str] = None
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+    metadata_filter: Optional[Dict[str, Any]] = None
 
 class VectorDeleteDocumentsRequest(BaseModel):
     documents: List[str]
@@ -118,6 +186,10 @@ class VectorDeleteDocumentsByMetaFieldRequest(BaseModel):
 class VectorCreateCollectionRequest(BaseModel):
     documents: List[DocumentModel]
     collection_name: str
+    index: Optional[VectorIndexParams] = None
+
+class VectorReindexRequest(BaseModel):
+    index: VectorIndexParams
 
 class VectorDeleteCollectionRequest(BaseModel):
     collection_name: str
@@ -164,6 +236,7 @@ class FingerprintListResponse(BaseModel):
     status: str
     data: List[Fingerprint]
     count: int
+    next_cursor: Optional[str] = None
 
 # conversation history
 class HistoryRecord(BaseModel):
@@ -199,6 +272,14 @@ class SearchHistoryRequest(BaseModel):
     run_id: str
     limit: Optional[int] = None
 
+class LatestHistoryRequest(BaseModel):
+    user_id: str
+    agent_id: str
+    run_id: str
+    limit: int = Field(20, ge=1, le=1000)
+    # next_cursor of the previous response, pages towards older turns
+    cursor: Optional[str] = None
+
 class HistoryRecordResponse(BaseModel):
     hid: str
     user_id: str
@@ -213,3 +294,10 @@ class SearchHistoryResponse(BaseModel):
     data: List[HistoryRecordResponse]
     total: int
     message: str
+
+class LatestHistoryResponse(BaseModel):
+    status: str
+    data: List[HistoryRecordResponse]
+    total: int
+    message: str
+    next_cursor: Optional[str] = None
@@ -0,0 +1,39 @@
+import json
+import base64
+import logging
+from typing import List, Dict, Any, AsyncIterator
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Opaque cursor from the sort key values of the last row of a page"""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8"))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(values, list) or not values:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+async def ndjson_lines(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """
+    One JSON document per line, written as the rows arrive. The status code is sent before the first row,
+    so a failure part way is reported as a last {"error": ...} line.
+    """
+    count = 0
+    try:
+        async for row in rows:
+            count += 1
+            yield (json.dumps(row, default=str, ensure_ascii=False) + "\n").encode("utf-8")
+    except Exception as e:
+        logger.error(f"NDJSON stream failed after {count} rows: {e}")
+        yield (json.dumps({"error": str(e)}, ensure_ascii=False) + "\n").encode("utf-8")
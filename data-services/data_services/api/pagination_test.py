@@ -0,0 +1,75 @@
+import os
+import sys
+import json
+import asyncio
+from datetime import datetime
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+from data_services.api.pagination import encode_cursor, decode_cursor, ndjson_lines
+
+
+def test_cursor_round_trip():
+    for values in (["9b2f4c1e-0d6a-4f7e-8a3b-2c5d7e9f1a0b"], ["collection_a", 42], ["ünïcode", None, 1.5]):
+        cursor = encode_cursor(values)
+        # URL safe and without padding, so it can be passed as a query parameter as is
+        assert "=" not in cursor and "+" not in cursor and "/" not in cursor
+        assert decode_cursor(cursor) == values
+    print("✓ cursors round trip")
+
+
+def test_cursor_of_datetime_key():
+    created_at = datetime(2026, 1, 2, 3, 4, 5, 678000)
+    values = decode_cursor(encode_cursor([created_at, "hid-1"]))
+    # Sort keys that are not JSON types come back as strings, the caller parses them
+    assert values == [str(created_at), "hid-1"]
+    assert datetime.fromisoformat(values[0]) == created_at
+    print("✓ datetime sort keys are encoded as strings")
+
+
+def test_invalid_cursors_rejected():
+    invalid = [
+        "not a cursor!",
+        encode_cursor([])[:-1] + "*",
+        encode_cursor([]),
+        encode_cursor({"id": 1}),
+        "",
+        "gA",
+    ]
+    for cursor in invalid:
+        try:
+            decode_cursor(cursor)
+            raise AssertionError(f"{cursor!r} must be rejected")
+        except ValueError:
+            pass
+    print("✓ malformed cursors raise ValueError")
+
+
+def test_ndjson_lines():
+    async def rows(fail_after=None):
+        for i in range(3):
+            if fail_after is not None and i == fail_after:
+                raise RuntimeError("connection lost")
+            yield {"id": i, "memory": "café", "created_at": datetime(2026, 1, 1)}
+
+    async def collect(fail_after=None):
+        return [line async for line in ndjson_lines(rows(fail_after))]
+
+    lines = asyncio.run(collect())
+    assert len(lines) == 3 and all(line.endswith(b"\n") for line in lines)
+    assert json.loads(lines[0]) == {"id": 0, "memory": "café", "created_at": "2026-01-01 00:00:00"}
+
+    lines = asyncio.run(collect(fail_after=2))
+    assert len(lines) == 3
+    assert json.loads(lines[-1]) == {"error": "connection lost"}
+    print("✓ ndjson_lines writes one row per line and reports a failure as the last line")
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip()
+    test_cursor_of_datetime_key()
+    test_invalid_cursors_rejected()
+    test_ndjson_lines()
+    print("\nAll pagination tests passed! ✓")
@@ -0,0 +1,161 @@
+import os
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Tuple
+from langchain_core.embeddings import Embeddings
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        if value <= 0:
+            logger.warning(f"{name} must be greater than 0, using default value {default}. Current value: {value}")
+            return default
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"{name} environment variable conversion failed, using default value {default}. Error: {e}")
+        return default
+
+
+class MicroBatchEmbeddings(Embeddings):
+    """
+    Front end for an embedding model that coalesces concurrent aembed_query calls.
+
+    Queries arriving within max_wait_ms of each other are sent as one aembed_documents call of up to
+    max_batch_size unique texts, identical concurrent queries share one result. Providers that embed
+    queries differently from documents (query_as_document=False) still get the coalescing of identical
+    texts, each unique text is then embedded with aembed_query concurrently.
+
+    Caching stays in CacheEmbedding in front of this class, so only cache misses reach the batcher.
+    """
+
+    def __init__(self, model_instance: Embeddings, max_batch_size: int = 32, max_wait_ms: int = 10, query_as_document: bool = True):
+        self.wrapped_model = model_instance
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.query_as_document = query_as_document
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self.stats = {
+            "requests": 0,
+            "coalesced": 0,
+            "batches": 0,
+            "batched_texts": 0,
+            "errors": 0
+        }
+
+    # Documents are already batched by the caller and sync calls cannot wait for others
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.wrapped_model.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.wrapped_model.embed_query(text)
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        return await self.wrapped_model.aembed_documents(texts)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        self.stats["requests"] += 1
+        future = self._pending.get(text) or self._inflight.get(text)
+        if future is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(future)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending[text] = future
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return await asyncio.shield(future)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._pending:
+            return
+
+        batch = list(self._pending.items())[:self.max_batch_size]
+        for text, future in batch:
+            del self._pending[text]
+            self._inflight[text] = future
+        # Whatever did not fit waits for the next window
+        if self._pending:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+
+        asyncio.ensure_future(self._run_batch(batch))
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        texts = [text for text, _ in batch]
+        self.stats["batches"] += 1
+        self.stats["batched_texts"] += len(texts)
+        try:
+            if self.query_as_document:
+                embeddings = await self.wrapped_model.aembed_documents(texts)
+            else:
+                embeddings = await asyncio.gather(*(self.wrapped_model.aembed_query(text) for text in texts))
+        except Exception as e:
+            self._finish(texts)
+            self.stats["errors"] += 1
+            logger.error(f"Embedding batch of {len(texts)} queries failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+                    # Mark as retrieved, a caller may have been cancelled already
+                    future.exception()
+            return
+
+        self._finish(texts)
+        for (_, future), embedding in zip(batch, embeddings):
+            if not future.done():
+                future.set_result(embedding)
+
+    def _finish(self, texts: List[str]) -> None:
+        for text in texts:
+            self._inflight.pop(text, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "avg_batch_size": round(self.stats["batched_texts"] / self.stats["batches"], 2) if self.stats["batches"] else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": int(self.max_wait * 1000),
+            "query_as_document": self.query_as_document
+        }
+
+
+_frontends: Dict[Tuple, MicroBatchEmbeddings] = {}
+
+
+def get_embedding_frontend(provider: Optional[str], model: Optional[str], model_instance: Embeddings) -> Embeddings:
+    """
+    Shared front end per provider and model, so the knowledge pyramid and vector services batch together.
+    Returns model_instance unchanged when EMBEDDING_MICRO_BATCH is not enabled.
+    """
+    if os.getenv('EMBEDDING_MICRO_BATCH', 'enable') != 'enable':
+        return model_instance
+
+    key = (provider, model)
+    if key not in _frontends:
+        # dashscope embeds queries with text_type=query, a document batch would change the vectors
+        default_query_as_document = 'disable' if provider == 'dashscope' else 'enable'
+        _frontends[key] = MicroBatchEmbeddings(
+            model_instance,
+            max_batch_size=_get_int_env('EMBEDDING_MICRO_BATCH_SIZE', 32),
+            max_wait_ms=_get_int_env('EMBEDDING_MICRO_BATCH_WAIT_MS', 10),
+            query_as_document=os.getenv('EMBEDDING_QUERY_AS_DOCUMENT', default_query_as_document) == 'enable'
+        )
+        logger.info(f"Embedding micro-batching enabled for {provider}/{model}: {_frontends[key].get_stats()}")
+    return _frontends[key]
+
+
+def get_embedding_frontend_stats() -> Dict[str, Any]:
+    return {f"{provider}/{model}": frontend.get_stats() for (provider, model), frontend in _frontends.items()}
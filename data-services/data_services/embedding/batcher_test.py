@@ -0,0 +1,132 @@
+import os
+import sys
+import asyncio
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+from data_services.embedding.batcher import MicroBatchEmbeddings, get_embedding_frontend
+
+
+class RecordingEmbeddings:
+    """Embedding model that records its calls, fails while fail is set"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.document_calls = []
+        self.query_calls = []
+        self.fail = False
+
+    async def aembed_documents(self, texts):
+        self.document_calls.append(list(texts))
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider unavailable")
+        return [[float(len(text))] for text in texts]
+
+    async def aembed_query(self, text):
+        self.query_calls.append(text)
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("provider unavailable")
+        return [float(len(text))]
+
+
+def test_concurrent_queries_coalesced():
+    async def run():
+        model = RecordingEmbeddings()
+        batcher = MicroBatchEmbeddings(model, max_batch_size=32, max_wait_ms=20)
+        texts = ["a", "bb", "a", "ccc", "bb"]
+        results = await asyncio.gather(*(batcher.aembed_query(text) for text in texts))
+        assert results == [[1.0], [2.0], [1.0], [3.0], [2.0]]
+        assert model.document_calls == [["a", "bb", "ccc"]]
+        assert batcher.stats["requests"] == 5 and batcher.stats["coalesced"] == 2
+        assert batcher.get_stats()["avg_batch_size"] == 3.0
+    asyncio.run(run())
+    print("✓ concurrent queries are sent as one batch")
+
+
+def test_batch_size_limit():
+    async def run():
+        model = RecordingEmbeddings()
+        batcher = MicroBatchEmbeddings(model, max_batch_size=2, max_wait_ms=20)
+        texts = ["a", "bb", "ccc", "dddd", "eeeee"]
+        results = await asyncio.gather(*(batcher.aembed_query(text) for text in texts))
+        assert results == [[float(len(text))] for text in texts]
+        assert model.document_calls == [["a", "bb"], ["ccc", "dddd"], ["eeeee"]]
+        assert batcher.stats["batches"] == 3
+    asyncio.run(run())
+    print("✓ batches are split at max_batch_size")
+
+
+def test_query_embedding_kept():
+    async def run():
+        model = RecordingEmbeddings()
+        batcher = MicroBatchEmbeddings(model, max_wait_ms=20, query_as_document=False)
+        results = await asyncio.gather(*(batcher.aembed_query(text) for text in ["a", "a", "bb"]))
+        assert results == [[1.0], [1.0], [2.0]]
+        assert model.document_calls == []
+        assert sorted(model.query_calls) == ["a", "bb"]
+    asyncio.run(run())
+    print("✓ query_as_document=False embeds each unique query as a query")
+
+
+def test_batch_error_reaches_every_caller():
+    async def run():
+        model = RecordingEmbeddings()
+        model.fail = True
+        batcher = MicroBatchEmbeddings(model, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.aembed_query(text) for text in ["a", "a", "bb"]), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        assert batcher.stats["errors"] == 1
+        assert not batcher._pending and not batcher._inflight
+
+        # The failed texts are embedded again by the next call
+        model.fail = False
+        assert await batcher.aembed_query("a") == [1.0]
+        assert len(model.document_calls) == 2
+    asyncio.run(run())
+    print("✓ a failed batch fails its callers and is not remembered")
+
+
+def test_cancelled_caller_does_not_cancel_batch():
+    async def run():
+        model = RecordingEmbeddings(delay=0.05)
+        batcher = MicroBatchEmbeddings(model, max_wait_ms=5)
+        cancelled = asyncio.create_task(batcher.aembed_query("a"))
+        waiting = asyncio.create_task(batcher.aembed_query("a"))
+        other = asyncio.create_task(batcher.aembed_query("bb"))
+        await asyncio.sleep(0.02)
+        cancelled.cancel()
+
+        assert await waiting == [1.0] and await other == [2.0]
+        assert cancelled.cancelled()
+        assert model.document_calls == [["a", "bb"]]
+    asyncio.run(run())
+    print("✓ a cancelled caller leaves the batch running")
+
+
+def test_frontend_shared_per_model():
+    model = RecordingEmbeddings()
+    os.environ['EMBEDDING_MICRO_BATCH'] = 'disable'
+    try:
+        assert get_embedding_frontend("openai", "test-embedding", model) is model
+    finally:
+        del os.environ['EMBEDDING_MICRO_BATCH']
+
+    frontend = get_embedding_frontend("openai", "test-embedding", model)
+    assert get_embedding_frontend("openai", "test-embedding", RecordingEmbeddings()) is frontend
+    assert frontend.query_as_document is True
+    assert get_embedding_frontend("dashscope", "test-embedding", model).query_as_document is False
+    print("✓ one front end per provider and model")
+
+
+if __name__ == "__main__":
+    test_concurrent_queries_coalesced()
+    test_batch_size_limit()
+    test_query_embedding_kept()
+    test_batch_error_reaches_every_caller()
+    test_cancelled_caller_does_not_cancel_batch()
+    test_frontend_shared_per_model()
+    print("\nAll embedding micro-batch tests passed! ✓")
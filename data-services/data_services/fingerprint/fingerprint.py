@@ -2,7 +2,7 @@ import asyncio
 from dbutils.pooled_db import PooledDB
 from pymysql import Error
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator
 import os
 from contextlib import asynccontextmanager
 import uuid
@@ -337,6 +337,64 @@ class AsyncFingerprintService:
             logger.error(f"Query all records error: {e}")
             return []
     
+    async def get_page(self, limit: int = 100, after: Optional[Tuple[Any, str]] = None) -> Tuple[List[Fingerprint], Optional[Tuple[Any, str]]]:
+        """
+        Get fingerprint records newest first with keyset pagination
+
+        Args:
+            limit: Page size
+            after: (created_at, fid) of the last record of the previous page, None for the first page
+
+        Returns:
+            Tuple[List[Fingerprint], Optional[Tuple]]: Records of the page and the key of the next page, None on the last page
+        """
+        # created_at, fid is served by idx_created_at, InnoDB keeps the primary key in every secondary index
+        if after is not None:
+            query = """SELECT * FROM fingerprints
+            WHERE created_at < %s OR (created_at = %s AND fid < %s)
+            ORDER BY created_at DESC, fid DESC LIMIT %s"""
+            params = (after[0], after[0], after[1], limit + 1)
+        else:
+            query = "SELECT * FROM fingerprints ORDER BY created_at DESC, fid DESC LIMIT %s"
+            params = (limit + 1,)
+
+        async with self._get_cursor() as cursor:
+            await cursor.execute(query, params)
+            results = await cursor.fetchall()
+
+        next_key = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_key = (results[-1]['created_at'], results[-1]['fid'])
+        return [self._to_fingerprint(result) for result in results], next_key
+
+    async def iter_all(self, page_size: int = 500) -> AsyncIterator[Fingerprint]:
+        """
+        Iterate over all fingerprint records newest first, one keyset page per query
+
+        Args:
+            page_size: Records read per query
+        """
+        after = None
+        while True:
+            fingerprints, after = await self.get_page(limit=page_size, after=after)
+            for fingerprint in fingerprints:
+                yield fingerprint
+            if after is None:
+                return
+
+    @staticmethod
+    def _to_fingerprint(result: Dict[str, Any]) -> Fingerprint:
+        return Fingerprint(
+            fid=result['fid'],
+            fingerprint_id=result['fingerprint_id'],
+            fingerprint_summary=result['fingerprint_summary'],
+            agent_info_name=result['agent_info_name'],
+            agent_info_description=result['agent_info_description'],
+            dd_namespace=result['dd_namespace'],
+            dd_name=result['dd_name']
+        )
+
     async def update(self, fid: str, fingerprint: Fingerprint) -> bool:
         """
         Update fingerprint record
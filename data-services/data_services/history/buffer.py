@@ -0,0 +1,461 @@
+import os
+import time
+import asyncio
+import logging
+import contextlib
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
+from ..api.base import HistoryRecord
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+WRITE_SYNC = "sync"
+WRITE_ASYNC = "async"
+
+ConversationKey = Tuple[str, str, str]
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        if value < 1:
+            logger.warning(f"{name} must be positive, using default value {default}. Current value: {value}")
+            return default
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"{name} environment variable conversion failed, using default value {default}. Error: {e}")
+        return default
+
+
+def _get_float_env(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+        if value <= 0:
+            logger.warning(f"{name} must be positive, using default value {default}. Current value: {value}")
+            return default
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"{name} environment variable conversion failed, using default value {default}. Error: {e}")
+        return default
+
+
+class _MemoryBackend:
+    """Recent turns and pending writes in process, for a single replica"""
+
+    def __init__(self, capacity: int, max_conversations: int, ttl: int, max_dead: int = 1000):
+        self.capacity = capacity
+        self.max_conversations = max_conversations
+        self.ttl = ttl
+        self._recent: "OrderedDict[ConversationKey, tuple]" = OrderedDict()
+        self._pending: List[HistoryRecord] = []
+        self._dead: "deque[HistoryRecord]" = deque(maxlen=max_dead)
+
+    async def get_recent(self, key: ConversationKey) -> Optional[Tuple[List[HistoryRecord], bool]]:
+        entry = self._recent.get(key)
+        if entry is None:
+            return None
+        expires_at, records, complete = entry
+        if expires_at < time.monotonic():
+            del self._recent[key]
+            return None
+        self._recent.move_to_end(key)
+        return list(records), complete
+
+    async def put_recent(self, key: ConversationKey, records: List[HistoryRecord], complete: bool) -> None:
+        self._recent[key] = (time.monotonic() + self.ttl, deque(records[-self.capacity:], maxlen=self.capacity), complete)
+        self._recent.move_to_end(key)
+        while len(self._recent) > self.max_conversations:
+            self._recent.popitem(last=False)
+
+    async def append_recent(self, key: ConversationKey, record: HistoryRecord) -> None:
+        entry = self._recent.get(key)
+        if entry is None:
+            # Not cached, the next read loads the conversation
+            return
+        _, records, complete = entry
+        # A full ring drops its oldest turn, which is then only in MySQL
+        complete = complete and len(records) < self.capacity
+        records.append(record)
+        self._recent[key] = (time.monotonic() + self.ttl, records, complete)
+
+    async def push_pending(self, record: HistoryRecord) -> int:
+        self._pending.append(record)
+        return len(self._pending)
+
+    async def pop_pending(self, count: int) -> List[HistoryRecord]:
+        batch = self._pending[:count]
+        del self._pending[:count]
+        return batch
+
+    async def requeue_pending(self, records: List[HistoryRecord]) -> None:
+        self._pending[:0] = records
+
+    async def pending_for(self, key: ConversationKey) -> List[HistoryRecord]:
+        return [record for record in self._pending if (record.user_id, record.agent_id, record.run_id) == key]
+
+    async def pending_count(self) -> int:
+        return len(self._pending)
+
+    async def dead_letter(self, records: List[HistoryRecord]) -> None:
+        self._dead.extend(records)
+
+    async def dead_letters(self) -> List[HistoryRecord]:
+        return list(self._dead)
+
+    def flush_lock(self):
+        # A single replica, the buffer's own lock already serializes its flushes and loads
+        return contextlib.nullcontext()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "memory", "conversations": len(self._recent), "dead_letters": len(self._dead)}
+
+
+class _RedisBackend:
+    """
+    Recent turns and pending writes in Redis, shared by every replica. Pending turns survive a restart of the
+    replica that accepted them, any replica's flusher writes them to MySQL.
+    """
+
+    def __init__(self, client, capacity: int, ttl: int, lock_timeout: int = 60):
+        self.redis = client
+        self.capacity = capacity
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+
+    def _recent_key(self, key: ConversationKey) -> str:
+        return "dac:history:recent:" + ":".join(key)
+
+    def _complete_key(self, key: ConversationKey) -> str:
+        return "dac:history:complete:" + ":".join(key)
+
+    _pending_key = "dac:history:pending"
+    _dead_key = "dac:history:dead"
+    _lock_key = "dac:history:flush_lock"
+
+    async def get_recent(self, key: ConversationKey) -> Optional[Tuple[List[HistoryRecord], bool]]:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(self._complete_key(key))
+            pipe.lrange(self._recent_key(key), 0, -1)
+            complete, values = await pipe.execute()
+        # The marker is written with the list, without it the list was never loaded or expired
+        if complete is None:
+            return None
+        return [HistoryRecord.model_validate_json(value) for value in values], complete == "1"
+
+    async def put_recent(self, key: ConversationKey, records: List[HistoryRecord], complete: bool) -> None:
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._recent_key(key))
+            if records:
+                pipe.rpush(self._recent_key(key), *[record.model_dump_json() for record in records[-self.capacity:]])
+                pipe.expire(self._recent_key(key), self.ttl)
+            pipe.set(self._complete_key(key), "1" if complete else "0", ex=self.ttl)
+            await pipe.execute()
+
+    async def append_recent(self, key: ConversationKey, record: HistoryRecord) -> None:
+        complete = await self.redis.get(self._complete_key(key))
+        if complete is None:
+            return
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(self._recent_key(key), record.model_dump_json())
+            pipe.ltrim(self._recent_key(key), -self.capacity, -1)
+            pipe.expire(self._recent_key(key), self.ttl)
+            length, _, _ = await pipe.execute()
+        if complete == "1" and length > self.capacity:
+            # The ring was full before the push, its oldest turn is now only in MySQL
+            await self.redis.set(self._complete_key(key), "0", ex=self.ttl)
+        else:
+            await self.redis.expire(self._complete_key(key), self.ttl)
+
+    async def push_pending(self, record: HistoryRecord) -> int:
+        return await self.redis.rpush(self._pending_key, record.model_dump_json())
+
+    async def pop_pending(self, count: int) -> List[HistoryRecord]:
+        # Atomic, replicas flushing at the same time never take the same turn
+        values = await self.redis.lpop(self._pending_key, count)
+        return [HistoryRecord.model_validate_json(value) for value in values or []]
+
+    async def requeue_pending(self, records: List[HistoryRecord]) -> None:
+        await self.redis.lpush(self._pending_key, *[record.model_dump_json() for record in reversed(records)])
+
+    async def pending_for(self, key: ConversationKey) -> List[HistoryRecord]:
+        records = [HistoryRecord.model_validate_json(value) for value in await self.redis.lrange(self._pending_key, 0, -1)]
+        return [record for record in records if (record.user_id, record.agent_id, record.run_id) == key]
+
+    async def pending_count(self) -> int:
+        return await self.redis.llen(self._pending_key)
+
+    async def dead_letter(self, records: List[HistoryRecord]) -> None:
+        await self.redis.rpush(self._dead_key, *[record.model_dump_json() for record in records])
+
+    async def dead_letters(self) -> List[HistoryRecord]:
+        return [HistoryRecord.model_validate_json(value) for value in await self.redis.lrange(self._dead_key, 0, -1)]
+
+    def flush_lock(self):
+        # Shared by the replicas, a turn popped by one replica's flush is in neither the queue nor MySQL until
+        # its insert commits. Expires after lock_timeout so a crashed replica does not hold it
+        return self.redis.lock(self._lock_key, timeout=self.lock_timeout)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"backend": "redis"}
+
+
+class HistoryBuffer:
+    """
+    Recent turns of every conversation in front of the history table.
+
+    Reads of the latest turns are served from a ring of the last HISTORY_BUFFER_SIZE turns per
+    (user_id, agent_id, run_id), loaded from MySQL on the first read. Writes go to the ring and to MySQL:
+    - sync: the turn is in MySQL before create returns
+    - async: the turn is queued and written in batches every HISTORY_FLUSH_INTERVAL seconds or once
+      HISTORY_FLUSH_BATCH turns are queued. With the memory backend a crash loses the turns of the last interval,
+      with the redis backend the queue is in Redis and survives it. Above HISTORY_MAX_PENDING queued turns,
+      writes fall back to sync.
+    A batch MySQL rejects is retried turn by turn, a turn that still fails HISTORY_FLUSH_MAX_ATTEMPTS times is
+    moved to a dead letter list instead of blocking the queue.
+    """
+
+    def __init__(self, service, backend, write_mode: str = WRITE_ASYNC, flush_interval: float = 1.0,
+                 flush_batch: int = 200, max_pending: int = 10000, max_attempts: int = 5):
+        self.service = service
+        self.backend = backend
+        self.write_mode = write_mode
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self._flush_lock = asyncio.Lock()
+        # Failed flush attempts per hid, counted by this replica
+        self._attempts: Dict[str, int] = {}
+        # Turns created while their conversation is being loaded, added to the ring once it is stored
+        self._loading: Dict[ConversationKey, List[HistoryRecord]] = {}
+        self._wake = asyncio.Event()
+        self._flusher: Optional[asyncio.Task] = None
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "loads": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "row_errors": 0,
+            "dead_lettered": 0,
+            "sync_fallbacks": 0
+        }
+
+    @classmethod
+    def from_env(cls, service) -> Optional["HistoryBuffer"]:
+        if os.getenv('HISTORY_BUFFER_ENABLE', 'disable') != 'enable':
+            return None
+
+        capacity = _get_int_env('HISTORY_BUFFER_SIZE', 50)
+        ttl = _get_int_env('HISTORY_BUFFER_TTL', 600)
+        backend = None
+        if os.getenv('HISTORY_BUFFER_BACKEND', 'memory') == 'redis':
+            redis_url = os.getenv('HISTORY_BUFFER_REDIS_URL')
+            if not redis_url:
+                raise ValueError("HISTORY_BUFFER_BACKEND=redis requires HISTORY_BUFFER_REDIS_URL")
+            import redis.asyncio as aioredis
+            backend = _RedisBackend(aioredis.from_url(redis_url, decode_responses=True), capacity, ttl)
+        else:
+            backend = _MemoryBackend(capacity, _get_int_env('HISTORY_BUFFER_MAX_CONVERSATIONS', 10000), ttl)
+
+        write_mode = os.getenv('HISTORY_WRITE_MODE', WRITE_ASYNC)
+        if write_mode not in (WRITE_SYNC, WRITE_ASYNC):
+            logger.warning(f"Unknown HISTORY_WRITE_MODE {write_mode}, using {WRITE_ASYNC}")
+            write_mode = WRITE_ASYNC
+
+        return cls(
+            service,
+            backend,
+            write_mode=write_mode,
+            flush_interval=_get_float_env('HISTORY_FLUSH_INTERVAL', 1.0),
+            flush_batch=_get_int_env('HISTORY_FLUSH_BATCH', 200),
+            max_pending=_get_int_env('HISTORY_MAX_PENDING', 10000),
+            max_attempts=_get_int_env('HISTORY_FLUSH_MAX_ATTEMPTS', 5)
+        )
+
+    async def start(self) -> None:
+        if self.write_mode == WRITE_ASYNC and self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        logger.info(f"History buffer started, backend={self.backend.get_stats()['backend']}, write_mode={self.write_mode}")
+
+    async def close(self) -> None:
+        """Stop the flusher and write every queued turn"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    async def create(self, history_record: HistoryRecord) -> bool:
+        # Stamped here, the turn is ordered by when it was accepted and not by when it was flushed
+        if history_record.created_at is None:
+            history_record.created_at = datetime.now().replace(microsecond=0)
+        key = (history_record.user_id, history_record.agent_id, history_record.run_id)
+
+        if self.write_mode == WRITE_ASYNC and await self.backend.pending_count() < self.max_pending:
+            pending = await self.backend.push_pending(history_record)
+            if pending >= self.flush_batch:
+                self._wake.set()
+        else:
+            if self.write_mode == WRITE_ASYNC:
+                self.stats["sync_fallbacks"] += 1
+            await self.service.insert_many([history_record])
+
+        if key in self._loading:
+            self._loading[key].append(history_record)
+        else:
+            await self.backend.append_recent(key, history_record)
+        return True
+
+    async def get_by_user_agent_run(self, user_id: str, agent_id: str, run_id: str, limit: int = None) -> List[HistoryRecord]:
+        """Same result as AsyncHistoryService.get_by_user_agent_run, including turns not flushed yet"""
+        records, complete = await self._get_recent((user_id, agent_id, run_id))
+        if complete or (limit is not None and limit <= len(records)):
+            self.stats["hits"] += 1
+            return records if limit is None else records[max(len(records) - limit, 0):]
+
+        # Older than the ring, MySQL has to answer and must hold every turn first
+        self.stats["misses"] += 1
+        await self.flush()
+        return await self.service.get_by_user_agent_run(user_id, agent_id, run_id, limit)
+
+    async def get_latest(self, user_id: str, agent_id: str, run_id: str, limit: int = 20,
+                         before: Optional[Tuple[Any, str]] = None) -> Tuple[List[HistoryRecord], Optional[Tuple[Any, str]]]:
+        """Same result as AsyncHistoryService.get_latest, the first page is served from the ring"""
+        if before is None:
+            records, complete = await self._get_recent((user_id, agent_id, run_id))
+            if complete or limit <= len(records):
+                self.stats["hits"] += 1
+                page = records[max(len(records) - limit, 0):]
+                has_more = len(records) > limit or not complete
+                next_key = (page[0].created_at, page[0].hid) if has_more and page else None
+                return page, next_key
+
+        self.stats["misses"] += 1
+        await self.flush()
+        return await self.service.get_latest(user_id, agent_id, run_id, limit=limit, before=before)
+
+    async def flush(self) -> int:
+        """
+        Write queued turns to MySQL in batches. A failed batch is retried turn by turn, so one bad turn does not
+        hold back the others. When no turn of the batch goes through MySQL is taken to be unavailable and the batch
+        is queued again for the next flush.
+        """
+        flushed = 0
+        async with self._locked():
+            while True:
+                batch = await self.backend.pop_pending(self.flush_batch)
+                if not batch:
+                    break
+                try:
+                    await self.service.insert_many(batch)
+                except Exception as e:
+                    self.stats["flush_errors"] += 1
+                    logger.warning(f"History flush of {len(batch)} turns failed, retrying turn by turn: {e}")
+                    failed = await self._insert_one_by_one(batch)
+                    flushed += len(batch) - len(failed)
+                    if len(failed) == len(batch):
+                        await self.backend.requeue_pending(batch)
+                        logger.error(f"History flush of {len(batch)} turns failed, retrying on the next flush")
+                        break
+                    await self._retry_or_dead_letter(failed)
+                    continue
+                for record in batch:
+                    self._attempts.pop(record.hid, None)
+                flushed += len(batch)
+                self.stats["flushes"] += 1
+            self.stats["flushed"] += flushed
+        return flushed
+
+    async def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            **self.backend.get_stats(),
+            "pending": await self.backend.pending_count(),
+            "write_mode": self.write_mode,
+            "flush_interval": self.flush_interval,
+            "flush_batch": self.flush_batch,
+            "max_attempts": self.max_attempts
+        }
+
+    async def get_dead_letters(self) -> List[HistoryRecord]:
+        return await self.backend.dead_letters()
+
+    @contextlib.asynccontextmanager
+    async def _locked(self):
+        async with self._flush_lock:
+            async with self.backend.flush_lock():
+                yield
+
+    async def _insert_one_by_one(self, batch: List[HistoryRecord]) -> List[HistoryRecord]:
+        failed = []
+        for record in batch:
+            try:
+                await self.service.insert_many([record])
+                self._attempts.pop(record.hid, None)
+            except Exception as e:
+                self.stats["row_errors"] += 1
+                logger.warning(f"History flush of turn {record.hid} failed: {e}")
+                failed.append(record)
+        return failed
+
+    async def _retry_or_dead_letter(self, failed: List[HistoryRecord]) -> None:
+        # Other turns of the batch went through, so these failed on their own content
+        retry, dead = [], []
+        for record in failed:
+            attempts = self._attempts.get(record.hid, 0) + 1
+            if attempts >= self.max_attempts:
+                self._attempts.pop(record.hid, None)
+                dead.append(record)
+            else:
+                self._attempts[record.hid] = attempts
+                retry.append(record)
+        if dead:
+            await self.backend.dead_letter(dead)
+            self.stats["dead_lettered"] += len(dead)
+            logger.error(f"History flush gave up on {len(dead)} turns after {self.max_attempts} attempts: {[record.hid for record in dead]}")
+        if retry:
+            await self.backend.requeue_pending(retry)
+
+    async def _get_recent(self, key: ConversationKey) -> Tuple[List[HistoryRecord], bool]:
+        entry = await self.backend.get_recent(key)
+        if entry is not None:
+            return entry
+
+        # Loaded once per conversation. Under the flush lock, a turn a flush takes off the queue is either
+        # still queued here or already in MySQL, never in neither
+        async with self._locked():
+            entry = await self.backend.get_recent(key)
+            if entry is not None:
+                return entry
+            self.stats["loads"] += 1
+            self._loading[key] = []
+            try:
+                pending = await self.backend.pending_for(key)
+                records, next_key = await self.service.get_latest(*key, limit=self.backend.capacity)
+                loaded = {record.hid for record in records}
+                records += [record for record in pending if record.hid not in loaded]
+                complete = next_key is None and len(records) <= self.backend.capacity
+                await self.backend.put_recent(key, records, complete)
+            finally:
+                created = self._loading.pop(key)
+        loaded = {record.hid for record in records}
+        for record in created:
+            if record.hid not in loaded:
+                await self.backend.append_recent(key, record)
+        return await self.backend.get_recent(key) or (records[-self.backend.capacity:], complete)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"History flush loop error: {e}")
@@ -0,0 +1,194 @@
+import os
+import sys
+import uuid
+import asyncio
+from datetime import datetime, timedelta
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+from data_services.api.base import HistoryRecord
+from data_services.history.buffer import HistoryBuffer, _MemoryBackend, WRITE_ASYNC, WRITE_SYNC
+
+KEY = ("USER1", "AGENT1", "RUN1")
+START = datetime(2026, 1, 1)
+
+
+class FakeHistoryService:
+    """The history table in memory, with the AsyncHistoryService methods the buffer uses"""
+
+    def __init__(self):
+        self.rows = {}
+        self.on_get_latest = None
+        self.fail = lambda record: False
+
+    async def insert_many(self, records):
+        if any(self.fail(record) for record in records):
+            raise RuntimeError("insert rejected")
+        for record in records:
+            self.rows.setdefault(record.hid, record)
+        return len(records)
+
+    def _conversation(self, user_id, agent_id, run_id):
+        records = [record for record in self.rows.values() if (record.user_id, record.agent_id, record.run_id) == (user_id, agent_id, run_id)]
+        return sorted(records, key=lambda record: (record.created_at, record.hid))
+
+    async def get_by_user_agent_run(self, user_id, agent_id, run_id, limit=None):
+        records = self._conversation(user_id, agent_id, run_id)
+        return records if limit is None else records[max(len(records) - limit, 0):]
+
+    async def get_latest(self, user_id, agent_id, run_id, limit=20, before=None):
+        records = self._conversation(user_id, agent_id, run_id)
+        if self.on_get_latest is not None:
+            await self.on_get_latest()
+        if before is not None:
+            records = [record for record in records if (record.created_at, record.hid) < before]
+        page = records[max(len(records) - limit, 0):]
+        next_key = (page[0].created_at, page[0].hid) if len(records) > limit else None
+        return page, next_key
+
+
+def make_record(index: int, conversation: str = "turn") -> HistoryRecord:
+    return HistoryRecord(
+        hid=str(uuid.uuid4()),
+        user_id=KEY[0],
+        agent_id=KEY[1],
+        run_id=KEY[2],
+        conversation=f"{conversation} {index}",
+        created_at=START + timedelta(seconds=index)
+    )
+
+
+def make_buffer(service, write_mode=WRITE_ASYNC, capacity=10, flush_batch=100, max_attempts=5):
+    backend = _MemoryBackend(capacity, max_conversations=100, ttl=600)
+    return HistoryBuffer(service, backend, write_mode=write_mode, flush_interval=60, flush_batch=flush_batch, max_attempts=max_attempts)
+
+
+def test_latest_served_from_ring():
+    async def run():
+        service = FakeHistoryService()
+        buffer = make_buffer(service)
+        records = [make_record(i) for i in range(3)]
+        await service.insert_many(records[:2])
+        await buffer.create(records[2])
+
+        page, next_key = await buffer.get_latest(*KEY, limit=2)
+        assert [record.hid for record in page] == [record.hid for record in records[1:]]
+        assert next_key == (records[1].created_at, records[1].hid)
+
+        page, next_key = await buffer.get_latest(*KEY, limit=5)
+        assert [record.hid for record in page] == [record.hid for record in records]
+        assert next_key is None
+        assert buffer.stats["loads"] == 1 and buffer.stats["hits"] == 2
+        # The queued turn was never written
+        assert records[2].hid not in service.rows
+    asyncio.run(run())
+    print("✓ latest turns served from the ring")
+
+
+def test_flush_during_load_keeps_queued_turns():
+    async def run():
+        service = FakeHistoryService()
+        buffer = make_buffer(service)
+        records = [make_record(i) for i in range(4)]
+        await service.insert_many(records[:2])
+        for record in records[2:]:
+            await buffer.create(record)
+
+        flushes = []
+
+        async def flush_while_loading():
+            # A flush started between the MySQL read and the queue read of the load
+            flushes.append(asyncio.create_task(buffer.flush()))
+            await asyncio.sleep(0.01)
+
+        service.on_get_latest = flush_while_loading
+        page, next_key = await buffer.get_latest(*KEY, limit=10)
+        service.on_get_latest = None
+        assert await flushes[0] == 2
+
+        assert [record.hid for record in page] == [record.hid for record in records]
+        assert next_key is None
+        assert all(record.hid in service.rows for record in records)
+        page, _ = await buffer.get_latest(*KEY, limit=10)
+        assert len(page) == 4 and buffer.stats["loads"] == 1
+    asyncio.run(run())
+    print("✓ a flush during the load loses no turn")
+
+
+def test_create_during_load_reaches_ring():
+    async def run():
+        for write_mode in (WRITE_ASYNC, WRITE_SYNC):
+            service = FakeHistoryService()
+            buffer = make_buffer(service, write_mode=write_mode)
+            records = [make_record(i) for i in range(3)]
+            await service.insert_many(records[:2])
+
+            async def create_while_loading():
+                service.on_get_latest = None
+                await buffer.create(records[2])
+
+            service.on_get_latest = create_while_loading
+            await buffer.get_latest(*KEY, limit=10)
+            page, next_key = await buffer.get_latest(*KEY, limit=10)
+            assert [record.hid for record in page] == [record.hid for record in records], write_mode
+            assert next_key is None
+    asyncio.run(run())
+    print("✓ a turn created during the load is in the ring")
+
+
+def test_bad_turn_is_dead_lettered():
+    async def run():
+        service = FakeHistoryService()
+        service.fail = lambda record: record.conversation.startswith("bad")
+        buffer = make_buffer(service, max_attempts=2)
+        good = [make_record(0), make_record(2)]
+        bad = make_record(1, conversation="bad")
+        for record in (good[0], bad, good[1]):
+            await buffer.create(record)
+
+        # The good turns go through, the bad one is queued again
+        assert await buffer.flush() == 2
+        assert await buffer.backend.pending_count() == 1
+        assert buffer.stats["dead_lettered"] == 0
+
+        later = make_record(3)
+        await buffer.create(later)
+        assert await buffer.flush() == 1
+        assert await buffer.backend.pending_count() == 0
+        assert [record.hid for record in await buffer.get_dead_letters()] == [bad.hid]
+        assert buffer.stats["dead_lettered"] == 1
+        assert set(service.rows) == {good[0].hid, good[1].hid, later.hid}
+    asyncio.run(run())
+    print("✓ a turn MySQL keeps rejecting is dead lettered")
+
+
+def test_unavailable_table_keeps_queue():
+    async def run():
+        service = FakeHistoryService()
+        service.fail = lambda record: True
+        buffer = make_buffer(service, max_attempts=1)
+        records = [make_record(i) for i in range(3)]
+        for record in records:
+            await buffer.create(record)
+
+        for _ in range(3):
+            assert await buffer.flush() == 0
+        assert await buffer.backend.pending_count() == 3
+        assert buffer.stats["dead_lettered"] == 0
+
+        service.fail = lambda record: False
+        assert await buffer.flush() == 3
+        assert set(service.rows) == {record.hid for record in records}
+    asyncio.run(run())
+    print("✓ nothing is dead lettered while MySQL is unavailable")
+
+
+if __name__ == "__main__":
+    test_latest_served_from_ring()
+    test_flush_during_load_keeps_queued_turns()
+    test_create_during_load_reaches_ring()
+    test_bad_turn_is_dead_lettered()
+    test_unavailable_table_keeps_queue()
+    print("\nAll history buffer tests passed! ✓")
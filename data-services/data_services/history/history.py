@@ -2,7 +2,7 @@ import asyncio
 from dbutils.pooled_db import PooledDB
 from pymysql import Error
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 import os
 from contextlib import asynccontextmanager
 import uuid
@@ -117,7 +117,8 @@ class AsyncHistoryService:
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT 'Creation time',
             updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT 'Update time',
             INDEX idx_user_id (user_id),
-            INDEX idx_agent_id (agent_id)
+            INDEX idx_agent_id (agent_id),
+            INDEX idx_user_agent_run_created (user_id, agent_id, run_id, created_at)
         ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='History conversation table'
         """
         
@@ -128,6 +129,37 @@ class AsyncHistoryService:
         except Error as e:
             logger.error(f"Table creation error: {e}")
             raise
+
+        if os.getenv('HISTORY_SCHEMA_MIGRATE', 'enable') == 'enable':
+            await self._migrate_indexes()
+
+    async def _migrate_indexes(self):
+        """
+        Add the indexes of the current schema to a history table created by an older version.
+        The conversation lookups filter on user_id, agent_id and run_id and order by created_at, the composite
+        index serves them as one range scan without a sort. InnoDB builds it online, reads and writes continue.
+        """
+        indexes = {
+            "idx_user_agent_run_created": "(user_id, agent_id, run_id, created_at)"
+        }
+
+        try:
+            async with self._get_cursor() as cursor:
+                await cursor.execute(
+                    """SELECT DISTINCT index_name AS index_name FROM information_schema.statistics
+                    WHERE table_schema = DATABASE() AND table_name = 'history'"""
+                )
+                existing = {row['index_name'] for row in await cursor.fetchall()}
+
+                for name, columns in indexes.items():
+                    if name in existing:
+                        continue
+                    logger.info(f"Adding index {name} to the history table, this can take a while on a large table")
+                    await cursor.execute(f"ALTER TABLE history ADD INDEX {name} {columns}, ALGORITHM=INPLACE, LOCK=NONE")
+                    logger.info(f"Index {name} added to the history table")
+        except Error as e:
+            logger.error(f"History index migration error: {e}")
+            raise
     
     async def create(self, history_record: HistoryRecord) -> bool:
         """
@@ -193,6 +225,30 @@ class AsyncHistoryService:
             logger.error(f"Batch create history records error: {e}")
             return False
     
+    async def insert_many(self, history_records: List[HistoryRecord]) -> int:
+        """
+        Insert history records with one multi-row statement, keeping their created_at.
+        Records already stored are skipped, so a retried batch is not duplicated. Errors are raised.
+
+        Args:
+            history_records: List of HistoryRecord objects
+
+        Returns:
+            int: Number of records inserted
+        """
+        insert_query = """
+        INSERT IGNORE INTO history
+        (hid, user_id, agent_id, run_id, conversation, created_at)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        """
+
+        # Plain placeholders only, aiomysql then sends the batch as one multi-row INSERT
+        async with self._get_cursor() as cursor:
+            return await cursor.executemany(insert_query, [
+                (record.hid, record.user_id, record.agent_id, record.run_id, record.conversation, record.created_at or datetime.now())
+                for record in history_records
+            ])
+
     async def get_by_hid(self, hid: str) -> Optional[HistoryRecord]:
         """
         Retrieve history record by primary key hid
@@ -234,17 +290,17 @@ class AsyncHistoryService:
             SELECT * FROM (
                 SELECT * FROM history 
                 WHERE user_id = %s AND agent_id = %s AND run_id = %s 
-                ORDER BY created_at DESC 
+                ORDER BY created_at DESC, hid DESC 
                 LIMIT %s
             ) AS recent_records 
-            ORDER BY created_at ASC
+            ORDER BY created_at ASC, hid ASC
             """
             params = (user_id, agent_id, run_id, limit)
         else:
             base_query = """
             SELECT * FROM history 
             WHERE user_id = %s AND agent_id = %s AND run_id = %s 
-            ORDER BY created_at ASC
+            ORDER BY created_at ASC, hid ASC
             """
             params = (user_id, agent_id, run_id)
         
@@ -270,6 +326,63 @@ class AsyncHistoryService:
             logger.error(f"Query history records by user, agent, and run ID error: {e}")
             return []
 
+    async def get_latest(self, user_id: str, agent_id: str, run_id: str, limit: int = 20,
+                         before: Optional[Tuple[Any, str]] = None) -> Tuple[List[HistoryRecord], Optional[Tuple[Any, str]]]:
+        """
+        Retrieve the latest turns of a conversation with keyset pagination
+
+        Args:
+            user_id: User ID
+            agent_id: Agent ID
+            run_id: Run ID
+            limit: Number of turns
+            before: (created_at, hid) of the oldest turn of the previous page, None for the latest turns
+
+        Returns:
+            Tuple[List[HistoryRecord], Optional[Tuple]]: Turns oldest first, and the key of the next older page, None when there are no older turns
+        """
+        # Read backwards on idx_user_agent_run_created, hid is the tiebreaker InnoDB keeps in the index,
+        # so only limit + 1 rows are read however long the conversation is
+        if before is not None:
+            query = """
+            SELECT * FROM history
+            WHERE user_id = %s AND agent_id = %s AND run_id = %s
+            AND (created_at < %s OR (created_at = %s AND hid < %s))
+            ORDER BY created_at DESC, hid DESC
+            LIMIT %s
+            """
+            params = (user_id, agent_id, run_id, before[0], before[0], before[1], limit + 1)
+        else:
+            query = """
+            SELECT * FROM history
+            WHERE user_id = %s AND agent_id = %s AND run_id = %s
+            ORDER BY created_at DESC, hid DESC
+            LIMIT %s
+            """
+            params = (user_id, agent_id, run_id, limit + 1)
+
+        async with self._get_cursor() as cursor:
+            await cursor.execute(query, params)
+            results = await cursor.fetchall()
+
+        next_key = None
+        if len(results) > limit:
+            results = results[:limit]
+            next_key = (results[-1]['created_at'], results[-1]['hid'])
+
+        history_records = [
+            HistoryRecord(
+                hid=result['hid'],
+                user_id=result['user_id'],
+                agent_id=result['agent_id'],
+                run_id=result['run_id'],
+                conversation=result['conversation'],
+                created_at=result['created_at'],
+                updated_at=result['updated_at']
+            ) for result in reversed(results)
+        ]
+        return history_records, next_key
+
     async def delete(self, hid: str) -> bool:
         """
         Delete history record
@@ -0,0 +1,128 @@
+import os
+import sys
+import asyncio
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+from data_services.history.history import AsyncHistoryService
+
+KEY = ("USER1", "AGENT1", "RUN1")
+START = datetime(2026, 1, 1)
+
+
+class FakeCursor:
+    """Answers the get_latest statements over rows in memory, the way MySQL evaluates them"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+        self._result = []
+
+    async def execute(self, query, params):
+        self.statements.append((" ".join(query.split()), params))
+        user_id, agent_id, run_id = params[:3]
+        rows = [row for row in self.rows if (row['user_id'], row['agent_id'], row['run_id']) == (user_id, agent_id, run_id)]
+        if len(params) == 7:
+            created_at, _, hid = params[3:6]
+            rows = [row for row in rows if row['created_at'] < created_at or (row['created_at'] == created_at and row['hid'] < hid)]
+        rows.sort(key=lambda row: (row['created_at'], row['hid']), reverse=True)
+        self._result = rows[:params[-1]]
+
+    async def fetchall(self):
+        return self._result
+
+
+def make_rows(count, same_second=False, run_id=KEY[2]):
+    rows = []
+    for i in range(count):
+        created_at = START if same_second else START + timedelta(seconds=i)
+        rows.append({
+            'hid': f"h{i:03d}",
+            'user_id': KEY[0],
+            'agent_id': KEY[1],
+            'run_id': run_id,
+            'conversation': f"turn {i}",
+            'created_at': created_at,
+            'updated_at': created_at
+        })
+    return rows
+
+
+def make_service(rows):
+    service = AsyncHistoryService(host="localhost")
+    cursor = FakeCursor(rows)
+
+    @asynccontextmanager
+    async def get_cursor(connection=None):
+        yield cursor
+
+    service._get_cursor = get_cursor
+    return service, cursor
+
+
+async def read_all_pages(service, limit):
+    pages = []
+    before = None
+    while True:
+        page, before = await service.get_latest(*KEY, limit=limit, before=before)
+        pages.append([record.hid for record in page])
+        if before is None:
+            return pages
+
+
+def test_latest_page_oldest_first():
+    async def run():
+        service, cursor = make_service(make_rows(5) + make_rows(3, run_id="OTHER"))
+        page, next_key = await service.get_latest(*KEY, limit=2)
+        assert [record.hid for record in page] == ["h003", "h004"]
+        assert next_key == (START + timedelta(seconds=3), "h003")
+        # limit + 1 rows are read to know whether an older page exists
+        assert cursor.statements[0][1][-1] == 3
+        assert "ORDER BY created_at DESC, hid DESC" in cursor.statements[0][0]
+    asyncio.run(run())
+    print("✓ the latest turns are returned oldest first")
+
+
+def test_pages_cover_conversation_once():
+    async def run():
+        for count, limit in ((5, 2), (6, 3), (6, 6), (1, 5)):
+            service, _ = make_service(make_rows(count))
+            pages = await read_all_pages(service, limit)
+            assert [hid for page in reversed(pages) for hid in page] == [f"h{i:03d}" for i in range(count)], (count, limit)
+            # A conversation that fills the last page exactly has no empty extra page
+            assert all(pages), (count, limit)
+    asyncio.run(run())
+    print("✓ pages cover every turn once, without an empty last page")
+
+
+def test_turns_of_the_same_second():
+    async def run():
+        service, cursor = make_service(make_rows(5, same_second=True))
+        pages = await read_all_pages(service, 2)
+        assert pages == [["h003", "h004"], ["h001", "h002"], ["h000"]]
+        statement, params = cursor.statements[1]
+        assert "(created_at < %s OR (created_at = %s AND hid < %s))" in statement
+        assert params[3:6] == (START, START, "h003")
+    asyncio.run(run())
+    print("✓ hid breaks ties between turns created in the same second")
+
+
+def test_empty_conversation():
+    async def run():
+        service, _ = make_service(make_rows(3, run_id="OTHER"))
+        page, next_key = await service.get_latest(*KEY, limit=10)
+        assert page == [] and next_key is None
+    asyncio.run(run())
+    print("✓ an empty conversation has no page and no cursor")
+
+
+if __name__ == "__main__":
+    test_latest_page_oldest_first()
+    test_pages_cover_conversation_once()
+    test_turns_of_the_same_second()
+    test_empty_conversation()
+    print("\nAll latest history tests passed! ✓")
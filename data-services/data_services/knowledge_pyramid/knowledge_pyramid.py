@@ -1,10 +1,16 @@
 import os
 import logging
+import functools
 from typing import List, Dict, Any, Optional
 from model_sdk import ModelManager
 from vector_sdk import Vector, Document, CacheEmbedding
+from ..embedding.batcher import get_embedding_frontend
+from ..vector.instance_cache import VectorInstanceCache
 from ..memory.memory import AsyncMemoryService
+from ..memory.extraction import MemoryExtractionQueue, get_memory_extraction_enable
 from ..api.base import DocumentModel, MemoryMessage, SearchType
+from ..retrieval.hybrid import hybrid_search, fuse_results, FUSION_WEIGHTED
+from ..retrieval.multi import fan_out, merge_global, get_multi_search_max_collections, MERGE_GLOBAL
 from datetime import datetime
 import psycopg2
 from psycopg2 import pool
@@ -19,9 +25,13 @@ class KnowledgePyramidService:
     def __init__(self):
         self.model_manager = None
         self.embedding_model = None
-        self.vector_instances = {}
+        self.embedding_frontend = None
+        # Bounded by VECTOR_INSTANCE_CACHE_SIZE / VECTOR_INSTANCE_CACHE_TTL
+        self.vector_instances = VectorInstanceCache.from_env(self._create_vector_instance)
         self.memory_config = {}
         self.memory_service = None
+        # mem0 fact extraction runs behind the add_documents response when MEMORY_EXTRACTION_ASYNC=enable
+        self.memory_extraction = MemoryExtractionQueue.from_env(self._extract_memories) if get_memory_extraction_enable() else None
         self.llm_model = None
 
     async def initialize(self):
@@ -61,6 +71,9 @@ class KnowledgePyramidService:
             logger.error(f"Failed to initialize services: {str(e)}")
             raise
 
+        # Query embeddings of the search paths go through the shared micro-batching front end
+        self.embedding_frontend = get_embedding_frontend(provider, model, self.embedding_model)
+
         # initial memory service
         try:
             custom_fact_extraction_prompt_for_knowledge = f"""
@@ -225,18 +238,19 @@ You should detect the language of the user input and record the facts in the sam
 
     def get_vector_instance(self, collection_name: str) -> Vector:
         """Get or create Vector instance (with connection pool reuse)"""
-        if collection_name not in self.vector_instances:
-            embedding = CacheEmbedding(self.embedding_model) if self.embedding_model else None
-            self.vector_instances[collection_name] = Vector(
-                collection_name=collection_name,
-                embedding=embedding
-            )
-            logger.info(f"Created new Vector instance for collection: {collection_name}")
-        
-        return self.vector_instances[collection_name]
+        return self.vector_instances.get(collection_name)
+
+    def _create_vector_instance(self, collection_name: str) -> Vector:
+        embedding = CacheEmbedding(self.embedding_frontend) if self.embedding_frontend else None
+        vector = Vector(
+            collection_name=collection_name,
+            embedding=embedding
+        )
+        logger.info(f"Created new Vector instance for collection: {collection_name}")
+        return vector
 
     # build knowledge pyramid for documents
-    async def create_collection_with_knowledge_pyramid(self, collection_name: str, documents: List[Document]) -> Dict[str, Any]:
+    async def create_collection_with_knowledge_pyramid(self, collection_name: str, documents: List[Document], index_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         vector = self.get_vector_instance(collection_name)
 
         try:
@@ -244,7 +258,7 @@ You should detect the language of the user input and record the facts in the sam
             if exist:
                 logger.info(f"Collection {collection_name} exist already")
             else:
-                await vector.acreate(texts=documents)
+                await vector.acreate(texts=documents, index_config=index_config)
                 logger.info(f"Collection {collection_name} created successfully")
 
         except Exception as e:
@@ -260,6 +274,9 @@ You should detect the language of the user input and record the facts in the sam
     async def delete_collection_with_knowledge_pyramid(self, collection_name: str) -> Dict[str, Any]:
         vector = self.get_vector_instance(collection_name)
         try:
+            if self.memory_extraction is not None:
+                await self.memory_extraction.cancel_collection(collection_name)
+
             exist = await vector.acollection_exists()
             if exist:
                 await vector.adelete()
@@ -267,10 +284,7 @@ You should detect the language of the user input and record the facts in the sam
             else:
                 logger.info(f"Collection {collection_name} not exist, there is no need to execute delete operation")
 
-            if collection_name in self.vector_instances:
-                if hasattr(self.vector_instances[collection_name], 'close'):
-                    await self.vector_instances[collection_name].close()
-                del self.vector_instances[collection_name]
+            await self.vector_instances.remove(collection_name)
         
         except Exception as e:
             logger.error(f"Error in delete_collection: {str(e)}")
@@ -300,8 +314,18 @@ You should detect the language of the user input and record the facts in the sam
             logger.error(f"Error in aadd_texts: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
+        messages_dict = [{"role": "user", "content": msg.page_content} for msg in documents]
+        if self.memory_extraction is not None:
+            memory_job = self.memory_extraction.submit(collection_name, messages_dict)
+            return {
+                "status": "success",
+                "message": "Document added successfully, memory extraction queued",
+                "vector_results": document_ids,
+                "memory_result": [],
+                "memory_job": memory_job
+            }
+
         try:
-            messages_dict = [{"role": "user", "content": msg.page_content} for msg in documents]
             logger.info(f"Knowledge Pyramid Service add_memory :{messages_dict}")
             memory_result = await self.memory_service.add_memory(
                 messages=messages_dict,
@@ -320,160 +344,160 @@ You should detect the language of the user input and record the facts in the sam
             "memory_result": memory_result["results"]
         }
 
-    def hybrid_merge_with_weights(self, vector_results, fulltext_results, vector_weight=0.7, fulltext_weight=0.3, hybrid_threshold: Optional[float] = None):
-        all_results = []
-        
-        # Process vector search results
-        for result in vector_results:
-            new_result = result.copy()
-            new_result['hybrid_score'] = result['score'] * vector_weight
-            new_result['search_type'] = 'vector'
-            if hybrid_threshold is None or new_result['hybrid_score'] >= hybrid_threshold:
-                all_results.append(new_result)
-        
-        # Process full-text search results
-        for result in fulltext_results:
-            new_result = result.copy()
-            new_result['hybrid_score'] = result['score'] * fulltext_weight
-            new_result['search_type'] = 'fulltext'
-            if hybrid_threshold is None or new_result['hybrid_score'] >= hybrid_threshold:
-                all_results.append(new_result)
-        
-        # Sort by weighted score in descending order
-        return sorted(all_results, key=lambda x: x['hybrid_score'], reverse=True)
+    async def _extract_memories(self, messages: List[Dict[str, str]], collection_name: str) -> Dict[str, Any]:
+        return await self.memory_service.add_memory(messages=messages, user_id=collection_name)
 
-    # search knowledge pyramid
-    async def search_documents_with_knowledge_pyramid(self, query: str, collection_name: str, search_type: str, limit: int = 10, hybrid_threshold: Optional[float] = 0.01, memory_threshold: Optional[float] = 0.01, vector_weight: Optional[float] = 0.7, fulltext_weight:Optional[float] = 0.3) -> Dict[str, Any]:
-        vector = self.get_vector_instance(collection_name)
+    def get_memory_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        if self.memory_extraction is None:
+            return None
+        return self.memory_extraction.get_job(job_id)
 
-        vector_sorted_results = []
-        try:
-            if search_type == SearchType.VECTOR:
-                results = await vector.asearch_by_vector(
-                    query=query,
-                    top_k=limit,
-                    score_threshold=hybrid_threshold
-                )
+    def list_memory_jobs(self, collection_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        if self.memory_extraction is None:
+            return []
+        return self.memory_extraction.list_jobs(collection_name)
 
-                vector_results = [
-                    {
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "score": float(doc.metadata.get('score', 0)),
-                        "search_type": search_type,
-                        "hybrid_score": 0.0
-                    } for doc in results
-                ]
-
-                vector_sorted_results = sorted(
-                    vector_results, 
-                    key=lambda x: x['score'], 
-                    reverse=True
-                )
-
-            elif search_type == SearchType.FULLTEXT:
-                results = await vector.asearch_by_full_text(
-                    query=query,
-                    top_k=limit
-                )
-
-                vector_results = [
-                    {
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "score": float(doc.metadata.get('score', 0)),
-                        "search_type": search_type,
-                        "hybrid_score": 0.0
-                    } for doc in results
-                ]
-
-                if hybrid_threshold is not None:
-                    filtered_results = [
-                        result for result in vector_results 
-                        if result['score'] >= hybrid_threshold
-                    ]
-                else:
-                    filtered_results = vector_results
-                
-                vector_sorted_results = sorted(
-                    filtered_results, 
-                    key=lambda x: x['score'], 
-                    reverse=True
-                )
-
-            elif search_type == SearchType.MEMORY:
-                results = []
-            elif search_type == SearchType.HYBRID:
-                results_vector = await vector.asearch_by_vector(
-                    query=query,
-                    top_k=limit
-                )
-                results_fulltext = await vector.asearch_by_full_text(
-                    query=query,
-                    top_k=limit
-                )
+    def hybrid_merge_with_weights(self, vector_results, fulltext_results, vector_weight=0.7, fulltext_weight=0.3, hybrid_threshold: Optional[float] = None):
+        # Normalized score fusion with one entry per chunk, see fuse_results
+        return fuse_results(
+            {'vector': vector_results, 'fulltext': fulltext_results},
+            weights={'vector': vector_weight, 'fulltext': fulltext_weight},
+            fusion=FUSION_WEIGHTED,
+            hybrid_threshold=hybrid_threshold
+        )
 
-                vector_results_dict = [
-                    {
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "score": float(doc.metadata.get('score', 0)),
-                        "search_type": "vector"
-                    } for doc in results_vector
-                ]
-                
-                fulltext_results_dict = [
-                    {
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "score": float(doc.metadata.get('score', 0)),
-                        "search_type": "fulltext"
-                    } for doc in results_fulltext
-                ]
-                
-                hybrid_results = self.hybrid_merge_with_weights(vector_results_dict, fulltext_results_dict, vector_weight=vector_weight, fulltext_weight=fulltext_weight, hybrid_threshold=hybrid_threshold)
-                vector_sorted_results = hybrid_results
-                
-            else:
-                results = []
+    # search knowledge pyramid
+    async def search_documents_with_knowledge_pyramid(self, query: str, collection_name: str, search_type: str, limit: int = 10, hybrid_threshold: Optional[float] = 0.01, memory_threshold: Optional[float] = 0.01, vector_weight: Optional[float] = 0.7, fulltext_weight:Optional[float] = 0.3, fusion: Optional[str] = None, ef_search: Optional[int] = None, probes: Optional[int] = None, metadata_filter: Optional[Dict[str, Any]] = None, query_vector: Optional[List[float]] = None) -> Dict[str, Any]:
+        vector = self.get_vector_instance(collection_name)
 
-        except Exception as e:
-            logger.error(f"Error searching vector: {str(e)}")
-            raise
-        
         memory_limit = 100
         try:
-            memory_results = await self.memory_service.search_memories(
+            # The memory search runs alongside the vector and fulltext legs
+            search_result = await hybrid_search(
+                vector,
                 query=query,
-                user_id=collection_name,
-                limit=memory_limit,
-                threshold=memory_threshold
-            )
-
-            sorted_memory_result = sorted(
-                memory_results["results"], 
-                key=lambda x: x['score'], 
-                reverse=False
+                search_type=search_type,
+                limit=limit,
+                hybrid_threshold=hybrid_threshold,
+                vector_weight=vector_weight,
+                fulltext_weight=fulltext_weight,
+                fusion=fusion,
+                ef_search=ef_search,
+                probes=probes,
+                metadata_filter=metadata_filter,
+                query_vector=query_vector,
+                extra_legs={
+                    'memory': functools.partial(
+                        self.memory_service.search_memories,
+                        query=query,
+                        user_id=collection_name,
+                        limit=memory_limit,
+                        threshold=memory_threshold
+                    )
+                }
             )
-            logger.info("Knowledge Pyramid Service search_memories")
         except Exception as e:
-            logger.error(f"Error searching memories: {str(e)}")
+            logger.error(f"Error searching knowledge pyramid: {str(e)}")
             raise
 
+        memory_results = search_result["extra"].get('memory', {"results": []})
+        sorted_memory_result = sorted(
+            memory_results["results"], 
+            key=lambda x: x['score'], 
+            reverse=False
+        )
+        logger.info("Knowledge Pyramid Service search_memories")
+
         return {
             "status": "success",
             "collection": collection_name,
             "search_type": search_type,
-            "vector_result": vector_sorted_results,
-            "memory_result": sorted_memory_result
+            "vector_result": search_result["result"],
+            "memory_result": sorted_memory_result,
+            "timed_out": search_result["timed_out"]
         }
 
+    # search several knowledge pyramid collections in one request
+    async def search_multiple_collections_with_knowledge_pyramid(
+        self,
+        query: str,
+        collection_names: List[str],
+        search_type: str,
+        limit: int = 10,
+        limits: Optional[Dict[str, int]] = None,
+        merge: str = "grouped",
+        total_limit: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **search_params
+    ) -> Dict[str, Any]:
+        """
+        Embed the query once and search every collection concurrently under one overall timeout.
+
+        Args:
+            limits: Per collection overrides of limit
+            merge: "grouped" returns one response per collection, "global" one ranked vector_result and
+                memory_result list, each entry tagged with its collection
+            total_limit: Length of the global vector_result list
+            search_params: Passed to search_documents_with_knowledge_pyramid
+        """
+        collection_names = list(dict.fromkeys(collection_names))
+        if not collection_names:
+            raise ValueError("collection_names cannot be empty")
+        max_collections = get_multi_search_max_collections()
+        if len(collection_names) > max_collections:
+            raise ValueError(f"At most {max_collections} collections can be searched at once")
+
+        query_vector = None
+        if search_type in (SearchType.VECTOR, SearchType.HYBRID):
+            query_vector = await self.get_vector_instance(collection_names[0]).aembed_query(query)
+
+        limits = limits or {}
+        outcome = await fan_out(
+            collection_names,
+            lambda name: self.search_documents_with_knowledge_pyramid(
+                query=query,
+                collection_name=name,
+                search_type=search_type,
+                limit=limits.get(name, limit),
+                query_vector=query_vector,
+                **search_params
+            ),
+            timeout=timeout
+        )
+
+        results = outcome["results"]
+        # Collections that timed out as a whole or answered without one of their legs
+        timed_out = outcome["timed_out"] + [name for name, result in results.items() if result["timed_out"]]
+
+        response = {
+            "status": "success",
+            "search_type": search_type,
+            "merge": merge,
+            "failed": outcome["failed"],
+            "timed_out": timed_out
+        }
+        if merge == MERGE_GLOBAL:
+            score_key = "hybrid_score" if search_type == SearchType.HYBRID else "score"
+            response["vector_result"] = merge_global(
+                {name: result["vector_result"] for name, result in results.items()}, score_key, limit=total_limit
+            )
+            # Memory results are listed in ascending score order, as in the single collection search
+            response["memory_result"] = merge_global(
+                {name: result["memory_result"] for name, result in results.items()}, "score", reverse=False
+            )
+        else:
+            response["results"] = {name: results[name] for name in collection_names if name in results}
+        return response
+
     # only search knowledge pyramid memory documents
-    async def search_memory_documents_with_knowledge_pyramid(self, collection_name: str)-> Dict[str, Any]:
+    async def search_memory_documents_with_knowledge_pyramid(self, collection_name: str, limit: int = 100, cursor: Optional[str] = None)-> Dict[str, Any]:
         try:
-            memory_results = await self.memory_service.get_all_memories(
-                user_id=collection_name
+            memory_page = await self.memory_service.get_memories_page(
+                user_id=collection_name,
+                limit=limit,
+                cursor=cursor
             )
+            memory_results = memory_page["memories"]
 
             logger.info("Knowledge Pyramid Service get_all_memories")
         except Exception as e:
@@ -485,7 +509,8 @@ You should detect the language of the user input and record the facts in the sam
             "collection": collection_name,
             "search_type": "memory",
             "vector_result": [],
-            "memory_result": memory_results
+            "memory_result": memory_results,
+            "next_cursor": memory_page["next_cursor"]
         }
 
     # delete knowledge pyramid all
@@ -502,15 +527,19 @@ You should detect the language of the user input and record the facts in the sam
                     "memory_memorys": []
                 }
 
+            # In-flight extraction would otherwise add memories back after the delete
+            if self.memory_extraction is not None:
+                await self.memory_extraction.cancel_collection(collection_name)
+
             exist = await vector.acollection_exists()
             if exist:
                 await vector.adelete()
             else:
                 logger.warning(f"Collection {collection_name} already does not exist")
 
-            memory_result = await self.memory_service.delete_all_memories(user_id=collection_name)
+            memory_result = await self.memory_service.bulk_delete_memories(user_id=collection_name)
 
-            logger.info(f"Knowledge Pyramid Service delete_all_memories end, memory_result = {memory_result}")
+            logger.info(f"Knowledge Pyramid Service delete_all_memories end, {len(memory_result['deleted'])} memories deleted")
         except Exception as e:
             logger.error(f"Error delete_all_documents_and_memorys_by_collection_name , adelete: {str(e)}")
             raise
@@ -543,59 +572,31 @@ You should detect the language of the user input and record the facts in the sam
             logger.error(f"Error delete_documents_and_memorys_by_ids , adelete_by_ids: {str(e)}")
             raise
 
-        # handle memory section
+        # handle memory section, one batched delete scoped to the collection instead of a lookup and a delete per memory
         existing_memorys = []
         non_existing_memorys = []
-        
-        for memory_id in memorys:
-            try:
-                memory_info = await self.memory_service.get_memory(memory_id)
-
-                if memory_info is not None and memory_info.get("id") is not None:
-                    existing_memorys.append(memory_id)
-                else:
-                    non_existing_memorys.append(memory_id)
-                    logger.info(f"⚠️ Memory {memory_id} does not exist, skipping deletion")
-            except Exception as e:
-                non_existing_memorys.append(memory_id)
-                logger.info(f"⚠️ Error checking memory {memory_id}: {e}, skipping deletion")
-        
-        logger.info(f"===== delete memory existing_memorys: {existing_memorys}")
-
-        success_count = 0
-        error_count = 0
         detailed_results = []
+        error_count = 0
 
-        for memory_id in existing_memorys:
+        if memorys:
             try:
-                result = await self.memory_service.delete_memory(memory_id=memory_id)
-                logger.info(f"===== start to delete memory id: {memory_id}, result={result}")
-
-                if isinstance(result, dict) and result.get("message") is not None:
-                    success_msg = f"Successfully deleted memory {memory_id}"
-                    logger.info(f"✅ {success_msg}")
-                    detailed_results.append({"memory_id": memory_id, "status": "success", "message": result.get('message', success_msg)})
-                    success_count += 1
-                elif result is None:
-                    error_msg = f"Unexpected None result for memory {memory_id}"
-                    logger.info(f"❌ {error_msg}")
-                    detailed_results.append({"memory_id": memory_id, "status": "error", "message": "None result"})
-                    error_count += 1
-                else:
-                    error_msg = f"Others Failed to delete memory {memory_id}: {result}"
-                    logger.info(f"❌ {error_msg}")
-                    detailed_results.append({"memory_id": memory_id, "status": "error", "message": str(result)})
-                    error_count += 1
-                    
+                memory_result = await self.memory_service.bulk_delete_memories(memory_ids=memorys, user_id=collection_name)
+                existing_memorys = memory_result["deleted"]
+                non_existing_memorys = memory_result["not_found"]
+                # Deletes that failed on a vector store without the batched path
+                for error in memory_result.get("errors", []):
+                    detailed_results.append({"memory_id": error["memory_id"], "status": "error", "message": error["error"]})
+                error_count = len(detailed_results)
             except Exception as e:
-                error_msg = f"Failed to delete memory {memory_id}: {e}"
-                logger.info(f"❌ {error_msg}")
-                detailed_results.append({"memory_id": memory_id, "status": "error", "message": str(e)})
-                error_count += 1
+                logger.error(f"Failed to delete memories of {collection_name}: {e}")
+                error_count = len(memorys)
+                detailed_results = [{"memory_id": memory_id, "status": "error", "message": str(e)} for memory_id in memorys]
 
+        for memory_id in existing_memorys:
+            detailed_results.append({"memory_id": memory_id, "status": "success", "message": f"Successfully deleted memory {memory_id}"})
         for memory_id in non_existing_memorys:
             detailed_results.append({"memory_id": memory_id, "status": "skipped", "message": "Memory does not exist"})
-            logger.info(f"⚠️ Skipped non-existing memory: {memory_id}")
+        success_count = len(existing_memorys)
 
         logger.info(f"\nDelete completed: {success_count} success, {error_count} fail, {len(non_existing_memorys)} skipped")
 
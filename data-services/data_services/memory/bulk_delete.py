@@ -0,0 +1,184 @@
+import os
+import time
+import uuid
+import sqlite3
+import asyncio
+import logging
+import threading
+from datetime import datetime
+from typing import List, Dict, Any, Optional
+from .store import MemoryPGStore, SCOPE_KEYS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        if value < 1:
+            logger.warning(f"{name} must be positive, using default value {default}. Current value: {value}")
+            return default
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"{name} environment variable conversion failed, using default value {default}. Error: {e}")
+        return default
+
+
+def _valid_ids(memory_ids: List[str]) -> List[str]:
+    # mem0 keys its pgvector table by uuid, anything else cannot exist and would fail the cast
+    valid = []
+    for memory_id in memory_ids:
+        try:
+            uuid.UUID(str(memory_id))
+            valid.append(str(memory_id))
+        except ValueError:
+            continue
+    return valid
+
+
+class MemoryBulkDeleter:
+    """
+    Deletes mem0 memories in batches with plain SQL instead of one mem0 delete per memory.
+
+    Every batch is one DELETE ... WHERE id = ANY(...) RETURNING on the mem0 pgvector table, followed by one
+    write to the mem0 history table: the DELETE events mem0 itself would record, or with purge_history the
+    removal of the memories' history. At most concurrency batches run at the same time, each on its own
+    connection of the store. Running deletes and their progress are reported by get_stats().
+    """
+
+    def __init__(self, store: MemoryPGStore, history_db_path: Optional[str] = None, batch_size: int = 1000, concurrency: int = 4):
+        self.store = store
+        self.history_db_path = history_db_path
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+        self.operations: Dict[str, Dict[str, Any]] = {}
+        self.stats = {"operations": 0, "deleted": 0, "batches": 0, "history_errors": 0}
+        self._history: Optional[sqlite3.Connection] = None
+        self._history_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls, store: MemoryPGStore, history_db_path: Optional[str] = None) -> "MemoryBulkDeleter":
+        return cls(
+            store,
+            history_db_path=history_db_path,
+            batch_size=_get_int_env('MEMORY_BULK_DELETE_BATCH_SIZE', 1000),
+            concurrency=_get_int_env('MEMORY_BULK_DELETE_CONCURRENCY', 4)
+        )
+
+    async def delete_by_ids(self, memory_ids: List[str], user_id: Optional[str] = None, purge_history: bool = False) -> Dict[str, Any]:
+        """
+        Delete memories by id, restricted to user_id when given. Returns the deleted ids and the ids that were
+        not found, so no lookup per id is needed beforehand. A failed batch raises, errors is always empty.
+        """
+        memory_ids = list(dict.fromkeys(str(memory_id) for memory_id in memory_ids))
+        scope = {"user_id": user_id} if user_id is not None else {}
+        deleted = await self._run(_valid_ids(memory_ids), scope, purge_history, f"ids={len(memory_ids)}")
+        deleted_set = set(deleted)
+        return {
+            "deleted": deleted,
+            "not_found": [memory_id for memory_id in memory_ids if memory_id not in deleted_set],
+            "errors": []
+        }
+
+    async def delete_by_scope(self, user_id: Optional[str] = None, agent_id: Optional[str] = None, run_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None, purge_history: bool = False) -> Dict[str, Any]:
+        """Delete every memory of a user/agent/run scope, optionally narrowed to memories whose metadata contains metadata"""
+        scope = {key: value for key, value in zip(SCOPE_KEYS, (user_id, agent_id, run_id)) if value is not None}
+        if not scope and not metadata:
+            raise ValueError("At least one of user_id, agent_id, run_id or metadata is required")
+
+        memory_ids = await asyncio.to_thread(self._select_ids, scope, metadata)
+        deleted = await self._run(memory_ids, scope, purge_history, f"scope={scope} metadata={metadata}")
+        return {"deleted": deleted, "not_found": [], "errors": []}
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            "running": list(self.operations.values()),
+            "batch_size": self.batch_size,
+            "concurrency": self.concurrency
+        }
+
+    def close(self) -> None:
+        with self._history_lock:
+            if self._history is not None:
+                self._history.close()
+                self._history = None
+
+    async def _run(self, memory_ids: List[str], scope: Dict[str, str], purge_history: bool, description: str) -> List[str]:
+        operation_id = uuid.uuid4().hex
+        batches = [memory_ids[i:i + self.batch_size] for i in range(0, len(memory_ids), self.batch_size)]
+        operation = {
+            "operation_id": operation_id,
+            "description": description,
+            "total": len(memory_ids),
+            "deleted": 0,
+            "batches": len(batches),
+            "batches_done": 0,
+            "started_at": time.time()
+        }
+        self.operations[operation_id] = operation
+        self.stats["operations"] += 1
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def run_batch(batch: List[str]) -> List[str]:
+            async with semaphore:
+                deleted = await asyncio.to_thread(self._delete_batch, batch, scope, purge_history)
+            operation["deleted"] += len(deleted)
+            operation["batches_done"] += 1
+            self.stats["deleted"] += len(deleted)
+            self.stats["batches"] += 1
+            logger.info(
+                f"Memory bulk delete {operation_id}: batch {operation['batches_done']}/{operation['batches']}, "
+                f"{operation['deleted']}/{operation['total']} deleted"
+            )
+            return deleted
+
+        try:
+            results = await asyncio.gather(*(run_batch(batch) for batch in batches))
+        finally:
+            del self.operations[operation_id]
+
+        deleted = [memory_id for batch in results for memory_id in batch]
+        logger.info(f"Memory bulk delete {operation_id} ({description}) finished: {len(deleted)} deleted in {time.time() - operation['started_at']:.2f}s")
+        return deleted
+
+    def _select_ids(self, scope: Dict[str, str], metadata: Optional[Dict[str, Any]]) -> List[str]:
+        # Only the ids are read, the deletes then go by primary key
+        conditions, params = self.store.scope_conditions(scope, metadata)
+        rows = self.store.fetch(f"SELECT id::text FROM {self.store.table_name} WHERE {' AND '.join(conditions)}", params)
+        return [row[0] for row in rows]
+
+    def _delete_batch(self, memory_ids: List[str], scope: Dict[str, str], purge_history: bool) -> List[str]:
+        conditions, params = self.store.scope_conditions(scope)
+        rows = self.store.fetch(
+            f"DELETE FROM {self.store.table_name} WHERE {' AND '.join(['id = ANY(%s::uuid[])'] + conditions)} RETURNING id::text, payload->>'data'",
+            [memory_ids] + params,
+            commit=True
+        )
+        if rows:
+            self._write_history(rows, purge_history)
+        return [row[0] for row in rows]
+
+    def _write_history(self, rows: List[tuple], purge_history: bool) -> None:
+        # The memories are gone at this point, a failing history write is counted but does not fail the delete
+        if not self.history_db_path:
+            return
+        try:
+            with self._history_lock:
+                if self._history is None:
+                    self._history = sqlite3.connect(os.path.expanduser(self.history_db_path), check_same_thread=False, timeout=30)
+                with self._history:
+                    if purge_history:
+                        self._history.executemany("DELETE FROM history WHERE memory_id = ?", [(row[0],) for row in rows])
+                    else:
+                        now = datetime.now().isoformat()
+                        self._history.executemany(
+                            """INSERT INTO history (id, memory_id, old_memory, new_memory, event, created_at, is_deleted)
+                            VALUES (?, ?, ?, NULL, 'DELETE', ?, 1)""",
+                            [(str(uuid.uuid4()), row[0], row[1], now) for row in rows]
+                        )
+        except Exception as e:
+            self.stats["history_errors"] += 1
+            logger.warning(f"Memory bulk delete history write failed for {len(rows)} memories: {e}")
@@ -0,0 +1,235 @@
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import asyncio
+import sqlite3
+import tempfile
+import threading
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+from data_services.memory.store import MemoryPGStore
+from data_services.memory.bulk_delete import MemoryBulkDeleter
+from data_services.memory.memory import AsyncMemoryService
+
+HISTORY_TABLE = """CREATE TABLE history (id TEXT PRIMARY KEY, memory_id TEXT, old_memory TEXT, new_memory TEXT,
+    event TEXT, created_at DATETIME, is_deleted INTEGER)"""
+
+
+class FakeMemoryStore(MemoryPGStore):
+    """The mem0 table as a dict of id to payload, answering the statements MemoryBulkDeleter runs"""
+
+    def __init__(self, memories, delay=0.0):
+        self.table_name = "mem0"
+        self.memories = memories
+        self.delay = delay
+        self.statements = []
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def _matches(self, sql, params, payload):
+        keys = re.findall(r"payload->>'(\w+)' = %s", sql)
+        if any(payload.get(key) != value for key, value in zip(keys, params)):
+            return False
+        if "payload @> %s::jsonb" in sql:
+            metadata = json.loads(params[len(keys)])
+            return all(payload.get(key) == value for key, value in metadata.items())
+        return True
+
+    def fetch(self, sql, params, commit=False):
+        with self._lock:
+            self.statements.append(sql.split()[0])
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            time.sleep(self.delay)
+            with self._lock:
+                if sql.startswith("DELETE"):
+                    ids, scope_params = params[0], params[1:]
+                    rows = [(i, self.memories[i]["data"]) for i in ids if i in self.memories and self._matches(sql, scope_params, self.memories[i])]
+                    for memory_id, _ in rows:
+                        del self.memories[memory_id]
+                    return rows
+                return [(i,) for i, payload in self.memories.items() if self._matches(sql, params, payload)]
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def make_memories(count, user_id="alice", **payload):
+    return {str(uuid.uuid4()): dict(payload, user_id=user_id, data=f"fact {i}") for i in range(count)}
+
+
+def history_rows(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT memory_id, old_memory, event, is_deleted FROM history").fetchall()
+
+
+def make_history_db(base_dir):
+    path = os.path.join(base_dir, "history.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute(HISTORY_TABLE)
+    return path
+
+
+def test_delete_by_ids_in_batches():
+    async def run():
+        with tempfile.TemporaryDirectory() as base_dir:
+            memories = make_memories(5)
+            store = FakeMemoryStore(dict(memories))
+            deleter = MemoryBulkDeleter(store, history_db_path=make_history_db(base_dir), batch_size=2)
+            ids = list(memories)
+            unknown = str(uuid.uuid4())
+
+            result = await deleter.delete_by_ids(ids + [ids[0], "not-a-uuid", unknown])
+            assert sorted(result["deleted"]) == sorted(ids)
+            assert result["not_found"] == ["not-a-uuid", unknown]
+            assert result["errors"] == []
+            # Six valid ids in batches of two, the invalid id never reaches SQL
+            assert store.statements == ["DELETE"] * 3
+            assert deleter.stats["batches"] == 3 and deleter.stats["deleted"] == 5
+            assert not store.memories and not deleter.get_stats()["running"]
+
+            rows = history_rows(deleter.history_db_path)
+            assert sorted(row[0] for row in rows) == sorted(ids)
+            assert all(row[2] == "DELETE" and row[3] == 1 for row in rows)
+            assert {row[1] for row in rows} == {payload["data"] for payload in memories.values()}
+            deleter.close()
+    asyncio.run(run())
+    print("✓ delete_by_ids deletes in batches and records DELETE events")
+
+
+def test_delete_by_ids_scoped_to_user():
+    async def run():
+        alice = make_memories(2)
+        bob = make_memories(1, user_id="bob")
+        store = FakeMemoryStore({**alice, **bob})
+        deleter = MemoryBulkDeleter(store, batch_size=10)
+        result = await deleter.delete_by_ids(list(alice) + list(bob), user_id="alice")
+        assert sorted(result["deleted"]) == sorted(alice)
+        assert result["not_found"] == list(bob)
+        assert list(store.memories) == list(bob)
+    asyncio.run(run())
+    print("✓ delete_by_ids only deletes memories of the given user")
+
+
+def test_delete_by_scope_and_metadata():
+    async def run():
+        docs = make_memories(3, agent_id="a1", source="docs")
+        chat = make_memories(2, agent_id="a1", source="chat")
+        other = make_memories(2, agent_id="a2", source="docs")
+        store = FakeMemoryStore({**docs, **chat, **other})
+        deleter = MemoryBulkDeleter(store, batch_size=2)
+
+        result = await deleter.delete_by_scope(user_id="alice", agent_id="a1", metadata={"source": "docs"})
+        assert sorted(result["deleted"]) == sorted(docs)
+        assert store.statements == ["SELECT", "DELETE", "DELETE"]
+
+        result = await deleter.delete_by_scope(agent_id="a1")
+        assert sorted(result["deleted"]) == sorted(chat)
+        assert set(store.memories) == set(other)
+
+        try:
+            await deleter.delete_by_scope()
+            raise AssertionError("an unscoped delete must be rejected")
+        except ValueError:
+            pass
+    asyncio.run(run())
+    print("✓ delete_by_scope selects the ids once and deletes them in batches")
+
+
+def test_purge_history():
+    async def run():
+        with tempfile.TemporaryDirectory() as base_dir:
+            path = make_history_db(base_dir)
+            memories = make_memories(3)
+            with sqlite3.connect(path) as conn:
+                conn.executemany(
+                    "INSERT INTO history (id, memory_id, new_memory, event) VALUES (?, ?, ?, 'ADD')",
+                    [(str(uuid.uuid4()), memory_id, payload["data"]) for memory_id, payload in memories.items()]
+                )
+            deleter = MemoryBulkDeleter(FakeMemoryStore(dict(memories)), history_db_path=path, batch_size=2)
+            await deleter.delete_by_ids(list(memories)[:2], purge_history=True)
+            assert [row[0] for row in history_rows(path)] == list(memories)[2:]
+            deleter.close()
+    asyncio.run(run())
+    print("✓ purge_history removes the history of deleted memories")
+
+
+def test_batches_bounded_by_concurrency():
+    async def run():
+        memories = make_memories(12)
+        store = FakeMemoryStore(dict(memories), delay=0.02)
+        deleter = MemoryBulkDeleter(store, batch_size=2, concurrency=2)
+        result = await deleter.delete_by_ids(list(memories))
+        assert len(result["deleted"]) == 12
+        assert store.max_running == 2
+    asyncio.run(run())
+    print("✓ at most concurrency batches run at once")
+
+
+def test_history_failure_does_not_fail_delete():
+    async def run():
+        with tempfile.TemporaryDirectory() as base_dir:
+            # No history table: mem0 never initialized this database
+            memories = make_memories(2)
+            deleter = MemoryBulkDeleter(FakeMemoryStore(dict(memories)), history_db_path=os.path.join(base_dir, "empty.db"))
+            result = await deleter.delete_by_ids(list(memories))
+            assert len(result["deleted"]) == 2
+            assert deleter.stats["history_errors"] == 1
+            deleter.close()
+    asyncio.run(run())
+    print("✓ a failing history write is counted, the delete stands")
+
+
+class FakeAsyncMemory:
+    """mem0 AsyncMemory get/delete over a dict, deletes of ids in broken fail"""
+
+    def __init__(self, memories, broken=()):
+        self.memories = memories
+        self.broken = set(broken)
+
+    async def get(self, memory_id):
+        payload = self.memories.get(memory_id)
+        return dict(payload, id=memory_id) if payload is not None else None
+
+    async def delete(self, memory_id):
+        if memory_id in self.broken:
+            raise RuntimeError("vector store unavailable")
+        del self.memories[memory_id]
+        return {"message": "Memory deleted successfully!"}
+
+
+def test_one_by_one_reports_errors():
+    async def run():
+        alice = make_memories(3)
+        bob = make_memories(1, user_id="bob")
+        ids = list(alice)
+        service = AsyncMemoryService()
+        service.memory_instance = FakeAsyncMemory({**alice, **bob}, broken=[ids[1]])
+        missing = str(uuid.uuid4())
+
+        result = await service.bulk_delete_memories(memory_ids=ids + list(bob) + [missing], user_id="alice")
+        assert result["deleted"] == [ids[0], ids[2]]
+        assert result["not_found"] == list(bob) + [missing]
+        # A failed delete is an error, not a missing memory
+        assert result["errors"] == [{"memory_id": ids[1], "error": "vector store unavailable"}]
+    asyncio.run(run())
+    print("✓ the mem0 fallback reports failed deletes as errors")
+
+
+if __name__ == "__main__":
+    test_delete_by_ids_in_batches()
+    test_delete_by_ids_scoped_to_user()
+    test_delete_by_scope_and_metadata()
+    test_purge_history()
+    test_batches_bounded_by_concurrency()
+    test_history_failure_does_not_fail_delete()
+    test_one_by_one_reports_errors()
+    print("\nAll memory bulk delete tests passed! ✓")
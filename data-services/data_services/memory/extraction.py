@@ -0,0 +1,267 @@
+import os
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_PARTIAL = "partial"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+# Errors kept per job, the counters still cover every chunk
+MAX_JOB_ERRORS = 20
+
+
+def _get_int_env(name: str, default: int, minimum: int = 1) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        if value < minimum:
+            logger.warning(f"{name} must be at least {minimum}, using default value {default}. Current value: {value}")
+            return default
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"{name} environment variable conversion failed, using default value {default}. Error: {e}")
+        return default
+
+
+def get_memory_extraction_enable() -> bool:
+    return os.getenv('MEMORY_EXTRACTION_ASYNC', 'enable') == 'enable'
+
+
+def chunk_messages(messages: List[Dict[str, str]], max_messages: int, max_chars: int) -> List[List[Dict[str, str]]]:
+    """Split messages into chunks of at most max_messages, and at most max_chars unless one message is longer"""
+    chunks = []
+    current = []
+    size = 0
+    for message in messages:
+        length = len(message.get("content") or "")
+        if current and (len(current) >= max_messages or size + length > max_chars):
+            chunks.append(current)
+            current = []
+            size = 0
+        current.append(message)
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+class MemoryExtractionJob:
+    def __init__(self, collection_name: str, chunks: List[List[Dict[str, str]]]):
+        self.job_id = uuid.uuid4().hex
+        self.collection_name = collection_name
+        self.chunks = chunks
+        self.total = len(chunks)
+        self.done = 0
+        self.failed = 0
+        self.memories = 0
+        self.errors: List[Dict[str, Any]] = []
+        self.status = JOB_QUEUED
+        self.cancelled = False
+        self.running = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.finished_at is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "collection_name": self.collection_name,
+            "status": self.status,
+            "chunks": self.total,
+            "done": self.done,
+            "failed": self.failed,
+            "memories": self.memories,
+            "errors": self.errors,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+class MemoryExtractionQueue:
+    """
+    Background mem0 fact extraction for knowledge pyramid ingestion.
+
+    A job splits the added documents into chunks, every chunk is one add_memory call under user_id=collection.
+    concurrency workers process the chunks of all jobs in submission order, a failed chunk is retried with
+    exponential backoff. Jobs live in process memory, queued chunks are lost on restart.
+    """
+
+    def __init__(
+        self,
+        extract: Callable[[List[Dict[str, str]], str], Awaitable[Dict[str, Any]]],
+        concurrency: int = 2,
+        chunk_size: int = 20,
+        chunk_chars: int = 8000,
+        retries: int = 3,
+        retry_delay: float = 1.0,
+        max_jobs: int = 1000
+    ):
+        self.extract = extract
+        self.concurrency = concurrency
+        self.chunk_size = chunk_size
+        self.chunk_chars = chunk_chars
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.max_jobs = max_jobs
+        # Called with the collection name after a chunk added memories, e.g. to invalidate cached searches
+        self.on_chunk_done: Optional[Callable[[str], Awaitable[None]]] = None
+        self.jobs: "OrderedDict[str, MemoryExtractionJob]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+
+    @classmethod
+    def from_env(cls, extract: Callable[[List[Dict[str, str]], str], Awaitable[Dict[str, Any]]]) -> "MemoryExtractionQueue":
+        return cls(
+            extract,
+            concurrency=_get_int_env('MEMORY_EXTRACTION_CONCURRENCY', 2),
+            chunk_size=_get_int_env('MEMORY_EXTRACTION_CHUNK_SIZE', 20),
+            chunk_chars=_get_int_env('MEMORY_EXTRACTION_CHUNK_CHARS', 8000),
+            retries=_get_int_env('MEMORY_EXTRACTION_RETRIES', 3, minimum=0),
+            max_jobs=_get_int_env('MEMORY_EXTRACTION_MAX_JOBS', 1000)
+        )
+
+    def submit(self, collection_name: str, messages: List[Dict[str, str]]) -> Dict[str, Any]:
+        job = MemoryExtractionJob(collection_name, chunk_messages(messages, self.chunk_size, self.chunk_chars))
+        self.jobs[job.job_id] = job
+        self._prune()
+        if job.total == 0:
+            self._finish(job)
+            return job.to_dict()
+
+        self._ensure_workers()
+        for index in range(job.total):
+            self._queue.put_nowait((job, index))
+        logger.info(f"Queued memory extraction job {job.job_id} for {collection_name}: {len(messages)} documents in {job.total} chunks")
+        return job.to_dict()
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        return job.to_dict() if job is not None else None
+
+    def list_jobs(self, collection_name: Optional[str] = None) -> List[Dict[str, Any]]:
+        return [
+            job.to_dict() for job in reversed(self.jobs.values())
+            if collection_name is None or job.collection_name == collection_name
+        ]
+
+    async def cancel_collection(self, collection_name: str) -> int:
+        """
+        Drop the queued chunks of a collection and wait for its running ones, so memories deleted after
+        this returns do not come back. Returns the number of cancelled jobs.
+        """
+        jobs = [job for job in self.jobs.values() if job.collection_name == collection_name and not job.finished]
+        for job in jobs:
+            job.cancelled = True
+        for job in jobs:
+            await job.idle.wait()
+            self._finish(job)
+        if jobs:
+            logger.info(f"Cancelled {len(jobs)} memory extraction jobs of {collection_name}")
+        return len(jobs)
+
+    async def close(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        statuses: Dict[str, int] = {}
+        for job in self.jobs.values():
+            statuses[job.status] = statuses.get(job.status, 0) + 1
+        return {
+            "queued_chunks": self._queue.qsize() if self._queue is not None else 0,
+            "running_chunks": sum(job.running for job in self.jobs.values()),
+            "jobs": statuses,
+            "concurrency": self.concurrency,
+            "chunk_size": self.chunk_size,
+            "chunk_chars": self.chunk_chars,
+            "retries": self.retries
+        }
+
+    def _ensure_workers(self) -> None:
+        # Created on first use, the queue and the workers belong to the server's event loop
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+
+    def _prune(self) -> None:
+        # Oldest finished jobs first, unfinished jobs are always kept
+        for job_id in [job_id for job_id, job in self.jobs.items() if job.finished][:max(len(self.jobs) - self.max_jobs, 0)]:
+            del self.jobs[job_id]
+
+    def _finish(self, job: MemoryExtractionJob) -> None:
+        if job.finished:
+            return
+        if job.cancelled:
+            job.status = JOB_CANCELLED
+        elif job.failed == 0:
+            job.status = JOB_SUCCEEDED
+        else:
+            job.status = JOB_PARTIAL if job.done else JOB_FAILED
+        job.finished_at = time.time()
+        # The documents are no longer needed
+        job.chunks = []
+        logger.info(f"Memory extraction job {job.job_id} {job.status}: {job.done}/{job.total} chunks, {job.memories} memories")
+
+    async def _worker(self) -> None:
+        while True:
+            job, index = await self._queue.get()
+            try:
+                if not job.cancelled:
+                    await self._run_chunk(job, index)
+            except Exception as e:
+                logger.error(f"Memory extraction worker error on job {job.job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run_chunk(self, job: MemoryExtractionJob, index: int) -> None:
+        job.status = JOB_RUNNING
+        job.running += 1
+        job.idle.clear()
+        try:
+            for attempt in range(self.retries + 1):
+                try:
+                    result = await self.extract(job.chunks[index], job.collection_name)
+                    job.done += 1
+                    job.memories += len((result or {}).get("results", []))
+                    break
+                except Exception as e:
+                    if attempt < self.retries and not job.cancelled:
+                        delay = self.retry_delay * 2 ** attempt
+                        logger.warning(f"Memory extraction job {job.job_id} chunk {index} failed, retrying in {delay}s: {e}")
+                        await asyncio.sleep(delay)
+                        continue
+                    logger.error(f"Memory extraction job {job.job_id} chunk {index} failed: {e}")
+                    job.failed += 1
+                    if len(job.errors) < MAX_JOB_ERRORS:
+                        job.errors.append({"chunk": index, "error": str(e)})
+                    break
+        finally:
+            job.running -= 1
+            if job.running == 0:
+                job.idle.set()
+
+        if self.on_chunk_done is not None:
+            try:
+                await self.on_chunk_done(job.collection_name)
+            except Exception as e:
+                logger.warning(f"Memory extraction chunk callback failed: {e}")
+        if job.done + job.failed == job.total:
+            self._finish(job)
@@ -0,0 +1,149 @@
+import os
+import sys
+import asyncio
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+from data_services.memory.extraction import (
+    MemoryExtractionQueue, chunk_messages,
+    JOB_SUCCEEDED, JOB_PARTIAL, JOB_FAILED, JOB_CANCELLED
+)
+
+
+def make_messages(count, length=10):
+    return [{"role": "user", "content": f"{i}".ljust(length, "x")} for i in range(count)]
+
+
+class FakeExtract:
+    """add_memory stand-in, failures[i] is how often the i-th chunk fails before it succeeds"""
+
+    def __init__(self, failures=None, delay=0.0):
+        self.failures = dict(failures or {})
+        self.delay = delay
+        self.calls = []
+
+    async def __call__(self, messages, collection_name):
+        index = int(messages[0]["content"].rstrip("x"))
+        self.calls.append((collection_name, index))
+        await asyncio.sleep(self.delay)
+        if self.failures.get(index, 0) > 0:
+            self.failures[index] -= 1
+            raise RuntimeError(f"llm error on {index}")
+        return {"results": [{"memory": m["content"]} for m in messages]}
+
+
+async def wait_finished(queue, job_id):
+    for _ in range(200):
+        job = queue.get_job(job_id)
+        if job["finished_at"] is not None:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_chunk_messages():
+    chunks = chunk_messages(make_messages(5), max_messages=2, max_chars=1000)
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+    chunks = chunk_messages(make_messages(5), max_messages=10, max_chars=25)
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+
+    # A message longer than max_chars gets a chunk of its own
+    messages = make_messages(1) + make_messages(1, length=100) + make_messages(1)
+    assert [len(chunk) for chunk in chunk_messages(messages, max_messages=10, max_chars=25)] == [1, 1, 1]
+    assert chunk_messages([], max_messages=10, max_chars=25) == []
+    print("✓ chunk_messages splits by count and size")
+
+
+def test_job_succeeds():
+    async def run():
+        extract = FakeExtract()
+        queue = MemoryExtractionQueue(extract, concurrency=2, chunk_size=2, retry_delay=0.001)
+        done_collections = []
+
+        async def on_chunk_done(collection_name):
+            done_collections.append(collection_name)
+
+        queue.on_chunk_done = on_chunk_done
+        job = queue.submit("c1", make_messages(5))
+        assert job["chunks"] == 3
+
+        job = await wait_finished(queue, job["job_id"])
+        assert job["status"] == JOB_SUCCEEDED
+        assert job["done"] == 3 and job["memories"] == 5
+        assert done_collections == ["c1"] * 3
+        await queue.close()
+    asyncio.run(run())
+    print("✓ every chunk of a job is extracted")
+
+
+def test_failed_chunk_retried():
+    async def run():
+        extract = FakeExtract(failures={0: 2})
+        queue = MemoryExtractionQueue(extract, concurrency=1, chunk_size=1, retries=3, retry_delay=0.001)
+        job = await wait_finished(queue, queue.submit("c1", make_messages(1))["job_id"])
+        assert job["status"] == JOB_SUCCEEDED
+        assert len(extract.calls) == 3
+        await queue.close()
+    asyncio.run(run())
+    print("✓ a failed chunk is retried")
+
+
+def test_partial_and_failed_jobs():
+    async def run():
+        extract = FakeExtract(failures={1: 10})
+        queue = MemoryExtractionQueue(extract, concurrency=1, chunk_size=1, retries=1, retry_delay=0.001)
+        job = await wait_finished(queue, queue.submit("c1", make_messages(2))["job_id"])
+        assert job["status"] == JOB_PARTIAL
+        assert job["done"] == 1 and job["failed"] == 1
+        assert job["errors"] == [{"chunk": 1, "error": "llm error on 1"}]
+
+        extract.failures = {0: 10}
+        job = await wait_finished(queue, queue.submit("c1", make_messages(1))["job_id"])
+        assert job["status"] == JOB_FAILED
+        await queue.close()
+    asyncio.run(run())
+    print("✓ chunks failing every attempt make the job partial or failed")
+
+
+def test_cancel_collection():
+    async def run():
+        extract = FakeExtract(delay=0.05)
+        queue = MemoryExtractionQueue(extract, concurrency=1, chunk_size=1, retry_delay=0.001)
+        cancelled = queue.submit("c1", make_messages(5))
+        other = queue.submit("c2", make_messages(1))
+        await asyncio.sleep(0.01)
+
+        # Waits for the running chunk, the queued ones are skipped
+        assert await queue.cancel_collection("c1") == 1
+        assert queue.get_job(cancelled["job_id"])["status"] == JOB_CANCELLED
+
+        assert (await wait_finished(queue, other["job_id"]))["status"] == JOB_SUCCEEDED
+        assert [call for call in extract.calls if call[0] == "c1"] == [("c1", 0)]
+        assert await queue.cancel_collection("c1") == 0
+        await queue.close()
+    asyncio.run(run())
+    print("✓ cancel_collection stops the queued chunks of a collection")
+
+
+def test_finished_jobs_pruned():
+    async def run():
+        queue = MemoryExtractionQueue(FakeExtract(), max_jobs=2)
+        jobs = [queue.submit("c1", []) for _ in range(4)]
+        assert all(job["status"] == JOB_SUCCEEDED for job in jobs)
+        assert [job["job_id"] for job in queue.list_jobs()] == [job["job_id"] for job in reversed(jobs[2:])]
+        assert queue.get_job(jobs[0]["job_id"]) is None
+    asyncio.run(run())
+    print("✓ only the latest max_jobs finished jobs are kept")
+
+
+if __name__ == "__main__":
+    test_chunk_messages()
+    test_job_succeeds()
+    test_failed_chunk_retried()
+    test_partial_and_failed_jobs()
+    test_cancel_collection()
+    test_finished_jobs_pruned()
+    print("\nAll memory extraction tests passed! ✓")
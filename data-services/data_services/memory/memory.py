@@ -1,9 +1,14 @@
 import os
+import uuid
+import asyncio
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 from mem0 import Memory
 from mem0 import AsyncMemory
 from datetime import datetime
+from .store import MemoryPGStore
+from .bulk_delete import MemoryBulkDeleter
+from ..api.pagination import encode_cursor, decode_cursor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -84,12 +89,19 @@ class AsyncMemoryService:
     def __init__(self):
         self.memory_instance = None
         self.memory_config = None
+        self.store = None
+        self.bulk_deleter = None
     
     async def initialize(self, config: Dict[str, Any]):
         self.memory_config = config
         
         try:
             self.memory_instance = await AsyncMemory.from_config(self.memory_config)
+            # Direct SQL for bulk deletes and paged listing, mem0 has neither
+            self.store = MemoryPGStore.from_config(self.memory_config, maxconn=int(os.getenv('MEMORY_BULK_DELETE_CONCURRENCY', '4')))
+            if self.store is not None:
+                history_db_path = getattr(getattr(self.memory_instance, "config", None), "history_db_path", None)
+                self.bulk_deleter = MemoryBulkDeleter.from_env(self.store, history_db_path=history_db_path or self.memory_config.get("history_db_path"))
             logger.info("Memory service initialized successfully")
 
         except Exception as e:
@@ -120,6 +132,47 @@ class AsyncMemoryService:
         result = await self.memory_instance.get_all(user_id=user_id, agent_id=agent_id, run_id=run_id, filters=filters, limit=limit)
         return result.get("results", [])
     
+    async def get_memories_page(self, user_id: Optional[str] = None, agent_id: Optional[str] = None, run_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None, limit: int = 100, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        One page of memories and the cursor of the next one, None on the last page.
+        Without a pgvector store there is a single page of at most limit memories.
+        """
+        if not self.memory_instance:
+            raise ValueError("Async Memory service not initialized. Call initialize() first.")
+
+        if self.store is None:
+            if cursor is not None:
+                raise ValueError("Cursor pagination requires the pgvector memory store")
+            memories = await self.get_all_memories(user_id=user_id, agent_id=agent_id, run_id=run_id, filters=filters, limit=limit)
+            return {"memories": memories, "next_cursor": None}
+
+        after_id = None
+        if cursor is not None:
+            after_id = decode_cursor(cursor)[0]
+            try:
+                after_id = str(uuid.UUID(str(after_id)))
+            except ValueError:
+                raise ValueError("Invalid cursor")
+
+        scope = {"user_id": user_id, "agent_id": agent_id, "run_id": run_id}
+        # One row more than asked tells whether there is a next page
+        memories = await asyncio.to_thread(self.store.list_page, scope, filters, limit + 1, after_id)
+        next_cursor = encode_cursor([memories[limit - 1]["id"]]) if len(memories) > limit else None
+        return {"memories": memories[:limit], "next_cursor": next_cursor}
+
+    async def iter_memories(self, user_id: Optional[str] = None, agent_id: Optional[str] = None, run_id: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None, page_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Every memory of the scope, read page by page so only one page is held in memory"""
+        cursor = None
+        while True:
+            page = await self.get_memories_page(user_id=user_id, agent_id=agent_id, run_id=run_id, filters=filters, limit=page_size, cursor=cursor)
+            for memory in page["memories"]:
+                yield memory
+            cursor = page["next_cursor"]
+            if cursor is None:
+                return
+
     async def search_memories(self, query: str, user_id: Optional[str] = None, agent_id: Optional[str] = None, run_id: Optional[str] = None, 
         filters: Optional[Dict[str, Any]] = None, limit: int = 100, threshold: Optional[float] = None) -> List[Dict[str, Any]]:
         if not self.memory_instance:
@@ -145,6 +198,62 @@ class AsyncMemoryService:
         
         return await self.memory_instance.delete_all(user_id=user_id, agent_id=agent_id, run_id=run_id)
     
+    async def bulk_delete_memories(self, memory_ids: Optional[List[str]] = None, user_id: Optional[str] = None, agent_id: Optional[str] = None,
+        run_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None, purge_history: bool = False) -> Dict[str, Any]:
+        """
+        Delete memories by id list, or every memory of a user/agent/run scope optionally narrowed by metadata.
+        With memory_ids, user_id restricts the deletion to that user's memories.
+        Returns the deleted ids, the ids that were not found, and the ids whose delete failed with their error.
+        """
+        if not self.memory_instance:
+            raise ValueError("Async Memory service not initialized. Call initialize() first.")
+
+        if self.bulk_deleter is None:
+            return await self._delete_memories_one_by_one(memory_ids, user_id, agent_id, run_id, metadata)
+
+        if memory_ids is not None:
+            return await self.bulk_deleter.delete_by_ids(memory_ids, user_id=user_id, purge_history=purge_history)
+
+        result = await self.bulk_deleter.delete_by_scope(user_id=user_id, agent_id=agent_id, run_id=run_id, metadata=metadata, purge_history=purge_history)
+        # Graph relations are kept per scope, there is no metadata on them to narrow by
+        if getattr(self.memory_instance, "enable_graph", False) and not metadata:
+            filters = {key: value for key, value in (("user_id", user_id), ("agent_id", agent_id), ("run_id", run_id)) if value is not None}
+            await asyncio.to_thread(self.memory_instance.graph.delete_all, filters)
+        return result
+
+    async def _delete_memories_one_by_one(self, memory_ids: Optional[List[str]], user_id: Optional[str], agent_id: Optional[str],
+        run_id: Optional[str], metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        # Vector stores other than pgvector, mem0 deletes with bounded concurrency
+        if memory_ids is None:
+            memories = await self.get_all_memories(user_id=user_id, agent_id=agent_id, run_id=run_id, filters=metadata, limit=1000000)
+            memory_ids = [memory["id"] for memory in memories]
+            user_id = None
+
+        semaphore = asyncio.Semaphore(int(os.getenv('MEMORY_BULK_DELETE_CONCURRENCY', '4')))
+
+        async def delete_one(memory_id: str) -> Optional[str]:
+            """"deleted", "not_found", or the error of a failed delete"""
+            async with semaphore:
+                try:
+                    memory = await self.memory_instance.get(memory_id)
+                    if memory is None or (user_id is not None and memory.get("user_id") != user_id):
+                        return "not_found"
+                    await self.memory_instance.delete(memory_id)
+                    return "deleted"
+                except Exception as e:
+                    logger.warning(f"Failed to delete memory {memory_id}: {e}")
+                    return str(e) or type(e).__name__
+
+        results = await asyncio.gather(*(delete_one(memory_id) for memory_id in memory_ids))
+        return {
+            "deleted": [memory_id for memory_id, result in zip(memory_ids, results) if result == "deleted"],
+            "not_found": [memory_id for memory_id, result in zip(memory_ids, results) if result == "not_found"],
+            "errors": [
+                {"memory_id": memory_id, "error": result}
+                for memory_id, result in zip(memory_ids, results) if result not in ("deleted", "not_found")
+            ]
+        }
+
     async def get_memory_history(self, memory_id: str) -> List[Dict[str, Any]]:
         if not self.memory_instance:
             raise ValueError("Async Memory service not initialized. Call initialize() first.")
@@ -0,0 +1,122 @@
+import json
+import logging
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+from psycopg2 import pool
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Payload keys mem0 stores the memory scope under
+SCOPE_KEYS = ("user_id", "agent_id", "run_id")
+# Payload keys mem0 returns as fields of a memory, everything else is its metadata
+PROMOTED_KEYS = ("user_id", "agent_id", "run_id", "actor_id", "role")
+CORE_KEYS = ("data", "hash", "created_at", "updated_at", "id")
+
+
+class MemoryPGStore:
+    """
+    Direct SQL access to the pgvector table mem0 keeps its memories in, for the operations mem0 only offers
+    one memory at a time (bulk deletes) or without paging (listing). Synchronous, callers run it in a thread.
+    """
+
+    def __init__(self, vector_store_config: Dict[str, Any], maxconn: int = 4):
+        self.config = vector_store_config
+        # mem0 creates the table unquoted under the collection name
+        self.table_name = vector_store_config.get("collection_name", "mem0")
+        self.maxconn = maxconn
+        self._pool: Optional[pool.ThreadedConnectionPool] = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, memory_config: Dict[str, Any], maxconn: int = 4) -> Optional["MemoryPGStore"]:
+        """None unless the memories are stored in pgvector"""
+        vector_store = memory_config.get("vector_store") or {}
+        if vector_store.get("provider") != "pgvector":
+            return None
+        return cls(vector_store.get("config") or {}, maxconn=maxconn)
+
+    def get_pool(self) -> pool.ThreadedConnectionPool:
+        with self._lock:
+            if self._pool is None:
+                if self.config.get("connection_string"):
+                    self._pool = pool.ThreadedConnectionPool(1, self.maxconn, dsn=self.config["connection_string"])
+                else:
+                    self._pool = pool.ThreadedConnectionPool(
+                        1, self.maxconn,
+                        user=self.config.get("user"),
+                        password=self.config.get("password"),
+                        host=self.config.get("host"),
+                        port=self.config.get("port"),
+                        dbname=self.config.get("dbname")
+                    )
+            return self._pool
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+    @staticmethod
+    def scope_conditions(scope: Dict[str, str], metadata: Optional[Dict[str, Any]] = None) -> Tuple[List[str], List[Any]]:
+        conditions = [f"payload->>'{key}' = %s" for key in SCOPE_KEYS if scope.get(key) is not None]
+        params: List[Any] = [scope[key] for key in SCOPE_KEYS if scope.get(key) is not None]
+        if metadata:
+            # mem0 stores custom metadata at the top level of the payload
+            conditions.append("payload @> %s::jsonb")
+            params.append(json.dumps(metadata))
+        return conditions, params
+
+    def fetch(self, sql: str, params: List[Any], commit: bool = False) -> List[tuple]:
+        connection_pool = self.get_pool()
+        conn = connection_pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall()
+            if commit:
+                conn.commit()
+            else:
+                conn.rollback()
+            return rows
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            connection_pool.putconn(conn)
+
+    def list_page(self, scope: Dict[str, str], metadata: Optional[Dict[str, Any]] = None, limit: int = 100, after_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        One page of memories in id order, starting after after_id. Keyset paging on the primary key, so a deep
+        page costs the same as the first one.
+        """
+        conditions, params = self.scope_conditions(scope, metadata)
+        if after_id is not None:
+            conditions.append("id > %s::uuid")
+            params.append(after_id)
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        rows = self.fetch(
+            f"SELECT id::text, payload FROM {self.table_name} {where_clause} ORDER BY id LIMIT %s",
+            params + [limit]
+        )
+        return [self.format_memory(memory_id, payload) for memory_id, payload in rows]
+
+    @staticmethod
+    def format_memory(memory_id: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """The shape mem0's get_all returns a memory in"""
+        payload = payload or {}
+        memory = {
+            "id": memory_id,
+            "memory": payload.get("data"),
+            "hash": payload.get("hash"),
+            "created_at": payload.get("created_at"),
+            "updated_at": payload.get("updated_at")
+        }
+        for key in PROMOTED_KEYS:
+            if key in payload:
+                memory[key] = payload[key]
+        metadata = {key: value for key, value in payload.items() if key not in CORE_KEYS and key not in PROMOTED_KEYS}
+        if metadata:
+            memory["metadata"] = metadata
+        return memory
@@ -0,0 +1,228 @@
+import os
+import re
+import copy
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Callable, Awaitable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        if value < 0:
+            logger.warning(f"{name} must not be negative, using default value {default}. Current value: {value}")
+            return default
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"{name} environment variable conversion failed, using default value {default}. Error: {e}")
+        return default
+
+
+class _LeaderCancelled(Exception):
+    """Set on an in-flight search whose leading caller was cancelled, its waiters then search themselves"""
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query or "").strip()
+
+
+class SearchCache:
+    """
+    Search result cache keyed by normalized request parameters and per-collection version counters.
+
+    Every write to a collection bumps its version, entries cached under the old version can no longer be
+    reached and age out of the LRU/TTL. Versions live in Redis when SEARCH_CACHE_REDIS_URL is set so all
+    replicas see the same invalidations, in process otherwise. Identical concurrent lookups are coalesced
+    into a single search. Callers get their own copy of the response and may modify it.
+    """
+
+    def __init__(self, max_size: int = 1000, ttl: int = 300, redis_url: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._redis = None
+        self.stats = {
+            "memory_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "invalidations": 0,
+            "errors": 0
+        }
+
+        if redis_url:
+            try:
+                import redis.asyncio as aioredis
+                self._redis = aioredis.from_url(redis_url, decode_responses=True)
+                logger.info("Search cache Redis tier enabled")
+            except ImportError:
+                logger.warning("SEARCH_CACHE_REDIS_URL is set but redis is not installed, using the in-process tier only")
+
+    @classmethod
+    def from_env(cls) -> Optional["SearchCache"]:
+        if os.getenv('SEARCH_CACHE_ENABLE', 'enable') != 'enable':
+            logger.info("Search cache disabled")
+            return None
+        return cls(
+            max_size=_get_int_env('SEARCH_CACHE_SIZE', 1000),
+            ttl=_get_int_env('SEARCH_CACHE_TTL', 300),
+            redis_url=os.getenv('SEARCH_CACHE_REDIS_URL')
+        )
+
+    # ---------- versions
+
+    def _version_key(self, scope: str) -> str:
+        return f"dac:search_cache:version:{scope}"
+
+    async def _get_version(self, scope: str) -> int:
+        if self._redis is not None:
+            try:
+                value = await self._redis.get(self._version_key(scope))
+                return int(value or 0)
+            except Exception as e:
+                # Falling back to the local counter could serve entries another replica invalidated
+                self.stats["errors"] += 1
+                raise RuntimeError(f"Search cache version lookup failed: {e}")
+        return self._versions.get(scope, 0)
+
+    async def invalidate(self, scope: str) -> None:
+        """Called after every write to a collection"""
+        self.stats["invalidations"] += 1
+        self._versions[scope] = self._versions.get(scope, 0) + 1
+        if self._redis is not None:
+            try:
+                await self._redis.incr(self._version_key(scope))
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.warning(f"Search cache invalidation of {scope} failed in Redis: {e}")
+
+    # ---------- entries
+
+    def _get_local(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _put_local(self, key: str, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def _get_redis(self, key: str) -> Optional[Any]:
+        if self._redis is None:
+            return None
+        try:
+            value = await self._redis.get(f"dac:search_cache:entry:{key}")
+            return json.loads(value) if value else None
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Search cache Redis lookup failed: {e}")
+            return None
+
+    async def _put_redis(self, key: str, value: Any) -> None:
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(f"dac:search_cache:entry:{key}", json.dumps(value, ensure_ascii=False, default=str), ex=self.ttl)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.warning(f"Search cache Redis store failed: {e}")
+
+    async def get_or_search(
+        self,
+        namespace: str,
+        scopes: list,
+        params: Dict[str, Any],
+        search: Callable[[], Awaitable[Dict[str, Any]]]
+    ) -> Dict[str, Any]:
+        """
+        Return the cached response for params, or run search once for all identical concurrent callers.
+
+        Args:
+            namespace: Route family, e.g. "knowledge_pyramid" or "vector"
+            scopes: Version scopes the response depends on, the collection names
+            params: Request parameters, the query is normalized before hashing
+            search: Coroutine factory running the actual search
+        """
+        try:
+            versions = [await self._get_version(scope) for scope in scopes]
+        except RuntimeError as e:
+            logger.warning(f"{e}, bypassing the search cache")
+            return await search()
+
+        normalized = dict(params, query=normalize_query(params.get("query", "")))
+        key = hashlib.sha256(
+            json.dumps([namespace, scopes, versions, normalized], sort_keys=True, default=str).encode("utf-8")
+        ).hexdigest()
+
+        while True:
+            cached = self._get_local(key)
+            if cached is not None:
+                self.stats["memory_hits"] += 1
+                return copy.deepcopy(cached)
+
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            self.stats["coalesced"] += 1
+            try:
+                return copy.deepcopy(await asyncio.shield(inflight))
+            except _LeaderCancelled:
+                # The caller running the search went away, the next waiter takes over
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await self._get_redis(key)
+            if result is not None:
+                self.stats["redis_hits"] += 1
+                self._put_local(key, result)
+            else:
+                self.stats["misses"] += 1
+                result = await search()
+                # Partial responses (a leg or collection timed out or failed) are not cached
+                if not result.get("timed_out") and not result.get("failed"):
+                    self._put_local(key, result)
+                    await self._put_redis(key, result)
+            future.set_result(result)
+            return copy.deepcopy(result)
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            future.exception()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved, waiters are optional and asyncio would log it otherwise
+            future.exception()
+            raise
+        finally:
+            del self._inflight[key]
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["memory_hits"] + self.stats["redis_hits"] + self.stats["misses"] + self.stats["coalesced"]
+        hits = lookups - self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "redis": self._redis is not None
+        }
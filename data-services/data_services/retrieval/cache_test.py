@@ -0,0 +1,144 @@
+import os
+import sys
+import asyncio
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+from data_services.retrieval.cache import SearchCache
+
+PARAMS = {"query": "what  is\tpgvector ", "top_k": 5}
+
+
+class CountingSearch:
+    def __init__(self, delay: float = 0.0):
+        self.calls = 0
+        self.delay = delay
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"status": "success", "results": [{"content": "pgvector", "score": 0.9}]}
+
+
+def test_hit_after_miss():
+    async def run():
+        cache = SearchCache(max_size=10, ttl=60)
+        search = CountingSearch()
+        first = await cache.get_or_search("vector", ["c1"], PARAMS, search)
+        # Whitespace of the query is normalized before hashing
+        second = await cache.get_or_search("vector", ["c1"], dict(PARAMS, query="what is pgvector"), search)
+        assert first == second
+        assert search.calls == 1
+        assert cache.stats["misses"] == 1 and cache.stats["memory_hits"] == 1
+    asyncio.run(run())
+    print("✓ identical queries hit the cache")
+
+
+def test_hit_returns_a_copy():
+    async def run():
+        cache = SearchCache(max_size=10, ttl=60)
+        search = CountingSearch()
+        first = await cache.get_or_search("vector", ["c1"], PARAMS, search)
+        first["results"].append({"content": "changed by the caller"})
+        first["status"] = "changed"
+        second = await cache.get_or_search("vector", ["c1"], PARAMS, search)
+        assert second["status"] == "success" and len(second["results"]) == 1
+        second["results"][0]["score"] = 0.0
+        third = await cache.get_or_search("vector", ["c1"], PARAMS, search)
+        assert third["results"][0]["score"] == 0.9
+    asyncio.run(run())
+    print("✓ callers cannot modify the cached response")
+
+
+def test_invalidate_bumps_version():
+    async def run():
+        cache = SearchCache(max_size=10, ttl=60)
+        search = CountingSearch()
+        await cache.get_or_search("vector", ["c1", "c2"], PARAMS, search)
+        await cache.invalidate("c2")
+        await cache.get_or_search("vector", ["c1", "c2"], PARAMS, search)
+        assert search.calls == 2
+        # Other collections keep their entries
+        await cache.get_or_search("vector", ["c1"], PARAMS, search)
+        await cache.get_or_search("vector", ["c1"], PARAMS, search)
+        assert search.calls == 3
+    asyncio.run(run())
+    print("✓ a write to a collection invalidates its entries")
+
+
+def test_partial_response_not_cached():
+    async def run():
+        cache = SearchCache(max_size=10, ttl=60)
+        calls = []
+
+        async def partial():
+            calls.append(1)
+            return {"status": "success", "results": [], "timed_out": ["fulltext"]}
+
+        await cache.get_or_search("knowledge_pyramid", ["c1"], PARAMS, partial)
+        await cache.get_or_search("knowledge_pyramid", ["c1"], PARAMS, partial)
+        assert len(calls) == 2
+    asyncio.run(run())
+    print("✓ partial responses are not cached")
+
+
+def test_concurrent_lookups_coalesced():
+    async def run():
+        cache = SearchCache(max_size=10, ttl=60)
+        search = CountingSearch(delay=0.05)
+        results = await asyncio.gather(*(cache.get_or_search("vector", ["c1"], PARAMS, search) for _ in range(5)))
+        assert search.calls == 1
+        assert cache.stats["coalesced"] == 4
+        assert all(result == results[0] for result in results)
+        # Every caller got its own copy
+        assert len({id(result) for result in results}) == 5
+    asyncio.run(run())
+    print("✓ identical concurrent lookups run one search")
+
+
+def test_leader_cancel_does_not_cancel_waiters():
+    async def run():
+        cache = SearchCache(max_size=10, ttl=60)
+        search = CountingSearch(delay=0.05)
+        leader = asyncio.create_task(cache.get_or_search("vector", ["c1"], PARAMS, search))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.create_task(cache.get_or_search("vector", ["c1"], PARAMS, search)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        leader.cancel()
+
+        results = await asyncio.gather(*waiters)
+        assert leader.cancelled()
+        assert all(result["status"] == "success" for result in results)
+        # One waiter took over the search, the others waited for it
+        assert search.calls == 2
+        assert not cache._inflight
+    asyncio.run(run())
+    print("✓ a cancelled leader hands the search to a waiter")
+
+
+def test_search_error_reaches_waiters():
+    async def run():
+        cache = SearchCache(max_size=10, ttl=60)
+
+        async def failing():
+            await asyncio.sleep(0.02)
+            raise ValueError("bad filter")
+
+        results = await asyncio.gather(*(cache.get_or_search("vector", ["c1"], PARAMS, failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        assert not cache._inflight and not cache._entries
+    asyncio.run(run())
+    print("✓ a failed search fails its waiters and is not cached")
+
+
+if __name__ == "__main__":
+    test_hit_after_miss()
+    test_hit_returns_a_copy()
+    test_invalidate_bumps_version()
+    test_partial_response_not_cached()
+    test_concurrent_lookups_coalesced()
+    test_leader_cancel_does_not_cancel_waiters()
+    test_search_error_reaches_waiters()
+    print("\nAll search cache tests passed! ✓")
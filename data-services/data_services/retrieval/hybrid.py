@@ -0,0 +1,299 @@
+import os
+import asyncio
+import hashlib
+import functools
+import logging
+from typing import List, Dict, Any, Optional, Awaitable, Callable, Tuple
+from ..api.base import SearchType
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+FUSION_WEIGHTED = "weighted"
+FUSION_RRF = "rrf"
+
+
+def get_search_leg_timeout() -> float:
+    """Seconds each search leg (vector, fulltext, memory) may take before it is dropped from the response"""
+    try:
+        value = float(os.getenv('SEARCH_LEG_TIMEOUT', '10'))
+        if value <= 0:
+            logger.warning(f"SEARCH_LEG_TIMEOUT must be greater than 0, using default value 10. Current value: {value}")
+            return 10.0
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"SEARCH_LEG_TIMEOUT environment variable conversion failed, using default value 10. Error: {e}")
+        return 10.0
+
+
+def get_rrf_k() -> int:
+    try:
+        value = int(os.getenv('HYBRID_RRF_K', '60'))
+        if value <= 0:
+            logger.warning(f"HYBRID_RRF_K must be greater than 0, using default value 60. Current value: {value}")
+            return 60
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"HYBRID_RRF_K environment variable conversion failed, using default value 60. Error: {e}")
+        return 60
+
+
+def get_batch_search_max_queries() -> int:
+    try:
+        value = int(os.getenv('BATCH_SEARCH_MAX_QUERIES', '32'))
+        if value <= 0:
+            logger.warning(f"BATCH_SEARCH_MAX_QUERIES must be greater than 0, using default value 32. Current value: {value}")
+            return 32
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"BATCH_SEARCH_MAX_QUERIES environment variable conversion failed, using default value 32. Error: {e}")
+        return 32
+
+
+def get_default_fusion() -> str:
+    fusion = os.getenv('HYBRID_FUSION', FUSION_WEIGHTED)
+    if fusion not in (FUSION_WEIGHTED, FUSION_RRF):
+        logger.warning(f"HYBRID_FUSION must be {FUSION_WEIGHTED} or {FUSION_RRF}, using default value {FUSION_WEIGHTED}. Current value: {fusion}")
+        return FUSION_WEIGHTED
+    return fusion
+
+
+def documents_to_results(documents: List[Any], search_type: str) -> List[Dict[str, Any]]:
+    return [
+        {
+            "content": doc.page_content,
+            "metadata": doc.metadata,
+            "score": float(doc.metadata.get('score', 0)),
+            "search_type": search_type,
+            "hybrid_score": 0.0
+        } for doc in documents
+    ]
+
+
+def result_key(result: Dict[str, Any]) -> str:
+    """Identity of a chunk across legs: doc_id when the document carries one, the content hash otherwise"""
+    doc_id = (result.get('metadata') or {}).get('doc_id')
+    if doc_id:
+        return str(doc_id)
+    return hashlib.sha256(result['content'].encode('utf-8')).hexdigest()
+
+
+def fuse_results(
+    leg_results: Dict[str, List[Dict[str, Any]]],
+    weights: Dict[str, float],
+    fusion: str = FUSION_WEIGHTED,
+    hybrid_threshold: Optional[float] = None,
+    limit: Optional[int] = None,
+    rrf_k: int = 60
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists into one list with one entry per chunk.
+
+    weighted: each leg's scores are divided by the leg's best score so cosine similarities and ts_rank
+        values are comparable, then summed with the leg weights. hybrid_threshold applies to the fused score.
+    rrf: reciprocal rank fusion, sum of weight / (rrf_k + rank). Rank based scores are not comparable
+        to hybrid_threshold, so it is not applied.
+
+    Every fused entry lists the legs that returned it in "sources", search_type is the leg that
+    contributed most.
+    """
+    fused: Dict[str, Dict[str, Any]] = {}
+    contributions: Dict[str, Dict[str, float]] = {}
+
+    for leg, results in leg_results.items():
+        weight = weights.get(leg, 1.0)
+        max_score = max((r['score'] for r in results), default=0.0)
+        ranked = sorted(results, key=lambda x: x['score'], reverse=True)
+
+        for rank, result in enumerate(ranked, start=1):
+            if fusion == FUSION_RRF:
+                contribution = weight / (rrf_k + rank)
+            else:
+                contribution = weight * (result['score'] / max_score if max_score > 0 else 0.0)
+
+            key = result_key(result)
+            if key not in fused:
+                entry = result.copy()
+                entry['sources'] = []
+                entry['hybrid_score'] = 0.0
+                fused[key] = entry
+                contributions[key] = {}
+            entry = fused[key]
+            if leg not in entry['sources']:
+                entry['sources'].append(leg)
+            # A leg can return the same chunk twice (duplicate rows), only its best rank counts
+            contributions[key][leg] = max(contributions[key].get(leg, 0.0), contribution)
+
+    for key, entry in fused.items():
+        entry['hybrid_score'] = sum(contributions[key].values())
+        entry['search_type'] = max(contributions[key], key=contributions[key].get)
+
+    results = list(fused.values())
+    if fusion != FUSION_RRF and hybrid_threshold is not None:
+        results = [r for r in results if r['hybrid_score'] >= hybrid_threshold]
+
+    results.sort(key=lambda x: x['hybrid_score'], reverse=True)
+    return results[:limit] if limit else results
+
+
+def rank_results(
+    leg_results: Dict[str, List[Dict[str, Any]]],
+    search_type: str,
+    limit: int = 10,
+    hybrid_threshold: Optional[float] = None,
+    vector_weight: Optional[float] = 0.7,
+    fulltext_weight: Optional[float] = 0.3,
+    fusion: Optional[str] = None
+) -> List[Dict[str, Any]]:
+    """Final result list of one query from its leg results"""
+    if search_type == SearchType.HYBRID:
+        return fuse_results(
+            leg_results,
+            weights={
+                'vector': vector_weight if vector_weight is not None else 0.7,
+                'fulltext': fulltext_weight if fulltext_weight is not None else 0.3
+            },
+            fusion=fusion or get_default_fusion(),
+            hybrid_threshold=hybrid_threshold,
+            limit=limit,
+            rrf_k=get_rrf_k()
+        )
+    elif search_type == SearchType.FULLTEXT:
+        results = [
+            r for r in leg_results.get('fulltext', [])
+            if hybrid_threshold is None or r['score'] >= hybrid_threshold
+        ]
+        results.sort(key=lambda x: x['score'], reverse=True)
+        return results
+    elif search_type == SearchType.VECTOR:
+        return sorted(leg_results.get('vector', []), key=lambda x: x['score'], reverse=True)
+    return []
+
+
+async def batch_search(
+    vector: Any,
+    queries: List[str],
+    search_type: str,
+    limit: int = 10,
+    hybrid_threshold: Optional[float] = None,
+    vector_weight: Optional[float] = 0.7,
+    fulltext_weight: Optional[float] = 0.3,
+    fusion: Optional[str] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    metadata_filter: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Search one collection for several queries. The vector leg of all queries is one statement, see
+    PGVector.abatch_search_by_vector. The fulltext searches run concurrently with it, each query is
+    then ranked like hybrid_search does.
+
+    Returns:
+        {"results": [{"query", "result"}, ...] in query order, "timed_out": [leg, ...]}
+    """
+    vector_params = {"ef_search": ef_search, "probes": probes, "metadata_filter": metadata_filter}
+    legs: Dict[str, Callable[[], Awaitable]] = {}
+    if search_type == SearchType.VECTOR:
+        legs['vector'] = functools.partial(vector.abatch_search_by_vector, queries, top_k=limit, score_threshold=hybrid_threshold, **vector_params)
+    elif search_type == SearchType.HYBRID:
+        legs['vector'] = functools.partial(vector.abatch_search_by_vector, queries, top_k=limit, **vector_params)
+    if search_type in (SearchType.FULLTEXT, SearchType.HYBRID):
+        legs['fulltext'] = lambda: asyncio.gather(*(
+            vector.asearch_by_full_text(query=query, top_k=limit, metadata_filter=metadata_filter) for query in queries
+        ))
+
+    outcomes, timed_out = await run_legs(legs)
+
+    results = []
+    for i, query in enumerate(queries):
+        leg_results = {name: documents_to_results(outcomes[name][i], name) for name in legs if name in outcomes}
+        results.append({
+            "query": query,
+            "result": rank_results(leg_results, search_type, limit, hybrid_threshold, vector_weight, fulltext_weight, fusion)
+        })
+    return {"results": results, "timed_out": timed_out}
+
+
+async def run_legs(legs: Dict[str, Callable[[], Awaitable]], timeout: Optional[float] = None) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Run the search legs concurrently, each bounded by timeout.
+
+    Each leg is a zero-argument callable returning the awaitable, it is only called here so no
+    coroutine is left unawaited when the caller fails before the legs run.
+
+    A leg that times out is reported in the returned list and left out of the results, so a slow leg
+    degrades the response instead of failing it. Any other error is raised as before.
+    """
+    timeout = timeout or get_search_leg_timeout()
+    names = list(legs.keys())
+
+    async def run_leg(name: str) -> Any:
+        return await asyncio.wait_for(legs[name](), timeout=timeout)
+
+    outcomes = await asyncio.gather(*(run_leg(name) for name in names), return_exceptions=True)
+
+    results = {}
+    timed_out = []
+    for name, outcome in zip(names, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            logger.warning(f"Search leg {name} timed out after {timeout}s")
+            timed_out.append(name)
+        elif isinstance(outcome, BaseException):
+            raise outcome
+        else:
+            results[name] = outcome
+    return results, timed_out
+
+
+async def hybrid_search(
+    vector: Any,
+    query: str,
+    search_type: str,
+    limit: int = 10,
+    hybrid_threshold: Optional[float] = None,
+    vector_weight: Optional[float] = 0.7,
+    fulltext_weight: Optional[float] = 0.3,
+    fusion: Optional[str] = None,
+    extra_legs: Optional[Dict[str, Callable[[], Awaitable]]] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    metadata_filter: Optional[Dict[str, Any]] = None,
+    query_vector: Optional[List[float]] = None
+) -> Dict[str, Any]:
+    """
+    Search one collection for the given search type. The vector and fulltext legs, and any extra legs
+    such as the knowledge pyramid memory search, run concurrently. Extra legs are zero-argument
+    callables, see run_legs. ef_search/probes override the
+    collection's vector index search settings for this request. metadata_filter is applied in SQL by
+    the vector and fulltext legs, see vector_sdk.pgvector.filter. query_vector skips embedding the query
+    when the caller already did.
+
+    Returns:
+        {"result": sorted results, "extra": {leg: raw result}, "timed_out": [leg, ...]}
+    """
+    vector_params = {"ef_search": ef_search, "probes": probes}
+    if query_vector is not None:
+        vector_params["query_vector"] = query_vector
+    legs: Dict[str, Callable[[], Awaitable]] = {}
+    if search_type == SearchType.VECTOR:
+        legs['vector'] = functools.partial(vector.asearch_by_vector, query=query, top_k=limit, score_threshold=hybrid_threshold, metadata_filter=metadata_filter, **vector_params)
+    elif search_type == SearchType.FULLTEXT:
+        legs['fulltext'] = functools.partial(vector.asearch_by_full_text, query=query, top_k=limit, metadata_filter=metadata_filter)
+    elif search_type == SearchType.HYBRID:
+        legs['vector'] = functools.partial(vector.asearch_by_vector, query=query, top_k=limit, metadata_filter=metadata_filter, **vector_params)
+        legs['fulltext'] = functools.partial(vector.asearch_by_full_text, query=query, top_k=limit, metadata_filter=metadata_filter)
+
+    extra_legs = extra_legs or {}
+    outcomes, timed_out = await run_legs({**legs, **extra_legs})
+
+    leg_results = {
+        name: documents_to_results(outcomes[name], name)
+        for name in legs if name in outcomes
+    }
+    results = rank_results(leg_results, search_type, limit, hybrid_threshold, vector_weight, fulltext_weight, fusion)
+
+    return {
+        "result": results,
+        "extra": {name: outcomes[name] for name in extra_legs if name in outcomes},
+        "timed_out": timed_out
+    }
@@ -0,0 +1,118 @@
+import os
+import sys
+import asyncio
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+from data_services.api.base import SearchType
+from data_services.retrieval.hybrid import fuse_results, run_legs, hybrid_search, FUSION_WEIGHTED, FUSION_RRF
+
+WEIGHTS = {"vector": 0.7, "fulltext": 0.3}
+
+
+def make_result(doc_id, score, leg):
+    return {"content": f"chunk {doc_id}", "metadata": {"doc_id": doc_id}, "score": score, "search_type": leg, "hybrid_score": 0.0}
+
+
+LEG_RESULTS = {
+    "vector": [make_result("a", 0.8, "vector"), make_result("b", 0.4, "vector")],
+    "fulltext": [make_result("c", 0.1, "fulltext"), make_result("b", 0.2, "fulltext")]
+}
+
+
+class FakeDocument:
+    def __init__(self, doc_id, score):
+        self.page_content = f"chunk {doc_id}"
+        self.metadata = {"doc_id": doc_id, "score": score}
+
+
+class FakeVector:
+    async def asearch_by_vector(self, query, top_k, metadata_filter=None, **kwargs):
+        return [FakeDocument("a", 0.8)]
+
+    async def asearch_by_full_text(self, query, top_k, metadata_filter=None):
+        return [FakeDocument("a", 0.5)]
+
+
+def test_weighted_fusion():
+    results = fuse_results(LEG_RESULTS, WEIGHTS, fusion=FUSION_WEIGHTED)
+    assert [r["metadata"]["doc_id"] for r in results] == ["a", "b", "c"]
+    # Scores are normalized by each leg's best score before weighting
+    assert [round(r["hybrid_score"], 6) for r in results] == [0.7, 0.65, 0.15]
+    assert results[1]["sources"] == ["vector", "fulltext"]
+    assert results[1]["search_type"] == "vector" and results[2]["search_type"] == "fulltext"
+
+    results = fuse_results(LEG_RESULTS, WEIGHTS, fusion=FUSION_WEIGHTED, hybrid_threshold=0.5, limit=1)
+    assert [r["metadata"]["doc_id"] for r in results] == ["a"]
+    print("✓ weighted fusion")
+
+
+def test_rrf_fusion():
+    results = fuse_results(LEG_RESULTS, WEIGHTS, fusion=FUSION_RRF, hybrid_threshold=0.5, rrf_k=60)
+    # The chunk both legs returned ranks first, the threshold does not apply to rank scores
+    assert [r["metadata"]["doc_id"] for r in results] == ["b", "a", "c"]
+    assert abs(results[0]["hybrid_score"] - (0.7 / 62 + 0.3 / 61)) < 1e-9
+    assert abs(results[1]["hybrid_score"] - 0.7 / 61) < 1e-9
+    print("✓ reciprocal rank fusion")
+
+
+def test_duplicate_rows_count_once():
+    legs = {"vector": [make_result("a", 0.9, "vector"), make_result("a", 0.3, "vector")]}
+    results = fuse_results(legs, WEIGHTS, fusion=FUSION_WEIGHTED)
+    assert len(results) == 1
+    assert results[0]["hybrid_score"] == 0.7 and results[0]["sources"] == ["vector"]
+    print("✓ a chunk returned twice by one leg counts once")
+
+
+def test_run_legs_drops_slow_leg():
+    async def run():
+        async def slow():
+            await asyncio.sleep(1)
+            return "slow"
+
+        async def fast():
+            return "fast"
+
+        results, timed_out = await run_legs({"vector": fast, "fulltext": slow}, timeout=0.05)
+        assert results == {"vector": "fast"}
+        assert timed_out == ["fulltext"]
+    asyncio.run(run())
+    print("✓ a slow leg is dropped from the response")
+
+
+def test_extra_leg_created_inside_run_legs():
+    async def run():
+        calls = []
+
+        async def search_memories():
+            calls.append("memory")
+            return {"results": [{"memory": "likes pgvector", "score": 0.1}]}
+
+        result = await hybrid_search(FakeVector(), "pgvector", SearchType.HYBRID, extra_legs={"memory": search_memories})
+        assert result["extra"]["memory"]["results"][0]["memory"] == "likes pgvector"
+        assert result["result"][0]["sources"] == ["vector", "fulltext"]
+        assert calls == ["memory"]
+
+        # hybrid_search fails before the legs run: the memory leg is never started
+        class BrokenVector:
+            pass
+
+        try:
+            await hybrid_search(BrokenVector(), "pgvector", SearchType.HYBRID, extra_legs={"memory": search_memories})
+            raise AssertionError("a vector without search methods must fail")
+        except AttributeError:
+            pass
+        assert calls == ["memory"]
+    asyncio.run(run())
+    print("✓ extra legs are only started by run_legs")
+
+
+if __name__ == "__main__":
+    test_weighted_fusion()
+    test_rrf_fusion()
+    test_duplicate_rows_count_once()
+    test_run_legs_drops_slow_leg()
+    test_extra_leg_created_inside_run_legs()
+    print("\nAll hybrid search tests passed! ✓")
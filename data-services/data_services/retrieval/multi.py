@@ -0,0 +1,83 @@
+import os
+import asyncio
+import logging
+from typing import List, Dict, Any, Optional, Callable, Awaitable
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MERGE_GROUPED = "grouped"
+MERGE_GLOBAL = "global"
+
+
+def get_multi_search_timeout() -> float:
+    """Seconds a multi-collection search waits for all collections before answering with the ones that finished"""
+    try:
+        value = float(os.getenv('MULTI_SEARCH_TIMEOUT', '15'))
+        if value <= 0:
+            logger.warning(f"MULTI_SEARCH_TIMEOUT must be greater than 0, using default value 15. Current value: {value}")
+            return 15.0
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"MULTI_SEARCH_TIMEOUT environment variable conversion failed, using default value 15. Error: {e}")
+        return 15.0
+
+
+def get_multi_search_max_collections() -> int:
+    try:
+        value = int(os.getenv('MULTI_SEARCH_MAX_COLLECTIONS', '32'))
+        if value <= 0:
+            logger.warning(f"MULTI_SEARCH_MAX_COLLECTIONS must be greater than 0, using default value 32. Current value: {value}")
+            return 32
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"MULTI_SEARCH_MAX_COLLECTIONS environment variable conversion failed, using default value 32. Error: {e}")
+        return 32
+
+
+async def fan_out(
+    collection_names: List[str],
+    search: Callable[[str], Awaitable[Dict[str, Any]]],
+    timeout: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Run search for every collection concurrently under one overall timeout.
+
+    A collection that fails or does not finish in time is reported instead of failing the whole request.
+
+    Returns:
+        {"results": {collection: response}, "failed": {collection: error}, "timed_out": [collection, ...]}
+    """
+    timeout = timeout or get_multi_search_timeout()
+    tasks = {name: asyncio.ensure_future(search(name)) for name in collection_names}
+    done, pending = await asyncio.wait(tasks.values(), timeout=timeout)
+    for task in pending:
+        task.cancel()
+
+    results = {}
+    failed = {}
+    timed_out = []
+    for name, task in tasks.items():
+        if task in pending:
+            logger.warning(f"Search of collection {name} timed out after {timeout}s")
+            timed_out.append(name)
+        elif task.exception() is not None:
+            logger.error(f"Search of collection {name} failed: {task.exception()}")
+            failed[name] = str(task.exception())
+        else:
+            results[name] = task.result()
+    return {"results": results, "failed": failed, "timed_out": timed_out}
+
+
+def merge_global(grouped: Dict[str, List[Dict[str, Any]]], score_key: str, limit: Optional[int] = None, reverse: bool = True) -> List[Dict[str, Any]]:
+    """
+    Flatten per-collection results into one ranked list, every entry tagged with its collection.
+    Hybrid scores are normalized per collection, so the global order is approximate across collections.
+    """
+    merged = [
+        dict(result, collection=collection)
+        for collection, results in grouped.items()
+        for result in results
+    ]
+    merged.sort(key=lambda x: x.get(score_key) or 0.0, reverse=reverse)
+    return merged[:limit] if limit else merged
@@ -1,7 +1,8 @@
 import json
 import logging
 import os
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from contextlib import asynccontextmanager
 import click
 import uvicorn
@@ -9,7 +10,7 @@ import sys
 import uuid
 from typing import List, Dict, Optional, Any
 from pydantic import BaseModel
-from vector_sdk import Document
+from vector_sdk import Document, get_default_embedding_cache
 from model_sdk import ModelManager
 import asyncio
 from enum import Enum
@@ -18,13 +19,17 @@ from .memory.memory import AsyncMemoryService
 from uvicorn.config import LOGGING_CONFIG
 from .api.base import DocumentModel, SearchType, CreateRequest, AddTextsRequest, SearchRequest,DeleteRequest
 from .api.base import MemoryMessage, MemoryAddRequest, MemoryUpdateRequest, MemorySearchRequest, MemoryGetAllRequest, MemoryDeleteRequest, MemoryResponse
-from .api.base import KnowledgePyramidAddRequest, KnowledgePyramidSearchRequest, KnowledgePyramidDeleteRequest
-from .api.base import VectorAddDocumentsRequest, VectorDeleteDocumentsRequest, VectorSearchRequest, VectorCreateCollectionRequest, VectorDeleteCollectionRequest, VectorDeleteDocumentsByMetaFieldRequest
+from .api.base import KnowledgePyramidAddRequest, KnowledgePyramidSearchRequest, KnowledgePyramidMultiSearchRequest, KnowledgePyramidDeleteRequest
+from .api.base import VectorAddDocumentsRequest, VectorDeleteDocumentsRequest, VectorSearchRequest, VectorBatchSearchRequest, VectorCreateCollectionRequest, VectorDeleteCollectionRequest, VectorDeleteDocumentsByMetaFieldRequest, VectorReindexRequest
 from .api.base import FingerprintCreateRequest, FingerprintUpdateRequest, FingerprintResponse, FingerprintSearchByDDRequest, FingerprintListResponse
-from .api.base import CreateHistoryRequest, CreateHistoryResponse, SearchHistoryRequest, SearchHistoryResponse, HistoryRecordResponse, HistoryRecord, HistoryMessage
+from .api.base import CreateHistoryRequest, CreateHistoryResponse, SearchHistoryRequest, SearchHistoryResponse, HistoryRecordResponse, HistoryRecord, HistoryMessage, LatestHistoryRequest, LatestHistoryResponse
 from .knowledge_pyramid.knowledge_pyramid import KnowledgePyramidService
 from .vector.vector import VectorService
 from .history.history import AsyncHistoryService
+from .history.buffer import HistoryBuffer
+from .retrieval.cache import SearchCache
+from .api.pagination import encode_cursor, decode_cursor, ndjson_lines, NDJSON_MEDIA_TYPE
+from .embedding.batcher import get_embedding_frontend_stats
 import psycopg2
 from psycopg2 import pool
 from .fingerprint.fingerprint import AsyncFingerprintService, Fingerprint
@@ -61,11 +66,13 @@ async_memory_service = None
 vector_service = None
 fingerprint_service = None
 history_service = None
+history_buffer = None
+search_cache = None
 
 async def initialize_services():
 
     # initial all services
-    global knowledge_pyramid_service, async_memory_service, vector_service, fingerprint_service, history_service
+    global knowledge_pyramid_service, async_memory_service, vector_service, fingerprint_service, history_service, history_buffer, search_cache
 
     # init knowledge pyramid service
     try:
@@ -280,11 +287,22 @@ You should detect the language of the user input and record the facts in the sam
         logger.error(f"Failed to initialize Fingerprint service: {str(e)}")
         raise
 
+    # init search cache
+    search_cache = SearchCache.from_env()
+    # Memories of a background extraction job become searchable chunk by chunk
+    if knowledge_pyramid_service.memory_extraction is not None:
+        knowledge_pyramid_service.memory_extraction.on_chunk_done = invalidate_search_cache
+
     # init history service
     try:
         history_service = AsyncHistoryService(pool_size=50)
         await history_service.initialize()
         logger.info("History service initialized successfully")
+
+        # Recent turns in front of MySQL, HISTORY_BUFFER_ENABLE=enable
+        history_buffer = HistoryBuffer.from_env(history_service)
+        if history_buffer is not None:
+            await history_buffer.start()
     except Exception as e:
         logger.error(f"Failed to initialize History service: {str(e)}")
         raise
@@ -301,6 +319,69 @@ async def get_info():
         "version": "0.1.0"
     }
 
+@app.get("/metrics/embedding_cache")
+async def get_embedding_cache_metrics():
+    cache = get_default_embedding_cache()
+    if cache is None:
+        return {"status": "success", "enabled": False}
+    return {"status": "success", "enabled": True, "stats": cache.get_stats()}
+
+@app.get("/metrics/embedding_batcher")
+async def get_embedding_batcher_metrics():
+    return {"status": "success", "frontends": get_embedding_frontend_stats()}
+
+@app.get("/metrics/vector_instances")
+async def get_vector_instances_metrics():
+    instances = {}
+    if knowledge_pyramid_service is not None:
+        instances["knowledge_pyramid"] = knowledge_pyramid_service.vector_instances.get_stats()
+    if vector_service is not None:
+        instances["vector"] = vector_service.vector_instances.get_stats()
+    return {"status": "success", "instances": instances}
+
+@app.get("/metrics/search_cache")
+async def get_search_cache_metrics():
+    if search_cache is None:
+        return {"status": "success", "enabled": False}
+    return {"status": "success", "enabled": True, "stats": search_cache.get_stats()}
+
+async def cached_search(namespace: str, scopes: List[str], params: Dict[str, Any], search):
+    if search_cache is None:
+        return await search()
+    return await search_cache.get_or_search(namespace, scopes, params, search)
+
+async def invalidate_search_cache(scope: str):
+    # Called after every write, also when the write failed part way
+    if search_cache is not None:
+        await search_cache.invalidate(scope)
+
+@app.get("/metrics/memory_extraction")
+async def get_memory_extraction_metrics():
+    if knowledge_pyramid_service is None or knowledge_pyramid_service.memory_extraction is None:
+        return {"status": "success", "enabled": False}
+    return {"status": "success", "enabled": True, "stats": knowledge_pyramid_service.memory_extraction.get_stats()}
+
+@app.get("/metrics/memory_bulk_delete")
+async def get_memory_bulk_delete_metrics():
+    deleters = {}
+    if async_memory_service is not None and async_memory_service.bulk_deleter is not None:
+        deleters["memory"] = async_memory_service.bulk_deleter.get_stats()
+    if knowledge_pyramid_service is not None and knowledge_pyramid_service.memory_service is not None and knowledge_pyramid_service.memory_service.bulk_deleter is not None:
+        deleters["knowledge_pyramid"] = knowledge_pyramid_service.memory_service.bulk_deleter.get_stats()
+    return {"status": "success", "deleters": deleters}
+
+@app.get("/metrics/history_buffer")
+async def get_history_buffer_metrics():
+    if history_buffer is None:
+        return {"status": "success", "enabled": False}
+    return {"status": "success", "enabled": True, "stats": await history_buffer.get_stats()}
+
+@app.get("/metrics/pgvector_pool")
+async def get_pgvector_pool_metrics():
+    # Imported lazily like the vector factory does, the pools only exist once a collection was used
+    from vector_sdk.pgvector.pgvector import PGPoolManager
+    return {"status": "success", "pools": PGPoolManager.get_stats()}
+
 ###################################### memory routes #########################
 @app.post("/memories")
 async def add_memory(request: MemoryAddRequest):
@@ -343,25 +424,42 @@ async def get_memory(memory_id: str):
 @app.post("/memories/get_all")
 async def get_all_memories(request: MemoryGetAllRequest):
     try:
-        memories = await async_memory_service.get_all_memories(
+        page = await async_memory_service.get_memories_page(
             user_id=request.user_id,
             agent_id=request.agent_id,
             run_id=request.run_id,
             filters=request.filters,
-            limit=request.limit
+            limit=request.limit,
+            cursor=request.cursor
         )
         return {
             "status": "success",
             "data": {
-                "memories": memories,
-                "count": len(memories)
+                "memories": page["memories"],
+                "count": len(page["memories"]),
+                "next_cursor": page["next_cursor"]
             }
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error getting memories: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# memory routes
+@app.post("/memories/get_all/stream")
+async def stream_all_memories(request: MemoryGetAllRequest):
+    # One memory per line, read page by page while the response is written; limit and cursor are ignored
+    memories = async_memory_service.iter_memories(
+        user_id=request.user_id,
+        agent_id=request.agent_id,
+        run_id=request.run_id,
+        filters=request.filters
+    )
+    return StreamingResponse(ndjson_lines(memories), media_type=NDJSON_MEDIA_TYPE)
+
+
 # memory routes
 @app.post("/memories/search")
 async def search_memories(request: MemorySearchRequest):
@@ -425,16 +523,27 @@ async def delete_memory(memory_id: str):
 @app.post("/memories/delete")
 async def delete_memories(request: MemoryDeleteRequest):
     try:
-        result = await async_memory_service.delete_all_memories(
+        result = await async_memory_service.bulk_delete_memories(
+            memory_ids=request.memory_ids,
             user_id=request.user_id,
             agent_id=request.agent_id,
-            run_id=request.run_id
+            run_id=request.run_id,
+            metadata=request.metadata,
+            purge_history=request.purge_history
         )
+        if result["errors"]:
+            return {
+                "status": "partial_success",
+                "message": f"{len(result['deleted'])} memories deleted, {len(result['errors'])} failed",
+                "data": result
+            }
         return {
             "status": "success",
-            "message": "Memories deleted successfully",
+            "message": f"{len(result['deleted'])} memories deleted successfully",
             "data": result
         }
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error deleting memories: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -487,6 +596,19 @@ async def add_documents_with_knowledge_pyramid(
     except Exception as e:
         logger.error(f"Error in add_documents_with_knowledge_pyramid: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(collection_name)
+
+@app.get("/knowledge_pyramid/memory_jobs/{job_id}")
+async def get_memory_job(job_id: str):
+    job = knowledge_pyramid_service.get_memory_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Memory extraction job '{job_id}' not found")
+    return {"status": "success", "job": job}
+
+@app.get("/knowledge_pyramid/memory_jobs")
+async def list_memory_jobs(collection_name: Optional[str] = None):
+    return {"status": "success", "jobs": knowledge_pyramid_service.list_memory_jobs(collection_name)}
 
 @app.post("/knowledge_pyramid/{collection_name}/search")
 async def search_documents_with_knowledge_pyramid(
@@ -494,34 +616,90 @@ async def search_documents_with_knowledge_pyramid(
     request: KnowledgePyramidSearchRequest
 ):
     try:
-        result = await knowledge_pyramid_service.search_documents_with_knowledge_pyramid(
-            query=request.query,
-            collection_name=collection_name,
-            search_type=request.search_type.value,
-            limit=request.limit,
-            hybrid_threshold=request.hybrid_threshold,
-            memory_threshold=request.memory_threshold,
-            vector_weight=request.vector_weight,
-            fulltext_weight=request.fulltext_weight
+        result = await cached_search(
+            "knowledge_pyramid",
+            [collection_name],
+            request.model_dump(mode="json"),
+            lambda: knowledge_pyramid_service.search_documents_with_knowledge_pyramid(
+                query=request.query,
+                collection_name=collection_name,
+                search_type=request.search_type.value,
+                limit=request.limit,
+                hybrid_threshold=request.hybrid_threshold,
+                memory_threshold=request.memory_threshold,
+                vector_weight=request.vector_weight,
+                fulltext_weight=request.fulltext_weight,
+                fusion=request.fusion,
+                ef_search=request.ef_search,
+                probes=request.probes,
+                metadata_filter=request.metadata_filter
+            )
         )
         return result
+    except ValueError as e:
+        # Invalid metadata filter or search parameters
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in search_documents_with_knowledge_pyramid: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/knowledge_pyramid/multi_search")
+async def search_multiple_collections_with_knowledge_pyramid(request: KnowledgePyramidMultiSearchRequest):
+    try:
+        result = await cached_search(
+            "knowledge_pyramid_multi",
+            request.collection_names,
+            request.model_dump(mode="json"),
+            lambda: knowledge_pyramid_service.search_multiple_collections_with_knowledge_pyramid(
+                query=request.query,
+                collection_names=request.collection_names,
+                search_type=request.search_type.value,
+                limit=request.limit,
+                limits=request.limits,
+                merge=request.merge,
+                total_limit=request.total_limit,
+                timeout=request.timeout,
+                hybrid_threshold=request.hybrid_threshold,
+                memory_threshold=request.memory_threshold,
+                vector_weight=request.vector_weight,
+                fulltext_weight=request.fulltext_weight,
+                fusion=request.fusion,
+                ef_search=request.ef_search,
+                probes=request.probes,
+                metadata_filter=request.metadata_filter
+            )
+        )
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in search_multiple_collections_with_knowledge_pyramid: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/knowledge_pyramid/{collection_name}/memories_get_all")
 async def search_memory_documents_with_knowledge_pyramid(
-    collection_name: str
+    collection_name: str,
+    limit: int = Query(100, ge=1, le=10000),
+    cursor: Optional[str] = None
 ):
     try:
         result = await knowledge_pyramid_service.search_memory_documents_with_knowledge_pyramid(
-            collection_name=collection_name
+            collection_name=collection_name,
+            limit=limit,
+            cursor=cursor
         )
         return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in search_memory_documents_with_knowledge_pyramid: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/knowledge_pyramid/{collection_name}/memories_stream")
+async def stream_memory_documents_with_knowledge_pyramid(collection_name: str):
+    memories = knowledge_pyramid_service.memory_service.iter_memories(user_id=collection_name)
+    return StreamingResponse(ndjson_lines(memories), media_type=NDJSON_MEDIA_TYPE)
+
 # knowledge pyramid routes
 @app.delete("/knowledge_pyramid/{collection_name}/delete_by_ids")
 async def delete_documents_and_memorys_by_ids(
@@ -538,6 +716,8 @@ async def delete_documents_and_memorys_by_ids(
     except Exception as e:
         logger.error(f"Error in delete_documents_and_memorys_by_ids: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(collection_name)
 
 # knowledge pyramid routes
 @app.delete("/knowledge_pyramid/{collection_name}/delete_all")
@@ -552,6 +732,8 @@ async def delete_all_documents_and_memorys_by_collection_name(
     except Exception as e:
         logger.error(f"Error in delete_all_documents_and_memorys_by_collection_name: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(collection_name)
 
 # knowledge pyramid routes
 @app.post("/knowledge_pyramid/create_collection")
@@ -564,11 +746,17 @@ async def create_collection(request: CreateRequest):
             ) for doc in request.documents
         ]
         
-        result = await knowledge_pyramid_service.create_collection_with_knowledge_pyramid(collection_name=request.collection_name, documents=documents)
+        result = await knowledge_pyramid_service.create_collection_with_knowledge_pyramid(
+            collection_name=request.collection_name,
+            documents=documents,
+            index_config=request.index.model_dump() if request.index else None
+        )
         return result
     except Exception as e:
         logger.error(f"Error in create_collection: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(request.collection_name)
 
 # knowledge pyramid routes
 @app.delete("/knowledge_pyramid/delete_collection")
@@ -580,6 +768,8 @@ async def delete_collection(request: DeleteRequest):
     except Exception as e:
         logger.error(f"Error in delete_collection: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(request.collection_name)
 
 ############################### vector routes ################################
 @app.post("/vector/{collection_name}/add_documents")
@@ -590,12 +780,15 @@ async def add_documents_with_vector(
     try:
         result = await vector_service.add_documents_with_vector(
             collection_name=collection_name,
-            documents=request.documents
+            documents=request.documents,
+            bulk=request.bulk
         )
         return result
     except Exception as e:
         logger.error(f"Error in add_documents_with_vector: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(collection_name)
 
 # vector routes
 @app.post("/vector/{collection_name}/search")
@@ -604,20 +797,64 @@ async def search_documents_with_vector(
     request: VectorSearchRequest
 ):
     try:
-        result = await vector_service.search_documents_with_vector(
-            query=request.query,
-            collection_name=collection_name,
-            search_type=request.search_type.value,
-            limit=request.limit,
-            hybrid_threshold=request.hybrid_threshold,
-            vector_weight=request.vector_weight,
-            fulltext_weight=request.fulltext_weight
+        result = await cached_search(
+            "vector",
+            [collection_name],
+            request.model_dump(mode="json"),
+            lambda: vector_service.search_documents_with_vector(
+                query=request.query,
+                collection_name=collection_name,
+                search_type=request.search_type.value,
+                limit=request.limit,
+                hybrid_threshold=request.hybrid_threshold,
+                vector_weight=request.vector_weight,
+                fulltext_weight=request.fulltext_weight,
+                fusion=request.fusion,
+                ef_search=request.ef_search,
+                probes=request.probes,
+                metadata_filter=request.metadata_filter
+            )
         )
         return result
+    except ValueError as e:
+        # Invalid metadata filter or search parameters
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in search_documents_with_knowledge_pyramid: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# vector routes
+@app.post("/vector/{collection_name}/batch_search")
+async def batch_search_documents_with_vector(
+    collection_name: str,
+    request: VectorBatchSearchRequest
+):
+    try:
+        result = await cached_search(
+            "vector_batch",
+            [collection_name],
+            request.model_dump(mode="json"),
+            lambda: vector_service.batch_search_documents_with_vector(
+                queries=request.queries,
+                collection_name=collection_name,
+                search_type=request.search_type.value,
+                limit=request.limit,
+                hybrid_threshold=request.hybrid_threshold,
+                vector_weight=request.vector_weight,
+                fulltext_weight=request.fulltext_weight,
+                fusion=request.fusion,
+                ef_search=request.ef_search,
+                probes=request.probes,
+                metadata_filter=request.metadata_filter
+            )
+        )
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in batch_search_documents_with_vector: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # vector routes
 @app.delete("/vector/{collection_name}/delete_by_ids")
 async def delete_documents_by_ids(
@@ -633,6 +870,8 @@ async def delete_documents_by_ids(
     except Exception as e:
         logger.error(f"Error in delete_documents_by_ids: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(collection_name)
 
 # vector routes
 @app.delete("/vector/{collection_name}/delete_by_metadata_field")
@@ -650,6 +889,8 @@ async def delete_by_metadata_field(
     except Exception as e:
         logger.error(f"Error in delete_by_metadata_field: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(collection_name)
 
 # vector routes
 @app.delete("/vector/{collection_name}/delete_all")
@@ -664,6 +905,8 @@ async def delete_all_documents_by_collection_name(
     except Exception as e:
         logger.error(f"Error in delete_all_documents_by_collection_name: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(collection_name)
 
 # vector routes
 @app.post("/vector/create_collection")
@@ -676,11 +919,45 @@ async def create_collection(request: VectorCreateCollectionRequest):
             ) for doc in request.documents
         ]
         
-        result = await vector_service.create_collection_with_vector(collection_name=request.collection_name, documents=documents)
+        result = await vector_service.create_collection_with_vector(
+            collection_name=request.collection_name,
+            documents=documents,
+            index_config=request.index.model_dump() if request.index else None
+        )
         return result
     except Exception as e:
         logger.error(f"Error in create_collection: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(request.collection_name)
+
+# vector routes
+@app.get("/vector/{collection_name}/index")
+async def get_index_config(collection_name: str):
+    try:
+        return await vector_service.get_index_config_with_vector(collection_name)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in get_index_config: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+# vector routes
+@app.post("/vector/{collection_name}/reindex")
+async def reindex(collection_name: str, request: VectorReindexRequest):
+    try:
+        return await vector_service.reindex_with_vector(
+            collection_name=collection_name,
+            index_config=request.index.model_dump()
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error in reindex: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # Cached results were computed with the previous search settings
+        await invalidate_search_cache(collection_name)
 
 # vector routes
 @app.delete("/vector/delete_collection")
@@ -692,6 +969,8 @@ async def delete_collection(request: VectorDeleteCollectionRequest):
     except Exception as e:
         logger.error(f"Error in delete_collection: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await invalidate_search_cache(request.collection_name)
 
 
 ################################### fingerprint routes ############################
@@ -751,6 +1030,36 @@ async def batch_create_fingerprints(fingerprints: List[FingerprintCreateRequest]
         logger.error(f"Error batch creating fingerprints: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/fingerprints", response_model=FingerprintListResponse)
+async def list_fingerprints(limit: int = Query(100, ge=1, le=1000), cursor: Optional[str] = None):
+    try:
+        after = None
+        if cursor is not None:
+            after = decode_cursor(cursor)
+            if len(after) != 2:
+                raise ValueError("Invalid cursor")
+
+        fingerprints, next_key = await fingerprint_service.get_page(limit=limit, after=after)
+        return FingerprintListResponse(
+            status="success",
+            data=fingerprints,
+            count=len(fingerprints),
+            next_cursor=encode_cursor(list(next_key)) if next_key is not None else None
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error listing fingerprints: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/fingerprints/stream")
+async def stream_fingerprints():
+    async def rows():
+        async for fingerprint in fingerprint_service.iter_all():
+            yield fingerprint.model_dump()
+
+    return StreamingResponse(ndjson_lines(rows()), media_type=NDJSON_MEDIA_TYPE)
+
 @app.get("/fingerprints/{fid}", response_model=FingerprintResponse)
 async def get_fingerprint_by_fid(fid: str):
     try:
@@ -950,7 +1259,10 @@ async def create_history_record(request: CreateHistoryRequest):
             conversation=messages_json_str
         )
 
-        success = await history_service.create(history_record)
+        if history_buffer is not None:
+            success = await history_buffer.create(history_record)
+        else:
+            success = await history_service.create(history_record)
         
         if success:
             return CreateHistoryResponse(
@@ -965,7 +1277,7 @@ async def create_history_record(request: CreateHistoryRequest):
 @app.post("/history/search", response_model=SearchHistoryResponse)
 async def search_history_records(search_request: SearchHistoryRequest):
     try:
-        history_records = await history_service.get_by_user_agent_run(
+        history_records = await (history_buffer or history_service).get_by_user_agent_run(
             user_id=search_request.user_id,
             agent_id=search_request.agent_id,
             run_id=search_request.run_id,
@@ -997,6 +1309,51 @@ async def search_history_records(search_request: SearchHistoryRequest):
         logger.error(f"search history error: {e}")
         raise HTTPException(status_code=500, detail=f"search history error: {str(e)}")
 
+@app.post("/history/latest", response_model=LatestHistoryResponse)
+async def get_latest_history_records(request: LatestHistoryRequest):
+    try:
+        before = None
+        if request.cursor is not None:
+            before = decode_cursor(request.cursor)
+            if len(before) != 2:
+                raise ValueError("Invalid cursor")
+
+        history_records, next_key = await (history_buffer or history_service).get_latest(
+            user_id=request.user_id,
+            agent_id=request.agent_id,
+            run_id=request.run_id,
+            limit=request.limit,
+            before=before
+        )
+
+        response_data = []
+        for record in history_records:
+            messages_data = json.loads(record.conversation)
+            messages = [HistoryMessage(**msg) for msg in messages_data]
+            response_data.append(HistoryRecordResponse(
+                hid=record.hid,
+                user_id=record.user_id,
+                agent_id=record.agent_id,
+                run_id=record.run_id,
+                messages=messages,
+                created_at=record.created_at,
+                updated_at=record.updated_at
+            ))
+
+        return LatestHistoryResponse(
+            status="success",
+            data=response_data,
+            total=len(response_data),
+            message=f"found {len(response_data)} items",
+            next_cursor=encode_cursor(list(next_key)) if next_key is not None else None
+        )
+
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"latest history error: {e}")
+        raise HTTPException(status_code=500, detail=f"latest history error: {str(e)}")
+
 
 @click.command()
 @click.option('--host', default='0.0.0.0', help='Host to bind')
@@ -1018,7 +1375,12 @@ def main(host, port):
         logger.info(f"Starting server on {host}:{port}")
         config = uvicorn.Config(app, host=host, port=port, log_config=log_config)
         server = uvicorn.Server(config)
-        await server.serve()
+        try:
+            await server.serve()
+        finally:
+            # Write-behind history turns still queued
+            if history_buffer is not None:
+                await history_buffer.close()
 
     try:
         asyncio.run(run_server())
@@ -0,0 +1,129 @@
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Callable
+from vector_sdk import Vector
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        value = int(os.getenv(name, str(default)))
+        if value < 0:
+            logger.warning(f"{name} must not be negative, using default value {default}. Current value: {value}")
+            return default
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"{name} environment variable conversion failed, using default value {default}. Error: {e}")
+        return default
+
+
+class VectorInstanceCache:
+    """
+    Per-collection Vector instances, bounded by max_size (least recently used first) and by ttl seconds
+    of idleness (0 keeps idle instances until they are the least recently used).
+
+    Evicted instances are closed. A request still holding one keeps a working object, the connection
+    pools are shared through PGPoolManager and not owned by the instance.
+    """
+
+    def __init__(self, factory: Callable[[str], Vector], max_size: int = 1000, ttl: int = 3600):
+        self.factory = factory
+        self.max_size = max(max_size, 1)
+        self.ttl = ttl
+        self._instances: "OrderedDict[str, tuple]" = OrderedDict()
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "removals": 0
+        }
+
+    @classmethod
+    def from_env(cls, factory: Callable[[str], Vector]) -> "VectorInstanceCache":
+        return cls(
+            factory,
+            max_size=_get_int_env('VECTOR_INSTANCE_CACHE_SIZE', 1000),
+            ttl=_get_int_env('VECTOR_INSTANCE_CACHE_TTL', 3600)
+        )
+
+    def get(self, collection_name: str) -> Vector:
+        now = time.monotonic()
+        self._expire(now)
+
+        entry = self._instances.get(collection_name)
+        if entry is not None:
+            self.stats["hits"] += 1
+            self._instances[collection_name] = (now, entry[1])
+            self._instances.move_to_end(collection_name)
+            return entry[1]
+
+        self.stats["misses"] += 1
+        instance = self.factory(collection_name)
+        self._instances[collection_name] = (now, instance)
+        while len(self._instances) > self.max_size:
+            name, (_, evicted) = self._instances.popitem(last=False)
+            self.stats["evictions"] += 1
+            logger.info(f"Evicted Vector instance for collection: {name}")
+            self._schedule_close(evicted)
+        return instance
+
+    def __contains__(self, collection_name: str) -> bool:
+        return collection_name in self._instances
+
+    def __len__(self) -> int:
+        return len(self._instances)
+
+    async def remove(self, collection_name: str) -> None:
+        """Drop and close the instance of a deleted collection"""
+        entry = self._instances.pop(collection_name, None)
+        if entry is not None:
+            self.stats["removals"] += 1
+            await self._close(entry[1])
+
+    async def close_all(self) -> None:
+        while self._instances:
+            _, (_, instance) = self._instances.popitem(last=False)
+            await self._close(instance)
+
+    def _expire(self, now: float) -> None:
+        if self.ttl <= 0:
+            return
+        # Least recently used first, so expired entries are at the front
+        while self._instances:
+            name, (last_used, instance) = next(iter(self._instances.items()))
+            if now - last_used < self.ttl:
+                break
+            del self._instances[name]
+            self.stats["expirations"] += 1
+            logger.info(f"Expired idle Vector instance for collection: {name}")
+            self._schedule_close(instance)
+
+    def _schedule_close(self, instance: Vector) -> None:
+        try:
+            asyncio.get_running_loop().create_task(self._close(instance))
+        except RuntimeError:
+            # No running loop, nothing to await the close on
+            pass
+
+    async def _close(self, instance: Vector) -> None:
+        try:
+            if hasattr(instance, 'close'):
+                await instance.close()
+        except Exception as e:
+            logger.warning(f"Closing Vector instance failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "size": len(self._instances),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,123 @@
+import os
+import sys
+import asyncio
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+from data_services.vector import instance_cache
+from data_services.vector.instance_cache import VectorInstanceCache
+
+
+class FakeVector:
+    def __init__(self, collection_name):
+        self.collection_name = collection_name
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeClock:
+    """Stands in for the time module of instance_cache"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def with_clock(test):
+    def run():
+        clock = FakeClock()
+        original = instance_cache.time
+        instance_cache.time = clock
+        try:
+            test(clock)
+        finally:
+            instance_cache.time = original
+    run.__name__ = test.__name__
+    return run
+
+
+def test_hit_returns_same_instance():
+    cache = VectorInstanceCache(FakeVector, max_size=10, ttl=0)
+    first = cache.get("c1")
+    assert cache.get("c1") is first
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+    assert cache.get_stats()["hit_rate"] == 0.5
+    print("✓ a collection reuses its instance")
+
+
+def test_lru_eviction_closes_instance():
+    async def run():
+        cache = VectorInstanceCache(FakeVector, max_size=2, ttl=0)
+        c1 = cache.get("c1")
+        c2 = cache.get("c2")
+        # c1 was used last, c2 is the least recently used
+        cache.get("c1")
+        cache.get("c3")
+        await asyncio.sleep(0)
+        assert "c2" not in cache and "c1" in cache and "c3" in cache
+        assert cache.stats["evictions"] == 1
+        assert c2.closed and not c1.closed
+        assert len(cache) == 2
+    asyncio.run(run())
+    print("✓ the least recently used instance is evicted")
+
+
+@with_clock
+def test_idle_instances_expire(clock):
+    async def run():
+        cache = VectorInstanceCache(FakeVector, max_size=10, ttl=60)
+        c1 = cache.get("c1")
+        clock.now += 30
+        c2 = cache.get("c2")
+        clock.now += 40
+        # c1 idle for 70s, c2 for 40s
+        assert cache.get("c2") is c2
+        await asyncio.sleep(0)
+        assert "c1" not in cache and c1.closed
+        assert cache.stats["expirations"] == 1
+
+        clock.now += 59
+        assert cache.get("c2") is c2
+        assert cache.get("c1") is not c1
+    asyncio.run(run())
+    print("✓ instances idle longer than ttl expire")
+
+
+def test_remove_and_close_all():
+    async def run():
+        cache = VectorInstanceCache(FakeVector, max_size=10, ttl=0)
+        c1 = cache.get("c1")
+        c2 = cache.get("c2")
+        await cache.remove("c1")
+        await cache.remove("missing")
+        assert c1.closed and "c1" not in cache
+        assert cache.stats["removals"] == 1
+
+        await cache.close_all()
+        assert c2.closed and len(cache) == 0
+    asyncio.run(run())
+    print("✓ remove and close_all close their instances")
+
+
+def test_eviction_without_loop():
+    # Sync callers have no loop to close on, the instance is dropped without failing the lookup
+    cache = VectorInstanceCache(FakeVector, max_size=1, ttl=0)
+    cache.get("c1")
+    cache.get("c2")
+    assert "c1" not in cache and cache.stats["evictions"] == 1
+    print("✓ eviction outside an event loop")
+
+
+if __name__ == "__main__":
+    test_hit_returns_same_instance()
+    test_lru_eviction_closes_instance()
+    test_idle_instances_expire()
+    test_remove_and_close_all()
+    test_eviction_without_loop()
+    print("\nAll Vector instance cache tests passed! ✓")
@@ -3,7 +3,10 @@ import logging
 from typing import List, Dict, Any, Optional
 from model_sdk import ModelManager
 from vector_sdk import Vector, Document, CacheEmbedding
+from ..embedding.batcher import get_embedding_frontend
+from .instance_cache import VectorInstanceCache
 from ..api.base import DocumentModel, SearchType
+from ..retrieval.hybrid import hybrid_search, batch_search, fuse_results, get_batch_search_max_queries, FUSION_WEIGHTED
 from datetime import datetime
 import asyncio
 
@@ -15,7 +18,9 @@ class VectorService:
         self.config = None
         self.model_manager = None
         self.embedding_model = None
-        self.vector_instances = {}
+        self.embedding_frontend = None
+        # Bounded by VECTOR_INSTANCE_CACHE_SIZE / VECTOR_INSTANCE_CACHE_TTL
+        self.vector_instances = VectorInstanceCache.from_env(self._create_vector_instance)
 
     async def initialize(self, config: Optional[Dict[str, Any]] = None):
         self.config = config
@@ -55,21 +60,25 @@ class VectorService:
             logger.error(f"Failed to initialize services: {str(e)}")
             raise
 
+        # Query embeddings of the search paths go through the shared micro-batching front end
+        self.embedding_frontend = get_embedding_frontend(provider, model, self.embedding_model)
+
         logger.info("Vector Service initialized successfully")
 
     def get_vector_instance(self, collection_name: str) -> Vector:
-        if collection_name not in self.vector_instances:
-            embedding = CacheEmbedding(self.embedding_model) if self.embedding_model else None
-            self.vector_instances[collection_name] = Vector(
-                collection_name=collection_name,
-                embedding=embedding
-            )
-            logger.info(f"Created new Vector instance for collection: {collection_name}")
-        
-        return self.vector_instances[collection_name]
+        return self.vector_instances.get(collection_name)
+
+    def _create_vector_instance(self, collection_name: str) -> Vector:
+        embedding = CacheEmbedding(self.embedding_frontend) if self.embedding_frontend else None
+        vector = Vector(
+            collection_name=collection_name,
+            embedding=embedding
+        )
+        logger.info(f"Created new Vector instance for collection: {collection_name}")
+        return vector
 
     # create collection
-    async def create_collection_with_vector(self, collection_name: str, documents: List[Document]) -> Dict[str, Any]:
+    async def create_collection_with_vector(self, collection_name: str, documents: List[Document], index_config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         vector = self.get_vector_instance(collection_name)
 
         try:
@@ -77,7 +86,7 @@ class VectorService:
             if exist:
                 logger.info(f"Collection {collection_name} exist already")
             else:
-                await vector.acreate(texts=documents)
+                await vector.acreate(texts=documents, index_config=index_config)
                 logger.info(f"Collection {collection_name} created successfully")
 
         except Exception as e:
@@ -100,10 +109,7 @@ class VectorService:
             else:
                 logger.info(f"Collection {collection_name} not exist, there is no need to execute delete operation")
             
-            if collection_name in self.vector_instances:
-                if hasattr(self.vector_instances[collection_name], 'close'):
-                    await self.vector_instances[collection_name].close()
-                del self.vector_instances[collection_name]
+            await self.vector_instances.remove(collection_name)
         
         except Exception as e:
             logger.error(f"Error in delete_collection: {str(e)}")
@@ -114,8 +120,39 @@ class VectorService:
             "message": f"Collection '{collection_name}' deleted successfully"
         }
 
+    # vector index settings
+    async def get_index_config_with_vector(self, collection_name: str) -> Dict[str, Any]:
+        vector = self.get_vector_instance(collection_name)
+        if not await vector.acollection_exists():
+            raise HTTPException(status_code=404, detail=f"Collection '{collection_name}' not found")
+
+        return {
+            "status": "success",
+            "collection": collection_name,
+            "index": await vector.aget_index_config()
+        }
+
+    # rebuild the vector index online with new parameters
+    async def reindex_with_vector(self, collection_name: str, index_config: Dict[str, Any]) -> Dict[str, Any]:
+        vector = self.get_vector_instance(collection_name)
+        if not await vector.acollection_exists():
+            raise HTTPException(status_code=404, detail=f"Collection '{collection_name}' not found")
+
+        try:
+            result = await vector.areindex(index_config)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        logger.info(f"Collection {collection_name} reindexed: {result}")
+
+        return {
+            "status": "success",
+            "collection": collection_name,
+            "rebuilt": result["rebuilt"],
+            "index": result["index"]
+        }
+
     # add documents
-    async def add_documents_with_vector(self, collection_name: str, documents: List[DocumentModel]) -> Dict[str, Any]:
+    async def add_documents_with_vector(self, collection_name: str, documents: List[DocumentModel], bulk: bool = False) -> Dict[str, Any]:
         vector = self.get_vector_instance(collection_name)
         documents = [
             Document(
@@ -124,9 +161,15 @@ class VectorService:
             ) for doc in documents
         ]
         
-        document_ids = await vector.aadd_texts(
-            documents=documents
-        )
+        if bulk:
+            # COPY based load, see PGVector.abulk_add_texts
+            document_ids = await vector.abulk_add_texts(
+                documents=documents
+            )
+        else:
+            document_ids = await vector.aadd_texts(
+                documents=documents
+            )
         
         return {
             "status": "success",
@@ -136,128 +179,76 @@ class VectorService:
         }
 
     def hybrid_merge_with_weights(self, vector_results, fulltext_results, vector_weight=0.7, fulltext_weight=0.3, hybrid_threshold: Optional[float] = None):
-
-        all_results = []
-        
-        for result in vector_results:
-            new_result = result.copy()
-            new_result['hybrid_score'] = result['score'] * vector_weight
-            new_result['search_type'] = 'vector'
-            if hybrid_threshold is None or new_result['hybrid_score'] >= hybrid_threshold:
-                all_results.append(new_result)
-        
-        for result in fulltext_results:
-            new_result = result.copy()
-            new_result['hybrid_score'] = result['score'] * fulltext_weight
-            new_result['search_type'] = 'fulltext'
-
-            logger.info(f"new_result['hybrid_score'] = {new_result['hybrid_score']}, hybrid_threshold={hybrid_threshold}")
-
-            if hybrid_threshold is None or new_result['hybrid_score'] >= hybrid_threshold:
-                all_results.append(new_result)
-
-        return sorted(all_results, key=lambda x: x['hybrid_score'], reverse=True)
+        # Normalized score fusion with one entry per chunk, see fuse_results
+        return fuse_results(
+            {'vector': vector_results, 'fulltext': fulltext_results},
+            weights={'vector': vector_weight, 'fulltext': fulltext_weight},
+            fusion=FUSION_WEIGHTED,
+            hybrid_threshold=hybrid_threshold
+        )
 
     # search documents
-    async def search_documents_with_vector(self, query: str, collection_name: str, search_type: str, limit: int = 10, hybrid_threshold: Optional[float] = 0.01, vector_weight: Optional[float] = 0.7, fulltext_weight:Optional[float] = 0.3) -> Dict[str, Any]:
+    async def search_documents_with_vector(self, query: str, collection_name: str, search_type: str, limit: int = 10, hybrid_threshold: Optional[float] = 0.01, vector_weight: Optional[float] = 0.7, fulltext_weight:Optional[float] = 0.3, fusion: Optional[str] = None, ef_search: Optional[int] = None, probes: Optional[int] = None, metadata_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         vector = self.get_vector_instance(collection_name)
-        vector_sorted_results = []
         try:
-            if search_type == SearchType.VECTOR:
-                results = await vector.asearch_by_vector(
-                    query=query,
-                    top_k=limit,
-                    score_threshold=hybrid_threshold
-                )
-
-                vector_results = [
-                    {
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "score": float(doc.metadata.get('score', 0)),
-                        "search_type": search_type,
-                        "hybrid_score": 0.0
-                    } for doc in results
-                ]
-
-                vector_sorted_results = sorted(
-                    vector_results, 
-                    key=lambda x: x['score'], 
-                    reverse=True
-                )
-
-            elif search_type == SearchType.FULLTEXT:
-                results = await vector.asearch_by_full_text(
-                    query=query,
-                    top_k=limit
-                )
+            search_result = await hybrid_search(
+                vector,
+                query=query,
+                search_type=search_type,
+                limit=limit,
+                hybrid_threshold=hybrid_threshold,
+                vector_weight=vector_weight,
+                fulltext_weight=fulltext_weight,
+                fusion=fusion,
+                ef_search=ef_search,
+                probes=probes,
+                metadata_filter=metadata_filter
+            )
+        except Exception as e:
+            logger.error(f"Error searching vector: {str(e)}")
+            raise
 
-                vector_results = [
-                    {
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "score": float(doc.metadata.get('score', 0)),
-                        "search_type": search_type,
-                        "hybrid_score": 0.0
-                    } for doc in results
-                ]
-
-                if hybrid_threshold is not None:
-                    filtered_results = [
-                        result for result in vector_results 
-                        if result['score'] >= hybrid_threshold
-                    ]
-                else:
-                    filtered_results = vector_results
-                
-                vector_sorted_results = sorted(
-                    filtered_results, 
-                    key=lambda x: x['score'], 
-                    reverse=True
-                )
-            elif search_type == SearchType.HYBRID:
-                results_vector = await vector.asearch_by_vector(
-                    query=query,
-                    top_k=limit
-                )
-                results_fulltext = await vector.asearch_by_full_text(
-                    query=query,
-                    top_k=limit
-                )
+        return {
+            "status": "success",
+            "collection": collection_name,
+            "search_type": search_type,
+            "result": search_result["result"],
+            "timed_out": search_result["timed_out"]
+        }
 
-                vector_results_dict = [
-                    {
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "score": float(doc.metadata.get('score', 0)),
-                        "search_type": "vector"
-                    } for doc in results_vector
-                ]
-                
-                fulltext_results_dict = [
-                    {
-                        "content": doc.page_content,
-                        "metadata": doc.metadata,
-                        "score": float(doc.metadata.get('score', 0)),
-                        "search_type": "fulltext"
-                    } for doc in results_fulltext
-                ]
-                
-                hybrid_results = self.hybrid_merge_with_weights(vector_results_dict, fulltext_results_dict, hybrid_threshold=hybrid_threshold, vector_weight=vector_weight, fulltext_weight=fulltext_weight)
-                vector_sorted_results = hybrid_results
-                
-            else:
-                results = []
+    # search several queries in one request
+    async def batch_search_documents_with_vector(self, queries: List[str], collection_name: str, search_type: str, limit: int = 10, hybrid_threshold: Optional[float] = 0.01, vector_weight: Optional[float] = 0.7, fulltext_weight:Optional[float] = 0.3, fusion: Optional[str] = None, ef_search: Optional[int] = None, probes: Optional[int] = None, metadata_filter: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        if not queries:
+            raise ValueError("queries cannot be empty")
+        max_queries = get_batch_search_max_queries()
+        if len(queries) > max_queries:
+            raise ValueError(f"At most {max_queries} queries can be searched at once")
 
+        vector = self.get_vector_instance(collection_name)
+        try:
+            search_result = await batch_search(
+                vector,
+                queries=queries,
+                search_type=search_type,
+                limit=limit,
+                hybrid_threshold=hybrid_threshold,
+                vector_weight=vector_weight,
+                fulltext_weight=fulltext_weight,
+                fusion=fusion,
+                ef_search=ef_search,
+                probes=probes,
+                metadata_filter=metadata_filter
+            )
         except Exception as e:
-            logger.error(f"Error searching vector: {str(e)}")
+            logger.error(f"Error batch searching vector: {str(e)}")
             raise
 
         return {
             "status": "success",
             "collection": collection_name,
             "search_type": search_type,
-            "result": vector_sorted_results
+            "results": search_result["results"],
+            "timed_out": search_result["timed_out"]
         }
 
     # delete all documents
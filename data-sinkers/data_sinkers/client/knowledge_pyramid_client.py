@@ -170,6 +170,30 @@ class KnowledgePyramidClient:
         
         return self._make_request("POST", endpoint, payload)
 
+    def delete_by_ids(
+        self,
+        collection_name: str,
+        documents: List[str],
+        memorys: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Delete vectors and memories by id
+        Args:
+            collection_name: Collection name
+            documents: Vector document ids
+            memorys: Memory ids
+        Returns:
+            API response result
+        """
+        payload = {
+            "documents": documents,
+            "memorys": memorys or []
+        }
+
+        endpoint = f"/knowledge_pyramid/{collection_name}/delete_by_ids"
+
+        return self._make_request("DELETE", endpoint, payload)
+
     def memories_get_all(
         self,
         collection_name: str
@@ -0,0 +1,265 @@
+import os
+import json
+import math
+from typing import Dict, Any, Optional, List
+from pydantic import BaseModel, Field
+from ..prompts.mysql import format_schema_to_markdown as mysql_format_schema_to_markdown
+from ..prompts.postgres import format_schema_to_markdown as postgres_format_schema_to_markdown
+from ..extractors.mysql import get_safe_batch_size
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("ingestion_estimator")
+
+# Splitter settings used by the MinIO and fileserver readers
+FILE_CHUNK_SIZE = 1000
+FILE_CHUNK_OVERLAP = FILE_CHUNK_SIZE // 5
+
+# Rough ratio of extracted text characters to file bytes, by extension.
+# Plain text formats are close to 1, binary container formats carry markup, images and compression.
+TEXT_BYTES_RATIO = {
+    "txt": 1.0,
+    "md": 1.0,
+    "csv": 1.0,
+    "docx": 0.3,
+    "doc": 0.3,
+    "xlsx": 0.2,
+    "pdf": 0.1,
+}
+
+# Maximum length of the combined fingerprint content, see FingerprintAnalyzer.process_sql_schemas_in_batches
+FINGERPRINT_MAX_LENGTH = 50000
+
+# mem0 add() runs one fact extraction call and one memory update call per add_documents request
+MEMORY_LLM_CALLS_PER_ADD = 2
+
+
+def _get_float_env(name: str, default: float) -> float:
+    try:
+        value = float(os.getenv(name, str(default)))
+        if value <= 0:
+            logger.warning(f"{name} must be greater than 0, using default value {default}. Current value: {value}")
+            return default
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"{name} environment variable conversion failed, using default value {default}. Error: {e}")
+        return default
+
+
+class IngestionEstimate(BaseModel):
+    source_type: str
+    sql_process_mode: Optional[str] = None
+    objects: int = 0
+    total_bytes: int = 0
+    documents: int = 0
+    llm_calls: Dict[str, int] = Field(default_factory=dict)
+    llm_input_tokens: int = 0
+    embedding_tokens: int = 0
+    estimated_duration_seconds: float = 0.0
+    details: List[Dict[str, Any]] = Field(default_factory=list)
+
+
+class IngestionEstimator:
+    """
+    Estimate the cost of process_data without calling any model.
+
+    Only metadata is read from the data source: table schemas and catalog statistics for SQL sources,
+    object sizes for MinIO and fileserver. The numbers mirror what the extractors would do for the
+    same descriptor so they can be used for admission and scheduling decisions.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 10,
+        chars_per_token: Optional[float] = None,
+        llm_call_seconds: Optional[float] = None,
+        embedding_tokens_per_second: Optional[float] = None
+    ):
+        """
+        Args:
+            max_concurrent: Concurrent LLM calls used by the fingerprint analyzer for batched phases
+            chars_per_token: Average characters per token, default from ESTIMATE_CHARS_PER_TOKEN
+            llm_call_seconds: Average latency of one LLM call, default from ESTIMATE_LLM_CALL_SECONDS
+            embedding_tokens_per_second: Embedding throughput, default from ESTIMATE_EMBEDDING_TOKENS_PER_SECOND
+        """
+        self.max_concurrent = max(1, max_concurrent)
+        self.chars_per_token = chars_per_token or _get_float_env('ESTIMATE_CHARS_PER_TOKEN', 3.0)
+        self.llm_call_seconds = llm_call_seconds or _get_float_env('ESTIMATE_LLM_CALL_SECONDS', 15.0)
+        self.embedding_tokens_per_second = embedding_tokens_per_second or _get_float_env('ESTIMATE_EMBEDDING_TOKENS_PER_SECOND', 5000.0)
+
+    def _tokens(self, chars: int) -> int:
+        return int(math.ceil(chars / self.chars_per_token)) if chars > 0 else 0
+
+    def _waves(self, calls: int) -> int:
+        return int(math.ceil(calls / self.max_concurrent)) if calls > 0 else 0
+
+    def estimate_sql(
+        self,
+        reader: Any,
+        datasource_type: str,
+        extract: Dict[str, Any],
+        enable_allinone: str,
+        sql_process_mode: str
+    ) -> IngestionEstimate:
+        """Estimate a MySQL or PostgreSQL ingest from schema metadata and catalog statistics"""
+        tables = extract.get('tables', [])
+
+        schema_results = reader.schema(tables) if tables else reader.schema()
+        table_stats = reader.table_stats(tables) if tables else reader.table_stats()
+        schema_relationship = reader.schema_relationship(tables) if tables else reader.schema_relationship()
+
+        format_schema_to_markdown = mysql_format_schema_to_markdown if datasource_type == "mysql" else postgres_format_schema_to_markdown
+
+        batch_size = get_safe_batch_size()
+        batch_markdown_chars = []
+        for i in range(0, len(schema_results), batch_size):
+            batch_markdown = format_schema_to_markdown(schema_results[i:i + batch_size])
+            if batch_markdown:
+                batch_markdown_chars.append(len(batch_markdown))
+        batches = len(batch_markdown_chars)
+        schema_chars = sum(batch_markdown_chars)
+        relationship_chars = len(json.dumps(schema_relationship, ensure_ascii=False, indent=2))
+
+        # Fingerprint phase: one call per batch, plus one call over the combined batch summaries
+        fingerprint_calls = batches + (1 if batches > 1 else 0)
+        fingerprint_input_chars = schema_chars + (min(schema_chars, FINGERPRINT_MAX_LENGTH) if batches > 1 else 0)
+
+        tables_summary_calls = 0
+        if enable_allinone == "enable":
+            documents = 1
+        elif sql_process_mode == "batch":
+            documents = batches
+        elif sql_process_mode == "dictionary":
+            documents = 1
+            tables_summary_calls = batches
+        else:
+            documents = 0
+
+        llm_calls = {
+            "table_relationship": 1,
+            "fingerprint": fingerprint_calls,
+            "agent_info": 1 if batches else 0,
+            "tables_summary": tables_summary_calls,
+            "memory_extraction": MEMORY_LLM_CALLS_PER_ADD if documents else 0,
+        }
+        llm_calls["total"] = sum(llm_calls.values())
+
+        # Documents are built from the schema markdown and relationships; dictionary summaries are
+        # condensed by the LLM, so the raw schema length is used as an upper bound.
+        document_chars = (schema_chars + relationship_chars * max(documents, 1)) if documents else 0
+
+        llm_input_chars = (
+            relationship_chars
+            + fingerprint_input_chars
+            + (schema_chars if tables_summary_calls else 0)
+            + (document_chars if documents else 0)
+        )
+
+        embedding_tokens = self._tokens(document_chars)
+
+        llm_waves = (
+            1
+            + self._waves(batches) + (1 if batches > 1 else 0)
+            + (1 if batches else 0)
+            + self._waves(tables_summary_calls)
+            + llm_calls["memory_extraction"]
+        )
+
+        return IngestionEstimate(
+            source_type=datasource_type,
+            sql_process_mode="allinone" if enable_allinone == "enable" else sql_process_mode,
+            objects=len(schema_results),
+            total_bytes=sum(stat['data_bytes'] for stat in table_stats),
+            documents=documents,
+            llm_calls=llm_calls,
+            llm_input_tokens=self._tokens(llm_input_chars),
+            embedding_tokens=embedding_tokens,
+            estimated_duration_seconds=round(llm_waves * self.llm_call_seconds + embedding_tokens / self.embedding_tokens_per_second, 2),
+            details=table_stats
+        )
+
+    def estimate_files(self, source_type: str, file_stats: List[Dict[str, Any]]) -> IngestionEstimate:
+        """Estimate a MinIO or fileserver ingest from object sizes"""
+        details = []
+        total_bytes = 0
+        total_chunks = 0
+        total_chars = 0
+
+        for stat in file_stats:
+            name = stat['object_name']
+            size = stat.get('size', 0)
+            file_type = os.path.splitext(name.split('?')[0])[1].lower().lstrip('.')
+            ratio = TEXT_BYTES_RATIO.get(file_type)
+
+            if ratio is None:
+                # Unsupported extensions fail to load in Processor.process_file and produce no documents
+                chars = 0
+                chunks = 0
+            else:
+                chars = int(size * ratio)
+                stride = FILE_CHUNK_SIZE - FILE_CHUNK_OVERLAP
+                chunks = max(1, int(math.ceil(max(chars - FILE_CHUNK_OVERLAP, 0) / stride))) if chars else 0
+
+            total_bytes += size
+            total_chars += chars
+            total_chunks += chunks
+            details.append({
+                "object_name": name,
+                "size": size,
+                "file_type": file_type,
+                "estimated_chunks": chunks
+            })
+
+        llm_calls = {
+            "memory_extraction": MEMORY_LLM_CALLS_PER_ADD if total_chunks else 0,
+        }
+        llm_calls["total"] = sum(llm_calls.values())
+
+        embedding_tokens = self._tokens(total_chars + total_chunks * FILE_CHUNK_OVERLAP)
+
+        return IngestionEstimate(
+            source_type=source_type,
+            objects=len(file_stats),
+            total_bytes=total_bytes,
+            documents=total_chunks,
+            llm_calls=llm_calls,
+            llm_input_tokens=self._tokens(total_chars) if total_chunks else 0,
+            embedding_tokens=embedding_tokens,
+            estimated_duration_seconds=round(llm_calls["total"] * self.llm_call_seconds + embedding_tokens / self.embedding_tokens_per_second, 2),
+            details=details
+        )
+
+
+def estimate_ingestion(
+        reader: Any,
+        source_type: str,
+        extract: Dict[str, Any],
+        enable_allinone: str,
+        sql_process_mode: str,
+        max_concurrent: int = 10
+    ) -> Dict[str, Any]:
+    """Dry-run entry point for process_data, returns the estimate as a JSON serializable dict"""
+    estimator = IngestionEstimator(max_concurrent=max_concurrent)
+
+    if source_type in ("mysql", "postgres"):
+        estimate = estimator.estimate_sql(reader, source_type, extract, enable_allinone=enable_allinone, sql_process_mode=sql_process_mode)
+    elif source_type == "minio" and extract.get('files') is None and extract.get('prefix') is not None:
+        file_stats = reader.stat(prefix=extract['prefix'], recursive=extract.get('recursive', True))
+        estimate = estimator.estimate_files(source_type, file_stats)
+    elif source_type in ("minio", "fileserver"):
+        files = extract.get('files')
+        if files is None:
+            raise ValueError("files is None - 'files' key not found in extract dictionary")
+        if not isinstance(files, list):
+            raise ValueError(f"files must be a list, got {type(files)}")
+
+        if source_type == "minio":
+            file_stats = reader.stat(objects=files)
+        else:
+            file_stats = [reader.stat(file_path) for file_path in files]
+        estimate = estimator.estimate_files(source_type, file_stats)
+    else:
+        raise ValueError(f"Unsupported data source type: {source_type}")
+
+    logger.info(f"estimate_ingestion, source_type={source_type}, documents={estimate.documents}, llm_calls={estimate.llm_calls}, embedding_tokens={estimate.embedding_tokens}")
+    return estimate.model_dump(mode="json")
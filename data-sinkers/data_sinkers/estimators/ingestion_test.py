@@ -0,0 +1,133 @@
+from data_sinkers.estimators.ingestion import IngestionEstimator, estimate_ingestion
+
+# python -m data_sinkers.estimators.ingestion_test
+
+
+def make_table(index):
+    return {
+        "table_name": f"t{index}",
+        "table_comment": f"table {index}",
+        "columns": [{"COLUMN_NAME": "id", "COLUMN_TYPE": "int", "IS_NULLABLE": "NO", "COLUMN_KEY": "PRI", "COLUMN_COMMENT": ""}]
+    }
+
+
+class FakeSqlReader:
+    """Schema and catalog statistics of a source with the given number of tables"""
+
+    def __init__(self, tables):
+        self.tables = [make_table(i) for i in range(tables)]
+        self.requested = []
+
+    def _select(self, tables):
+        self.requested.append(tables)
+        return [t for t in self.tables if tables is None or t["table_name"] in tables]
+
+    def schema(self, tables=None):
+        return self._select(tables)
+
+    def table_stats(self, tables=None):
+        return [{"table_name": t["table_name"], "rows": 100, "data_bytes": 1000} for t in self._select(tables)]
+
+    def schema_relationship(self, tables=None):
+        return []
+
+
+class FakeFileReader:
+    def __init__(self, sizes):
+        self.sizes = sizes
+        self.calls = []
+
+    def stat(self, object_name=None, objects=None, prefix=None, recursive=True):
+        self.calls.append({"object_name": object_name, "objects": objects, "prefix": prefix})
+        if object_name is not None:
+            return {"object_name": object_name, "size": self.sizes[object_name]}
+        names = objects if objects is not None else [name for name in self.sizes if name.startswith(prefix)]
+        return [{"object_name": name, "size": self.sizes[name]} for name in names]
+
+
+SIZES = {"docs/a.txt": 1000, "docs/b.md": 2600, "docs/c.pdf": 10000, "docs/d.bin": 5000}
+
+
+def sql_estimate(tables, enable_allinone="disable", sql_process_mode="batch"):
+    estimator = IngestionEstimator(max_concurrent=10, chars_per_token=3.0, llm_call_seconds=10.0, embedding_tokens_per_second=5000.0)
+    return estimator.estimate_sql(FakeSqlReader(tables), "mysql", {}, enable_allinone=enable_allinone, sql_process_mode=sql_process_mode)
+
+
+def test_sql_batch_mode():
+    # 12 tables in batches of SQL_BATCHSIZE 5: three batches
+    estimate = sql_estimate(12)
+    assert estimate.objects == 12 and estimate.total_bytes == 12000
+    assert estimate.documents == 3
+    assert estimate.llm_calls == {
+        "table_relationship": 1, "fingerprint": 4, "agent_info": 1, "tables_summary": 0, "memory_extraction": 2, "total": 8
+    }
+    assert estimate.llm_input_tokens > 0 and estimate.embedding_tokens > 0
+    # relationship, fingerprint batches, fingerprint summary, agent info, two memory calls
+    assert estimate.estimated_duration_seconds == round(6 * 10.0 + estimate.embedding_tokens / 5000.0, 2)
+    print("✓ SQL estimate in batch mode")
+
+
+def test_sql_dictionary_and_allinone():
+    estimate = sql_estimate(12, sql_process_mode="dictionary")
+    assert estimate.documents == 1
+    assert estimate.llm_calls["tables_summary"] == 3 and estimate.llm_calls["total"] == 11
+
+    estimate = sql_estimate(12, enable_allinone="enable")
+    assert estimate.documents == 1 and estimate.sql_process_mode == "allinone"
+    assert estimate.llm_calls["tables_summary"] == 0
+
+    estimate = sql_estimate(0)
+    assert estimate.documents == 0 and estimate.embedding_tokens == 0
+    assert estimate.llm_calls["fingerprint"] == 0 and estimate.llm_calls["memory_extraction"] == 0
+    print("✓ SQL estimate in dictionary and allinone mode")
+
+
+def test_sql_selected_tables():
+    reader = FakeSqlReader(12)
+    result = estimate_ingestion(reader, "postgres", {"tables": ["t1", "t2"]}, "disable", "batch")
+    assert result["objects"] == 2 and result["documents"] == 1
+    assert reader.requested == [["t1", "t2"], ["t1", "t2"]]
+    print("✓ SQL estimate of selected tables")
+
+
+def test_file_chunks():
+    reader = FakeFileReader(SIZES)
+    result = estimate_ingestion(reader, "fileserver", {"files": list(SIZES)}, "disable", "batch")
+    chunks = {detail["object_name"]: detail["estimated_chunks"] for detail in result["details"]}
+    # 1000 and 2600 text characters, a pdf keeps a tenth of its bytes, unknown types produce nothing
+    assert chunks == {"docs/a.txt": 1, "docs/b.md": 3, "docs/c.pdf": 1, "docs/d.bin": 0}
+    assert result["objects"] == 4 and result["total_bytes"] == 18600 and result["documents"] == 5
+    assert result["llm_calls"] == {"memory_extraction": 2, "total": 2}
+    print("✓ file estimate from object sizes")
+
+
+def test_minio_prefix_and_objects():
+    reader = FakeFileReader(SIZES)
+    result = estimate_ingestion(reader, "minio", {"prefix": "docs/"}, "disable", "batch")
+    assert result["objects"] == 4 and reader.calls[-1]["prefix"] == "docs/"
+
+    result = estimate_ingestion(reader, "minio", {"files": ["docs/d.bin"]}, "disable", "batch")
+    assert result["documents"] == 0 and result["llm_calls"]["total"] == 0
+    assert reader.calls[-1]["objects"] == ["docs/d.bin"]
+    print("✓ MinIO estimate by prefix and by object list")
+
+
+def test_invalid_extract():
+    reader = FakeFileReader(SIZES)
+    for source_type, extract in (("fileserver", {}), ("minio", {"files": "docs/a.txt"}), ("oracle", {})):
+        try:
+            estimate_ingestion(reader, source_type, extract, "disable", "batch")
+            raise AssertionError(f"{source_type} {extract} must be rejected")
+        except ValueError:
+            pass
+    print("✓ invalid extract descriptors are rejected")
+
+
+if __name__ == "__main__":
+    test_sql_batch_mode()
+    test_sql_dictionary_and_allinone()
+    test_sql_selected_tables()
+    test_file_chunks()
+    test_minio_prefix_and_objects()
+    test_invalid_extract()
+    print("\nAll ingestion estimate tests passed! ✓")
@@ -69,3 +69,21 @@ def extract_fileserver(
 
     logger.info(f"Total results: {len(results)}")
     return results
+
+def fetch_fileserver(reader: FileServerReader, extract: Dict[str, Any], staging_dir: str) -> List[Dict[str, str]]:
+    """Download the files of extract['files'] into staging_dir, returns the staged files in the given order"""
+    files = extract.get('files')
+    if files is None:
+        raise ValueError("files is None - 'files' key not found in extract dictionary")
+
+    if not isinstance(files, list):
+        raise ValueError(f"files must be a list, got {type(files)}")
+
+    staged = []
+    for file_path in files:
+        fetched = reader.fetch(file_path, staging_dir)
+        if fetched is not None:
+            staged.append(dict(fetched, name=file_path))
+
+    logger.info(f"fetch_fileserver, files={len(files)}, staged={len(staged)}")
+    return staged
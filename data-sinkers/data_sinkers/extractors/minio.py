@@ -1,7 +1,7 @@
 import os
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, Tuple
 from pydantic import BaseModel, Field
-from ..readers.minio.minio_reader import MinIOReader
+from ..readers.minio.minio_reader import MinIOReader, documents_in_listing_order
 from ..api.base import DocumentModel
 from ..analyzers.fingerprint import FingerprintAnalyzer
 from ..client.knowledge_pyramid_client import KnowledgePyramidClient
@@ -12,6 +12,20 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("minio_extractor")
 
+
+def get_minio_max_objects_per_task() -> int:
+    """Objects processed by one task when extracting a prefix, the rest goes to a continuation task"""
+    default_value = 1000
+    try:
+        value = int(os.getenv('MINIO_MAX_OBJECTS_PER_TASK', str(default_value)))
+        if value <= 0:
+            logger.warning(f"MINIO_MAX_OBJECTS_PER_TASK must be greater than 0, using default value {default_value}. Current value: {value}")
+            return default_value
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"MINIO_MAX_OBJECTS_PER_TASK environment variable conversion failed, using default value {default_value}. Error: {e}")
+        return default_value
+
 def extract_minio(
 		reader: MinIOReader, 
 		descriptor: Dict[str, Any], 
@@ -52,4 +66,108 @@ def extract_minio(
 
     results = reader.query(objects=object_names)
 
-    return results
\ No newline at end of file
+    return results
+
+def extract_minio_prefix(reader: MinIOReader, extract: Dict[str, Any]) -> Tuple[List[DocumentModel], Optional[str]]:
+    """
+    Extract every object under extract['prefix'] with a streaming listing
+
+    extract keys:
+        prefix: Object prefix to list
+        recursive: Whether to list sub directories, default True
+        extensions: Optional extension filter, such as ['.pdf', '.txt']
+        start_after: Continuation marker from a previous task
+        max_objects: Objects handled by this task, default from MINIO_MAX_OBJECTS_PER_TASK
+
+    Returns:
+        (documents, next_marker), next_marker is None when the listing is exhausted
+    """
+    prefix = extract.get('prefix')
+    if prefix is None:
+        raise ValueError("prefix is None - 'prefix' key not found in extract dictionary")
+
+    max_objects = extract.get('max_objects') or get_minio_max_objects_per_task()
+
+    by_index = {}
+    marker = extract.get('start_after')
+
+    stream = reader.query_stream(
+        prefix=prefix,
+        recursive=extract.get('recursive', True),
+        start_after=extract.get('start_after'),
+        extensions=extract.get('extensions'),
+        max_objects=max_objects
+    )
+    while True:
+        try:
+            index, obj_name, documents, marker = next(stream)
+        except StopIteration as stop:
+            has_more = bool(stop.value)
+            break
+        by_index[index] = documents
+
+    # Files finish in any order, the documents keep the listing order so ingestion is deterministic
+    results = documents_in_listing_order(by_index)
+
+    next_marker = marker if has_more else None
+    logger.info(f"extract_minio_prefix, prefix={prefix}, processed={len(by_index)}, documents={len(results)}, next_marker={next_marker}")
+
+    return results, next_marker
+
+def fetch_minio(reader: MinIOReader, extract: Dict[str, Any], staging_dir: str) -> List[Dict[str, str]]:
+    """Download the objects of extract['files'] into staging_dir, returns the staged files in the given order"""
+    object_names = extract.get('files')
+    if object_names is None:
+        raise ValueError("object_names is None - 'files' key not found in extract dictionary")
+
+    if not isinstance(object_names, list):
+        raise ValueError(f"object_names must be a list, got {type(object_names)}")
+
+    staged = []
+    for obj_name in object_names:
+        if obj_name.endswith('/'):
+            continue
+        path = reader.fetch_one(obj_name, staging_dir)
+        if path is not None:
+            staged.append({"name": obj_name, "filename": os.path.basename(obj_name), "path": path})
+
+    logger.info(f"fetch_minio, objects={len(object_names)}, staged={len(staged)}")
+    return staged
+
+def fetch_minio_prefix(reader: MinIOReader, extract: Dict[str, Any], staging_dir: str) -> Tuple[List[Dict[str, str]], Optional[str]]:
+    """
+    Download every object under extract['prefix'] into staging_dir, same extract keys and marker as extract_minio_prefix
+
+    Returns:
+        (staged files in listing order, next_marker)
+    """
+    prefix = extract.get('prefix')
+    if prefix is None:
+        raise ValueError("prefix is None - 'prefix' key not found in extract dictionary")
+
+    by_index = {}
+    marker = extract.get('start_after')
+
+    stream = reader.fetch_stream(
+        staging_dir,
+        prefix=prefix,
+        recursive=extract.get('recursive', True),
+        start_after=extract.get('start_after'),
+        extensions=extract.get('extensions'),
+        max_objects=extract.get('max_objects') or get_minio_max_objects_per_task()
+    )
+    while True:
+        try:
+            index, obj_name, path, marker = next(stream)
+        except StopIteration as stop:
+            has_more = bool(stop.value)
+            break
+        if path is not None:
+            by_index[index] = {"name": obj_name, "filename": os.path.basename(obj_name), "path": path}
+
+    staged = [by_index[index] for index in sorted(by_index)]
+
+    next_marker = marker if has_more else None
+    logger.info(f"fetch_minio_prefix, prefix={prefix}, staged={len(staged)}, next_marker={next_marker}")
+
+    return staged, next_marker
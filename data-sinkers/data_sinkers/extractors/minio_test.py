@@ -0,0 +1,127 @@
+import os
+import time
+import random
+import tempfile
+from data_sinkers.readers.minio.minio_reader import MinIOReader
+from data_sinkers.extractors.minio import extract_minio_prefix, fetch_minio_prefix
+
+# python -m data_sinkers.extractors.minio_test
+
+OBJECTS = ["docs/a.md", "docs/b.pdf", "docs/c.md", "docs/sub/", "docs/sub/d.md", "docs/sub/e.txt"]
+
+
+class FakeMinio:
+    """iter_objects of GeneralMinio over a fixed listing, in key order"""
+
+    def __init__(self, names):
+        self.names = sorted(names)
+        self.listed = 0
+
+    def iter_objects(self, prefix, recursive, bucket, start_after=None):
+        for name in self.names:
+            if not name.startswith(prefix) or (start_after is not None and name <= start_after):
+                continue
+            self.listed += 1
+            yield {"object_name": name, "is_dir": name.endswith("/")}
+
+
+class FakeMinIOReader(MinIOReader):
+    def __init__(self, names):
+        super().__init__({"bucket": "test", "host": "localhost:9000", "access_key": "", "secret_key": ""})
+        self._client = FakeMinio(names)
+
+    def query_one(self, object_name, **kwargs):
+        # Files finish out of listing order
+        time.sleep(random.random() * 0.01)
+        return [f"content of {object_name}"]
+
+    def fetch_one(self, object_name, staging_dir, **kwargs):
+        time.sleep(random.random() * 0.01)
+        if object_name.endswith(".pdf"):
+            return None
+        with tempfile.NamedTemporaryFile("w", dir=staging_dir, delete=False, suffix=os.path.splitext(object_name)[1]) as tmp_file:
+            tmp_file.write(f"content of {object_name}")
+            return tmp_file.name
+
+
+def collect(reader, **extract):
+    return extract_minio_prefix(reader, dict({"prefix": "docs/"}, **extract))
+
+
+def test_listing_within_limit_has_no_marker():
+    documents, next_marker = collect(FakeMinIOReader(OBJECTS), max_objects=10)
+    assert len(documents) == 5
+    assert next_marker is None
+    print("✓ a listing below max_objects has no marker")
+
+
+def test_listing_ending_at_limit_has_no_marker():
+    documents, next_marker = collect(FakeMinIOReader(OBJECTS), max_objects=5)
+    assert len(documents) == 5
+    assert next_marker is None
+    print("✓ a listing ending exactly at max_objects has no marker")
+
+
+def test_continuation_covers_every_object_once():
+    reader = FakeMinIOReader(OBJECTS)
+    documents, next_marker = collect(reader, max_objects=2)
+    assert documents == ["content of docs/a.md", "content of docs/b.pdf"]
+    assert next_marker == "docs/b.pdf"
+
+    seen = list(documents)
+    while next_marker is not None:
+        documents, next_marker = collect(reader, max_objects=2, start_after=next_marker)
+        seen.extend(documents)
+    assert seen == [f"content of {name}" for name in OBJECTS if not name.endswith("/")]
+    print("✓ continuation tasks cover every object once")
+
+
+def test_query_stream_returns_has_more():
+    reader = FakeMinIOReader(OBJECTS)
+    stream = reader.query_stream(prefix="docs/", max_objects=3, max_workers=2)
+    results = []
+    while True:
+        try:
+            results.append(next(stream))
+        except StopIteration as stop:
+            has_more = stop.value
+            break
+    assert has_more is True
+    assert [marker for _, _, _, marker in results][-1] == "docs/c.md"
+    assert sorted((index, name) for index, name, _, _ in results) == [(0, "docs/a.md"), (1, "docs/b.pdf"), (2, "docs/c.md")]
+    # Markers only move forward over objects that are done
+    markers = [marker for _, _, _, marker in results if marker is not None]
+    assert markers == sorted(markers)
+    print("✓ query_stream reports more objects past max_objects")
+
+
+def test_extensions_filter():
+    documents, next_marker = collect(FakeMinIOReader(OBJECTS), extensions=[".MD"], max_objects=3)
+    assert documents == ["content of docs/a.md", "content of docs/c.md", "content of docs/sub/d.md"]
+    assert next_marker is None
+    print("✓ extensions filter the listing before the limit")
+
+
+def test_fetch_stages_files_in_listing_order():
+    with tempfile.TemporaryDirectory() as staging_dir:
+        reader = FakeMinIOReader(OBJECTS)
+        staged, next_marker = fetch_minio_prefix(reader, {"prefix": "docs/", "max_objects": 4}, staging_dir)
+        # The failed download of b.pdf is skipped, the marker still moves past it
+        assert [item["name"] for item in staged] == ["docs/a.md", "docs/c.md", "docs/sub/d.md"]
+        assert [item["filename"] for item in staged] == ["a.md", "c.md", "d.md"]
+        assert next_marker == "docs/sub/d.md"
+        for item in staged:
+            assert os.path.dirname(item["path"]) == staging_dir and item["path"].endswith(".md")
+            with open(item["path"]) as f:
+                assert f.read() == f"content of {item['name']}"
+    print("✓ fetch_minio_prefix stages the files in listing order without parsing them")
+
+
+if __name__ == "__main__":
+    test_listing_within_limit_has_no_marker()
+    test_listing_ending_at_limit_has_no_marker()
+    test_continuation_covers_every_object_once()
+    test_query_stream_returns_has_more()
+    test_extensions_filter()
+    test_fetch_stages_files_in_listing_order()
+    print("\nAll MinIO prefix extraction tests passed! ✓")
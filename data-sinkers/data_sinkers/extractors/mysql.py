@@ -52,7 +52,8 @@ def extract_mysql(
         fingerprint_client: FingerprintClient,
         enable_allinone: str, 
         enable_sample_data: str,
-        sql_process_mode: str
+        sql_process_mode: str,
+        update_fingerprint: bool = True
     ) -> List[DocumentModel]:
 
     results: List[DocumentModel] = []
@@ -112,8 +113,10 @@ def extract_mysql(
             dd_namespace=descriptor.get('namespace'),
             dd_name=descriptor.get('name')
         )
-    fingerprint_client.create_fingerprint(fingerprint)
-    logger.info("========== extract_mysql, add fingerprint to fingerprint database success=")
+    # Incremental sync of a subset of tables keeps the DD fingerprint of the full run
+    if update_fingerprint:
+        fingerprint_client.create_fingerprint(fingerprint)
+        logger.info("========== extract_mysql, add fingerprint to fingerprint database success=")
 
     # Build document, then send to dataservices. All-in-one
     if enable_allinone == "enable":
@@ -190,7 +193,8 @@ def extract_mysql(
                             "source_type": "mysql",
                             "dd_namespace": descriptor.get('namespace'),
                             "dd_name": descriptor.get('name'),
-                            "fingerprint_id": tables_fingerprint_id
+                            "fingerprint_id": tables_fingerprint_id,
+                            "tables": [table['table_name'] for table in batch]
                         }
                     )
                 )
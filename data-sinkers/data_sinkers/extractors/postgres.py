@@ -52,7 +52,8 @@ def extract_postgres(
         fingerprint_client: FingerprintClient,
         enable_allinone: str, 
         enable_sample_data: str,
-        sql_process_mode: str
+        sql_process_mode: str,
+        update_fingerprint: bool = True
     ) -> List[DocumentModel]:
 
     results: List[DocumentModel] = []
@@ -118,8 +119,10 @@ def extract_postgres(
             dd_namespace=descriptor.get('namespace'),
             dd_name=descriptor.get('name')
         )
-    fingerprint_client.create_fingerprint(fingerprint)
-    logger.info("========== extract_postgres, add fingerprint to fingerprint database success=")
+    # Incremental sync of a subset of tables keeps the DD fingerprint of the full run
+    if update_fingerprint:
+        fingerprint_client.create_fingerprint(fingerprint)
+        logger.info("========== extract_postgres, add fingerprint to fingerprint database success=")
 
     # Build document, then send to dataservices. All-in-one mode
     if enable_allinone == "enable":
@@ -196,7 +199,8 @@ def extract_postgres(
                             "source_type": "postgres",
                             "dd_namespace": descriptor.get('namespace'),
                             "dd_name": descriptor.get('name'),
-                            "fingerprint_id": tables_fingerprint_id
+                            "fingerprint_id": tables_fingerprint_id,
+                            "tables": [table['table_name'] for table in batch]
                         }
                     )
                 )
@@ -0,0 +1,43 @@
+import os
+from io import BytesIO
+from typing import Dict, List
+from langchain.schema import Document
+from ..file_processors.general import Processor, can_process_in_memory
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("staged_extractor")
+
+
+def parse_staged_files(staged: List[Dict[str, str]]) -> List[Document]:
+    """
+    Parse the files downloaded by fetch_minio, fetch_minio_prefix or fetch_fileserver, in the given order
+
+    Files of a type that can be parsed from memory are read back and parsed under their original
+    filename, so the documents are the same as the ones MinIOReader.query_one and FileServerReader.query
+    return. A file that fails to parse is skipped, as in those readers.
+    """
+    chunk_size = 1000
+    processor = Processor(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_size // 5,
+        splitter_type="recursive"
+    )
+
+    results: List[Document] = []
+    for item in staged:
+        path = item['path']
+        filename = item.get('filename') or os.path.basename(path)
+        try:
+            if can_process_in_memory(filename, os.path.getsize(path)):
+                with open(path, 'rb') as f:
+                    documents = processor.process_stream(BytesIO(f.read()), filename)
+            else:
+                documents = processor.process_file(path)
+            results.extend(documents)
+        except Exception as e:
+            logger.error(f"file process error, name={item.get('name')}, path={path}: {e}")
+            continue
+
+    logger.info(f"parse_staged_files, files={len(staged)}, documents={len(results)}")
+    return results
@@ -4,6 +4,8 @@ from langchain_community.document_loaders import (
         CSVLoader,
     )
 from langchain.schema import Document
+from io import BytesIO, StringIO
+import csv
 import logging
 import os
 
@@ -41,6 +43,23 @@ class CsvProcessor:
     def load_with_ragflow(self, file_path: str, **kwargs) -> List[Document]:
         return []
     
+    def load_from_stream(self, stream: BytesIO, filename: str, encoding: str = "utf-8", **kwargs) -> List[Document]:
+        """Same output as CSVLoader (one document per row), parsed from memory"""
+        try:
+            reader = csv.DictReader(StringIO(stream.getvalue().decode(encoding)))
+            documents = []
+            for i, row in enumerate(reader):
+                content = "\n".join(
+                    f"{k.strip() if k is not None else k}: {v.strip() if isinstance(v, str) else ','.join(map(str.strip, v)) if isinstance(v, list) else v}"
+                    for k, v in row.items()
+                )
+                documents.append(Document(page_content=content, metadata={"source": filename, "row": i}))
+            logger.info(f"CsvProcessor loaded {len(documents)} pages from {filename} in memory")
+            return documents
+        except Exception as e:
+            logger.error(f"CsvProcessor in memory load failed: {e}")
+            return []
+
     def process_csv(
         self, 
         file_path: str, 
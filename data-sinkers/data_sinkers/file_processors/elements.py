@@ -0,0 +1,20 @@
+from typing import List, Any
+from langchain.schema import Document
+
+
+def elements_to_documents(elements: List[Any], source: str) -> List[Document]:
+    """
+    Convert unstructured elements to documents the same way the langchain
+    Unstructured*Loader classes do in mode="elements"
+    """
+    documents = []
+    for element in elements:
+        metadata = {"source": source}
+        if hasattr(element, "metadata"):
+            metadata.update(element.metadata.to_dict())
+        if hasattr(element, "category"):
+            metadata["category"] = element.category
+        if hasattr(element, "id"):
+            metadata["element_id"] = element.id
+        documents.append(Document(page_content=str(element), metadata=metadata))
+    return documents
@@ -1,4 +1,4 @@
-from typing import List, Dict, Optional, Union, Any, Literal
+from typing import List, Dict, Optional, Union, Any, Literal, Iterator, Tuple
 from .pdf import PDFProcessor
 from .word import WordProcessor
 from .excel import ExcelProcessor
@@ -7,9 +7,34 @@ from .txt import TxtProcessor
 from .markdown import MarkdownProcessor
 from ..spliters.langchain import TextSplitterWrapper
 from langchain.schema import Document
+from io import BytesIO
 import logging
 import os
 
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("processor")
+
+# File types whose processors can parse directly from memory, anything else is spilled to a temp file
+STREAM_FILE_TYPES = ("txt", "md", "csv", "docx")
+
+
+def get_in_memory_max_bytes() -> int:
+    """Objects up to this size are parsed from memory without a temp file, 0 disables the in-memory path"""
+    default_value = 8 * 1024 * 1024
+    try:
+        value = int(os.getenv('IN_MEMORY_MAX_BYTES', str(default_value)))
+        if value < 0:
+            logger.warning(f"IN_MEMORY_MAX_BYTES must not be negative, using default value {default_value}. Current value: {value}")
+            return default_value
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"IN_MEMORY_MAX_BYTES environment variable conversion failed, using default value {default_value}. Error: {e}")
+        return default_value
+
+
+def get_file_type(filename: str) -> str:
+    return os.path.splitext(filename.split('?')[0])[1].lower().lstrip('.')
+
 
 class Processor:
 
@@ -99,13 +124,81 @@ class Processor:
             processor = MarkdownProcessor()
             raw_documents = processor.process_markdown(file_path)
             
+        return self._finalize(raw_documents)
+
+    def process_stream(
+        self,
+        stream: BytesIO,
+        filename: str,
+        **loader_kwargs
+    ) -> Union[List[Document], Dict]:
+        """
+        Parse an in-memory file without touching the filesystem
+
+        Args:
+            stream: File content
+            filename: Original file name, used for the file type and the document source
+        """
+        file_type = get_file_type(filename)
+
+        self.logger.info(f"Processor.process_stream, filename={filename}, file_type={file_type}, size={stream.getbuffer().nbytes}")
+
+        raw_documents = []
+
+        if file_type == "txt":
+            raw_documents = TxtProcessor().load_from_stream(stream, filename)
+
+        if file_type == "md":
+            raw_documents = MarkdownProcessor().load_from_stream(stream, filename)
+
+        if file_type == "csv":
+            raw_documents = CsvProcessor().load_from_stream(stream, filename)
+
+        if file_type == "docx":
+            raw_documents = WordProcessor().load_from_stream(stream, filename)
+
+        return self._finalize(raw_documents)
+
+    def _finalize(self, raw_documents: List[Document]) -> List[Document]:
         if not raw_documents:
             raise Exception(f"Failed to load file")
 
-        self.logger.debug(f"Processor.process_file, raw_documents={raw_documents}")
+        self.logger.debug(f"Processor, raw_documents={raw_documents}")
 
         if len(raw_documents) > 1:
             return raw_documents
         else:
             split_documents = self.text_splitter.split_documents(raw_documents)
             return split_documents
+
+
+def can_process_in_memory(filename: str, size: Optional[int]) -> bool:
+    """
+    Whether a file of this name and announced size (None if unknown) should be read into memory
+
+    The size is only a hint, the read itself is bounded by read_in_memory.
+    """
+    max_bytes = get_in_memory_max_bytes()
+    if max_bytes <= 0 or get_file_type(filename) not in STREAM_FILE_TYPES:
+        return False
+    return size is None or size <= max_bytes
+
+
+def read_in_memory(chunks: Iterator[bytes]) -> Tuple[List[bytes], bool]:
+    """
+    Read chunks until more than IN_MEMORY_MAX_BYTES were read
+
+    Returns the chunks read and whether the stream ended within the limit. When it did not, the
+    caller writes the chunks read and the rest of the iterator to a temporary file.
+    """
+    max_bytes = get_in_memory_max_bytes()
+    read = []
+    total = 0
+    for chunk in chunks:
+        if not chunk:
+            continue
+        read.append(chunk)
+        total += len(chunk)
+        if total > max_bytes:
+            return read, False
+    return read, True
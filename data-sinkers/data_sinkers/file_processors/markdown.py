@@ -3,6 +3,8 @@ from langchain_community.document_loaders import (
         UnstructuredMarkdownLoader,
     )
 from langchain.schema import Document
+from io import BytesIO
+from .elements import elements_to_documents
 import logging
 import os
 
@@ -30,6 +32,21 @@ class MarkdownProcessor:
     def load_with_ragflow(self, file_path: str, **kwargs) -> List[Document]:
         return []
     
+    def load_from_stream(self, stream: BytesIO, filename: str, encoding: str = "utf-8", **kwargs) -> List[Document]:
+        """Same partitioning as load_with_unstructured, from an in-memory markdown text"""
+        try:
+            from unstructured.partition.md import partition_md
+
+            elements = partition_md(
+                text=stream.getvalue().decode(encoding), chunking_strategy="by_title", max_characters=1000,
+            )
+            documents = elements_to_documents(elements, filename)
+            logger.info(f"partition_md loaded {len(documents)} pages from {filename} in memory")
+            return documents
+        except Exception as e:
+            logger.error(f"partition_md failed: {e}")
+            return []
+
     def process_markdown(
         self, 
         file_path: str, 
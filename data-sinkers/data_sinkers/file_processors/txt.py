@@ -3,6 +3,7 @@ from langchain_community.document_loaders import (
         TextLoader,
     )
 from langchain.schema import Document
+from io import BytesIO
 import logging
 import os
 
@@ -25,6 +26,16 @@ class TxtProcessor:
             logger.error(f"TextLoader failed: {e}")
             return []
     
+    def load_from_stream(self, stream: BytesIO, filename: str, encoding: str = "utf-8", **kwargs) -> List[Document]:
+        """Same output as TextLoader, decoded from memory"""
+        try:
+            text = stream.getvalue().decode(encoding)
+            logger.info(f"TxtProcessor loaded 1 pages from {filename} in memory")
+            return [Document(page_content=text, metadata={"source": filename})]
+        except Exception as e:
+            logger.error(f"TxtProcessor in memory load failed: {e}")
+            return []
+
     def process_txt(
         self, 
         file_path: str, 
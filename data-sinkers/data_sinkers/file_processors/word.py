@@ -4,6 +4,8 @@ from langchain_community.document_loaders import (
     UnstructuredWordDocumentLoader
 )
 from langchain.schema import Document
+from io import BytesIO
+from .elements import elements_to_documents
 import logging
 import os
 
@@ -41,6 +43,21 @@ class WordProcessor:
     def load_with_ragflow(self, file_path: str, **kwargs) -> List[Document]:
         return []
     
+    def load_from_stream(self, stream: BytesIO, filename: str, **kwargs) -> List[Document]:
+        """Same partitioning as load_with_unstructured, from an in-memory docx"""
+        try:
+            from unstructured.partition.docx import partition_docx
+
+            elements = partition_docx(
+                file=stream, chunking_strategy="by_title", max_characters=1000,
+            )
+            documents = elements_to_documents(elements, filename)
+            logger.info(f"partition_docx loaded {len(documents)} pages from {filename} in memory")
+            return documents
+        except Exception as e:
+            logger.error(f"partition_docx failed: {e}")
+            return []
+
     def process_word(
         self, 
         file_path: str, 
@@ -1,11 +1,13 @@
 import requests
 import tempfile
+import itertools
 import os
+from io import BytesIO
 from typing import Any, Dict, Optional, Tuple, List
 from abc import ABC, abstractmethod
 from langchain.schema import Document
 from ..base.base_reader import BaseDataReader
-from ...file_processors.general import Processor
+from ...file_processors.general import Processor, can_process_in_memory, read_in_memory
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -37,30 +39,8 @@ class FileServerReader(BaseDataReader):
             response = self._client.get(url, params=params, stream=True)
             response.raise_for_status()
             
-            # Get filename from headers or fallback to URL
-            content_disposition = response.headers.get('Content-Disposition', '')
-            filename = None
+            filename = self._filename(response, endpoint)
             
-            # Try from Content-Disposition first
-            if 'filename=' in content_disposition:
-                filename = content_disposition.split('filename=')[1].strip('"\'')
-            
-            # Fallback 1: From URL if path-like
-            if filename is None and '/' in endpoint:
-                filename = endpoint.split('/')[-1]
-            
-            # Fallback 2: Use last part of URL
-            if filename is None:
-                filename = endpoint.split('?')[0].split('/')[-1]  # Remove query params
-            
-            # Create temp file
-            suffix = os.path.splitext(filename)[1] if filename else None
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-                for chunk in response.iter_content(chunk_size=1024 * 1024):
-                    if chunk:
-                        tmp_file.write(chunk)
-                temp_path = tmp_file.name
-
             chunk_size = 1000
             splitter_type = "recursive"
 
@@ -69,6 +49,27 @@ class FileServerReader(BaseDataReader):
                 chunk_overlap=chunk_size // 5,
                 splitter_type=splitter_type
             )
+
+            # Small files of a stream capable type are parsed from memory
+            content_length = response.headers.get('Content-Length')
+            size = int(content_length) if content_length is not None else None
+            # Content-Length is only a hint, the read stops once IN_MEMORY_MAX_BYTES is exceeded
+            chunks = response.iter_content(chunk_size=1024 * 1024)
+            head = []
+            if can_process_in_memory(filename, size):
+                head, complete = read_in_memory(chunks)
+                if complete:
+                    result = processor.process_stream(BytesIO(b"".join(head)), filename)
+                    return result
+                logger.info(f"{url} exceeds IN_MEMORY_MAX_BYTES, spilling to a temporary file")
+
+            # Create temp file
+            suffix = os.path.splitext(filename)[1] if filename else None
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+                for chunk in itertools.chain(head, chunks):
+                    if chunk:
+                        tmp_file.write(chunk)
+                temp_path = tmp_file.name
             
             result = processor.process_file(temp_path)
             
@@ -88,6 +89,72 @@ class FileServerReader(BaseDataReader):
                     os.unlink(temp_path)
                 except OSError:
                     pass
+
+    def fetch(self, endpoint: str, staging_dir: str, **kwargs) -> Optional[Dict[str, str]]:
+        """
+        Download a file into staging_dir without parsing it, see parse_staged_files
+
+        Returns:
+            {'filename', 'path'} of the downloaded file, None when the download failed
+        """
+        url = f"http://{self.config['host']}:{self.config['port']}/{endpoint}"
+        params = kwargs.get('params', None)
+        temp_path = ""
+
+        try:
+            response = self._client.get(url, params=params, stream=True)
+            response.raise_for_status()
+
+            filename = self._filename(response, endpoint)
+            suffix = os.path.splitext(filename)[1] if filename else None
+            with tempfile.NamedTemporaryFile(dir=staging_dir, delete=False, suffix=suffix) as tmp_file:
+                temp_path = tmp_file.name
+                for chunk in response.iter_content(chunk_size=1024 * 1024):
+                    if chunk:
+                        tmp_file.write(chunk)
+
+            return {'filename': filename, 'path': temp_path}
+
+        except Exception as e:
+            logger.error(f"Error downloading {url}: {e}")
+            if temp_path and os.path.exists(temp_path):
+                try:
+                    os.unlink(temp_path)
+                except OSError:
+                    pass
+            return None
+
+    def _filename(self, response: requests.Response, endpoint: str) -> str:
+        # Get filename from headers or fallback to URL
+        content_disposition = response.headers.get('Content-Disposition', '')
+        filename = None
+
+        # Try from Content-Disposition first
+        if 'filename=' in content_disposition:
+            filename = content_disposition.split('filename=')[1].strip('"\'')
+
+        # Fallback 1: From URL if path-like
+        if filename is None and '/' in endpoint:
+            filename = endpoint.split('/')[-1]
+
+        # Fallback 2: Use last part of URL
+        if filename is None:
+            filename = endpoint.split('?')[0].split('/')[-1]  # Remove query params
+
+        return filename
+
+    def stat(self, endpoint: str, **kwargs) -> Dict[str, Any]:
+        """Get the file size from a HEAD request without downloading the body"""
+        url = f"http://{self.config['host']}:{self.config['port']}/{endpoint}"
+        params = kwargs.get('params', None)
+
+        try:
+            response = self._client.head(url, params=params, allow_redirects=True)
+            response.raise_for_status()
+            return {'object_name': endpoint, 'size': int(response.headers.get('Content-Length', 0) or 0)}
+        except Exception as e:
+            logger.error(f"Error getting size of {url}: {e}")
+            return {'object_name': endpoint, 'size': 0, 'error': str(e)}
     
     def close(self) -> None:
         if hasattr(self, '_client') and self._client is not None:
@@ -3,7 +3,7 @@ import time
 from minio import Minio
 from io import BytesIO
 import logging
-from typing import Any, Dict, Optional, Tuple, List
+from typing import Any, Dict, Optional, Tuple, List, Iterator
 from minio.error import S3Error
 
 minio_logger = logging.getLogger("minio")
@@ -77,6 +77,25 @@ class GeneralMinio(object):
             minio_logger.error(f"list object fail: {e}")
         return objects_info
 
+    def iter_objects(self, prefix: str = "", recursive: bool = True, bucket: str = None, start_after: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield object info in key order, one listing page is fetched at a time.
+        Errors are raised instead of swallowed so a caller can resume from the last object it saw.
+        """
+        try:
+            obj_list = self.conn.list_objects(bucket, prefix=prefix, recursive=recursive, start_after=start_after)
+            for obj in obj_list:
+                yield {
+                    'object_name': obj.object_name,
+                    'size': obj.size,
+                    'last_modified': obj.last_modified,
+                    'etag': obj.etag,
+                    'is_dir': obj.is_dir
+                }
+        except Exception as e:
+            minio_logger.error(f"list object fail, prefix={prefix}, start_after={start_after}: {e}")
+            raise
+
     def get_presigned_url(self, bucket, fnm, expires):
         try:
             return self.conn.get_presigned_url("GET", bucket, fnm, expires)
@@ -1,18 +1,41 @@
 import tempfile
+import itertools
 import os
-from typing import Any, Dict, Optional, Tuple, List
+from typing import Any, Callable, Dict, Optional, Tuple, List, Iterator, Generator
 from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from io import BytesIO
 from minio.error import S3Error
 from langchain.schema import Document
 from .minio_conn import GeneralMinio
 from ..base.base_reader import BaseDataReader
-from ...file_processors.general import Processor
+from ...file_processors.general import Processor, can_process_in_memory, read_in_memory
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("minio_reader")
 
+
+def get_minio_max_workers() -> int:
+    """Number of objects downloaded and parsed concurrently while the listing is still running"""
+    default_value = 4
+    try:
+        value = int(os.getenv('MINIO_MAX_WORKERS', str(default_value)))
+        if value <= 0:
+            logger.warning(f"MINIO_MAX_WORKERS must be greater than 0, using default value {default_value}. Current value: {value}")
+            return default_value
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"MINIO_MAX_WORKERS environment variable conversion failed, using default value {default_value}. Error: {e}")
+        return default_value
+
+
+def documents_in_listing_order(by_index: Dict[int, List[Document]]) -> List[Document]:
+    """Documents of query_stream results keyed by listing index, in listing order whatever order the files finished in"""
+    return [document for index in sorted(by_index) for document in by_index[index]]
+
+
 class MinIOReader(BaseDataReader):
     def _validate_config(self) -> None:
         required_keys = ['bucket', 'host', 'access_key', 'secret_key']
@@ -30,7 +53,11 @@ class MinIOReader(BaseDataReader):
     
     def query_one(self, object_name: str, **kwargs) -> List[Document]:
         """
-        Download file from MinIO to temporary file
+        Download file from MinIO and process it
+
+        Objects of a type that can be parsed from memory are read into a BytesIO buffer, the read stops
+        once IN_MEMORY_MAX_BYTES is exceeded and the object is streamed to a temporary file instead.
+        Other types are always streamed to a temporary file.
 
         Parameters:
             object_name: Object name in MinIO (including path)
@@ -44,18 +71,15 @@ class MinIOReader(BaseDataReader):
         
         temp_path = ""
         filename = ""
+        data = None
 
         try:
             data = self.client.conn.get_object(bucket, object_name)
-            file_data = data.read()
-            
+
             filename = os.path.basename(object_name)
+            content_length = data.headers.get('Content-Length')
+            size = int(content_length) if content_length is not None else None
 
-            suffix = os.path.splitext(filename)[1]
-            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
-                tmp_file.write(file_data)
-                temp_path = tmp_file.name
-            
             chunk_size = 1000
             splitter_type = "recursive"
 
@@ -64,6 +88,21 @@ class MinIOReader(BaseDataReader):
                 chunk_overlap=chunk_size // 5,
                 splitter_type=splitter_type
             )
+
+            chunks = data.stream(1024 * 1024)
+            head = []
+            if can_process_in_memory(filename, size):
+                head, complete = read_in_memory(chunks)
+                if complete:
+                    result = processor.process_stream(BytesIO(b"".join(head)), filename)
+                    return result
+                logger.info(f"{object_name} exceeds IN_MEMORY_MAX_BYTES, spilling to a temporary file")
+
+            suffix = os.path.splitext(filename)[1]
+            with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+                for chunk in itertools.chain(head, chunks):
+                    tmp_file.write(chunk)
+                temp_path = tmp_file.name
             
             result = processor.process_file(temp_path)
 
@@ -75,21 +114,51 @@ class MinIOReader(BaseDataReader):
         except Exception as e:
             logger.error(f"file process error: {e}")
             return []
-        except Exception as e:
+        finally:
+            if data is not None:
+                data.close()
+                data.release_conn()
             if temp_path and os.path.exists(temp_path):
                 try:
                     os.unlink(temp_path)
                 except OSError:
                     pass
-            logger.error(f"Error processing {temp_path}: {e}")
-            return []
-        finally:
+    
+    def fetch_one(self, object_name: str, staging_dir: str, **kwargs) -> Optional[str]:
+        """
+        Download an object into staging_dir without parsing it, see parse_staged_files
+
+        Returns:
+            Path of the downloaded file, None when the download failed
+        """
+        bucket = kwargs.get('bucket', self.config['bucket'])
+        data = None
+        temp_path = ""
+
+        try:
+            data = self.client.conn.get_object(bucket, object_name)
+
+            suffix = os.path.splitext(object_name)[1]
+            with tempfile.NamedTemporaryFile(dir=staging_dir, delete=False, suffix=suffix) as tmp_file:
+                temp_path = tmp_file.name
+                for chunk in data.stream(1024 * 1024):
+                    tmp_file.write(chunk)
+
+            return temp_path
+
+        except Exception as e:
+            logger.error(f"MinIO download error, object={object_name}: {e}")
             if temp_path and os.path.exists(temp_path):
                 try:
                     os.unlink(temp_path)
                 except OSError:
                     pass
-    
+            return None
+        finally:
+            if data is not None:
+                data.close()
+                data.release_conn()
+
     def query(self, prefix: str = "", recursive: bool = True, objects: Optional[List[str]] = None, **kwargs) -> List[Document]:
         """
         Read all files under bucket (supports filtering)
@@ -103,18 +172,16 @@ class MinIOReader(BaseDataReader):
         bucket = kwargs.get('bucket', self.config['bucket'])
         all_documents = []
         
-        if objects is not None:
-            # If objects parameter is provided, directly use the specified object list
-            file_objects = [obj for obj in objects if not obj.endswith('/')]
-            logger.info(f"Using specified {len(file_objects)} objects for processing")
-        else:
-            # Get all object list
-            objects_list = self.client.list_objects(prefix, recursive, bucket)
-            logger.info(f"Found {len(objects_list)} objects to process")
-
-            # Filter out directories and empty files
-            file_objects = [obj for obj in objects_list if not obj.endswith('/')]
-            logger.info(f"Remaining {len(file_objects)} files after filtering")
+        if objects is None:
+            # Stream the listing, files are downloaded and parsed while later pages are still being listed
+            by_index = {}
+            for index, obj_name, documents, _ in self.query_stream(prefix=prefix, recursive=recursive, bucket=bucket):
+                by_index[index] = documents
+            return documents_in_listing_order(by_index)
+
+        # If objects parameter is provided, directly use the specified object list
+        file_objects = [obj for obj in objects if not obj.endswith('/')]
+        logger.info(f"Using specified {len(file_objects)} objects for processing")
         
         # Process files one by one
         for i, obj_name in enumerate(file_objects):
@@ -144,29 +211,185 @@ class MinIOReader(BaseDataReader):
             bucket: Specify bucket
         """
         bucket = kwargs.get('bucket', self.config['bucket'])
-        all_documents = []
-        
-        # Get all objects
-        objects = self.client.list_objects(prefix, recursive, bucket)
-        
-        # Filter by extension
-        filtered_objects = [
-            obj for obj in objects 
-            if not obj.endswith('/') and any(obj.lower().endswith(ext.lower()) for ext in extensions)
-        ]
-        
-        logger.info(f"Found {len(filtered_objects)} files matching extensions {extensions}")
+        by_index = {}
+
+        for index, obj_name, documents, _ in self.query_stream(prefix=prefix, recursive=recursive, extensions=extensions, bucket=bucket):
+            by_index[index] = documents
+
+        logger.info(f"Processed {len(by_index)} files matching extensions {extensions}")
         
-        # Process filtered files
-        for obj_name in filtered_objects:
-            try:
-                documents = self.query_one(obj_name, bucket=bucket, **kwargs)
-                all_documents.extend(documents)
-            except Exception as e:
-                logger.error(f"Error processing file {obj_name}: {e}")
+        return documents_in_listing_order(by_index)
+
+    def iter_objects(
+        self,
+        prefix: str = "",
+        recursive: bool = True,
+        start_after: Optional[str] = None,
+        extensions: Optional[List[str]] = None,
+        **kwargs
+    ) -> Iterator[str]:
+        """
+        Lazily yield file object names in key order, directories are skipped
+
+        Parameters:
+            prefix: File prefix filter
+            recursive: Whether to recursively list subdirectories
+            start_after: Continuation marker, listing starts after this object name
+            extensions: Only yield files with these extensions, such as ['.pdf', '.txt']
+        """
+        bucket = kwargs.get('bucket', self.config['bucket'])
+
+        for obj in self.client.iter_objects(prefix, recursive, bucket, start_after=start_after):
+            obj_name = obj['object_name']
+            if obj['is_dir'] or obj_name.endswith('/'):
                 continue
-        
-        return all_documents
+            if extensions and not any(obj_name.lower().endswith(ext.lower()) for ext in extensions):
+                continue
+            yield obj_name
+
+    def shard_prefixes(self, prefix: str = "", **kwargs) -> List[Dict[str, Any]]:
+        """
+        Split a listing into independent shards by listing only one level below prefix
+
+        Every sub directory becomes a recursive shard, files directly under prefix form one
+        non recursive shard. The shards cover the same objects as a recursive listing of prefix.
+
+        Returns:
+            [{'prefix': str, 'recursive': bool}, ...]
+        """
+        bucket = kwargs.get('bucket', self.config['bucket'])
+        shards = []
+        has_files = False
+
+        for obj in self.client.iter_objects(prefix, False, bucket):
+            if obj['is_dir'] or obj['object_name'].endswith('/'):
+                shards.append({'prefix': obj['object_name'], 'recursive': True})
+            else:
+                has_files = True
+
+        if has_files:
+            shards.append({'prefix': prefix, 'recursive': False})
+
+        logger.info(f"Split prefix '{prefix}' into {len(shards)} shards")
+        return shards
+
+    def query_stream(
+        self,
+        prefix: str = "",
+        recursive: bool = True,
+        start_after: Optional[str] = None,
+        extensions: Optional[List[str]] = None,
+        max_objects: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        **kwargs
+    ) -> Generator[Tuple[int, str, List[Document], Optional[str]], None, bool]:
+        """
+        List and process objects concurrently, yielding results as files finish
+
+        The listing is consumed lazily and at most 2 * max_workers files are in flight, so memory
+        does not grow with the bucket size and the first documents are available after the first page.
+
+        Parameters:
+            prefix: File prefix filter
+            recursive: Whether to recursively process subdirectories
+            start_after: Continuation marker returned by a previous run
+            extensions: Only process files with these extensions
+            max_objects: Stop after this many objects, the last marker can be used to continue
+            max_workers: Concurrent downloads, default from MINIO_MAX_WORKERS
+
+        Yields:
+            (index, object_name, documents, marker) in completion order. index is the position of the
+            object in the listing, see documents_in_listing_order. Every object up to and including marker
+            in listing order has been processed, so marker can be passed as start_after to resume
+
+        Returns:
+            True when the listing was cut at max_objects and more objects follow, as the generator's
+            return value (StopIteration.value)
+        """
+        bucket = kwargs.get('bucket', self.config['bucket'])
+        return (yield from self._stream_objects(
+            lambda obj_name: self.query_one(obj_name, bucket=bucket),
+            prefix, recursive, start_after, extensions, max_objects, max_workers, bucket
+        ))
+
+    def fetch_stream(
+        self,
+        staging_dir: str,
+        prefix: str = "",
+        recursive: bool = True,
+        start_after: Optional[str] = None,
+        extensions: Optional[List[str]] = None,
+        max_objects: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        **kwargs
+    ) -> Generator[Tuple[int, str, Optional[str], Optional[str]], None, bool]:
+        """
+        Same listing and markers as query_stream, but objects are only downloaded into staging_dir
+
+        Yields:
+            (index, object_name, path, marker), path is None when the download failed
+        """
+        bucket = kwargs.get('bucket', self.config['bucket'])
+        return (yield from self._stream_objects(
+            lambda obj_name: self.fetch_one(obj_name, staging_dir, bucket=bucket),
+            prefix, recursive, start_after, extensions, max_objects, max_workers, bucket
+        ))
+
+    def _stream_objects(
+        self,
+        handle: Callable[[str], Any],
+        prefix: str,
+        recursive: bool,
+        start_after: Optional[str],
+        extensions: Optional[List[str]],
+        max_objects: Optional[int],
+        max_workers: Optional[int],
+        bucket: str
+    ) -> Generator[Tuple[int, str, Any, Optional[str]], None, bool]:
+        max_workers = max_workers or get_minio_max_workers()
+
+        # Create the client before the worker threads share it
+        self.client
+
+        listed = deque()
+        finished = set()
+        marker = start_after
+        pending = {}
+
+        def drain(done_futures):
+            nonlocal marker
+            for future in done_futures:
+                index, obj_name = pending.pop(future)
+                documents = future.result()
+                finished.add(obj_name)
+                while listed and listed[0] in finished:
+                    marker = listed.popleft()
+                    finished.discard(marker)
+                yield index, obj_name, documents, marker
+
+        has_more = False
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            count = 0
+            for obj_name in self.iter_objects(prefix, recursive, start_after=start_after, extensions=extensions, bucket=bucket):
+                if max_objects is not None and count >= max_objects:
+                    # One object listed past the limit, so a listing that ends exactly at it is not continued
+                    has_more = True
+                    break
+                count += 1
+
+                listed.append(obj_name)
+                pending[executor.submit(handle, obj_name)] = (count - 1, obj_name)
+
+                if len(pending) >= max_workers * 2:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    yield from drain(done)
+
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                yield from drain(done)
+
+        logger.info(f"stream finished, prefix={prefix}, start_after={start_after}, processed={count}, marker={marker}, has_more={has_more}")
+        return has_more
     
     def batch_query(self, object_names: List[str], **kwargs) -> List[Document]:
         """
@@ -185,6 +408,36 @@ class MinIOReader(BaseDataReader):
         
         return all_documents
 
+
+    def stat(self, objects: Optional[List[str]] = None, prefix: str = "", recursive: bool = True, **kwargs) -> List[Dict[str, Any]]:
+        """
+        Get object names and sizes without downloading any content
+
+        Parameters:
+            objects: Specify list of objects to stat, if not provided all objects under prefix are listed
+            prefix: File prefix filter
+            recursive: Whether to recursively list subdirectories
+        """
+        bucket = kwargs.get('bucket', self.config['bucket'])
+
+        if objects is None:
+            objects_info = self.client.list_objects_with_info(prefix, recursive, bucket)
+            return [
+                {'object_name': obj['object_name'], 'size': obj['size'] or 0}
+                for obj in objects_info if not obj['is_dir']
+            ]
+
+        results = []
+        for obj_name in objects:
+            if obj_name.endswith('/'):
+                continue
+            try:
+                stat = self.client.conn.stat_object(bucket, obj_name)
+                results.append({'object_name': obj_name, 'size': stat.size or 0})
+            except S3Error as e:
+                logger.error(f"MinIO stat error for {obj_name}: {e}")
+                results.append({'object_name': obj_name, 'size': 0, 'error': str(e)})
+        return results
     
     def close(self) -> None:
         """MinIO connection does not require special close handling"""
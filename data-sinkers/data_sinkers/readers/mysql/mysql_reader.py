@@ -298,6 +298,103 @@ class MySQLReader(BaseDataReader):
         except Error as e:
             raise RuntimeError(f"Failed to get table structure: {e}")
 
+    def table_stats(self, table_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get approximate row counts and storage sizes from INFORMATION_SCHEMA without scanning table data
+
+        Parameters:
+            table_names: Optional parameter, specifies the list of table names. If None or empty list, gets all tables.
+
+        Returns:
+        [
+            {
+                'table_name': 'users',
+                'table_rows': 1024,
+                'data_bytes': 65536,
+                'update_time': datetime(2025, 1, 1, 0, 0)
+            }
+        ]
+        """
+        try:
+            table_condition = ""
+            params = [self.config['database']]
+
+            if table_names:
+                placeholders = ', '.join(['%s'] * len(table_names))
+                table_condition = f"AND TABLE_NAME IN ({placeholders})"
+                params.extend(table_names)
+
+            stats_sql = f"""
+                SELECT 
+                    TABLE_NAME,
+                    TABLE_ROWS,
+                    DATA_LENGTH,
+                    UPDATE_TIME
+                FROM 
+                    INFORMATION_SCHEMA.TABLES 
+                WHERE 
+                    TABLE_SCHEMA = %s
+                    AND TABLE_TYPE = 'BASE TABLE'
+                    {table_condition}
+            """
+
+            with self.client.cursor(DictCursor) as cursor:
+                cursor.execute(stats_sql, params)
+                rows = cursor.fetchall()
+
+            return [
+                {
+                    'table_name': row['TABLE_NAME'],
+                    'table_rows': int(row['TABLE_ROWS'] or 0),
+                    'data_bytes': int(row['DATA_LENGTH'] or 0),
+                    'update_time': row['UPDATE_TIME']
+                }
+                for row in rows
+            ]
+
+        except Error as e:
+            raise RuntimeError(f"Failed to get table statistics: {e}")
+
+    def change_markers(
+        self,
+        table_names: Optional[List[str]] = None,
+        watermark_columns: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """
+        Get a cheap per-table change marker, the marker differs whenever the table has been written
+
+        The marker combines INFORMATION_SCHEMA.TABLES UPDATE_TIME, TABLE_ROWS and DATA_LENGTH. For tables
+        listed in watermark_columns, MAX(column) is added, which also catches updates that the
+        InnoDB statistics miss (UPDATE_TIME is not persisted across restarts).
+
+        Parameters:
+            table_names: Optional parameter, specifies the list of table names. If None or empty list, gets all tables.
+            watermark_columns: Optional mapping of table name to a monotonically increasing column, such as updated_at
+
+        Returns:
+            {'users': '2025-01-01 00:00:00|1024|65536|2025-01-01 00:00:00', ...}
+        """
+        watermark_columns = watermark_columns or {}
+        markers = {}
+
+        for stat in self.table_stats(table_names):
+            markers[stat['table_name']] = f"{stat['update_time']}|{stat['table_rows']}|{stat['data_bytes']}"
+
+        try:
+            with self.client.cursor(DictCursor) as cursor:
+                for table_name, column in watermark_columns.items():
+                    if table_name not in markers:
+                        continue
+                    table_identifier = table_name.replace('`', '``')
+                    column_identifier = column.replace('`', '``')
+                    cursor.execute(f"SELECT MAX(`{column_identifier}`) AS watermark FROM `{table_identifier}`")
+                    row = cursor.fetchone()
+                    markers[table_name] += f"|{row['watermark'] if row else None}"
+        except Error as e:
+            raise RuntimeError(f"Failed to get watermark: {e}")
+
+        return markers
+
     def schema_relationship(self, table_names: Optional[List[str]] = None) -> Dict[str, Any]:
         """
         Specifically analyze relationships between tables
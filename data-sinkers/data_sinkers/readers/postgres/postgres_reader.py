@@ -1,4 +1,5 @@
 import psycopg2
+from psycopg2 import sql
 from psycopg2.extras import RealDictCursor
 from typing import List, Dict, Any, Optional, Iterable, Union
 from contextlib import contextmanager
@@ -294,6 +295,112 @@ class PostgresReader(BaseDataReader):
         except psycopg2.Error as e:
             raise RuntimeError(f"Failed to retrieve schema: {e}")
 
+    def table_stats(self, table_names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Get approximate row counts and storage sizes from the catalog without scanning table data.
+        Row counts come from pg_class.reltuples, so they are as fresh as the last ANALYZE/VACUUM.
+        """
+        try:
+            stats_sql = """
+                SELECT 
+                    t.table_name,
+                    GREATEST(pc.reltuples, 0)::bigint as table_rows,
+                    pg_catalog.pg_table_size(pc.oid) as data_bytes
+                FROM 
+                    information_schema.tables t
+                JOIN 
+                    pg_class pc ON pc.relname = t.table_name
+                JOIN 
+                    pg_namespace pn ON pn.oid = pc.relnamespace AND pn.nspname = t.table_schema
+                WHERE 
+                    t.table_schema NOT IN ('pg_catalog', 'information_schema')
+                    AND t.table_type = 'BASE TABLE'
+            """
+
+            params = []
+            if table_names:
+                placeholders = ','.join(['%s'] * len(table_names))
+                stats_sql += f" AND t.table_name IN ({placeholders})"
+                params.extend(table_names)
+
+            stats_sql += " ORDER BY t.table_name"
+
+            with self._get_cursor() as cursor:
+                cursor.execute(stats_sql, params or None)
+                rows = cursor.fetchall()
+
+            return [
+                {
+                    'table_name': row['table_name'],
+                    'table_rows': int(row['table_rows'] or 0),
+                    'data_bytes': int(row['data_bytes'] or 0)
+                }
+                for row in rows
+            ]
+
+        except psycopg2.Error as e:
+            raise RuntimeError(f"Failed to retrieve table statistics: {e}")
+
+
+    def change_markers(
+        self,
+        table_names: Optional[List[str]] = None,
+        watermark_columns: Optional[Dict[str, str]] = None
+    ) -> Dict[str, str]:
+        """
+        Get a cheap per-table change marker from the pg_stat_user_tables write counters.
+        For tables listed in watermark_columns, MAX(column) is added to the marker.
+
+        Args:
+            table_names: Optional list of table names, all tables if None or empty
+            watermark_columns: Optional mapping of table name to a monotonically increasing column, such as updated_at
+
+        Returns:
+            {'users': '120|4|0', ...} (inserted|updated|deleted[|watermark])
+        """
+        watermark_columns = watermark_columns or {}
+        try:
+            counters_sql = """
+                SELECT 
+                    relname as table_name,
+                    schemaname as table_schema,
+                    n_tup_ins,
+                    n_tup_upd,
+                    n_tup_del
+                FROM 
+                    pg_stat_user_tables
+            """
+
+            params = []
+            if table_names:
+                placeholders = ','.join(['%s'] * len(table_names))
+                counters_sql += f" WHERE relname IN ({placeholders})"
+                params.extend(table_names)
+
+            markers = {}
+            schemas = {}
+            with self._get_cursor() as cursor:
+                cursor.execute(counters_sql, params or None)
+                for row in cursor.fetchall():
+                    markers[row['table_name']] = f"{row['n_tup_ins']}|{row['n_tup_upd']}|{row['n_tup_del']}"
+                    schemas[row['table_name']] = row['table_schema']
+
+                for table_name, column in watermark_columns.items():
+                    if table_name not in markers:
+                        continue
+                    watermark_sql = sql.SQL("SELECT MAX({}) as watermark FROM {}.{}").format(
+                        sql.Identifier(column),
+                        sql.Identifier(schemas[table_name]),
+                        sql.Identifier(table_name)
+                    )
+                    cursor.execute(watermark_sql)
+                    row = cursor.fetchone()
+                    markers[table_name] += f"|{row['watermark'] if row else None}"
+
+            return markers
+
+        except psycopg2.Error as e:
+            raise RuntimeError(f"Failed to retrieve change markers: {e}")
 
     def schema_relationship(self, table_names: Optional[List[str]] = None) -> Dict[str, Any]:
         """
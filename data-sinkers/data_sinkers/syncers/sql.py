@@ -0,0 +1,201 @@
+import os
+import re
+import copy
+import json
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Tuple
+from pydantic import BaseModel, Field
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("sql_syncer")
+
+SYNC_KEY_PREFIX = "dac:sql_sync:"
+SYNC_LOCK_PREFIX = "dac:sql_sync_lock:"
+
+# Connection settings that are never written to Redis, they are resolved from the credential reference at sync time
+CREDENTIAL_KEYS = ("user", "password")
+CREDENTIAL_REF_PATTERN = re.compile(r"^[A-Za-z0-9][A-Za-z0-9._-]*$")
+
+
+def get_sql_sync_interval() -> int:
+    """Seconds between two change checks of every registered SQL datasource, 0 disables the schedule"""
+    default_value = 300
+    try:
+        value = int(os.getenv('SQL_SYNC_INTERVAL', str(default_value)))
+        if value < 0:
+            logger.warning(f"SQL_SYNC_INTERVAL must not be negative, using default value {default_value}. Current value: {value}")
+            return default_value
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"SQL_SYNC_INTERVAL environment variable conversion failed, using default value {default_value}. Error: {e}")
+        return default_value
+
+
+def get_sql_sync_state_ttl() -> int:
+    """Seconds a registration outlives its last sync check, every check renews it"""
+    default_value = 7 * 24 * 3600
+    try:
+        value = int(os.getenv('SQL_SYNC_STATE_TTL', str(default_value)))
+        if value <= 0:
+            logger.warning(f"SQL_SYNC_STATE_TTL must be positive, using default value {default_value}. Current value: {value}")
+            return default_value
+        return value
+    except (ValueError, TypeError) as e:
+        logger.warning(f"SQL_SYNC_STATE_TTL environment variable conversion failed, using default value {default_value}. Error: {e}")
+        return default_value
+
+
+def get_credential_ref(data: Dict[str, Any]) -> Optional[str]:
+    """Credential reference of a task, sync.credential_ref or the authenticationRef of the source"""
+    return (data.get('sync') or {}).get('credential_ref') or (data.get('source') or {}).get('authenticationRef')
+
+
+def strip_credentials(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of the task data without the datasource user and password"""
+    data = copy.deepcopy(data)
+    metadata = (data.get('source') or {}).get('metadata') or {}
+    for key in CREDENTIAL_KEYS:
+        metadata.pop(key, None)
+    return data
+
+
+def resolve_credentials(credential_ref: str) -> Dict[str, str]:
+    """
+    Read the user and password of a credential reference from SQL_SYNC_CREDENTIALS_DIR/<credential_ref>/,
+    one file per key, the layout of a Kubernetes Secret mounted as a volume
+    """
+    if not credential_ref or not CREDENTIAL_REF_PATTERN.match(credential_ref):
+        raise ValueError(f"Invalid credential reference: {credential_ref!r}")
+    base_dir = os.path.join(os.getenv('SQL_SYNC_CREDENTIALS_DIR', '/etc/dac/sql-sync-credentials'), credential_ref)
+    credentials = {}
+    for key in CREDENTIAL_KEYS:
+        path = os.path.join(base_dir, key)
+        if not os.path.isfile(path):
+            raise ValueError(f"Credential {key} of {credential_ref} not found at {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            credentials[key] = f.read().strip()
+    return credentials
+
+
+class SyncedDocument(BaseModel):
+    # Tables covered by the document, empty means the document is built from every table (allinone, dictionary)
+    tables: List[str] = Field(default_factory=list)
+    vector_ids: List[str] = Field(default_factory=list)
+
+
+class SqlSyncState(BaseModel):
+    collection_name: str
+    # Task data without credentials, see strip_credentials
+    data: Dict[str, Any]
+    credential_ref: str
+    sql_process_mode: str
+    markers: Dict[str, str] = Field(default_factory=dict)
+    documents: List[SyncedDocument] = Field(default_factory=list)
+    last_sync_at: Optional[str] = None
+
+
+class SqlSyncStore:
+    """Sync state per collection, kept in Redis next to the Celery broker. Expires ttl seconds after the last check"""
+
+    def __init__(self, client: Any, ttl: int = 7 * 24 * 3600):
+        self.client = client
+        self.ttl = ttl
+
+    def save(self, state: SqlSyncState) -> None:
+        self.client.set(f"{SYNC_KEY_PREFIX}{state.collection_name}", state.model_dump_json(), ex=self.ttl)
+
+    def touch(self, collection_name: str) -> None:
+        self.client.expire(f"{SYNC_KEY_PREFIX}{collection_name}", self.ttl)
+
+    def load(self, collection_name: str) -> Optional[SqlSyncState]:
+        value = self.client.get(f"{SYNC_KEY_PREFIX}{collection_name}")
+        if value is None:
+            return None
+        return SqlSyncState.model_validate_json(value)
+
+    def delete(self, collection_name: str) -> None:
+        self.client.delete(f"{SYNC_KEY_PREFIX}{collection_name}")
+
+    def list_collections(self) -> List[str]:
+        collections = []
+        for key in self.client.scan_iter(match=f"{SYNC_KEY_PREFIX}*", count=100):
+            key = key.decode() if isinstance(key, bytes) else key
+            collections.append(key[len(SYNC_KEY_PREFIX):])
+        return collections
+
+    def acquire_lock(self, collection_name: str, ttl: int) -> bool:
+        """Only one sync per collection at a time, the lock expires if a worker dies mid-sync"""
+        return bool(self.client.set(f"{SYNC_LOCK_PREFIX}{collection_name}", "1", nx=True, ex=ttl))
+
+    def release_lock(self, collection_name: str) -> None:
+        self.client.delete(f"{SYNC_LOCK_PREFIX}{collection_name}")
+
+
+def build_sync_state(
+        collection_name: str,
+        data: Dict[str, Any],
+        sql_process_mode: str,
+        markers: Dict[str, str],
+        documents: List[Dict[str, Any]],
+        vector_ids: List[str]
+    ) -> SqlSyncState:
+    """
+    Build the state of a full ingest, documents and vector_ids are in the same order (one id per document).
+    The credentials in data are dropped, data must carry a credential reference to resolve them at sync time.
+    """
+    if len(documents) != len(vector_ids):
+        raise ValueError(f"Sync state of {collection_name} needs one vector id per document, got {len(vector_ids)} ids for {len(documents)} documents")
+    credential_ref = get_credential_ref(data)
+    if not credential_ref:
+        raise ValueError(f"Incremental sync of {collection_name} needs sync.credential_ref or source.authenticationRef, credentials are not stored")
+
+    return SqlSyncState(
+        collection_name=collection_name,
+        data=strip_credentials(data),
+        credential_ref=credential_ref,
+        sql_process_mode=sql_process_mode,
+        markers=markers,
+        documents=[
+            SyncedDocument(tables=doc.get("metadata", {}).get("tables") or [], vector_ids=[vector_id])
+            for doc, vector_id in zip(documents, vector_ids)
+        ],
+        last_sync_at=datetime.now(timezone.utc).isoformat()
+    )
+
+
+def changed_tables(old_markers: Dict[str, str], new_markers: Dict[str, str]) -> List[str]:
+    """Tables written, added or dropped since the markers were taken"""
+    tables = set(old_markers) | set(new_markers)
+    return sorted(table for table in tables if old_markers.get(table) != new_markers.get(table))
+
+
+def plan_refresh(state: SqlSyncState, changed: List[str], current_tables: List[str]) -> Tuple[List[int], Optional[List[str]]]:
+    """
+    Decide which stored documents are stale and which tables must be re-extracted
+
+    Returns:
+        (indexes of stale documents, tables to extract), tables is None when the whole source has to be
+        extracted again, because a stale document is built from every table
+    """
+    changed_set = set(changed)
+    stale = [
+        i for i, doc in enumerate(state.documents)
+        if not doc.tables or changed_set & set(doc.tables)
+    ]
+
+    if any(not state.documents[i].tables for i in stale) or not state.documents:
+        return stale, None
+
+    covered = set()
+    for doc in state.documents:
+        covered.update(doc.tables)
+
+    refresh = set()
+    for i in stale:
+        refresh.update(state.documents[i].tables)
+    # New tables that no document covers yet
+    refresh.update(table for table in changed_set if table not in covered)
+
+    current = set(current_tables)
+    return stale, sorted(table for table in refresh if table in current)
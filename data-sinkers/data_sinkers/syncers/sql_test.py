@@ -0,0 +1,122 @@
+import os
+import tempfile
+from data_sinkers.syncers.sql import SqlSyncState, SyncedDocument, build_sync_state, changed_tables, plan_refresh, resolve_credentials
+
+# python -m data_sinkers.syncers.sql_test
+
+DATA = {
+    "source": {
+        "type": "mysql",
+        "metadata": {"host": "192.168.1.10", "port": 3306, "user": "reader", "password": "secret", "database": "shop"}
+    },
+    "sync": {"enabled": True, "credential_ref": "shop-db"},
+    "extract": {"tables": ["orders", "users", "items"]}
+}
+
+
+def make_state(documents):
+    return SqlSyncState(
+        collection_name="c1",
+        data={},
+        credential_ref="shop-db",
+        sql_process_mode="batch",
+        documents=[SyncedDocument(tables=tables, vector_ids=[f"v{i}"]) for i, tables in enumerate(documents)]
+    )
+
+
+def test_changed_tables():
+    old = {"orders": "1", "users": "1", "dropped": "1"}
+    new = {"orders": "2", "users": "1", "added": "1"}
+    assert changed_tables(old, new) == ["added", "dropped", "orders"]
+    assert changed_tables(new, dict(new)) == []
+    print("✓ changed_tables")
+
+
+def test_plan_refresh_batches():
+    state = make_state([["orders", "users"], ["items"]])
+    stale, tables = plan_refresh(state, ["users"], ["orders", "users", "items"])
+    assert stale == [0]
+    assert tables == ["orders", "users"]
+
+    # A new table no document covers is extracted on its own
+    stale, tables = plan_refresh(state, ["payments"], ["orders", "users", "items", "payments"])
+    assert stale == [] and tables == ["payments"]
+
+    # A dropped table is not extracted again, its batch still is
+    stale, tables = plan_refresh(state, ["users"], ["orders", "items"])
+    assert stale == [0] and tables == ["orders"]
+    print("✓ plan_refresh in batch mode")
+
+
+def test_plan_refresh_whole_source():
+    # allinone / dictionary: one document built from every table
+    state = make_state([[]])
+    stale, tables = plan_refresh(state, ["items"], ["orders", "users", "items"])
+    assert stale == [0] and tables is None
+
+    stale, tables = plan_refresh(make_state([]), ["items"], ["items"])
+    assert stale == [] and tables is None
+    print("✓ plan_refresh of a whole source document")
+
+
+def test_build_sync_state():
+    documents = [{"metadata": {"tables": ["orders", "users"]}}, {"metadata": {}}]
+    state = build_sync_state("c1", DATA, "batch", {"orders": "1"}, documents, ["v1", "v2"])
+    assert [doc.tables for doc in state.documents] == [["orders", "users"], []]
+    assert [doc.vector_ids for doc in state.documents] == [["v1"], ["v2"]]
+    assert state.credential_ref == "shop-db"
+
+    # The credentials stay out of the stored state, the task data is not modified
+    stored = state.model_dump_json()
+    assert "secret" not in stored and "reader" not in stored
+    assert state.data["source"]["metadata"]["host"] == "192.168.1.10"
+    assert DATA["source"]["metadata"]["password"] == "secret"
+    print("✓ build_sync_state")
+
+
+def test_build_sync_state_rejects_mismatch():
+    documents = [{"metadata": {"tables": ["orders"]}}, {"metadata": {"tables": ["users"]}}]
+    try:
+        build_sync_state("c1", DATA, "batch", {}, documents, ["v1"])
+        raise AssertionError("a missing vector id must be rejected")
+    except ValueError as e:
+        assert "one vector id per document" in str(e)
+
+    data = dict(DATA, sync={"enabled": True})
+    try:
+        build_sync_state("c1", data, "batch", {}, documents[:1], ["v1"])
+        raise AssertionError("a state without credential reference must be rejected")
+    except ValueError as e:
+        assert "credential_ref" in str(e)
+    print("✓ build_sync_state rejects mismatched ids and missing credential references")
+
+
+def test_resolve_credentials():
+    with tempfile.TemporaryDirectory() as base_dir:
+        os.makedirs(os.path.join(base_dir, "shop-db"))
+        for key, value in (("user", "reader"), ("password", "secret\n")):
+            with open(os.path.join(base_dir, "shop-db", key), "w") as f:
+                f.write(value)
+
+        os.environ["SQL_SYNC_CREDENTIALS_DIR"] = base_dir
+        try:
+            assert resolve_credentials("shop-db") == {"user": "reader", "password": "secret"}
+            for credential_ref in ("missing", "../shop-db", ""):
+                try:
+                    resolve_credentials(credential_ref)
+                    raise AssertionError(f"{credential_ref!r} must not resolve")
+                except ValueError:
+                    pass
+        finally:
+            del os.environ["SQL_SYNC_CREDENTIALS_DIR"]
+    print("✓ resolve_credentials")
+
+
+if __name__ == "__main__":
+    test_changed_tables()
+    test_plan_refresh_batches()
+    test_plan_refresh_whole_source()
+    test_build_sync_state()
+    test_build_sync_state_rejects_mismatch()
+    test_resolve_credentials()
+    print("\nAll SQL sync tests passed! ✓")
@@ -1,13 +1,16 @@
 import time
 import os
+import copy
+import shutil
 from urllib.parse import quote_plus
-from celery import Celery
+from celery import Celery, chain
 from data_sinkers import get_reader
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Union, Tuple
 from pydantic import BaseModel, Field
 from enum import Enum
 import logging
 import re
+import redis
 from .client.knowledge_pyramid_client import KnowledgePyramidClient
 from .client.vector_client import VectorClient
 from .client.fingerprint_client import FingerprintClient, FingerprintData
@@ -15,8 +18,11 @@ from .analyzers.fingerprint import FingerprintAnalyzer
 from .api.base import DocumentModel
 from .extractors.mysql import extract_mysql
 from .extractors.postgres import extract_postgres
-from .extractors.minio import extract_minio
-from .extractors.fileserver import extract_fileserver
+from .extractors.minio import extract_minio, extract_minio_prefix, fetch_minio, fetch_minio_prefix
+from .extractors.fileserver import extract_fileserver, fetch_fileserver
+from .extractors.staged import parse_staged_files
+from .estimators.ingestion import estimate_ingestion
+from .syncers.sql import SqlSyncStore, build_sync_state, changed_tables, plan_refresh, get_sql_sync_interval, get_sql_sync_state_ttl, get_credential_ref, resolve_credentials
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("data_sinkers")
@@ -37,6 +43,14 @@ temperature = float(os.getenv('Temperature', '0.01'))
 enable_allinone = os.getenv('ENABLE_ALLINONE', 'disable')
 enable_sample_data = os.getenv('ENABLE_SAMPLE_DATA', 'disable')
 
+# Staged pipeline: extraction and indexing run as separate tasks on queues with their own worker profiles
+enable_pipeline = os.getenv('CELERY_PIPELINE', 'disable')
+queue_io = os.getenv('CELERY_QUEUE_IO', 'io')
+queue_cpu = os.getenv('CELERY_QUEUE_CPU', 'cpu')
+queue_llm = os.getenv('CELERY_QUEUE_LLM', 'llm')
+# Files downloaded on the io queue are parsed from here on the cpu queue, the io and cpu workers must share it
+staging_dir = os.getenv('CELERY_STAGING_DIR', '/tmp/data-sinkers-staging')
+
 fingerprint_analyzer = FingerprintAnalyzer(
     provider=provider,
     api_key=api_key,
@@ -66,6 +80,10 @@ class DataSourceConfig(BaseModel):
     classification: Optional[Dict[str, Any]] = None
 
 
+# Incremental SQL sync state lives in the result backend db
+sql_sync_store = SqlSyncStore(redis.Redis(host=redis_host, port=int(redis_port), db=int(redis_db_backend), password=redis_password or None), ttl=get_sql_sync_state_ttl())
+sql_sync_interval = get_sql_sync_interval()
+
 celery = Celery(
     'tasks',
     broker=f'redis://{password_part}{redis_host}:{redis_port}/{redis_db_broker}',
@@ -84,10 +102,23 @@ celery.conf.update(
     task_default_queue='dataset',
     task_routes={
         'tasks.process_data': {'queue': 'dataset'},
+        'tasks.extract_documents': {'queue': queue_llm},
+        'tasks.fetch_documents': {'queue': queue_io},
+        'tasks.parse_documents': {'queue': queue_cpu},
+        'tasks.index_documents': {'queue': queue_io},
     },
     task_track_started=True
 )
 
+# Celery beat checks every registered SQL datasource for changes, run a worker with CELERY_BEAT=enable
+if sql_sync_interval > 0:
+    celery.conf.beat_schedule = {
+        'sync-sql-sources': {
+            'task': 'tasks.sync_sql_sources',
+            'schedule': float(sql_sync_interval),
+        },
+    }
+
 def get_connection_config(source_type: DataSourceType, metadata: Dict[str, Any]) -> Dict[str, Any]:
     config_map = {
         DataSourceType.MYSQL: {
@@ -158,6 +189,8 @@ def process_data(self, data: Dict[str, Any]):
 
                 pyramid_result = send_delete_collection_to_knowledge_pyramid(client=knowledge_pyramid_client, collection_name=collection_name)
                 logger.info(f"Successfully sent delete collection request {collection_name} to Knowledge Pyramid")
+
+                sql_sync_store.delete(collection_name)
             except Exception as e:
                 raise ValueError(f"KnowledgePyramidClient to send delete collection to data-services fail: {data}") from e
 
@@ -183,23 +216,41 @@ def process_data(self, data: Dict[str, Any]):
         logger.info(f"connection_config = {connection_config}")
 
         reader = get_reader(source_type.value, connection_config)
-        
-        result: List[DocumentModel] = []
 
-        try:
-            if source_type == DataSourceType.MYSQL:
-                result = extract_mysql(reader, descriptor, extract, prompts, fingerprint_analyzer=fingerprint_analyzer, fingerprint_client=fingerprint_client, enable_allinone=enable_allinone, enable_sample_data=enable_sample_data, sql_process_mode=sql_process_mode)
-                
-            elif source_type == DataSourceType.POSTGRESQL:
-                result = extract_postgres(reader, descriptor, extract, prompts, fingerprint_analyzer=fingerprint_analyzer, fingerprint_client=fingerprint_client, enable_allinone=enable_allinone, enable_sample_data=enable_sample_data, sql_process_mode=sql_process_mode)
+        # Dry-run: only read metadata and return the expected cost, no model is called and nothing is written
+        if data.get('dry_run', False):
+            try:
+                estimate = estimate_ingestion(reader, source_type.value, extract, enable_allinone=enable_allinone, sql_process_mode=sql_process_mode, max_concurrent=fingerprint_analyzer.max_concurrent)
+            finally:
+                reader.close()
 
-            elif source_type == DataSourceType.MINIO:
-                result = extract_minio(reader, descriptor, extract, prompts, fingerprint_analyzer=fingerprint_analyzer, fingerprint_client=fingerprint_client, enable_allinone=enable_allinone, enable_sample_data=enable_sample_data)
+            return {
+                "status": "success",
+                "task_id": self.request.id,
+                "descriptor": descriptor,
+                "dry_run": True,
+                "estimate": estimate
+            }
 
-            elif source_type == DataSourceType.FILESERVER:
-                result = extract_fileserver(reader, descriptor, extract, prompts, fingerprint_analyzer=fingerprint_analyzer, fingerprint_client=fingerprint_client, enable_allinone=enable_allinone, enable_sample_data=enable_sample_data) 
+        # Large MinIO prefixes: list one level and fan out a subtask per shard
+        if source_type == DataSourceType.MINIO and extract.get('files') is None and extract.get('split', False):
+            try:
+                subtasks = send_minio_shard_subtasks(reader, data)
+            finally:
+                reader.close()
 
-            logger.info(f"============= process_data extract success, result = {result} ")
+            return {
+                "status": "success",
+                "task_id": self.request.id,
+                "descriptor": descriptor,
+                "subtasks": subtasks
+            }
+        
+        try:
+            # Taken before extraction, so writes during the extraction are picked up by the next sync
+            sync_markers = get_sync_markers(reader, source_type, data)
+
+            result, next_marker = extract_source_documents(reader, source_type, descriptor, extract, prompts, sql_process_mode=sql_process_mode)
 
             processing = data.get('data', {}).get('processing')
             if processing and result:
@@ -207,23 +258,7 @@ def process_data(self, data: Dict[str, Any]):
             
             serializable_result = [item.dict() for item in result] if result else []
 
-            try:
-                pyramid_result = send_add_documents_to_knowledge_pyramid(client=knowledge_pyramid_client, documents=serializable_result, collection_name=collection_name)
-                logger.info(f"Successfully sent {len(serializable_result)} documents to Knowledge Pyramid")
-            except Exception as e:
-                raise ValueError(f"KnowledgePyramidClient to send documents to data-services fail: {data}") from e
-
-            return {
-                "status": "success",
-                "task_id": self.request.id,
-                "descriptor": descriptor,
-                "data": serializable_result,
-                "pyramid_result": pyramid_result,
-                "metadata": {
-                    "source_type": source_type.value,
-                    "processed_at": time.strftime("%Y-%m-%d %H:%M:%S")
-                }
-            }
+            return send_extracted_documents(self.request.id, data, source_type, collection_name, serializable_result, next_marker, sync_markers=sync_markers, sql_process_mode=sql_process_mode)
             
         except Exception as e:
             logger.error(f"Data processing failed: {str(e)}", exc_info=True)
@@ -235,6 +270,375 @@ def process_data(self, data: Dict[str, Any]):
         logger.error(f"Task execution failed: {str(e)}", exc_info=True)
         raise ValueError(f"process_data fail: {data}, error={str(e)}") from e
 
+@celery.task(name='tasks.extract_documents', bind=True, acks_late=True)
+def extract_documents(self, data: Dict[str, Any]):
+    """
+    Pipeline stage 1 for SQL sources: read the source and build the documents, runs on the llm queue.
+    The serialized documents are passed to tasks.index_documents through the result backend.
+    File sources go through tasks.fetch_documents and tasks.parse_documents instead.
+    """
+    logger.info(f"============= start extract task {self.request.id} ===================")
+
+    try:
+        source_data = data.get('source', {})
+        descriptor = data.get('descriptor', {})
+        extract = data.get('extract', {})
+        prompts = data.get('prompts', {})
+
+        sql_process_mode="dictionary"
+
+        if not all([source_data, descriptor]):
+            raise ValueError("Missing necessary input fields to create collection and add documents: source, descriptor")
+
+        try:
+            source_type = DataSourceType(source_data.get('type'))
+        except ValueError as e:
+            raise ValueError(f"Unsupported data source type: {source_data.get('type')}") from e
+
+        reader = get_reader(source_type.value, get_connection_config(source_type, source_data.get('metadata', {})))
+
+        try:
+            if source_type == DataSourceType.MINIO and extract.get('files') is None and extract.get('split', False):
+                return {"subtasks": send_minio_shard_subtasks(reader, data)}
+
+            sync_markers = get_sync_markers(reader, source_type, data)
+
+            result, next_marker = extract_source_documents(reader, source_type, descriptor, extract, prompts, sql_process_mode=sql_process_mode)
+
+            processing = data.get('data', {}).get('processing')
+            if processing and result:
+                result = apply_processing(result, processing)
+
+            return {
+                "documents": [item.dict() for item in result] if result else [],
+                "next_marker": next_marker,
+                "sync_markers": sync_markers,
+                "sql_process_mode": sql_process_mode
+            }
+        finally:
+            reader.close()
+
+    except Exception as e:
+        logger.error(f"Extract task failed: {str(e)}", exc_info=True)
+        raise ValueError(f"extract_documents fail: {data}, error={str(e)}") from e
+
+@celery.task(name='tasks.fetch_documents', bind=True, acks_late=True)
+def fetch_documents(self, data: Dict[str, Any]):
+    """
+    Pipeline stage 1 for minio and fileserver sources: download the files into a staging directory of
+    this task under CELERY_STAGING_DIR, runs on the io queue. Only the paths are passed on to tasks.parse_documents.
+    """
+    logger.info(f"============= start fetch task {self.request.id} ===================")
+
+    try:
+        source_data = data.get('source', {})
+        descriptor = data.get('descriptor', {})
+        extract = data.get('extract', {})
+
+        if not all([source_data, descriptor]):
+            raise ValueError("Missing necessary input fields to create collection and add documents: source, descriptor")
+
+        try:
+            source_type = DataSourceType(source_data.get('type'))
+        except ValueError as e:
+            raise ValueError(f"Unsupported data source type: {source_data.get('type')}") from e
+
+        reader = get_reader(source_type.value, get_connection_config(source_type, source_data.get('metadata', {})))
+
+        try:
+            if source_type == DataSourceType.MINIO and extract.get('files') is None and extract.get('split', False):
+                return {"subtasks": send_minio_shard_subtasks(reader, data)}
+
+            staging_path = os.path.join(staging_dir, self.request.id)
+            os.makedirs(staging_path, exist_ok=True)
+            try:
+                staged, next_marker = fetch_source_files(reader, source_type, extract, staging_path)
+            except Exception:
+                shutil.rmtree(staging_path, ignore_errors=True)
+                raise
+
+            return {
+                "staging_path": staging_path,
+                "files": staged,
+                "next_marker": next_marker
+            }
+        finally:
+            reader.close()
+
+    except Exception as e:
+        logger.error(f"Fetch task failed: {str(e)}", exc_info=True)
+        raise ValueError(f"fetch_documents fail: {data}, error={str(e)}") from e
+
+@celery.task(name='tasks.parse_documents', bind=True, acks_late=True)
+def parse_documents(self, fetched: Dict[str, Any], data: Dict[str, Any]):
+    """
+    Pipeline stage 2 for minio and fileserver sources: parse the files staged by tasks.fetch_documents, runs on
+    the cpu queue. The staging directory is removed afterwards, the documents go on to tasks.index_documents.
+    """
+    logger.info(f"============= start parse task {self.request.id} ===================")
+
+    if fetched.get('subtasks') is not None:
+        return fetched
+
+    try:
+        result = parse_staged_files(fetched.get('files', []))
+
+        processing = data.get('data', {}).get('processing')
+        if processing and result:
+            result = apply_processing(result, processing)
+
+        return {
+            "documents": [item.dict() for item in result] if result else [],
+            "next_marker": fetched.get('next_marker')
+        }
+
+    except Exception as e:
+        logger.error(f"Parse task failed: {str(e)}", exc_info=True)
+        raise ValueError(f"parse_documents fail: {data}, error={str(e)}") from e
+    finally:
+        shutil.rmtree(fetched['staging_path'], ignore_errors=True)
+
+@celery.task(name='tasks.index_documents', bind=True, acks_late=True)
+def index_documents(self, extracted: Dict[str, Any], data: Dict[str, Any]):
+    """Pipeline stage 2: send the extracted documents to data-services, runs on the io queue"""
+    logger.info(f"============= start index task {self.request.id} ===================")
+
+    descriptor = data.get('descriptor', {})
+
+    try:
+        if extracted.get('subtasks') is not None:
+            return {
+                "status": "success",
+                "task_id": self.request.id,
+                "descriptor": descriptor,
+                "subtasks": extracted['subtasks']
+            }
+
+        source_type = DataSourceType(data.get('source', {}).get('type'))
+        collection_name = generate_collection_name(descriptor)
+
+        return send_extracted_documents(self.request.id, data, source_type, collection_name, extracted.get('documents', []), extracted.get('next_marker'), sync_markers=extracted.get('sync_markers'), sql_process_mode=extracted.get('sql_process_mode'))
+
+    except Exception as e:
+        logger.error(f"Index task failed: {str(e)}", exc_info=True)
+        raise ValueError(f"index_documents fail: {data}, error={str(e)}") from e
+
+def extract_source_documents(
+        reader: Any,
+        source_type: DataSourceType,
+        descriptor: Dict[str, Any],
+        extract: Dict[str, Any],
+        prompts: Dict[str, Any],
+        sql_process_mode: str,
+        update_fingerprint: bool = True
+    ) -> Tuple[List[DocumentModel], Optional[str]]:
+    result: List[DocumentModel] = []
+    next_marker = None
+
+    if source_type == DataSourceType.MYSQL:
+        result = extract_mysql(reader, descriptor, extract, prompts, fingerprint_analyzer=fingerprint_analyzer, fingerprint_client=fingerprint_client, enable_allinone=enable_allinone, enable_sample_data=enable_sample_data, sql_process_mode=sql_process_mode, update_fingerprint=update_fingerprint)
+        
+    elif source_type == DataSourceType.POSTGRESQL:
+        result = extract_postgres(reader, descriptor, extract, prompts, fingerprint_analyzer=fingerprint_analyzer, fingerprint_client=fingerprint_client, enable_allinone=enable_allinone, enable_sample_data=enable_sample_data, sql_process_mode=sql_process_mode, update_fingerprint=update_fingerprint)
+
+    elif source_type == DataSourceType.MINIO and extract.get('files') is None and extract.get('prefix') is not None:
+        result, next_marker = extract_minio_prefix(reader, extract)
+
+    elif source_type == DataSourceType.MINIO:
+        result = extract_minio(reader, descriptor, extract, prompts, fingerprint_analyzer=fingerprint_analyzer, fingerprint_client=fingerprint_client, enable_allinone=enable_allinone, enable_sample_data=enable_sample_data)
+
+    elif source_type == DataSourceType.FILESERVER:
+        result = extract_fileserver(reader, descriptor, extract, prompts, fingerprint_analyzer=fingerprint_analyzer, fingerprint_client=fingerprint_client, enable_allinone=enable_allinone, enable_sample_data=enable_sample_data) 
+
+    logger.info(f"============= extract success, result = {result} ")
+
+    return result, next_marker
+
+def fetch_source_files(
+        reader: Any,
+        source_type: DataSourceType,
+        extract: Dict[str, Any],
+        staging_path: str
+    ) -> Tuple[List[Dict[str, str]], Optional[str]]:
+    next_marker = None
+
+    if source_type == DataSourceType.MINIO and extract.get('files') is None and extract.get('prefix') is not None:
+        staged, next_marker = fetch_minio_prefix(reader, extract, staging_path)
+
+    elif source_type == DataSourceType.MINIO:
+        staged = fetch_minio(reader, extract, staging_path)
+
+    elif source_type == DataSourceType.FILESERVER:
+        staged = fetch_fileserver(reader, extract, staging_path)
+
+    else:
+        raise ValueError(f"{source_type.value} sources have no files to fetch, use tasks.extract_documents")
+
+    logger.info(f"============= fetch success, staged {len(staged)} files into {staging_path}")
+
+    return staged, next_marker
+
+def send_extracted_documents(
+        task_id: str,
+        data: Dict[str, Any],
+        source_type: DataSourceType,
+        collection_name: str,
+        serializable_result: List[Dict[str, Any]],
+        next_marker: Optional[str],
+        sync_markers: Optional[Dict[str, str]] = None,
+        sql_process_mode: Optional[str] = None
+    ) -> Dict[str, Any]:
+    try:
+        pyramid_result = send_add_documents_to_knowledge_pyramid(client=knowledge_pyramid_client, documents=serializable_result, collection_name=collection_name)
+        logger.info(f"Successfully sent {len(serializable_result)} documents to Knowledge Pyramid")
+    except Exception as e:
+        raise ValueError(f"KnowledgePyramidClient to send documents to data-services fail: {data}") from e
+
+    # Register the datasource for incremental sync, the vector ids are needed to delete stale documents later
+    if sync_markers is not None:
+        state = build_sync_state(collection_name, data, sql_process_mode, sync_markers, serializable_result, pyramid_result.get("vector_results") or [])
+        sql_sync_store.save(state)
+        logger.info(f"Registered {collection_name} for incremental sync, tables={len(sync_markers)}, documents={len(state.documents)}")
+
+    # The listing was cut at max_objects, continue after the last processed object in a new task
+    continuation_task_id = send_minio_continuation(data, next_marker) if next_marker else None
+
+    return {
+        "status": "success",
+        "task_id": task_id,
+        "descriptor": data.get('descriptor', {}),
+        "data": serializable_result,
+        "pyramid_result": pyramid_result,
+        "next_marker": next_marker,
+        "continuation_task_id": continuation_task_id,
+        "metadata": {
+            "source_type": source_type.value,
+            "processed_at": time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+    }
+
+def get_sync_markers(reader: Any, source_type: DataSourceType, data: Dict[str, Any]) -> Optional[Dict[str, str]]:
+    """Change markers of a SQL datasource that opted in with data['sync']['enabled'], None otherwise"""
+    sync_config = data.get('sync') or {}
+    if not sync_config.get('enabled', False):
+        return None
+    if source_type not in (DataSourceType.MYSQL, DataSourceType.POSTGRESQL):
+        logger.warning(f"Incremental sync is only supported for SQL datasources, got {source_type.value}")
+        return None
+    if not get_credential_ref(data):
+        # Checked before the ingest, the registration could not be synced without its credentials
+        raise ValueError("Incremental sync needs sync.credential_ref or source.authenticationRef, the datasource credentials are not stored")
+
+    tables = data.get('extract', {}).get('tables', [])
+    return reader.change_markers(tables or None, sync_config.get('watermark_columns'))
+
+@celery.task(name='tasks.sync_sql_sources', bind=True)
+def sync_sql_sources(self):
+    """Celery beat entry: check every registered SQL datasource in its own task"""
+    collections = sql_sync_store.list_collections()
+    queue = queue_llm if enable_pipeline == "enable" else 'dataset'
+    for collection_name in collections:
+        sync_sql_source.apply_async(args=[collection_name], queue=queue)
+
+    logger.info(f"sync_sql_sources, dispatched {len(collections)} sync tasks")
+    return {"status": "success", "collections": collections}
+
+@celery.task(name='tasks.sync_sql_source', bind=True, acks_late=True)
+def sync_sql_source(self, collection_name: str):
+    """
+    Refresh the documents of one SQL datasource whose tables changed since the last sync.
+    Only the stale documents are rebuilt, their old vectors are deleted once the new ones are stored.
+    """
+    if not sql_sync_store.acquire_lock(collection_name, ttl=max(sql_sync_interval, 60) * 4):
+        logger.info(f"sync_sql_source, {collection_name} is already being synced")
+        return {"status": "skipped", "collection": collection_name}
+
+    try:
+        state = sql_sync_store.load(collection_name)
+        if state is None:
+            return {"status": "skipped", "collection": collection_name}
+        sql_sync_store.touch(collection_name)
+
+        data = state.data
+        source_data = data.get('source', {})
+        descriptor = data.get('descriptor', {})
+        extract = data.get('extract', {})
+        source_type = DataSourceType(source_data.get('type'))
+
+        connection_metadata = {**source_data.get('metadata', {}), **resolve_credentials(state.credential_ref)}
+        reader = get_reader(source_type.value, get_connection_config(source_type, connection_metadata))
+        try:
+            markers = get_sync_markers(reader, source_type, data)
+            changed = changed_tables(state.markers, markers)
+            if not changed:
+                logger.info(f"sync_sql_source, {collection_name} has no changes")
+                return {"status": "success", "collection": collection_name, "changed_tables": []}
+
+            stale, refresh_tables = plan_refresh(state, changed, list(markers.keys()))
+            logger.info(f"sync_sql_source, {collection_name} changed_tables={changed}, stale_documents={len(stale)}, refresh_tables={refresh_tables}")
+
+            new_documents = []
+            if refresh_tables is None or refresh_tables:
+                refresh_extract = copy.deepcopy(extract)
+                if refresh_tables is not None:
+                    refresh_extract['tables'] = refresh_tables
+
+                result, _ = extract_source_documents(
+                    reader, source_type, descriptor, refresh_extract, data.get('prompts', {}),
+                    sql_process_mode=state.sql_process_mode, update_fingerprint=refresh_tables is None
+                )
+                new_documents = [item.dict() for item in result] if result else []
+        finally:
+            reader.close()
+
+        vector_ids = []
+        if new_documents:
+            pyramid_result = send_add_documents_to_knowledge_pyramid(client=knowledge_pyramid_client, documents=new_documents, collection_name=collection_name)
+            vector_ids = pyramid_result.get("vector_results") or []
+
+        # Built before the stale vectors are deleted, a response without one id per document stops the sync here
+        refreshed = build_sync_state(collection_name, data, state.sql_process_mode, markers, new_documents, vector_ids)
+
+        stale_vector_ids = [vector_id for i in stale for vector_id in state.documents[i].vector_ids]
+        if stale_vector_ids:
+            knowledge_pyramid_client.delete_by_ids(collection_name=collection_name, documents=stale_vector_ids)
+
+        stale_set = set(stale)
+        refreshed.documents = [doc for i, doc in enumerate(state.documents) if i not in stale_set] + refreshed.documents
+        sql_sync_store.save(refreshed)
+
+        return {
+            "status": "success",
+            "collection": collection_name,
+            "changed_tables": changed,
+            "refreshed_documents": len(new_documents),
+            "deleted_vectors": len(stale_vector_ids)
+        }
+
+    except Exception as e:
+        logger.error(f"sync_sql_source failed: {str(e)}", exc_info=True)
+        raise ValueError(f"sync_sql_source fail: {collection_name}, error={str(e)}") from e
+    finally:
+        sql_sync_store.release_lock(collection_name)
+
+def dispatch_ingestion(data: Dict[str, Any]) -> str:
+    """
+    Send an ingestion either as a single process_data task or as a pipeline:
+    file sources as fetch (io) -> parse (cpu) -> index (io), the download is network bound and the parsing CPU bound,
+    SQL sources as extract (llm) -> index (io), SQL extraction is dominated by LLM latency (fingerprints, summaries)
+    """
+    if enable_pipeline != "enable":
+        return process_data.apply_async(args=[data], queue='dataset').id
+
+    source_type = data.get('source', {}).get('type')
+    if source_type in (DataSourceType.MYSQL.value, DataSourceType.POSTGRESQL.value):
+        stages = [extract_documents.s(data).set(queue=queue_llm)]
+    else:
+        stages = [fetch_documents.s(data).set(queue=queue_io), parse_documents.s(data).set(queue=queue_cpu)]
+
+    async_result = chain(*stages, index_documents.s(data).set(queue=queue_io)).apply_async()
+    return async_result.id
+
 def apply_processing(data: List[DocumentModel], processing: Dict[str, Any]) ->List[DocumentModel]:
 
     cleaning_rules = processing.get('cleaning', [])
@@ -249,6 +653,33 @@ def apply_processing(data: List[DocumentModel], processing: Dict[str, Any]) ->Li
     
     return data
 
+def send_minio_shard_subtasks(reader: Any, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    extract = data.get('extract', {})
+    shards = reader.shard_prefixes(prefix=extract.get('prefix', ''))
+
+    subtasks = []
+    for shard in shards:
+        subtask_data = copy.deepcopy(data)
+        subtask_data['extract']['prefix'] = shard['prefix']
+        subtask_data['extract']['recursive'] = shard['recursive']
+        subtask_data['extract'].pop('split', None)
+        subtask_data['extract'].pop('start_after', None)
+
+        subtask_id = dispatch_ingestion(subtask_data)
+        subtasks.append({"task_id": subtask_id, "prefix": shard['prefix'], "recursive": shard['recursive']})
+
+    logger.info(f"Sent {len(subtasks)} minio shard subtasks for prefix '{extract.get('prefix', '')}'")
+    return subtasks
+
+def send_minio_continuation(data: Dict[str, Any], next_marker: str) -> str:
+    continuation_data = copy.deepcopy(data)
+    continuation_data['extract']['start_after'] = next_marker
+    continuation_data['extract'].pop('split', None)
+
+    continuation_task_id = dispatch_ingestion(continuation_data)
+    logger.info(f"Sent minio continuation task {continuation_task_id}, start_after={next_marker}")
+    return continuation_task_id
+
 def send_add_documents_to_knowledge_pyramid(client: KnowledgePyramidClient, documents: List[Dict[str, Any]], collection_name: str) -> Dict[str, Any]:
     try:
         create_collection_result = client.create_collection(
@@ -2,8 +2,48 @@
 
 set -e
 
-CONCURRENCY_OPTION="-c ${CELERY_WORKER_AMOUNT:-10}"
+# WORKER_PROFILE selects defaults for the staged pipeline queues (CELERY_PIPELINE=enable):
+#   io  - file downloads, data-services calls, metadata and deletes: gevent, high concurrency, some prefetch
+#   cpu - file parsing: prefork, one process per core, no prefetch
+#   llm - SQL fingerprinting and summaries: gevent, bounded by LLM rate limits, no prefetch
+# Without a profile the worker consumes the single dataset queue as before.
+# CELERY_WORKER_CLASS, CELERY_WORKER_AMOUNT, CELERY_PREFETCH_MULTIPLIER and CELERY_QUEUES override the profile.
+case "${WORKER_PROFILE:-}" in
+  io)
+    DEFAULT_POOL=gevent
+    DEFAULT_CONCURRENCY=100
+    DEFAULT_PREFETCH=4
+    DEFAULT_QUEUES=${CELERY_QUEUE_IO:-io}
+    ;;
+  cpu)
+    DEFAULT_POOL=prefork
+    DEFAULT_CONCURRENCY=$(nproc)
+    DEFAULT_PREFETCH=1
+    DEFAULT_QUEUES=${CELERY_QUEUE_CPU:-cpu}
+    ;;
+  llm)
+    DEFAULT_POOL=gevent
+    DEFAULT_CONCURRENCY=20
+    DEFAULT_PREFETCH=1
+    DEFAULT_QUEUES=${CELERY_QUEUE_LLM:-llm}
+    ;;
+  *)
+    DEFAULT_POOL=gevent
+    DEFAULT_CONCURRENCY=10
+    DEFAULT_PREFETCH=1
+    DEFAULT_QUEUES=dataset
+    ;;
+esac
 
-exec celery -A data_sinkers.tasks worker -P ${CELERY_WORKER_CLASS:-gevent} $CONCURRENCY_OPTION \
+CONCURRENCY_OPTION="-c ${CELERY_WORKER_AMOUNT:-$DEFAULT_CONCURRENCY}"
+
+# Embedded beat for the incremental SQL sync schedule, enable it on exactly one worker
+BEAT_OPTION=""
+if [ "${CELERY_BEAT:-disable}" = "enable" ]; then
+  BEAT_OPTION="-B"
+fi
+
+exec celery -A data_sinkers.tasks worker -P ${CELERY_WORKER_CLASS:-$DEFAULT_POOL} $CONCURRENCY_OPTION $BEAT_OPTION \
+  --prefetch-multiplier ${CELERY_PREFETCH_MULTIPLIER:-$DEFAULT_PREFETCH} \
   --max-tasks-per-child ${MAX_TASKS_PRE_CHILD:-50} --loglevel ${LOG_LEVEL:-INFO} \
-  -Q ${CELERY_QUEUES:-dataset}
\ No newline at end of file
+  -Q ${CELERY_QUEUES:-$DEFAULT_QUEUES}
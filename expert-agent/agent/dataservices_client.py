@@ -19,6 +19,7 @@ class SearchRequest:
     limit: int = 5
     hybrid_threshold: float = 0.1
     memory_threshold: float = 0.1
+    metadata_filter: Optional[Dict[str, Any]] = None
     extra_params: Optional[Dict[str, Any]] = None
 
 # vector api
@@ -221,6 +222,7 @@ class DataServicesClient:
         limit: int = 5,
         hybrid_threshold: float = 0.1,
         memory_threshold: float = 0.1,
+        metadata_filter: Optional[Dict[str, Any]] = None,
         **extra_params
     ) -> SearchResult:
         """
@@ -233,6 +235,7 @@ class DataServicesClient:
             limit: Number of results to return
             hybrid_threshold: Hybrid search threshold
             memory_threshold: Memory threshold
+            metadata_filter: Filter on document metadata applied by data-services, e.g. {"datasource": "mysql"}
             **extra_params: Additional parameters
         
         Returns:
@@ -245,6 +248,7 @@ class DataServicesClient:
             limit=limit,
             hybrid_threshold=hybrid_threshold,
             memory_threshold=memory_threshold,
+            metadata_filter=metadata_filter,
             extra_params=extra_params
         )
         return await self._search(request_data)
@@ -257,6 +261,7 @@ class DataServicesClient:
         limit: int = 5,
         hybrid_threshold: float = 0.1,
         memory_threshold: float = 0.1,
+        metadata_filter: Optional[Dict[str, Any]] = None,
         **extra_params
     ) -> MultiSearchResult:
         """
@@ -269,6 +274,7 @@ class DataServicesClient:
             limit: Number of results to return per collection
             hybrid_threshold: Hybrid search threshold
             memory_threshold: Memory threshold
+            metadata_filter: Filter on document metadata, applied to every collection
             **extra_params: Additional parameters
         
         Returns:
@@ -281,6 +287,65 @@ class DataServicesClient:
         if not collection_names:
             raise ValueError("collection_names Cannot be empty")
         
+        payload = {
+            "collection_names": collection_names,
+            "query": query,
+            "search_type": search_type,
+            "limit": limit,
+            "hybrid_threshold": hybrid_threshold,
+            "memory_threshold": memory_threshold,
+            "merge": "grouped"
+        }
+        if metadata_filter:
+            payload["metadata_filter"] = metadata_filter
+        if extra_params:
+            payload.update(extra_params)
+
+        # One request embeds the query once and searches the collections concurrently on the server
+        try:
+            response_data = await self._multi_search(payload)
+        except Exception as e:
+            # Same outcome as every collection failing, the caller gets empty knowledge
+            logger.error(f"Collections {collection_names} search fail: {str(e)}")
+            return MultiSearchResult(results={name: None for name in collection_names}, all_content="")
+        if response_data is None:
+            return await self._search_collections_one_by_one(
+                collection_names, query, search_type, limit, hybrid_threshold, memory_threshold, metadata_filter, **extra_params
+            )
+
+        for collection_name, error in response_data.get('failed', {}).items():
+            logger.error(f"Collection {collection_name} search fail: {error}")
+        for collection_name in response_data.get('timed_out', []):
+            logger.warning(f"Collection {collection_name} search timed out, results may be incomplete")
+
+        results = {}
+        all_contents = []
+        collection_results = response_data.get('results', {})
+        for collection_name in collection_names:
+            if collection_name in collection_results:
+                result = self._parse_search_response(collection_results[collection_name])
+                results[collection_name] = result
+                all_contents.append(result.extract_content_as_string())
+            else:
+                results[collection_name] = None
+
+        return MultiSearchResult(
+            results=results,
+            all_content="\n".join(all_contents)
+        )
+
+    async def _search_collections_one_by_one(
+        self,
+        collection_names: List[str],
+        query: str,
+        search_type: str,
+        limit: int,
+        hybrid_threshold: float,
+        memory_threshold: float,
+        metadata_filter: Optional[Dict[str, Any]],
+        **extra_params
+    ) -> MultiSearchResult:
+        # data-services versions without /knowledge_pyramid/multi_search
         results = {}
         all_contents = []
 
@@ -293,6 +358,7 @@ class DataServicesClient:
                     limit=limit,
                     hybrid_threshold=hybrid_threshold,
                     memory_threshold=memory_threshold,
+                    metadata_filter=metadata_filter,
                     **extra_params
                 )
                 results[collection_name] = result
@@ -308,6 +374,44 @@ class DataServicesClient:
             results=results,
             all_content=all_content
         )
+
+    async def _multi_search(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Execute a multi-collection search request
+
+        Returns:
+            Dict: Response data, None when the server has no multi-collection endpoint
+        """
+        url = f"{self.base_url}/knowledge_pyramid/multi_search"
+
+        try:
+            await self._create_session()
+
+            async with self.session.post(url, json=payload) as response:
+                response_text = await response.text()
+
+                if response.status == 404:
+                    logger.warning("data-services has no multi_search endpoint, searching collections one by one")
+                    return None
+                if response.status == 200:
+                    try:
+                        return await response.json()
+                    except json.JSONDecodeError:
+                        logger.error(f"JSON parse fail: {response_text}")
+                        raise ValueError(f"JSON parse fail: {response_text}")
+                else:
+                    error_msg = f"HTTP error: {response.status}, response: {response_text}"
+                    logger.error(error_msg)
+                    raise ValueError(error_msg)
+
+        except aiohttp.ClientError as e:
+            error_msg = f"network request error: {str(e)}"
+            logger.error(error_msg)
+            raise ConnectionError(error_msg)
+        except asyncio.TimeoutError:
+            error_msg = f"request timeout: {self.timeout} seconds"
+            logger.error(error_msg)
+            raise TimeoutError(error_msg)
     
     async def _search(self, request: SearchRequest) -> SearchResult:
         """
@@ -330,6 +434,9 @@ class DataServicesClient:
             "memory_threshold": request.memory_threshold
         }
 
+        if request.metadata_filter:
+            payload["metadata_filter"] = request.metadata_filter
+
         if request.extra_params:
             payload.update(request.extra_params)
         
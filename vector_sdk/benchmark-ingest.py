@@ -0,0 +1,88 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+
+# vector_config reads the PGVECTOR_* environment at import time
+os.environ.setdefault('PGVECTOR_HOST', '192.168.xxx.xxx')
+os.environ.setdefault('PGVECTOR_PORT', '5433')
+os.environ.setdefault('PGVECTOR_USER', 'postgres')
+os.environ.setdefault('PGVECTOR_PASSWORD', 'postgres')
+os.environ.setdefault('PGVECTOR_DATABASE', 'knowledge_vector')
+
+from vector_sdk import Document
+from vector_sdk.pgvector.pgvector import PGVectorFactory, PGPoolManager
+
+
+def build_documents(rows: int, dimension: int):
+    documents = []
+    embeddings = []
+    for i in range(rows):
+        documents.append(
+            Document(
+                page_content=f"benchmark chunk {i} " + "lorem ipsum dolor sit amet " * 20,
+                metadata={"doc_id": str(uuid.uuid4()), "document_id": f"bench-{i // 100}"}
+            )
+        )
+        embeddings.append([random.uniform(-1, 1) for _ in range(dimension)])
+    return documents, embeddings
+
+
+async def run(mode: str, rows: int, dimension: int, batch_size: int, defer_index: bool):
+    collection_name = f"bench_ingest_{mode}_{uuid.uuid4().hex[:8]}"
+    vector = PGVectorFactory().init_vector(collection_name, [], None)
+
+    documents, embeddings = build_documents(rows, dimension)
+    await vector.acreate(texts=documents[:1], embeddings=embeddings[:1], defer_index=defer_index)
+
+    start = time.perf_counter()
+    try:
+        for i in range(0, rows, batch_size):
+            batch_documents = documents[i:i + batch_size]
+            batch_embeddings = embeddings[i:i + batch_size]
+            if mode == "copy":
+                # A multi batch load manages the index itself, see --defer-index
+                await vector.abulk_add_texts(documents=batch_documents, embeddings=batch_embeddings, defer_index=False)
+            else:
+                await vector.aadd_texts(documents=batch_documents, embeddings=batch_embeddings)
+        load_seconds = time.perf_counter() - start
+
+        index_seconds = 0.0
+        if defer_index:
+            index_start = time.perf_counter()
+            await vector.acreate_vector_index()
+            index_seconds = time.perf_counter() - index_start
+
+        total_seconds = time.perf_counter() - start
+        print(
+            f"mode={mode} rows={rows} dimension={dimension} batch_size={batch_size} defer_index={defer_index} "
+            f"load={load_seconds:.2f}s index={index_seconds:.2f}s total={total_seconds:.2f}s "
+            f"throughput={rows / total_seconds:.0f} rows/s"
+        )
+        print(f"pool stats: {PGPoolManager.get_stats()['async']}")
+    finally:
+        await vector.adelete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare executemany and binary COPY ingest into a pgvector collection")
+    parser.add_argument("--mode", choices=["executemany", "copy", "both"], default="both")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--dimension", type=int, default=1024)
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--defer-index", action="store_true", help="create the HNSW index after the load")
+    args = parser.parse_args()
+
+    modes = ["executemany", "copy"] if args.mode == "both" else [args.mode]
+
+    async def run_all():
+        for mode in modes:
+            await run(mode, args.rows, args.dimension, args.batch_size, args.defer_index)
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
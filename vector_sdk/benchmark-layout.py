@@ -0,0 +1,154 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+import uuid
+
+# vector_config reads the PGVECTOR_* environment at import time
+os.environ.setdefault('PGVECTOR_HOST', '192.168.xxx.xxx')
+os.environ.setdefault('PGVECTOR_PORT', '5433')
+os.environ.setdefault('PGVECTOR_USER', 'postgres')
+os.environ.setdefault('PGVECTOR_PASSWORD', 'postgres')
+os.environ.setdefault('PGVECTOR_DATABASE', 'knowledge_vector')
+
+from vector_sdk import Document
+from vector_sdk.pgvector.pgvector import PGVectorFactory
+
+
+def random_vector(dimension: int) -> list[float]:
+    return [random.uniform(-1, 1) for _ in range(dimension)]
+
+
+def build_documents(rows: int, dimension: int):
+    documents = []
+    embeddings = []
+    for i in range(rows):
+        documents.append(
+            Document(
+                page_content=f"benchmark chunk {i} " + "lorem ipsum dolor sit amet " * 20,
+                metadata={"doc_id": str(uuid.uuid4()), "document_id": f"bench-{i // 100}"}
+            )
+        )
+        embeddings.append(random_vector(dimension))
+    return documents, embeddings
+
+
+def percentiles(latencies: list[float]) -> str:
+    cuts = statistics.quantiles([latency * 1000 for latency in latencies], n=100)
+    return f"p50={cuts[49]:.1f}ms p95={cuts[94]:.1f}ms p99={cuts[98]:.1f}ms"
+
+
+async def catalog_footprint(vector) -> tuple:
+    """Relations and on-disk bytes of the whole database, compared before and after the load"""
+    conn = await vector._get_async_connection()
+    try:
+        relations = await conn.fetchval("SELECT count(*) FROM pg_class")
+        size = await conn.fetchval("SELECT pg_database_size(current_database())")
+        return relations, size
+    finally:
+        await vector._release_async_connection(conn)
+
+
+async def exact_ids(vector, query_vector: list[float], k: int) -> set:
+    """Ground truth, the same query with index scans disabled"""
+    vector_str = "[" + ",".join(map(str, query_vector)) + "]"
+    where_clause = "WHERE collection = $2" if vector._row_key else ""
+    args = [vector_str, *vector._row_key.values()]
+    conn = await vector._get_async_connection()
+    try:
+        async with conn.transaction():
+            await conn.execute("SET LOCAL enable_indexscan = off")
+            records = await conn.fetch(
+                f"SELECT meta->>'doc_id' FROM {vector.table_name} {where_clause} ORDER BY embedding <=> $1::vector LIMIT {k}",
+                *args
+            )
+        return {record[0] for record in records}
+    finally:
+        await vector._release_async_connection(conn)
+
+
+async def run(layout: str, args):
+    factory = PGVectorFactory()
+    prefix = f"bench_layout_{layout}_{uuid.uuid4().hex[:8]}"
+    # Collection sizes are skewed like real tenants: a few large collections and many small ones
+    sizes = [max(1, int(args.rows * random.paretovariate(1.5) / 3)) for _ in range(args.collections)]
+    vectors = [factory.init_vector(f"{prefix}_{i}", [], None, layout=layout) for i in range(args.collections)]
+
+    relations_before, size_before = await catalog_footprint(vectors[0])
+    try:
+        start = time.perf_counter()
+        for vector, rows in zip(vectors, sizes):
+            documents, embeddings = build_documents(rows, args.dimension)
+            await vector.acreate(texts=documents[:1], embeddings=embeddings[:1])
+            await vector.abulk_add_texts(documents=documents, embeddings=embeddings, defer_index=False)
+        load_seconds = time.perf_counter() - start
+
+        relations_after, size_after = await catalog_footprint(vectors[0])
+        print(
+            f"\nlayout={layout} collections={args.collections} rows={sum(sizes)} "
+            f"(min={min(sizes)} max={max(sizes)}) dimension={args.dimension}"
+        )
+        print(
+            f"load={load_seconds:.2f}s relations=+{relations_after - relations_before} "
+            f"size=+{(size_after - size_before) / 1024 / 1024:.1f}MB"
+        )
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies = []
+        recalls = []
+
+        async def run_one():
+            vector = random.choice(vectors)
+            query_vector = random_vector(args.dimension)
+            async with semaphore:
+                query_start = time.perf_counter()
+                docs = await vector.asearch_by_vector(query_vector, top_k=args.k, ef_search=args.ef_search)
+                latencies.append(time.perf_counter() - query_start)
+            relevant = await exact_ids(vector, query_vector, args.k)
+            retrieved = {doc.metadata.get("doc_id") for doc in docs}
+            recalls.append(len(retrieved & relevant) / len(relevant) if relevant else 1.0)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_one() for _ in range(args.queries)))
+        search_seconds = time.perf_counter() - start
+        print(
+            f"search queries={args.queries} concurrency={args.concurrency} {percentiles(latencies)} "
+            f"qps={args.queries / search_seconds:.0f} recall@{args.k}={statistics.mean(recalls):.4f}"
+        )
+    finally:
+        if not args.keep:
+            start = time.perf_counter()
+            for vector in vectors:
+                await vector.adelete()
+            print(f"delete={time.perf_counter() - start:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the table-per-collection and shared partitioned pgvector layouts")
+    parser.add_argument("--layout", choices=["table", "shared", "both"], default="both")
+    parser.add_argument("--collections", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=1000, help="typical rows per collection, sizes follow a Pareto distribution")
+    parser.add_argument("--dimension", type=int, default=256)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--ef-search", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--keep", action="store_true", help="keep the benchmark collections")
+    args = parser.parse_args()
+
+    layouts = ["table", "shared"] if args.layout == "both" else [args.layout]
+
+    async def run_all():
+        for layout in layouts:
+            # Same collection sizes for both layouts
+            random.seed(args.seed)
+            await run(layout, args)
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
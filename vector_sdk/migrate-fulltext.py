@@ -0,0 +1,65 @@
+import argparse
+import asyncio
+import os
+
+# vector_config reads the PGVECTOR_* environment at import time
+os.environ.setdefault('PGVECTOR_HOST', '192.168.xxx.xxx')
+os.environ.setdefault('PGVECTOR_PORT', '5433')
+os.environ.setdefault('PGVECTOR_USER', 'postgres')
+os.environ.setdefault('PGVECTOR_PASSWORD', 'postgres')
+os.environ.setdefault('PGVECTOR_DATABASE', 'knowledge_vector')
+
+from vector_sdk.pgvector.pgvector import PGVectorFactory
+
+
+async def list_collections(vector) -> list:
+    conn = await vector._get_async_connection()
+    try:
+        # Collection tables only, the embedding_cache side table shares the prefix but has no text column
+        records = await conn.fetch(
+            """SELECT t.tablename FROM pg_catalog.pg_tables t
+            WHERE t.schemaname = 'public' AND t.tablename LIKE 'embedding\\_%'
+            AND EXISTS (
+                SELECT 1 FROM information_schema.columns c
+                WHERE c.table_schema = 'public' AND c.table_name = t.tablename AND c.column_name = 'meta'
+            )
+            ORDER BY t.tablename"""
+        )
+        return [record["tablename"][len("embedding_"):] for record in records]
+    finally:
+        await vector._release_async_connection(conn)
+
+
+async def migrate(collections: list, dry_run: bool):
+    factory = PGVectorFactory()
+    if not collections:
+        collections = await list_collections(factory.init_vector("migrate_fulltext", [], None))
+
+    for collection_name in collections:
+        vector = factory.init_vector(collection_name, [], None)
+        if dry_run:
+            conn = await vector._get_async_connection()
+            try:
+                migrated = await vector._atsv_column_exists(conn)
+            finally:
+                await vector._release_async_connection(conn)
+            print(f"{collection_name}: {'migrated' if migrated else 'needs migration'}")
+            continue
+
+        changed = await vector.amigrate_full_text()
+        # IF NOT EXISTS makes this a no-op on collections that have the index
+        await vector.acreate_metadata_index()
+        print(f"{collection_name}: {'migrated' if changed else 'already migrated'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Add the stored tsvector column and the text and metadata GIN indexes to existing pgvector collections")
+    parser.add_argument("collections", nargs="*", help="collection names, default every embedding_* table")
+    parser.add_argument("--dry-run", action="store_true", help="only report which collections need migration")
+    args = parser.parse_args()
+
+    asyncio.run(migrate(args.collections, args.dry_run))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+import argparse
+import asyncio
+import os
+
+# vector_config reads the PGVECTOR_* environment at import time
+os.environ.setdefault('PGVECTOR_HOST', '192.168.xxx.xxx')
+os.environ.setdefault('PGVECTOR_PORT', '5433')
+os.environ.setdefault('PGVECTOR_USER', 'postgres')
+os.environ.setdefault('PGVECTOR_PASSWORD', 'postgres')
+os.environ.setdefault('PGVECTOR_DATABASE', 'knowledge_vector')
+
+import asyncpg
+
+from vector_sdk.pgvector.pgvector import PGVectorFactory
+
+
+async def table_collections(vector) -> list:
+    conn = await vector._get_async_connection()
+    try:
+        # Collection tables only, the embedding_cache side table shares the prefix but has no meta column
+        records = await conn.fetch(
+            """SELECT t.tablename FROM pg_catalog.pg_tables t
+            WHERE t.schemaname = 'public' AND t.tablename LIKE 'embedding\\_%'
+            AND EXISTS (
+                SELECT 1 FROM information_schema.columns c
+                WHERE c.table_schema = 'public' AND c.table_name = t.tablename AND c.column_name = 'meta'
+            )
+            ORDER BY t.tablename"""
+        )
+        return [record["tablename"][len("embedding_"):] for record in records]
+    finally:
+        await vector._release_async_connection(conn)
+
+
+async def shared_collections(vector) -> list:
+    conn = await vector._get_async_connection()
+    try:
+        records = await conn.fetch("SELECT name FROM vector_collections ORDER BY name")
+        return [record["name"] for record in records]
+    except asyncpg.UndefinedTableError:
+        return []
+    finally:
+        await vector._release_async_connection(conn)
+
+
+async def count_rows(vector, sql: str, *args) -> int:
+    conn = await vector._get_async_connection()
+    try:
+        return await conn.fetchval(sql, *args)
+    finally:
+        await vector._release_async_connection(conn)
+
+
+async def to_shared(factory, collection_name: str, dry_run: bool, drop_source: bool):
+    source = factory.init_vector(collection_name, [], None, layout="table")
+    target = factory.init_vector(collection_name, [], None, layout="shared")
+
+    source_rows = await count_rows(source, f"SELECT count(*) FROM {source.table_name}")
+    if dry_run:
+        print(f"{collection_name}: {source_rows} rows in {source.table_name}")
+        return
+
+    conn = await source._get_async_connection()
+    try:
+        dimension = await source._adimension(conn)
+        index_config = await source._aload_index_config(conn)
+    finally:
+        await source._release_async_connection(conn)
+
+    # Keeps the settings of an existing shared table
+    await target._acreate_collection(dimension, index_config=index_config)
+    conn = await target._get_async_connection()
+    try:
+        await conn.execute(
+            f"""INSERT INTO {target.table_name} (collection, id, text, meta, embedding)
+            SELECT $1, id, text, meta, embedding FROM {source.table_name}
+            ON CONFLICT (collection, id) DO NOTHING""",
+            collection_name
+        )
+    finally:
+        await target._release_async_connection(conn)
+
+    target_rows = await count_rows(target, f"SELECT count(*) FROM {target.table_name} WHERE collection = $1", collection_name)
+    print(f"{collection_name}: {source_rows} rows -> {target_rows} rows in {target.table_name}")
+    if drop_source:
+        if target_rows < source_rows:
+            print(f"{collection_name}: row count mismatch, keeping {source.table_name}")
+        else:
+            await source.adelete()
+
+
+async def to_table(factory, collection_name: str, dry_run: bool, drop_source: bool):
+    source = factory.init_vector(collection_name, [], None, layout="shared")
+    target = factory.init_vector(collection_name, [], None, layout="table")
+
+    if not await source._aresolve():
+        print(f"{collection_name}: not found in vector_collections")
+        return
+    source_rows = await count_rows(source, f"SELECT count(*) FROM {source.table_name} WHERE collection = $1", collection_name)
+    if dry_run:
+        print(f"{collection_name}: {source_rows} rows in {source.table_name}")
+        return
+
+    conn = await source._get_async_connection()
+    try:
+        index_config = await source._aload_index_config(conn)
+    finally:
+        await source._release_async_connection(conn)
+
+    # Loading before building the index is much faster than maintaining it row by row
+    await target._acreate_collection(source.dimension, create_index=False, index_config=index_config)
+    conn = await target._get_async_connection()
+    try:
+        await conn.execute(
+            f"""INSERT INTO {target.table_name} (id, text, meta, embedding)
+            SELECT id, text, meta, embedding FROM {source.table_name} WHERE collection = $1
+            ON CONFLICT (id) DO NOTHING""",
+            collection_name
+        )
+    finally:
+        await target._release_async_connection(conn)
+    await target.acreate_vector_index()
+
+    target_rows = await count_rows(target, f"SELECT count(*) FROM {target.table_name}")
+    print(f"{collection_name}: {source_rows} rows -> {target_rows} rows in {target.table_name}")
+    if drop_source:
+        if target_rows < source_rows:
+            print(f"{collection_name}: row count mismatch, keeping the rows in {source.table_name}")
+        else:
+            await source.adelete()
+
+
+async def migrate(to: str, collections: list, dry_run: bool, drop_source: bool):
+    factory = PGVectorFactory()
+    if not collections:
+        if to == "shared":
+            collections = await table_collections(factory.init_vector("migrate_layout", [], None, layout="table"))
+        else:
+            collections = await shared_collections(factory.init_vector("migrate_layout", [], None, layout="table"))
+
+    for collection_name in collections:
+        if to == "shared":
+            await to_shared(factory, collection_name, dry_run, drop_source)
+        else:
+            await to_table(factory, collection_name, dry_run, drop_source)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Copy pgvector collections between the table and shared storage layouts")
+    parser.add_argument("--to", choices=["shared", "table"], required=True, help="target layout")
+    parser.add_argument("collections", nargs="*", help="collection names, default every collection of the source layout")
+    parser.add_argument("--dry-run", action="store_true", help="only list the collections and their row counts")
+    parser.add_argument("--drop-source", action="store_true", help="delete a collection from the source layout once its rows are copied")
+    args = parser.parse_args()
+
+    asyncio.run(migrate(args.to, args.collections, args.dry_run, args.drop_source))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,9 @@
 from .vector_factory import Vector
 from .base import Document
 from .cached_embedding import CacheEmbedding
+from .embedding_cache import EmbeddingCache, get_default_embedding_cache
 
 
 __all__ = [
-    "Vector","Document","CacheEmbedding"
+    "Vector","Document","CacheEmbedding","EmbeddingCache","get_default_embedding_cache"
 ]
\ No newline at end of file
@@ -2,6 +2,7 @@ import logging
 from typing import Any, Optional
 from sqlalchemy.exc import IntegrityError
 from langchain_core.embeddings import Embeddings
+from .embedding_cache import EmbeddingCache, embedding_cache_key, get_default_embedding_cache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -11,25 +12,119 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+_DEFAULT_CACHE = object()
+
+
+# Settings that change the vectors a model returns, credentials are left out
+_IDENTITY_KEYS = ("model", "model_name", "deployment", "azure_deployment", "dimensions", "base_url", "openai_api_base", "azure_endpoint")
+
+
+def _model_identity(model_instance: Embeddings) -> str:
+    """Class, provider and the model settings, so two models or endpoints never share cache entries"""
+    # Wrappers such as batching front ends expose the model they delegate to
+    model_instance = getattr(model_instance, "wrapped_model", model_instance)
+    parts = [type(model_instance).__name__]
+    provider = getattr(model_instance, "provider", None)
+    if provider is not None:
+        parts.append(f"provider={provider}")
+    # The model_sdk wrappers keep the model settings in model_kwargs, langchain classes as attributes
+    model_kwargs = getattr(model_instance, "model_kwargs", None)
+    if not isinstance(model_kwargs, dict):
+        model_kwargs = {}
+    for key in _IDENTITY_KEYS:
+        value = model_kwargs.get(key)
+        if value is None:
+            value = getattr(model_instance, key, None)
+        if value is not None:
+            parts.append(f"{key}={value}")
+    return "|".join(parts)
+
 
 class CacheEmbedding(Embeddings):
-    def __init__(self, model_instance: Embeddings, user: Optional[str] = None) -> None:
+    def __init__(
+        self,
+        model_instance: Embeddings,
+        user: Optional[str] = None,
+        cache: Any = _DEFAULT_CACHE,
+        model_key: Optional[str] = None
+    ) -> None:
+        """
+        Args:
+            model_instance: Embedding model
+            user: Caller identity, not part of the cache key
+            cache: EmbeddingCache to use, defaults to the process wide cache from EMBEDDING_CACHE_BACKEND, None disables caching
+            model_key: Overrides the model identity derived from the model instance
+        """
         self._model_instance = model_instance
         self._user = user
+        self._cache: Optional[EmbeddingCache] = get_default_embedding_cache() if cache is _DEFAULT_CACHE else cache
+        self._model_key = model_key or _model_identity(model_instance)
+
+    def _keys(self, kind: str, texts: list[str]) -> list[str]:
+        return [embedding_cache_key(self._model_key, kind, text) for text in texts]
+
+    def _plan(self, keys: list[str], texts: list[str], found: dict) -> tuple[list[str], list[str]]:
+        """Unique missing keys and their texts in first-seen order"""
+        missing_keys = []
+        missing_texts = []
+        seen = set()
+        for key, text in zip(keys, texts):
+            if key in found or key in seen:
+                continue
+            seen.add(key)
+            missing_keys.append(key)
+            missing_texts.append(text)
+        return missing_keys, missing_texts
+
+    def _record(self, texts: list[str], keys: list[str], found: dict, persistent_hits: int, missing_keys: list[str]):
+        unique = len(set(keys))
+        self._cache.stats.record(
+            requests=len(texts),
+            memory_hits=len(found) - persistent_hits,
+            persistent_hits=persistent_hits,
+            misses=len(missing_keys),
+            batch_duplicates=len(texts) - unique
+        )
 
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
-        """Embed search docs in batches of 10."""
+        """Embed search docs, only unique cache misses are sent to the model."""
         try:
-            return self._model_instance.embed_documents(texts)
+            if self._cache is None or not texts:
+                return self._model_instance.embed_documents(texts)
+
+            keys = self._keys("document", texts)
+            found, persistent_hits = self._cache.lookup(list(dict.fromkeys(keys)))
+            missing_keys, missing_texts = self._plan(keys, texts, found)
+            self._record(texts, keys, found, persistent_hits, missing_keys)
+
+            if missing_texts:
+                embedded = dict(zip(missing_keys, self._model_instance.embed_documents(missing_texts)))
+                self._cache.store(embedded)
+                found.update(embedded)
+
+            return [found[key] for key in keys]
         except Exception as ex:
             logging.exception(f"Failed to async embed documents texts")
             raise ex
 
 
     async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
-        """Async embed search docs in batches of 10."""
+        """Async embed search docs, only unique cache misses are sent to the model."""
         try:
-            return await self._model_instance.aembed_documents(texts)
+            if self._cache is None or not texts:
+                return await self._model_instance.aembed_documents(texts)
+
+            keys = self._keys("document", texts)
+            found, persistent_hits = await self._cache.alookup(list(dict.fromkeys(keys)))
+            missing_keys, missing_texts = self._plan(keys, texts, found)
+            self._record(texts, keys, found, persistent_hits, missing_keys)
+
+            if missing_texts:
+                embedded = dict(zip(missing_keys, await self._model_instance.aembed_documents(missing_texts)))
+                await self._cache.astore(embedded)
+                found.update(embedded)
+
+            return [found[key] for key in keys]
         except Exception as ex:
             logging.exception(f"Failed to async embed documents text")
             raise ex
@@ -38,7 +133,18 @@ class CacheEmbedding(Embeddings):
     def embed_query(self, text: str) -> list[float]:
         """Embed query text."""
         try:
-            return self._model_instance.embed_query(text)
+            if self._cache is None:
+                return self._model_instance.embed_query(text)
+
+            key = embedding_cache_key(self._model_key, "query", text)
+            found, persistent_hits = self._cache.lookup([key])
+            self._record([text], [key], found, persistent_hits, [] if found else [key])
+            if key in found:
+                return found[key]
+
+            embedding = self._model_instance.embed_query(text)
+            self._cache.store({key: embedding})
+            return embedding
         except Exception as ex:
             logging.exception(f"Failed to embed query text '{text[:10]}...({len(text)} chars)'")
             raise ex
@@ -47,7 +153,22 @@ class CacheEmbedding(Embeddings):
     async def aembed_query(self, text: str) -> list[float]:
         """Async embed query text."""
         try:
-            return await self._model_instance.aembed_query(text)
+            if self._cache is None:
+                return await self._model_instance.aembed_query(text)
+
+            key = embedding_cache_key(self._model_key, "query", text)
+            found, persistent_hits = await self._cache.alookup([key])
+            self._record([text], [key], found, persistent_hits, [] if found else [key])
+            if key in found:
+                return found[key]
+
+            embedding = await self._model_instance.aembed_query(text)
+            await self._cache.astore({key: embedding})
+            return embedding
         except Exception as ex:
             logging.exception(f"Failed to async embed query text '{text[:10]}...({len(text)} chars)'")
             raise ex
+
+    def cache_stats(self) -> Optional[dict]:
+        """Hit and miss counters of the cache behind this embedding, None when caching is disabled"""
+        return self._cache.get_stats() if self._cache is not None else None
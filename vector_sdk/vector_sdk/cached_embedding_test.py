@@ -0,0 +1,185 @@
+import os
+import sys
+import asyncio
+import tempfile
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+sys.path.insert(0, project_root)
+sys.path.insert(0, os.path.join(os.path.dirname(project_root), "model_sdk"))
+from model_sdk.models.openai_compatible.embedding import OpenAICompatibleEmbedding
+from model_sdk.models.dashscope.embedding import DashScopeEmbedding
+from model_sdk.models.azure.embedding import AzureOpenAIEmbedding
+from vector_sdk.cached_embedding import CacheEmbedding
+from vector_sdk.embedding_cache import EmbeddingCache, LRUEmbeddingStore, SQLiteEmbeddingStore
+
+
+class CountingEmbeddings:
+    """Embedding model that records the texts it was asked to embed"""
+
+    def __init__(self, model="test-model"):
+        self.model = model
+        self.calls = []
+
+    def _embed(self, text):
+        return [float(len(text)), float(sum(map(ord, text)) % 97)]
+
+    def embed_documents(self, texts):
+        self.calls.append(list(texts))
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        self.calls.append([text])
+        return self._embed(text)
+
+    async def aembed_documents(self, texts):
+        return self.embed_documents(texts)
+
+    async def aembed_query(self, text):
+        return self.embed_query(text)
+
+
+class FailingStore:
+    def get_many(self, keys):
+        raise RuntimeError("store unavailable")
+
+    def put_many(self, items):
+        raise RuntimeError("store unavailable")
+
+
+def test_batch_duplicates_embedded_once():
+    model = CountingEmbeddings()
+    embedding = CacheEmbedding(model, cache=EmbeddingCache(max_size=100))
+    result = embedding.embed_documents(["a", "bb", "a"])
+    assert model.calls == [["a", "bb"]]
+    assert result[0] == result[2] == model._embed("a")
+
+    embedding.embed_documents(["bb", "ccc"])
+    assert model.calls[-1] == ["ccc"]
+    stats = embedding.cache_stats()
+    assert stats["requests"] == 5 and stats["batch_duplicates"] == 1
+    assert stats["misses"] == 3 and stats["memory_hits"] == 1
+    assert stats["hit_rate"] == 0.25
+    print("✓ duplicates and cached texts are not sent to the model")
+
+
+def test_query_and_model_in_key():
+    cache = EmbeddingCache(max_size=100)
+    model = CountingEmbeddings()
+    embedding = CacheEmbedding(model, cache=cache)
+    embedding.embed_documents(["a"])
+    # Queries and documents are cached separately
+    embedding.embed_query("a")
+    embedding.embed_query("a")
+    assert model.calls == [["a"], ["a"]]
+
+    # Another model never reads the entries of the first one
+    other = CountingEmbeddings(model="other-model")
+    CacheEmbedding(other, cache=cache).embed_documents(["a"])
+    assert other.calls == [["a"]]
+    print("✓ the cache key covers the model and the query/document kind")
+
+
+def test_model_sdk_wrappers_in_key():
+    def model_key(model_instance):
+        return CacheEmbedding(model_instance, cache=None)._model_key
+
+    small = model_key(OpenAICompatibleEmbedding("openai", model="text-embedding-3-small", base_url="http://llm-a/v1", api_key="k1"))
+    keys = {
+        small,
+        model_key(OpenAICompatibleEmbedding("openai", model="bge-m3", base_url="http://llm-a/v1", api_key="k1")),
+        model_key(OpenAICompatibleEmbedding("openai", model="text-embedding-3-small", base_url="http://llm-b/v1", api_key="k1")),
+        model_key(OpenAICompatibleEmbedding("openai", model="text-embedding-3-small", base_url="http://llm-a/v1", api_key="k1", dimensions=512)),
+        model_key(DashScopeEmbedding("dashscope", model="text-embedding-v3", dashscope_api_key="k1")),
+        model_key(DashScopeEmbedding("dashscope", model="text-embedding-v2", dashscope_api_key="k1")),
+        model_key(AzureOpenAIEmbedding("azure", model="text-embedding-3-small", azure_deployment="embed-a",
+            azure_endpoint="https://a.openai.azure.com", api_key="k1", api_version="2024-02-01")),
+        model_key(AzureOpenAIEmbedding("azure", model="text-embedding-3-small", azure_deployment="embed-b",
+            azure_endpoint="https://a.openai.azure.com", api_key="k1", api_version="2024-02-01")),
+    }
+    assert len(keys) == 8
+    assert "model=text-embedding-3-small" in small and "provider=openai" in small
+
+    # The credentials are not part of the key, rotating them keeps the cache
+    assert model_key(OpenAICompatibleEmbedding("openai", model="text-embedding-3-small", base_url="http://llm-a/v1", api_key="k2")) == small
+    assert "k1" not in small
+    print("✓ the model_sdk embedding settings are part of the cache key")
+
+
+def test_memory_tier_stores_float32():
+    store = LRUEmbeddingStore(max_size=2)
+    embedding = [0.1, -0.25, 1e-3]
+    store.put_many({"k1": embedding})
+    assert store._data["k1"].itemsize == 4
+    found = store.get_many(["k1"])["k1"]
+    assert isinstance(found, list) and all(abs(a - b) < 1e-7 for a, b in zip(found, embedding))
+
+    store.put_many({"k2": [1.0], "k3": [2.0]})
+    assert list(store.get_many(["k1", "k2", "k3"])) == ["k2", "k3"]
+    print("✓ the memory tier keeps float32 arrays and evicts by entries")
+
+
+def test_persistent_hits():
+    with tempfile.TemporaryDirectory() as base_dir:
+        path = os.path.join(base_dir, "embeddings.db")
+        first = CacheEmbedding(CountingEmbeddings(), cache=EmbeddingCache(max_size=100, persistent=SQLiteEmbeddingStore(path)))
+        expected = first.embed_documents(["a", "bb"])
+
+        # A new process starts with an empty memory tier
+        model = CountingEmbeddings()
+        cache = EmbeddingCache(max_size=100, persistent=SQLiteEmbeddingStore(path))
+        second = CacheEmbedding(model, cache=cache)
+        assert second.embed_documents(["a", "bb"]) == expected
+        assert model.calls == []
+        assert second.embed_documents(["a"]) == expected[:1]
+        stats = second.cache_stats()
+        assert stats["persistent_hits"] == 2 and stats["memory_hits"] == 1 and stats["misses"] == 0
+        cache.persistent.close()
+        first._cache.persistent.close()
+    print("✓ the persistent tier serves a cold memory tier")
+
+
+def test_persistent_failure_is_a_miss():
+    model = CountingEmbeddings()
+    embedding = CacheEmbedding(model, cache=EmbeddingCache(max_size=100, persistent=FailingStore()))
+    assert embedding.embed_documents(["a"]) == [model._embed("a")]
+    assert embedding.embed_documents(["a"]) == [model._embed("a")]
+    assert model.calls == [["a"]]
+    print("✓ a failing persistent tier does not fail embeddings")
+
+
+def test_async_paths():
+    async def run():
+        model = CountingEmbeddings()
+        embedding = CacheEmbedding(model, cache=EmbeddingCache(max_size=100))
+        await embedding.aembed_documents(["a", "a", "bb"])
+        await embedding.aembed_query("bb")
+        await embedding.aembed_query("bb")
+        assert model.calls == [["a", "bb"], ["bb"]]
+        stats = embedding.cache_stats()
+        assert stats["requests"] == 5 and stats["memory_hits"] == 1 and stats["misses"] == 3
+    asyncio.run(run())
+    print("✓ async embeddings use the cache the same way")
+
+
+def test_cache_disabled():
+    model = CountingEmbeddings()
+    embedding = CacheEmbedding(model, cache=None)
+    embedding.embed_documents(["a", "a"])
+    embedding.embed_documents(["a"])
+    assert model.calls == [["a", "a"], ["a"]]
+    assert embedding.cache_stats() is None
+    print("✓ cache=None passes every call to the model")
+
+
+if __name__ == "__main__":
+    test_batch_duplicates_embedded_once()
+    test_query_and_model_in_key()
+    test_model_sdk_wrappers_in_key()
+    test_memory_tier_stores_float32()
+    test_persistent_hits()
+    test_persistent_failure_is_a_miss()
+    test_async_paths()
+    test_cache_disabled()
+    print("\nAll embedding cache tests passed! ✓")
@@ -9,6 +9,23 @@ class VectorConfig:
     PGVECTOR_MIN_CONNECTION = int(os.getenv("PGVECTOR_MIN_CONNECTION", 1))
     PGVECTOR_MAX_CONNECTION = int(os.getenv("PGVECTOR_MAX_CONNECTION", 5))
     PGVECTOR_PG_BIGM = bool(os.getenv("PGVECTOR_PG_BIGM", False))
+    PGVECTOR_STATEMENT_CACHE_SIZE = int(os.getenv("PGVECTOR_STATEMENT_CACHE_SIZE", 100))
+    PGVECTOR_MAX_QUERIES = int(os.getenv("PGVECTOR_MAX_QUERIES", 50000))
+    PGVECTOR_MAX_INACTIVE_CONNECTION_LIFETIME = float(os.getenv("PGVECTOR_MAX_INACTIVE_CONNECTION_LIFETIME", 300))
+    PGVECTOR_ACQUIRE_TIMEOUT = float(os.getenv("PGVECTOR_ACQUIRE_TIMEOUT")) if os.getenv("PGVECTOR_ACQUIRE_TIMEOUT") else None
+    # Empty for the server's default_text_search_config
+    PGVECTOR_TEXT_SEARCH_CONFIG = os.getenv("PGVECTOR_TEXT_SEARCH_CONFIG", "")
+    PGVECTOR_BULK_DEFER_INDEX_ROWS = int(os.getenv("PGVECTOR_BULK_DEFER_INDEX_ROWS", 10000))
+    # A deferred index is only rebuilt when the table holds at most this many times the rows of the load
+    PGVECTOR_BULK_DEFER_INDEX_RATIO = float(os.getenv("PGVECTOR_BULK_DEFER_INDEX_RATIO", 1.0))
+    # Iterative index scans for filtered searches, needs pgvector >= 0.8
+    PGVECTOR_ITERATIVE_SCAN = os.getenv("PGVECTOR_ITERATIVE_SCAN", "enable") == "enable"
+    # Storage layout: "table" keeps one table per collection, "shared" one hash-partitioned table per dimension
+    PGVECTOR_LAYOUT = os.getenv("PGVECTOR_LAYOUT", "table")
+    PGVECTOR_SHARED_PARTITIONS = int(os.getenv("PGVECTOR_SHARED_PARTITIONS", 16))
+    EMBEDDING_CACHE_BACKEND = os.getenv("EMBEDDING_CACHE_BACKEND", "memory")
+    EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", 10000))
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
 
 
 vector_config = VectorConfig()
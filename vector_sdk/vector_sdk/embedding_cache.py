@@ -0,0 +1,312 @@
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .configs import vector_config
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    handlers=[logging.StreamHandler()]  # 输出到控制台
+)
+
+logger = logging.getLogger(__name__)
+
+# SQLite limits the number of host parameters per statement
+_LOOKUP_CHUNK_SIZE = 500
+
+
+def embedding_cache_key(model_key: str, kind: str, text: str) -> str:
+    """
+    Content address of one embedding. The kind (document/query) is part of the key because
+    several providers embed queries and documents differently.
+    """
+    return hashlib.sha256(f"{model_key}\0{kind}\0{text}".encode("utf-8")).hexdigest()
+
+
+def _encode(embedding: List[float]) -> bytes:
+    return array("d", embedding).tobytes()
+
+
+def _decode(blob: bytes) -> List[float]:
+    values = array("d")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCacheStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.batch_duplicates = 0
+
+    def record(self, requests: int = 0, memory_hits: int = 0, persistent_hits: int = 0, misses: int = 0, batch_duplicates: int = 0):
+        with self._lock:
+            self.requests += requests
+            self.memory_hits += memory_hits
+            self.persistent_hits += persistent_hits
+            self.misses += misses
+            self.batch_duplicates += batch_duplicates
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.memory_hits + self.persistent_hits + self.misses
+            hits = self.memory_hits + self.persistent_hits
+            return {
+                "requests": self.requests,
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "batch_duplicates": self.batch_duplicates,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+class LRUEmbeddingStore:
+    """
+    In-process tier, bounded by number of entries. Entries are kept as float32 arrays, about 6 KiB for
+    1536 dimensions instead of about 48 KiB as a list of Python floats, and decoded on read.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._data: "OrderedDict[str, array]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            for key in keys:
+                value = self._data.get(key)
+                if value is not None:
+                    self._data.move_to_end(key)
+                    found[key] = value.tolist()
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        if self.max_size <= 0:
+            return
+        encoded = {key: array("f", value) for key, value in items.items()}
+        with self._lock:
+            for key, value in encoded.items():
+                self._data[key] = value
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SQLiteEmbeddingStore:
+    """Persistent tier in a local SQLite file, embeddings are stored as float64 blobs"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embedding_cache (key TEXT PRIMARY KEY, embedding BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), _LOOKUP_CHUNK_SIZE):
+                chunk = keys[i:i + _LOOKUP_CHUNK_SIZE]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, embedding FROM embedding_cache WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = _decode(blob)
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (key, embedding) VALUES (?, ?)",
+                [(key, _encode(value)) for key, value in items.items()]
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class PGEmbeddingStore:
+    """
+    Persistent tier in a pgvector side table, shared by every replica that uses the same database.
+    The embedding column has no fixed dimension so one table serves every model.
+    """
+
+    def __init__(self, table_name: str = "embedding_cache"):
+        from .pgvector.pgvector import PGPoolManager, PGVectorConfig
+
+        self.table_name = table_name
+        self._pool = PGPoolManager.get_sync_pool(
+            PGVectorConfig(
+                host=vector_config.PGVECTOR_HOST,
+                port=vector_config.PGVECTOR_PORT,
+                user=vector_config.PGVECTOR_USER,
+                password=vector_config.PGVECTOR_PASSWORD,
+                database=vector_config.PGVECTOR_DATABASE,
+                min_connection=vector_config.PGVECTOR_MIN_CONNECTION,
+                max_connection=vector_config.PGVECTOR_MAX_CONNECTION,
+                pg_bigm=vector_config.PGVECTOR_PG_BIGM,
+            )
+        )
+        self._execute("CREATE EXTENSION IF NOT EXISTS vector")
+        self._execute(
+            f"CREATE TABLE IF NOT EXISTS {self.table_name} (key TEXT PRIMARY KEY, embedding vector NOT NULL)"
+        )
+
+    def _execute(self, sql: str, params: Any = None, fetch: bool = False):
+        conn = self._pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
+                rows = cur.fetchall() if fetch else None
+            conn.commit()
+            return rows
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+
+    def get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        for i in range(0, len(keys), _LOOKUP_CHUNK_SIZE):
+            chunk = keys[i:i + _LOOKUP_CHUNK_SIZE]
+            rows = self._execute(
+                f"SELECT key, embedding::text FROM {self.table_name} WHERE key = ANY(%s)", (chunk,), fetch=True
+            )
+            for key, embedding in rows:
+                found[key] = [float(x) for x in embedding.strip("[]").split(",")]
+        return found
+
+    def put_many(self, items: Dict[str, List[float]]) -> None:
+        import psycopg2.extras
+
+        values = [(key, "[" + ",".join(map(str, value)) + "]") for key, value in items.items()]
+        conn = self._pool.getconn()
+        try:
+            with conn.cursor() as cur:
+                psycopg2.extras.execute_values(
+                    cur,
+                    f"INSERT INTO {self.table_name} (key, embedding) VALUES %s ON CONFLICT (key) DO NOTHING",
+                    values,
+                    template="(%s, %s::vector)"
+                )
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            self._pool.putconn(conn)
+
+    def close(self) -> None:
+        # The pool is shared and managed by PGPoolManager
+        pass
+
+
+class EmbeddingCache:
+    """
+    Two tier embedding cache: an in-process LRU in front of an optional persistent store.
+    Persistent tier failures are logged and treated as misses, they never fail an embedding call.
+    """
+
+    def __init__(self, max_size: int = 10000, persistent: Optional[Any] = None):
+        self.memory = LRUEmbeddingStore(max_size)
+        self.persistent = persistent
+        self.stats = EmbeddingCacheStats()
+
+    def lookup(self, keys: List[str]) -> Tuple[Dict[str, List[float]], int]:
+        """Return the cached embeddings for keys and how many came from the persistent tier"""
+        found = self.memory.get_many(keys)
+        missing = [key for key in keys if key not in found]
+
+        persistent_hits = 0
+        if missing and self.persistent is not None:
+            try:
+                stored = self.persistent.get_many(missing)
+            except Exception as e:
+                logger.warning(f"Embedding cache persistent lookup failed: {e}")
+                stored = {}
+            if stored:
+                self.memory.put_many(stored)
+                found.update(stored)
+                persistent_hits = len(stored)
+
+        return found, persistent_hits
+
+    def store(self, items: Dict[str, List[float]]) -> None:
+        self.memory.put_many(items)
+        if self.persistent is not None:
+            try:
+                self.persistent.put_many(items)
+            except Exception as e:
+                logger.warning(f"Embedding cache persistent store failed: {e}")
+
+    async def alookup(self, keys: List[str]) -> Tuple[Dict[str, List[float]], int]:
+        if self.persistent is None:
+            return self.lookup(keys)
+        return await asyncio.to_thread(self.lookup, keys)
+
+    async def astore(self, items: Dict[str, List[float]]) -> None:
+        if self.persistent is None:
+            self.store(items)
+            return
+        await asyncio.to_thread(self.store, items)
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = self.stats.to_dict()
+        stats["memory_entries"] = len(self.memory)
+        stats["persistent_backend"] = type(self.persistent).__name__ if self.persistent is not None else None
+        return stats
+
+
+_default_cache: Optional[EmbeddingCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_embedding_cache() -> Optional[EmbeddingCache]:
+    """
+    Process wide cache configured by EMBEDDING_CACHE_BACKEND (none, memory, sqlite, pgvector),
+    shared by every CacheEmbedding so all collections benefit from the same entries
+    """
+    global _default_cache
+
+    backend = vector_config.EMBEDDING_CACHE_BACKEND
+    if backend == "none":
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            persistent = None
+            try:
+                if backend == "sqlite":
+                    persistent = SQLiteEmbeddingStore(vector_config.EMBEDDING_CACHE_PATH)
+                elif backend == "pgvector":
+                    persistent = PGEmbeddingStore()
+                elif backend != "memory":
+                    logger.warning(f"Unknown EMBEDDING_CACHE_BACKEND {backend}, using memory only")
+            except Exception as e:
+                logger.warning(f"Failed to open embedding cache backend {backend}, using memory only: {e}")
+                persistent = None
+
+            _default_cache = EmbeddingCache(max_size=vector_config.EMBEDDING_CACHE_SIZE, persistent=persistent)
+            logger.info(f"Embedding cache initialized, backend={backend}, max_size={vector_config.EMBEDDING_CACHE_SIZE}")
+        return _default_cache
@@ -0,0 +1,125 @@
+import json
+from typing import Any, Dict, List, Optional
+
+COMPARISON_OPERATORS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<="}
+SCALAR_TYPES = (str, int, float, bool)
+
+
+class SQLParams:
+    """Collects query parameters and hands out placeholders, "%s" for psycopg2 or "$n" for asyncpg"""
+
+    def __init__(self, style: str, values: Optional[List[Any]] = None):
+        self.style = style
+        self.values = list(values or [])
+
+    def add(self, value: Any) -> str:
+        self.values.append(value)
+        return "%s" if self.style == "psycopg2" else f"${len(self.values)}"
+
+
+def _check_key(key: Any) -> str:
+    if not isinstance(key, str) or not key or key.startswith("$"):
+        raise ValueError(f"Invalid metadata filter key: {key!r}")
+    return key
+
+
+def _check_scalar(key: str, value: Any, allow_bool: bool = True) -> Any:
+    if not isinstance(value, SCALAR_TYPES) or (isinstance(value, bool) and not allow_bool):
+        raise ValueError(f"Unsupported value for metadata filter on {key}: {value!r}")
+    return value
+
+
+def _compile_in(key: str, values: Any, params: SQLParams) -> str:
+    if not isinstance(values, list) or not values:
+        raise ValueError(f"$in/$nin on {key} needs a non-empty list")
+    # One containment per value so every branch can use the GIN index
+    return "(" + " OR ".join(
+        f"meta @> {params.add(json.dumps({key: _check_scalar(key, value)}))}::jsonb" for value in values
+    ) + ")"
+
+
+def _compile_range(key: str, bounds: Dict[str, Any], params: SQLParams) -> str:
+    # jsonpath comparisons are typed, numbers compare with numbers and strings with strings,
+    # a value of another type simply does not match instead of failing a cast
+    conditions = []
+    variables = {}
+    for operator, value in bounds.items():
+        variables[operator[1:]] = _check_scalar(key, value, allow_bool=False)
+        conditions.append(f"@ {COMPARISON_OPERATORS[operator]} ${operator[1:]}")
+    path = f"$.{json.dumps(key)} ? ({' && '.join(conditions)})"
+    return f"jsonb_path_exists(meta, {params.add(path)}::jsonpath, {params.add(json.dumps(variables))}::jsonb)"
+
+
+def _compile_field(key: str, condition: Any, params: SQLParams) -> str:
+    if not isinstance(condition, dict):
+        condition = {"$eq": condition}
+
+    clauses = []
+    bounds = {}
+    for operator, value in condition.items():
+        if operator == "$eq":
+            clauses.append(f"meta @> {params.add(json.dumps({key: _check_scalar(key, value)}))}::jsonb")
+        elif operator == "$ne":
+            clauses.append(f"NOT meta @> {params.add(json.dumps({key: _check_scalar(key, value)}))}::jsonb")
+        elif operator == "$in":
+            clauses.append(_compile_in(key, value, params))
+        elif operator == "$nin":
+            clauses.append(f"NOT {_compile_in(key, value, params)}")
+        elif operator in COMPARISON_OPERATORS:
+            bounds[operator] = value
+        elif operator == "$between":
+            if not isinstance(value, list) or len(value) != 2:
+                raise ValueError(f"$between on {key} needs [low, high]")
+            bounds["$gte"], bounds["$lte"] = value
+        elif operator == "$exists":
+            if not isinstance(value, bool):
+                raise ValueError(f"$exists on {key} needs true or false")
+            clauses.append(f"{'' if value else 'NOT '}meta ? {params.add(key)}")
+        else:
+            raise ValueError(f"Unsupported metadata filter operator {operator!r} on {key}")
+
+    if bounds:
+        clauses.append(_compile_range(key, bounds, params))
+    if not clauses:
+        raise ValueError(f"Empty metadata filter condition on {key}")
+    return " AND ".join(clauses)
+
+
+def compile_metadata_filter(metadata_filter: Dict[str, Any], params: SQLParams) -> str:
+    """
+    Compile a metadata filter into a parameterized SQL condition on the meta JSONB column.
+
+    Filters map top-level meta keys to a value (equality) or to operators:
+        {"datasource": "mysql"}
+        {"datasource": {"$in": ["mysql", "postgres"]}, "year": {"$gte": 2020, "$lt": 2025}}
+        {"$or": [{"owner": {"$exists": false}}, {"owner": "alice"}]}
+
+    $eq, $ne, $in, $nin and $exists are answered by the GIN index on meta, equality is typed
+    ("1" does not match 1). $gt, $gte, $lt, $lte and $between compare numbers or strings. $ne and $nin
+    also match rows without the key. Keys at one level are combined with AND.
+    """
+    if not isinstance(metadata_filter, dict) or not metadata_filter:
+        raise ValueError("Metadata filter must be a non-empty object")
+
+    clauses = []
+    for key, condition in metadata_filter.items():
+        if key in ("$and", "$or"):
+            if not isinstance(condition, list) or not condition:
+                raise ValueError(f"{key} needs a non-empty list of filters")
+            joiner = " AND " if key == "$and" else " OR "
+            clauses.append("(" + joiner.join(f"({compile_metadata_filter(item, params)})" for item in condition) + ")")
+        else:
+            clauses.append(_compile_field(_check_key(key), condition, params))
+    return " AND ".join(clauses)
+
+
+def compile_search_filter(kwargs: Dict[str, Any], params: SQLParams) -> str:
+    """SQL condition for the document_ids_filter and metadata_filter search arguments, empty when neither is set"""
+    clauses = []
+    document_ids_filter = kwargs.get("document_ids_filter")
+    if document_ids_filter:
+        clauses.append(f"meta->>'document_id' = ANY({params.add([str(id) for id in document_ids_filter])}::text[])")
+    metadata_filter = kwargs.get("metadata_filter")
+    if metadata_filter:
+        clauses.append(f"({compile_metadata_filter(metadata_filter, params)})")
+    return " AND ".join(clauses)
@@ -0,0 +1,106 @@
+import os
+import sys
+import json
+
+# Add project root directory to Python path
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(os.path.dirname(current_dir))
+sys.path.insert(0, project_root)
+from vector_sdk.pgvector.filter import SQLParams, compile_metadata_filter, compile_search_filter
+
+
+def compile_filter(metadata_filter, style="asyncpg", values=None):
+    params = SQLParams(style, values)
+    return compile_metadata_filter(metadata_filter, params), params.values
+
+
+def test_equality_uses_containment():
+    sql, values = compile_filter({"datasource": "mysql", "year": 2024})
+    assert sql == "meta @> $1::jsonb AND meta @> $2::jsonb"
+    assert [json.loads(value) for value in values] == [{"datasource": "mysql"}, {"year": 2024}]
+
+    # psycopg2 placeholders, numbering continues after the statement's own parameters
+    sql, values = compile_filter({"datasource": "mysql"}, style="psycopg2", values=["[0.1]"])
+    assert sql == "meta @> %s::jsonb" and len(values) == 2
+    sql, _ = compile_filter({"datasource": "mysql"}, values=["[0.1]", 10])
+    assert sql == "meta @> $3::jsonb"
+    print("✓ equality compiles to a jsonb containment")
+
+
+def test_set_and_exists_operators():
+    sql, values = compile_filter({"datasource": {"$in": ["mysql", "postgres"]}, "owner": {"$exists": False}})
+    assert sql == "(meta @> $1::jsonb OR meta @> $2::jsonb) AND NOT meta ? $3"
+    assert values[2] == "owner"
+
+    sql, values = compile_filter({"datasource": {"$ne": "minio", "$nin": ["fileserver"]}})
+    assert sql == "NOT meta @> $1::jsonb AND NOT (meta @> $2::jsonb)"
+    assert json.loads(values[1]) == {"datasource": "fileserver"}
+    print("✓ $in, $nin, $ne and $exists")
+
+
+def test_range_uses_jsonpath_variables():
+    sql, values = compile_filter({"year": {"$gte": 2020, "$lt": 2025}})
+    assert sql == "jsonb_path_exists(meta, $1::jsonpath, $2::jsonb)"
+    assert values[0] == '$."year" ? (@ >= $gte && @ < $lt)'
+    assert json.loads(values[1]) == {"gte": 2020, "lt": 2025}
+
+    _, values = compile_filter({"created": {"$between": ["2024-01-01", "2024-12-31"]}})
+    assert values[0] == '$."created" ? (@ >= $gte && @ <= $lte)'
+    assert json.loads(values[1]) == {"gte": "2024-01-01", "lte": "2024-12-31"}
+    print("✓ range operators compile to jsonpath with bound variables")
+
+
+def test_logical_operators():
+    sql, _ = compile_filter({"$or": [{"owner": {"$exists": False}}, {"owner": "alice"}], "public": True})
+    assert sql == "((NOT meta ? $1) OR (meta @> $2::jsonb)) AND meta @> $3::jsonb"
+    print("✓ $and/$or nest filters")
+
+
+def test_values_are_never_inlined():
+    key = "name'; DROP TABLE embeddings; --"
+    sql, values = compile_filter({key: {"$gt": "x' OR '1'='1"}})
+    assert "DROP" not in sql and "OR '1'" not in sql
+    assert json.dumps(key) in values[0]
+    print("✓ keys and values only reach SQL as parameters")
+
+
+def test_invalid_filters_rejected():
+    invalid = [
+        {},
+        {"$where": "1=1"},
+        {"year": {"$regex": "20.*"}},
+        {"year": {"$in": []}},
+        {"year": {"$between": [2020]}},
+        {"year": {"$gt": True}},
+        {"tags": ["a", "b"]},
+        {"owner": {"$exists": "yes"}},
+        {"$or": []},
+        {"year": {}},
+    ]
+    for metadata_filter in invalid:
+        try:
+            compile_filter(metadata_filter)
+            raise AssertionError(f"{metadata_filter} must be rejected")
+        except ValueError:
+            pass
+    print("✓ invalid filters raise ValueError")
+
+
+def test_search_filter():
+    params = SQLParams("psycopg2", ["[0.1]"])
+    sql = compile_search_filter({"document_ids_filter": [1, "d2"], "metadata_filter": {"datasource": "mysql"}}, params)
+    assert sql == "meta->>'document_id' = ANY(%s::text[]) AND (meta @> %s::jsonb)"
+    assert params.values[1] == ["1", "d2"]
+    assert compile_search_filter({}, SQLParams("asyncpg")) == ""
+    print("✓ compile_search_filter combines document ids and metadata")
+
+
+if __name__ == "__main__":
+    test_equality_uses_containment()
+    test_set_and_exists_operators()
+    test_range_uses_jsonpath_variables()
+    test_logical_operators()
+    test_values_are_never_inlined()
+    test_invalid_filters_rejected()
+    test_search_filter()
+    print("\nAll metadata filter tests passed! ✓")
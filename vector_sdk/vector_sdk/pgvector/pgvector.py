@@ -1,9 +1,13 @@
 import hashlib
 import json
 import logging
+import re
+import struct
+import sys
 import uuid
+from array import array
 from contextlib import contextmanager
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Literal, Optional
 import threading
 import psycopg2.errors
 import psycopg2.extras  # type: ignore
@@ -16,9 +20,11 @@ from ..vector_type import VectorType
 from langchain_core.embeddings import Embeddings
 from ..base import Document
 from ..configs import vector_config
+from .filter import SQLParams, compile_search_filter
 import asyncpg
 from asyncpg.pool import Pool
 import asyncio
+import time
 
 
 logging.basicConfig(
@@ -30,6 +36,81 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Seconds a PGVector instance keeps the index settings read from the collection table comment
+INDEX_CONFIG_TTL = 60
+
+
+class VectorIndexConfig(BaseModel):
+    """
+    Per-collection vector index settings, stored as a comment on the collection table.
+
+    ef_search (hnsw) and probes (ivfflat) are the collection defaults for searches, a search request
+    may override them.
+
+    quantization indexes a compressed copy of the embeddings, halfvec (2x smaller) or binary (32x smaller,
+    hamming distance). The table keeps the full precision column: a search fetches rerank_factor * top_k
+    candidates from the index and ranks them by their exact cosine distance.
+    """
+    index_type: Literal["hnsw", "ivfflat"] = "hnsw"
+    m: int = 16
+    ef_construction: int = 64
+    lists: int = 100
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+    quantization: Literal["none", "halfvec", "binary"] = "none"
+    rerank_factor: int = 4
+
+    @model_validator(mode="after")
+    def validate_params(self) -> "VectorIndexConfig":
+        # Ranges accepted by pgvector
+        if not 2 <= self.m <= 100:
+            raise ValueError("m must be between 2 and 100")
+        if not 4 <= self.ef_construction <= 1000 or self.ef_construction < 2 * self.m:
+            raise ValueError("ef_construction must be between 4 and 1000 and at least 2 * m")
+        if not 1 <= self.lists <= 32768:
+            raise ValueError("lists must be between 1 and 32768")
+        if self.ef_search is not None and not 1 <= self.ef_search <= 1000:
+            raise ValueError("ef_search must be between 1 and 1000")
+        if self.probes is not None and self.probes < 1:
+            raise ValueError("probes must be at least 1")
+        if not 1 <= self.rerank_factor <= 100:
+            raise ValueError("rerank_factor must be between 1 and 100")
+        return self
+
+    def with_params(self) -> str:
+        if self.index_type == "ivfflat":
+            return f"lists = {self.lists}"
+        return f"m = {self.m}, ef_construction = {self.ef_construction}"
+
+    def max_dimension(self) -> int:
+        # Largest dimension pgvector indexes for the stored type
+        return {"none": 2000, "halfvec": 4000, "binary": 64000}[self.quantization]
+
+    def index_column(self, dimension: int) -> str:
+        if self.quantization == "halfvec":
+            return f"(embedding::halfvec({dimension})) halfvec_cosine_ops"
+        if self.quantization == "binary":
+            return f"(binary_quantize(embedding)::bit({dimension})) bit_hamming_ops"
+        return "embedding vector_cosine_ops"
+
+    def index_order(self, column: str, query: str, dimension: int) -> str:
+        """Distance to sort by to use the index, column and query are vector expressions"""
+        if self.quantization == "halfvec":
+            return f"{column}::halfvec({dimension}) <=> ({query})::halfvec({dimension})"
+        if self.quantization == "binary":
+            return f"binary_quantize({column})::bit({dimension}) <~> binary_quantize({query})::bit({dimension})"
+        return f"{column} <=> {query}"
+
+    def build_params(self) -> dict:
+        """The settings the index is built with, the others only affect searches"""
+        return self.model_dump(exclude={"ef_search", "probes", "rerank_factor"})
+
+
+TEXT_SEARCH_CONFIG_PATTERN = re.compile(r"[A-Za-z_][A-Za-z0-9_.]*")
+# Configuration of tables whose comment does not record one, the former fixed default
+LEGACY_TEXT_SEARCH_CONFIG = "english"
+
+
 class PGVectorConfig(BaseModel):
     host: str
     port: int
@@ -39,6 +120,14 @@ class PGVectorConfig(BaseModel):
     min_connection: int
     max_connection: int
     pg_bigm: bool = False
+    # asyncpg pool tuning, see PGPoolManager.get_async_pool
+    statement_cache_size: int = 100
+    max_queries: int = 50000
+    max_inactive_connection_lifetime: float = 300.0
+    acquire_timeout: Optional[float] = None
+    # Text search configuration of new tsvector columns, None for the server's default_text_search_config.
+    # The configuration a table was created with is kept in its comment and used by its queries
+    text_search_config: Optional[str] = None
 
     @model_validator(mode="before")
     @classmethod
@@ -59,6 +148,9 @@ class PGVectorConfig(BaseModel):
             raise ValueError("config PGVECTOR_MAX_CONNECTION is required")
         if values["min_connection"] > values["max_connection"]:
             raise ValueError("config PGVECTOR_MIN_CONNECTION should less than PGVECTOR_MAX_CONNECTION")
+        # Interpolated into the generated column DDL
+        if values.get("text_search_config") and not TEXT_SEARCH_CONFIG_PATTERN.fullmatch(values["text_search_config"]):
+            raise ValueError("config PGVECTOR_TEXT_SEARCH_CONFIG must be a text search configuration name")
         return values
 
 
@@ -67,13 +159,73 @@ CREATE TABLE IF NOT EXISTS {table_name} (
     id UUID PRIMARY KEY,
     text TEXT NOT NULL,
     meta JSONB NOT NULL,
-    embedding vector({dimension}) NOT NULL
+    embedding vector({dimension}) NOT NULL,
+    text_tsv tsvector GENERATED ALWAYS AS (to_tsvector('{text_search_config}'::regconfig, coalesce(text, ''))) STORED
 ) using heap;
 """
 
+SQL_ADD_TSV_COLUMN = """
+ALTER TABLE {table_name} ADD COLUMN IF NOT EXISTS
+text_tsv tsvector GENERATED ALWAYS AS (to_tsvector('{text_search_config}'::regconfig, coalesce(text, ''))) STORED;
+"""
+
+SQL_CREATE_INDEX_TSV = """
+CREATE INDEX {concurrently} IF NOT EXISTS tsv_idx_{index_hash} ON {table_name}
+USING gin (text_tsv);
+"""
+
+SQL_CREATE_INDEX_META = """
+CREATE INDEX {concurrently} IF NOT EXISTS meta_idx_{index_hash} ON {table_name}
+USING gin (meta);
+"""
+
+SQL_DEFAULT_TEXT_SEARCH_CONFIG = "SELECT current_setting('default_text_search_config')"
+
+SQL_TSV_COLUMN_EXISTS = """
+SELECT EXISTS (
+    SELECT 1 FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = {placeholder} AND column_name = 'text_tsv'
+)
+"""
+
+# Ranked top-k over the stored tsvector column, the GIN index serves the @@ filter
+SQL_FULL_TEXT_SEARCH = """
+SELECT meta, text, ts_rank(text_tsv, query) AS score
+FROM {table_name}, plainto_tsquery('{text_search_config}'::regconfig, {placeholder}) query
+WHERE text_tsv @@ query
+{where_clause}
+ORDER BY score DESC
+LIMIT {top_k}
+"""
+
+# Tables created before the text_tsv column, evaluated row by row until they are migrated
+SQL_FULL_TEXT_SEARCH_LEGACY = """
+SELECT meta, text, ts_rank(to_tsvector(coalesce(text, '')), plainto_tsquery({placeholder})) AS score
+FROM {table_name}
+WHERE to_tsvector(text) @@ plainto_tsquery({placeholder})
+{where_clause}
+ORDER BY score DESC
+LIMIT {top_k}
+"""
+
 SQL_CREATE_INDEX = """
-CREATE INDEX IF NOT EXISTS embedding_cosine_v1_idx_{index_hash} ON {table_name}
-USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX {concurrently} IF NOT EXISTS {index_name} ON {table_name}
+USING {index_type} ({index_column}) WITH ({with_params});
+"""
+
+# vector(n) keeps n as the type modifier of the column
+SQL_EMBEDDING_DIMENSION = """
+SELECT atttypmod FROM pg_attribute
+WHERE attrelid = to_regclass({placeholder}) AND attname = 'embedding' AND NOT attisdropped
+"""
+
+SQL_DROP_INDEX = """
+DROP INDEX IF EXISTS {index_name};
+"""
+
+# Rows already in the table, counted up to {limit} + 1 only
+SQL_COUNT_ROWS_UP_TO = """
+SELECT count(*) FROM (SELECT 1 FROM {table_name} LIMIT {limit}) AS existing
 """
 
 SQL_CREATE_INDEX_PG_BIGM = """
@@ -82,21 +234,116 @@ USING gin (text gin_bigm_ops);
 """
 
 
+def encode_vector_binary(embedding: list[float]) -> bytes:
+    """pgvector binary wire format: int16 dimension, int16 unused, float4 values, all big-endian"""
+    values = array("f", embedding)
+    if sys.byteorder == "little":
+        values.byteswap()
+    return struct.pack(">HH", len(values), 0) + values.tobytes()
+
+
+def decode_vector_binary(data: bytes) -> list[float]:
+    dimension, _ = struct.unpack_from(">HH", data)
+    values = array("f")
+    values.frombytes(data[4:4 + 4 * dimension])
+    if sys.byteorder == "little":
+        values.byteswap()
+    return values.tolist()
+
+
+class PoolStats:
+    """
+    Acquire counters for one pool, wait time is measured from acquire() to a usable connection.
+    Updated from worker threads for the sync pools, hence the lock.
+    """
+
+    def __init__(self):
+        self.acquired = 0
+        self.released = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self.timeouts = 0
+        self.exhausted = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._lock = threading.Lock()
+
+    def record_acquire(self, wait_seconds: float):
+        with self._lock:
+            self.acquired += 1
+            self.in_use += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+            self.wait_seconds_total += wait_seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, wait_seconds)
+
+    def record_release(self):
+        with self._lock:
+            self.released += 1
+            self.in_use = max(0, self.in_use - 1)
+
+    def record_exhausted(self):
+        with self._lock:
+            self.exhausted += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "acquired": self.acquired,
+            "released": self.released,
+            "in_use": self.in_use,
+            "max_in_use": self.max_in_use,
+            "timeouts": self.timeouts,
+            "exhausted": self.exhausted,
+            "wait_seconds_avg": round(self.wait_seconds_total / self.acquired, 6) if self.acquired else 0.0,
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+class CountingConnectionPool(psycopg2.pool.ThreadedConnectionPool):
+    """ThreadedConnectionPool that records its checkouts, psycopg2 has no public API for the pool usage"""
+
+    def __init__(self, *args, **kwargs):
+        self.stats = PoolStats()
+        super().__init__(*args, **kwargs)
+
+    def getconn(self, key=None):
+        start = time.perf_counter()
+        try:
+            conn = super().getconn(key)
+        except psycopg2.pool.PoolError:
+            # All max_connection connections are checked out, psycopg2 does not wait for one
+            self.stats.record_exhausted()
+            raise
+        self.stats.record_acquire(time.perf_counter() - start)
+        return conn
+
+    def putconn(self, conn=None, key=None, close=False):
+        try:
+            super().putconn(conn, key, close)
+        finally:
+            self.stats.record_release()
+
+
 class PGPoolManager:
     _instance = None
     _lock = threading.Lock()
     _async_lock = asyncio.Lock()
     
-    _sync_pools: Dict[str, psycopg2.pool.SimpleConnectionPool] = {}
+    _sync_pools: Dict[str, CountingConnectionPool] = {}
     _async_pools: Dict[str, Pool] = {}
+    _async_pool_stats: Dict[str, PoolStats] = {}
     
+    @staticmethod
+    def config_key(config: PGVectorConfig) -> str:
+        return f"{config.host}:{config.port}:{config.database}"
+
     @classmethod
-    def get_sync_pool(cls, config: PGVectorConfig) -> psycopg2.pool.SimpleConnectionPool:
-        config_key = f"{config.host}:{config.port}:{config.database}"
+    def get_sync_pool(cls, config: PGVectorConfig) -> CountingConnectionPool:
+        config_key = cls.config_key(config)
         
         with cls._lock:
             if config_key not in cls._sync_pools:
-                cls._sync_pools[config_key] = psycopg2.pool.SimpleConnectionPool(
+                # Threaded pool, the sync paths are also called from worker threads (asyncio.to_thread)
+                cls._sync_pools[config_key] = CountingConnectionPool(
                     config.min_connection,
                     config.max_connection,
                     host=config.host,
@@ -109,10 +356,13 @@ class PGPoolManager:
     
     @classmethod
     async def get_async_pool(cls, config: PGVectorConfig) -> Pool:
-        config_key = f"{config.host}:{config.port}:{config.database}"
+        config_key = cls.config_key(config)
         
         async with cls._async_lock:
             if config_key not in cls._async_pools:
+                # Connections are reused across requests: prepared statements are cached per connection,
+                # connections are recycled after max_queries and idle ones are closed after
+                # max_inactive_connection_lifetime seconds (down to min_size)
                 cls._async_pools[config_key] = await asyncpg.create_pool(
                     host=config.host,
                     port=config.port,
@@ -120,9 +370,71 @@ class PGPoolManager:
                     password=config.password,
                     database=config.database,
                     min_size=config.min_connection,
-                    max_size=config.max_connection
+                    max_size=config.max_connection,
+                    max_queries=config.max_queries,
+                    max_inactive_connection_lifetime=config.max_inactive_connection_lifetime,
+                    statement_cache_size=config.statement_cache_size
+                )
+                cls._async_pool_stats[config_key] = PoolStats()
+                logger.info(
+                    f"Created async pool {config_key}, min_size={config.min_connection}, max_size={config.max_connection}, "
+                    f"statement_cache_size={config.statement_cache_size}, max_inactive_connection_lifetime={config.max_inactive_connection_lifetime}"
                 )
             return cls._async_pools[config_key]
+
+    @classmethod
+    async def acquire(cls, config: PGVectorConfig) -> asyncpg.Connection:
+        """Acquire a connection from the shared async pool, it must be handed back with release()"""
+        config_key = cls.config_key(config)
+        pool = await cls.get_async_pool(config)
+        stats = cls._async_pool_stats[config_key]
+
+        start = time.perf_counter()
+        try:
+            conn = await pool.acquire(timeout=config.acquire_timeout)
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            logger.warning(f"Timed out acquiring a connection from pool {config_key} after {config.acquire_timeout}s")
+            raise
+        stats.record_acquire(time.perf_counter() - start)
+        return conn
+
+    @classmethod
+    async def release(cls, config: PGVectorConfig, conn: asyncpg.Connection) -> None:
+        config_key = cls.config_key(config)
+        pool = cls._async_pools.get(config_key)
+        try:
+            if pool is None:
+                # Pool was closed while the connection was checked out
+                await conn.close()
+            else:
+                await pool.release(conn)
+        finally:
+            stats = cls._async_pool_stats.get(config_key)
+            if stats is not None:
+                stats.record_release()
+
+    @classmethod
+    def get_stats(cls) -> Dict[str, Any]:
+        """Utilization of every pool created in this process, keyed by host:port:database"""
+        stats = {"async": {}, "sync": {}}
+        for config_key, pool in list(cls._async_pools.items()):
+            pool_stats = cls._async_pool_stats.get(config_key)
+            stats["async"][config_key] = {
+                "size": pool.get_size(),
+                "idle": pool.get_idle_size(),
+                "min_size": pool.get_min_size(),
+                "max_size": pool.get_max_size(),
+                **(pool_stats.to_dict() if pool_stats else {}),
+            }
+        with cls._lock:
+            for config_key, pool in cls._sync_pools.items():
+                stats["sync"][config_key] = {
+                    "min_size": pool.minconn,
+                    "max_size": pool.maxconn,
+                    **pool.stats.to_dict(),
+                }
+        return stats
     
     @classmethod
     def close_all(cls):
@@ -136,6 +448,7 @@ class PGPoolManager:
                 for pool in cls._async_pools.values():
                     await pool.close()
                 cls._async_pools.clear()
+                cls._async_pool_stats.clear()
         
         # Run the async close in a new event loop if not already in one
         try:
@@ -154,7 +467,18 @@ class PGVector(BaseVector):
         self.table_name = f"embedding_{collection_name}"
         self.index_hash = hashlib.md5(self.table_name.encode()).hexdigest()[:8]
         self.pg_bigm = config.pg_bigm
+        self.text_search_config = config.text_search_config
+        # Configuration the table's text_tsv column was created with, read from the table comment
+        self._table_text_search_config: Optional[str] = None
         self._async_pool_lock = asyncio.Lock()
+        # Only a positive answer is cached, a table may be migrated while this instance is alive
+        self._has_tsv_column = False
+        # Re-read periodically so a reindex done through another replica is picked up
+        self._index_config: Optional[VectorIndexConfig] = None
+        self._index_config_loaded_at = 0.0
+        self.index_name = f"embedding_cosine_v1_idx_{self.index_hash}"
+        # Leading columns written with every row, the shared layout stores the collection name
+        self._row_key: Dict[str, Any] = {}
 
 
     def get_type(self) -> str:
@@ -173,7 +497,11 @@ class PGVector(BaseVector):
         await self._ensure_async_pool()
         if self._async_pool is None:
             raise RuntimeError("Async connection pool not initialized")
-        return await self._async_pool.acquire()
+        return await PGPoolManager.acquire(self.config)
+
+    async def _release_async_connection(self, conn):
+        # Hand the connection back to the pool, closing it would defeat the pool
+        await PGPoolManager.release(self.config, conn)
 
 
     # new
@@ -196,11 +524,20 @@ class PGVector(BaseVector):
 
     def create(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
         dimension = len(embeddings[0])
-        self._create_collection(dimension)
+        self._create_collection(dimension, index_config=kwargs.get("index_config"))
 
     async def acreate(self, texts: list[Document], embeddings: list[list[float]], **kwargs):
+        """
+        Args:
+            defer_index: Skip the vector index, see abulk_add_texts
+            index_config: VectorIndexConfig or dict, hnsw m=16 ef_construction=64 by default
+        """
         dimension = len(embeddings[0])
-        await self._acreate_collection(dimension)
+        await self._acreate_collection(
+            dimension,
+            create_index=not kwargs.get("defer_index", False),
+            index_config=kwargs.get("index_config")
+        )
 
     def collection_exists(self) -> bool:
         """检查表是否存在"""
@@ -228,7 +565,7 @@ class PGVector(BaseVector):
                 )
                 return result[0] if result else False
             finally:
-                await conn.close()
+                await self._release_async_connection(conn)
         except Exception as e:
             logger.warning(f"Error checking if table exists: {e}")
             return False
@@ -254,6 +591,7 @@ class PGVector(BaseVector):
                 pks.append(str(doc_id))
                 values.append(
                     (
+                        *self._row_key.values(),
                         str(doc_id),  # Convert UUID to string before sending to PostgreSQL
                         doc.page_content,
                         json.dumps(doc.metadata),
@@ -263,7 +601,7 @@ class PGVector(BaseVector):
         with self._get_cursor() as cur:
             psycopg2.extras.execute_values(
                 cur, 
-                f"INSERT INTO {self.table_name} (id, text, meta, embedding) VALUES %s", 
+                f"INSERT INTO {self.table_name} ({', '.join(self._insert_columns())}) VALUES %s", 
                 values
             )
         return pks
@@ -293,6 +631,7 @@ class PGVector(BaseVector):
                 embedding_str = "[" + ",".join(map(str, embeddings[i])) + "]"
                 values.append(
                     (
+                        *self._row_key.values(),
                         str(doc_id),  # Convert UUID to string
                         doc.page_content,
                         json.dumps(doc.metadata),
@@ -300,16 +639,287 @@ class PGVector(BaseVector):
                     )
                 )
         
+        columns = self._insert_columns()
+        placeholders = [f"${i}" for i in range(1, len(columns))] + [f"${len(columns)}::vector"]
         conn = await self._get_async_connection()
         try:
             await conn.executemany(
-                f"INSERT INTO {self.table_name} (id, text, meta, embedding) VALUES ($1, $2, $3, $4::vector)",
+                f"INSERT INTO {self.table_name} ({', '.join(columns)}) VALUES ({', '.join(placeholders)})",
                 values
             )
         finally:
-            await conn.close()
+            await self._release_async_connection(conn)
+        return pks
+
+
+    async def abulk_add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
+        """
+        Bulk load with COPY ... FROM STDIN (FORMAT binary), embeddings are sent as binary float4 vectors
+        instead of text literals.
+
+        Args:
+            documents: Documents to insert, doc_id in metadata is used as the primary key when it is a valid UUID
+            embeddings: One embedding per document
+            defer_index: Drop the HNSW index before the load and rebuild it afterwards. Defaults to True when
+                the load has at least PGVECTOR_BULK_DEFER_INDEX_ROWS rows and the table holds at most
+                PGVECTOR_BULK_DEFER_INDEX_RATIO times as many rows as the load. While the index is rebuilt,
+                searches on the collection fall back to a sequential scan.
+        """
+        records = []
+        pks = []
+        for i, doc in enumerate(documents):
+            if doc.metadata is not None:
+                doc_id = doc.metadata.get("doc_id")
+                try:
+                    doc_id = uuid.UUID(str(doc_id)) if doc_id else uuid.uuid4()
+                except (ValueError, AttributeError):
+                    doc_id = uuid.uuid4()
+
+                pks.append(str(doc_id))
+                records.append((*self._row_key.values(), doc_id, doc.page_content, json.dumps(doc.metadata), embeddings[i]))
+
+        if not records:
+            return pks
+
+        defer_index = kwargs.get("defer_index")
+
+        conn = await self._get_async_connection()
+        try:
+            if defer_index is None:
+                defer_index = await self._adefer_index(conn, len(records))
+            # The binary codec is scoped to this load, the other async paths still send vectors as text
+            await conn.set_type_codec(
+                "vector",
+                schema="public",
+                encoder=encode_vector_binary,
+                decoder=decode_vector_binary,
+                format="binary"
+            )
+            try:
+                if defer_index:
+                    index_config = await self._aload_index_config(conn)
+                    index_sql = self._index_sql(index_config, len(embeddings[0]))
+                    await conn.execute(SQL_DROP_INDEX.format(index_name=self.index_name))
+                try:
+                    async with conn.transaction():
+                        await conn.copy_records_to_table(
+                            self.table_name,
+                            records=records,
+                            columns=self._insert_columns()
+                        )
+                finally:
+                    # Rebuild even if the load failed so the collection is never left without its index
+                    if defer_index and len(embeddings[0]) <= index_config.max_dimension():
+                        await conn.execute(index_sql)
+            finally:
+                await conn.reset_type_codec("vector", schema="public")
+        finally:
+            await self._release_async_connection(conn)
+
+        logger.info(f"Bulk loaded {len(records)} rows into {self.table_name}, defer_index={defer_index}")
         return pks
 
+    async def _adefer_index(self, conn, rows: int) -> bool:
+        """
+        Rebuilding the index costs as much as indexing every row of the table, inserting into it costs per
+        loaded row. Only a load that is large and not much smaller than the table is worth a rebuild.
+        """
+        if rows < vector_config.PGVECTOR_BULK_DEFER_INDEX_ROWS:
+            return False
+        limit = int(rows * vector_config.PGVECTOR_BULK_DEFER_INDEX_RATIO)
+        existing = await conn.fetchval(SQL_COUNT_ROWS_UP_TO.format(table_name=self.table_name, limit=limit + 1))
+        return existing <= limit
+
+    def _insert_columns(self) -> list:
+        return [*self._row_key, "id", "text", "meta", "embedding"]
+
+    async def adrop_vector_index(self) -> None:
+        """Drop the HNSW index, for loads split across several abulk_add_texts calls"""
+        conn = await self._get_async_connection()
+        try:
+            await conn.execute(SQL_DROP_INDEX.format(index_name=self.index_name))
+        finally:
+            await self._release_async_connection(conn)
+
+    async def acreate_vector_index(self) -> None:
+        conn = await self._get_async_connection()
+        try:
+            index_config = await self._aload_index_config(conn)
+            dimension = await self._adimension(conn)
+            if dimension <= index_config.max_dimension():
+                await conn.execute(self._index_sql(index_config, dimension))
+        finally:
+            await self._release_async_connection(conn)
+
+    async def _adimension(self, conn) -> int:
+        return await conn.fetchval(SQL_EMBEDDING_DIMENSION.format(placeholder="$1"), self.table_name.lower())
+
+    def _index_sql(self, index_config: VectorIndexConfig, dimension: int, index_name: Optional[str] = None, concurrently: bool = False) -> str:
+        return SQL_CREATE_INDEX.format(
+            concurrently="CONCURRENTLY" if concurrently else "",
+            index_name=index_name or self.index_name,
+            table_name=self.table_name,
+            index_type=index_config.index_type,
+            index_column=index_config.index_column(dimension),
+            with_params=index_config.with_params()
+        )
+
+    def _comment_sql(self, index_config: VectorIndexConfig) -> str:
+        settings: Dict[str, Any] = {"vector_index": index_config.model_dump(exclude_none=True)}
+        if self._table_text_search_config:
+            settings["text_search_config"] = self._table_text_search_config
+        comment = json.dumps(settings).replace("'", "''")
+        return f"COMMENT ON TABLE {self.table_name} IS '{comment}'"
+
+    def _parse_text_search_config(self, comment: Optional[str]) -> Optional[str]:
+        try:
+            config = json.loads(comment).get("text_search_config") if comment else None
+        except (ValueError, AttributeError):
+            return None
+        return config if isinstance(config, str) and TEXT_SEARCH_CONFIG_PATTERN.fullmatch(config) else None
+
+    def _set_table_settings(self, comment: Optional[str]) -> VectorIndexConfig:
+        """Index settings and text search configuration stored in the table comment"""
+        self._table_text_search_config = self._parse_text_search_config(comment)
+        return self._set_index_config(self._parse_index_config(comment))
+
+    def _query_text_search_config(self) -> str:
+        return self._table_text_search_config or self.text_search_config or LEGACY_TEXT_SEARCH_CONFIG
+
+    def _new_text_search_config(self, cur) -> str:
+        """Configuration of a new text_tsv column, resolved once so the stored column and the queries agree"""
+        if self.text_search_config:
+            return self.text_search_config
+        cur.execute(SQL_DEFAULT_TEXT_SEARCH_CONFIG)
+        return cur.fetchone()[0]
+
+    async def _anew_text_search_config(self, conn) -> str:
+        if self.text_search_config:
+            return self.text_search_config
+        return await conn.fetchval(SQL_DEFAULT_TEXT_SEARCH_CONFIG)
+
+    def _parse_index_config(self, comment: Optional[str]) -> VectorIndexConfig:
+        # Tables created before index settings were stored use the former fixed hnsw parameters
+        try:
+            return VectorIndexConfig(**json.loads(comment)["vector_index"]) if comment else VectorIndexConfig()
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable index settings on {self.table_name}: {e}")
+            return VectorIndexConfig()
+
+    def _index_config_stale(self) -> bool:
+        return self._index_config is None or time.monotonic() - self._index_config_loaded_at > INDEX_CONFIG_TTL
+
+    def _set_index_config(self, index_config: VectorIndexConfig) -> VectorIndexConfig:
+        self._index_config = index_config
+        self._index_config_loaded_at = time.monotonic()
+        return index_config
+
+    def _load_index_config(self, cur) -> VectorIndexConfig:
+        if self._index_config_stale():
+            cur.execute("SELECT obj_description(to_regclass(%s), 'pg_class')", (self.table_name.lower(),))
+            self._set_table_settings(cur.fetchone()[0])
+        return self._index_config
+
+    async def _aload_index_config(self, conn) -> VectorIndexConfig:
+        if self._index_config_stale():
+            comment = await conn.fetchval("SELECT obj_description(to_regclass($1), 'pg_class')", self.table_name.lower())
+            self._set_table_settings(comment)
+        return self._index_config
+
+    async def aget_index_config(self) -> Dict[str, Any]:
+        conn = await self._get_async_connection()
+        try:
+            self._index_config = None
+            return (await self._aload_index_config(conn)).model_dump()
+        finally:
+            await self._release_async_connection(conn)
+
+    async def areindex(self, index_config: Any) -> Dict[str, Any]:
+        """
+        Rebuild the vector index with new parameters without blocking reads or writes.
+
+        The new index is built concurrently under a temporary name, then it replaces the old one, which
+        keeps serving searches until the swap. Changing only ef_search/probes/rerank_factor skips the rebuild.
+        """
+        new_config = index_config if isinstance(index_config, VectorIndexConfig) else VectorIndexConfig(**index_config)
+
+        conn = await self._get_async_connection()
+        try:
+            self._index_config = None
+            current = await self._aload_index_config(conn)
+            rebuild = new_config.build_params() != current.build_params()
+
+            if rebuild:
+                dimension = await self._adimension(conn)
+                if dimension > new_config.max_dimension():
+                    raise ValueError(f"{new_config.quantization} indexes support at most {new_config.max_dimension()} dimensions, the collection has {dimension}")
+                temp_name = f"{self.index_name}_new"
+                # Leftover from an interrupted reindex, possibly invalid
+                await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {temp_name}")
+                logger.info(f"Reindexing {self.table_name}: {current.model_dump()} -> {new_config.model_dump()}")
+                await conn.execute(self._index_sql(new_config, dimension, index_name=temp_name, concurrently=True))
+                await conn.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {self.index_name}")
+                await conn.execute(f"ALTER INDEX {temp_name} RENAME TO {self.index_name}")
+
+            await conn.execute(self._comment_sql(new_config))
+            self._set_index_config(new_config)
+            return {"rebuilt": rebuild, "index": new_config.model_dump()}
+        finally:
+            await self._release_async_connection(conn)
+
+    def _vector_search_sql(self, index_config: VectorIndexConfig, vector_placeholder: str, condition: str, top_k: int, dimension: int, rerank_factor: int) -> str:
+        if index_config.quantization != "none":
+            # Candidates in quantized distance order from the index, then the exact distance decides.
+            # The query vector is referenced twice, a psycopg2 caller binds it again after the filter values.
+            return (
+                f"SELECT meta, text, embedding <=> {vector_placeholder} AS distance FROM ("
+                f"SELECT meta, text, embedding FROM {self.table_name}"
+                f"{f' WHERE {condition}' if condition else ''}"
+                f" ORDER BY {index_config.index_order('embedding', vector_placeholder, dimension)}"
+                f" LIMIT {top_k * rerank_factor}"
+                f") candidates ORDER BY distance LIMIT {top_k}"
+            )
+        sql = (
+            f"SELECT meta, text, embedding <=> {vector_placeholder} AS distance FROM {self.table_name}"
+            f"{f' WHERE {condition}' if condition else ''}"
+            f" ORDER BY distance LIMIT {top_k}"
+        )
+        if condition and index_config.index_type == "ivfflat" and vector_config.PGVECTOR_ITERATIVE_SCAN:
+            # relaxed_order may return rows slightly out of order
+            sql = f"WITH candidates AS MATERIALIZED ({sql}) SELECT * FROM candidates ORDER BY distance"
+        return sql
+
+    def _search_settings(self, index_config: VectorIndexConfig, kwargs: Dict[str, Any]) -> list:
+        """set_config calls for the request ef_search/probes, falling back to the collection defaults"""
+        settings = []
+        ef_search = kwargs.get("ef_search") or index_config.ef_search
+        probes = kwargs.get("probes") or index_config.probes
+        if index_config.quantization != "none" and index_config.index_type == "hnsw":
+            # An hnsw scan returns at most ef_search rows, keep room for every candidate
+            candidates = kwargs.get("top_k", 4) * self._rerank_factor(index_config, kwargs)
+            ef_search = min(max(ef_search or 40, candidates), 1000)
+        if ef_search is not None:
+            settings.append(("hnsw.ef_search", str(int(ef_search))))
+        if probes is not None:
+            settings.append(("ivfflat.probes", str(int(probes))))
+        # A filtered search keeps walking the index until top_k rows pass the filter (pgvector >= 0.8).
+        # hnsw keeps the exact distance order, ivfflat only supports relaxed order and is re-sorted by the query.
+        if vector_config.PGVECTOR_ITERATIVE_SCAN and self._is_filtered(kwargs):
+            if index_config.index_type == "ivfflat":
+                settings.append(("ivfflat.iterative_scan", "relaxed_order"))
+            else:
+                settings.append(("hnsw.iterative_scan", "strict_order"))
+        return settings
+
+    def _rerank_factor(self, index_config: VectorIndexConfig, kwargs: Dict[str, Any]) -> int:
+        return int(kwargs.get("rerank_factor") or index_config.rerank_factor)
+
+    def _is_filtered(self, kwargs: Dict[str, Any]) -> bool:
+        return bool(kwargs.get("metadata_filter") or kwargs.get("document_ids_filter"))
+
+    def _search_filter(self, kwargs: Dict[str, Any], params: SQLParams) -> str:
+        return compile_search_filter(kwargs, params)
+
 
     def text_exists(self, id: str) -> bool:
         try:
@@ -347,7 +957,7 @@ class PGVector(BaseVector):
             # If table doesn't exist, document definitely doesn't exist
             return False
         finally:
-            await conn.close()
+            await self._release_async_connection(conn)
 
 
     def get_by_ids(self, ids: list[str]) -> list[Document]:
@@ -372,7 +982,7 @@ class PGVector(BaseVector):
                 docs.append(Document(page_content=record[1], metadata=record[0]))
             return docs
         finally:
-            await conn.close()
+            await self._release_async_connection(conn)
 
 
     def delete_by_ids(self, ids: list[str]) -> None:
@@ -408,7 +1018,7 @@ class PGVector(BaseVector):
             except Exception as e:
                 raise e
         finally:
-            await conn.close()
+            await self._release_async_connection(conn)
 
 
     def delete_by_metadata_field(self, key: str, value: str) -> None:
@@ -425,7 +1035,7 @@ class PGVector(BaseVector):
                 key, value
             )
         finally:
-            await conn.close()
+            await self._release_async_connection(conn)
 
 
     def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
@@ -438,18 +1048,18 @@ class PGVector(BaseVector):
         top_k = kwargs.get("top_k", 4)
         if not isinstance(top_k, int) or top_k <= 0:
             raise ValueError("top_k must be a positive integer")
-        document_ids_filter = kwargs.get("document_ids_filter")
-        where_clause = ""
-        if document_ids_filter:
-            document_ids = ", ".join(f"'{id}'" for id in document_ids_filter)
-            where_clause = f" WHERE meta->>'document_id' in ({document_ids}) "
+        params = SQLParams("psycopg2", [json.dumps(query_vector)])
+        condition = self._search_filter(kwargs, params)
 
         with self._get_cursor() as cur:
+            index_config = self._load_index_config(cur)
+            # is_local=true scopes the settings to this transaction, committed by _get_cursor
+            for name, value in self._search_settings(index_config, kwargs):
+                cur.execute("SELECT set_config(%s, %s, true)", (name, value))
+            values = params.values + [params.values[0]] if index_config.quantization != "none" else params.values
             cur.execute(
-                f"SELECT meta, text, embedding <=> %s AS distance FROM {self.table_name}"
-                f" {where_clause}"
-                f" ORDER BY distance LIMIT {top_k}",
-                (json.dumps(query_vector),),
+                self._vector_search_sql(index_config, "%s::vector", condition, top_k, len(query_vector), self._rerank_factor(index_config, kwargs)),
+                values
             )
             docs = []
             score_threshold = float(kwargs.get("score_threshold") or 0.0)
@@ -466,23 +1076,23 @@ class PGVector(BaseVector):
         top_k = kwargs.get("top_k", 4)
         if not isinstance(top_k, int) or top_k <= 0:
             raise ValueError("top_k must be a positive integer")
-        document_ids_filter = kwargs.get("document_ids_filter")
-        where_clause = ""
-        if document_ids_filter:
-            document_ids = ", ".join(f"'{id}'" for id in document_ids_filter)
-            where_clause = f" WHERE meta->>'document_id' in ({document_ids}) "
-        
         # Convert the vector list to a string representation
         vector_str = "[" + ",".join(map(str, query_vector)) + "]"
+        params = SQLParams("asyncpg", [vector_str])
+        condition = self._search_filter(kwargs, params)
         
         conn = await self._get_async_connection()
         try:
-            records = await conn.fetch(
-                f"SELECT meta, text, embedding <=> $1::vector AS distance FROM {self.table_name}"
-                f" {where_clause}"
-                f" ORDER BY distance LIMIT {top_k}",
-                vector_str  # Pass the string representation
-            )
+            index_config = await self._aload_index_config(conn)
+            settings = self._search_settings(index_config, kwargs)
+            # set_config(..., true) only lasts for the transaction, the pooled connection is not affected
+            async with conn.transaction():
+                for name, value in settings:
+                    await conn.execute("SELECT set_config($1, $2, true)", name, value)
+                records = await conn.fetch(
+                    self._vector_search_sql(index_config, "$1::vector", condition, top_k, len(query_vector), self._rerank_factor(index_config, kwargs)),
+                    *params.values
+                )
             
             docs = []
             score_threshold = float(kwargs.get("score_threshold") or 0.0)
@@ -495,19 +1105,121 @@ class PGVector(BaseVector):
                     docs.append(Document(page_content=text, metadata=metadata))
             return docs
         finally:
-            await conn.close()
+            await self._release_async_connection(conn)
+
+
+    def _batch_search_sql(self, index_config: VectorIndexConfig, vector_placeholder: str, condition: str, top_k: int, dimension: int, rerank_factor: int) -> str:
+        # One index scan per query vector, joined laterally so every query gets its own top_k
+        if index_config.quantization != "none":
+            return f"""
+            SELECT q.ord, r.meta, r.text, r.distance
+            FROM (
+                SELECT u.ord, u.query::vector AS embedding
+                FROM unnest({vector_placeholder}::text[]) WITH ORDINALITY AS u(query, ord)
+            ) q
+            CROSS JOIN LATERAL (
+                SELECT c.meta, c.text, c.embedding <=> q.embedding AS distance
+                FROM (
+                    SELECT t.meta, t.text, t.embedding
+                    FROM {self.table_name} t
+                    {f'WHERE {condition}' if condition else ''}
+                    ORDER BY {index_config.index_order('t.embedding', 'q.embedding', dimension)}
+                    LIMIT {top_k * rerank_factor}
+                ) c
+                ORDER BY distance
+                LIMIT {top_k}
+            ) r
+            ORDER BY q.ord, r.distance
+        """
+        return f"""
+            SELECT q.ord, r.meta, r.text, r.distance
+            FROM (
+                SELECT u.ord, u.query::vector AS embedding
+                FROM unnest({vector_placeholder}::text[]) WITH ORDINALITY AS u(query, ord)
+            ) q
+            CROSS JOIN LATERAL (
+                SELECT t.meta, t.text, t.embedding <=> q.embedding AS distance
+                FROM {self.table_name} t
+                {f'WHERE {condition}' if condition else ''}
+                ORDER BY distance
+                LIMIT {top_k}
+            ) r
+            ORDER BY q.ord, r.distance
+        """
+
+    def _group_batch_records(self, records, count: int, score_threshold: float) -> list[list[Document]]:
+        results: list[list[Document]] = [[] for _ in range(count)]
+        for position, metadata, text, distance in records:
+            metadata = json.loads(metadata) if isinstance(metadata, str) else metadata
+            score = 1 - distance
+            metadata["score"] = score
+            if score > score_threshold:
+                results[position - 1].append(Document(page_content=text, metadata=metadata))
+        return results
+
+    def batch_search_by_vector(self, query_vectors: list[list[float]], **kwargs: Any) -> list[list[Document]]:
+        """
+        Nearest neighbors for several query vectors in one statement, one result list per query vector
+        in input order. Takes the search_by_vector arguments, which apply to every query.
+        """
+        top_k = kwargs.get("top_k", 4)
+        if not isinstance(top_k, int) or top_k <= 0:
+            raise ValueError("top_k must be a positive integer")
+        if not query_vectors:
+            return []
+        params = SQLParams("psycopg2", [[json.dumps(query_vector) for query_vector in query_vectors]])
+        condition = self._search_filter(kwargs, params)
 
+        with self._get_cursor() as cur:
+            index_config = self._load_index_config(cur)
+            for name, value in self._search_settings(index_config, kwargs):
+                cur.execute("SELECT set_config(%s, %s, true)", (name, value))
+            cur.execute(
+                self._batch_search_sql(index_config, "%s", condition, top_k, len(query_vectors[0]), self._rerank_factor(index_config, kwargs)),
+                params.values
+            )
+            return self._group_batch_records(cur.fetchall(), len(query_vectors), float(kwargs.get("score_threshold") or 0.0))
+
+    async def abatch_search_by_vector(self, query_vectors: list[list[float]], **kwargs: Any) -> list[list[Document]]:
+        top_k = kwargs.get("top_k", 4)
+        if not isinstance(top_k, int) or top_k <= 0:
+            raise ValueError("top_k must be a positive integer")
+        if not query_vectors:
+            return []
+        vector_strs = ["[" + ",".join(map(str, query_vector)) + "]" for query_vector in query_vectors]
+        params = SQLParams("asyncpg", [vector_strs])
+        condition = self._search_filter(kwargs, params)
+
+        conn = await self._get_async_connection()
+        try:
+            index_config = await self._aload_index_config(conn)
+            settings = self._search_settings(index_config, kwargs)
+            async with conn.transaction():
+                for name, value in settings:
+                    await conn.execute("SELECT set_config($1, $2, true)", name, value)
+                records = await conn.fetch(
+                    self._batch_search_sql(index_config, "$1", condition, top_k, len(query_vectors[0]), self._rerank_factor(index_config, kwargs)),
+                    *params.values
+                )
+            return self._group_batch_records(records, len(query_vectors), float(kwargs.get("score_threshold") or 0.0))
+        finally:
+            await self._release_async_connection(conn)
 
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         top_k = kwargs.get("top_k", 5)
         if not isinstance(top_k, int) or top_k <= 0:
             raise ValueError("top_k must be a positive integer")
         with self._get_cursor() as cur:
-            document_ids_filter = kwargs.get("document_ids_filter")
-            where_clause = ""
-            if document_ids_filter:
-                document_ids = ", ".join(f"'{id}'" for id in document_ids_filter)
-                where_clause = f" AND meta->>'document_id' in ({document_ids}) "
+            has_tsv_column = not self.pg_bigm and self._tsv_column_exists(cur)
+            if self.pg_bigm:
+                # f"'{query}'" is required in order to account for whitespace in query
+                params = SQLParams("psycopg2", [f"'{query}'", f"'{query}'"])
+            else:
+                # Bound as is like the async path, the query is bound twice except for the text_tsv variant
+                params = SQLParams("psycopg2", [query] if has_tsv_column else [query, query])
+            # Filter parameters follow the query
+            condition = self._search_filter(kwargs, params)
+            where_clause = f" AND {condition} " if condition else ""
             if self.pg_bigm:
                 cur.execute("SET pg_bigm.similarity_limit TO 0.000001")
                 cur.execute(
@@ -517,19 +1229,29 @@ class PGVector(BaseVector):
                     {where_clause}
                     ORDER BY score DESC
                     LIMIT {top_k}""",
-                    # f"'{query}'" is required in order to account for whitespace in query
-                    (f"'{query}'", f"'{query}'"),
+                    params.values,
+                )
+            elif has_tsv_column:
+                self._load_index_config(cur)
+                cur.execute(
+                    SQL_FULL_TEXT_SEARCH.format(
+                        table_name=self.table_name,
+                        text_search_config=self._query_text_search_config(),
+                        placeholder="%s",
+                        where_clause=where_clause,
+                        top_k=top_k
+                    ),
+                    params.values,
                 )
             else:
                 cur.execute(
-                    f"""SELECT meta, text, ts_rank(to_tsvector(coalesce(text, '')), plainto_tsquery(%s)) AS score
-                    FROM {self.table_name}
-                    WHERE to_tsvector(text) @@ plainto_tsquery(%s)
-                    {where_clause}
-                    ORDER BY score DESC
-                    LIMIT {top_k}""",
-                    # f"'{query}'" is required in order to account for whitespace in query
-                    (f"'{query}'", f"'{query}'"),
+                    SQL_FULL_TEXT_SEARCH_LEGACY.format(
+                        table_name=self.table_name,
+                        placeholder="%s",
+                        where_clause=where_clause,
+                        top_k=top_k
+                    ),
+                    params.values,
                 )
 
             docs = []
@@ -546,11 +1268,10 @@ class PGVector(BaseVector):
         top_k = kwargs.get("top_k", 5)
         if not isinstance(top_k, int) or top_k <= 0:
             raise ValueError("top_k must be a positive integer")
-        document_ids_filter = kwargs.get("document_ids_filter")
-        where_clause = ""
-        if document_ids_filter:
-            document_ids = ", ".join(f"'{id}'" for id in document_ids_filter)
-            where_clause = f" AND meta->>'document_id' in ({document_ids}) "
+        # The query is $1 in every variant
+        params = SQLParams("asyncpg", [query])
+        condition = self._search_filter(kwargs, params)
+        where_clause = f" AND {condition} " if condition else ""
         
         conn = await self._get_async_connection()
         try:
@@ -563,17 +1284,29 @@ class PGVector(BaseVector):
                     {where_clause}
                     ORDER BY score DESC
                     LIMIT {top_k}""",
-                    query
+                    *params.values
+                )
+            elif await self._atsv_column_exists(conn):
+                await self._aload_index_config(conn)
+                records = await conn.fetch(
+                    SQL_FULL_TEXT_SEARCH.format(
+                        table_name=self.table_name,
+                        text_search_config=self._query_text_search_config(),
+                        placeholder="$1",
+                        where_clause=where_clause,
+                        top_k=top_k
+                    ),
+                    *params.values
                 )
             else:
                 records = await conn.fetch(
-                    f"""SELECT meta, text, ts_rank(to_tsvector(coalesce(text, '')), plainto_tsquery($1)) AS score
-                    FROM {self.table_name}
-                    WHERE to_tsvector(text) @@ plainto_tsquery($1)
-                    {where_clause}
-                    ORDER BY score DESC
-                    LIMIT {top_k}""",
-                    query
+                    SQL_FULL_TEXT_SEARCH_LEGACY.format(
+                        table_name=self.table_name,
+                        placeholder="$1",
+                        where_clause=where_clause,
+                        top_k=top_k
+                    ),
+                    *params.values
                 )
             
             docs = []
@@ -585,7 +1318,54 @@ class PGVector(BaseVector):
                 docs.append(Document(page_content=text, metadata=metadata))
             return docs
         finally:
-            await conn.close()
+            await self._release_async_connection(conn)
+
+
+    def _tsv_column_exists(self, cur) -> bool:
+        if not self._has_tsv_column:
+            cur.execute(SQL_TSV_COLUMN_EXISTS.format(placeholder="%s"), (self.table_name.lower(),))
+            self._has_tsv_column = cur.fetchone()[0]
+        return self._has_tsv_column
+
+    async def _atsv_column_exists(self, conn) -> bool:
+        if not self._has_tsv_column:
+            self._has_tsv_column = await conn.fetchval(SQL_TSV_COLUMN_EXISTS.format(placeholder="$1"), self.table_name.lower())
+        return self._has_tsv_column
+
+    async def amigrate_full_text(self) -> bool:
+        """
+        Add the stored text_tsv column and its GIN index to a table created before they existed.
+        Adding the column rewrites the table under an exclusive lock, the index is built concurrently.
+        Returns False when the table was already migrated.
+        """
+        conn = await self._get_async_connection()
+        try:
+            if await self._atsv_column_exists(conn):
+                migrated = False
+            else:
+                self._index_config = None
+                index_config = await self._aload_index_config(conn)
+                text_search_config = await self._anew_text_search_config(conn)
+                logger.info(f"Adding text_tsv column to {self.table_name}, text search configuration {text_search_config}")
+                await conn.execute(SQL_ADD_TSV_COLUMN.format(table_name=self.table_name, text_search_config=text_search_config))
+                # Recorded with the index settings, queries read it from there
+                self._table_text_search_config = text_search_config
+                await conn.execute(self._comment_sql(index_config))
+                migrated = True
+            # Also run when the column already exists, in case an earlier migration stopped before the index build
+            await conn.execute(SQL_CREATE_INDEX_TSV.format(concurrently="CONCURRENTLY", table_name=self.table_name, index_hash=self.index_hash))
+            self._has_tsv_column = True
+            return migrated
+        finally:
+            await self._release_async_connection(conn)
+
+    async def acreate_metadata_index(self) -> None:
+        """GIN index on meta used by metadata filters, built concurrently for tables created before it existed"""
+        conn = await self._get_async_connection()
+        try:
+            await conn.execute(SQL_CREATE_INDEX_META.format(concurrently="CONCURRENTLY", table_name=self.table_name, index_hash=self.index_hash))
+        finally:
+            await self._release_async_connection(conn)
 
 
     def delete(self) -> None:
@@ -599,42 +1379,77 @@ class PGVector(BaseVector):
         try:
             await conn.execute(f"DROP TABLE IF EXISTS {self.table_name}")
         finally:
-            await conn.close()
+            await self._release_async_connection(conn)
 
 
-    def _create_collection(self, dimension: int):
+    def _create_collection(self, dimension: int, index_config: Any = None):
         cache_key = f"vector_indexing_{self._collection_name}"
         lock_name = f"{cache_key}_lock"
         collection_exist_cache_key = f"vector_indexing_{self._collection_name}"
 
         with self._get_cursor() as cur:
             cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
-            cur.execute(SQL_CREATE_TABLE.format(table_name=self.table_name, dimension=dimension))
+            text_search_config = self._new_text_search_config(cur)
+            cur.execute(SQL_CREATE_TABLE.format(table_name=self.table_name, dimension=dimension, text_search_config=text_search_config))
+            cur.execute(SQL_CREATE_INDEX_TSV.format(concurrently="", table_name=self.table_name, index_hash=self.index_hash))
+            cur.execute(SQL_CREATE_INDEX_META.format(concurrently="", table_name=self.table_name, index_hash=self.index_hash))
             # PG hnsw index only support 2000 dimension or less
             # ref: https://github.com/pgvector/pgvector?tab=readme-ov-file#indexing
-            if dimension <= 2000:
-                cur.execute(SQL_CREATE_INDEX.format(table_name=self.table_name, index_hash=self.index_hash))
+            index_config = VectorIndexConfig(**(index_config or {})) if not isinstance(index_config, VectorIndexConfig) else index_config
+            # CREATE TABLE IF NOT EXISTS may have kept an existing table, its index settings stay
+            cur.execute("SELECT obj_description(to_regclass(%s), 'pg_class')", (self.table_name.lower(),))
+            comment = cur.fetchone()[0]
+            if comment:
+                index_config = self._set_table_settings(comment)
+            else:
+                self._table_text_search_config = text_search_config
+                cur.execute(self._comment_sql(index_config))
+                self._set_index_config(index_config)
+            if dimension <= index_config.max_dimension():
+                cur.execute(self._index_sql(index_config, dimension))
             if self.pg_bigm:
                 cur.execute(SQL_CREATE_INDEX_PG_BIGM.format(table_name=self.table_name, index_hash=self.index_hash))
 
 
     # new
-    async def _acreate_collection(self, dimension: int):
+    async def _acreate_collection(self, dimension: int, create_index: bool = True, index_config: Any = None):
+        index_config = VectorIndexConfig(**(index_config or {})) if not isinstance(index_config, VectorIndexConfig) else index_config
         conn = await self._get_async_connection()
         try:
             await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
-            await conn.execute(SQL_CREATE_TABLE.format(table_name=self.table_name, dimension=dimension))
-            if dimension <= 2000:
-                await conn.execute(SQL_CREATE_INDEX.format(table_name=self.table_name, index_hash=self.index_hash))
+            text_search_config = await self._anew_text_search_config(conn)
+            await conn.execute(SQL_CREATE_TABLE.format(table_name=self.table_name, dimension=dimension, text_search_config=text_search_config))
+            await conn.execute(SQL_CREATE_INDEX_TSV.format(concurrently="", table_name=self.table_name, index_hash=self.index_hash))
+            await conn.execute(SQL_CREATE_INDEX_META.format(concurrently="", table_name=self.table_name, index_hash=self.index_hash))
+            # CREATE TABLE IF NOT EXISTS may have kept an existing table, its index settings stay
+            comment = await conn.fetchval("SELECT obj_description(to_regclass($1), 'pg_class')", self.table_name.lower())
+            if comment:
+                index_config = self._set_table_settings(comment)
+            else:
+                self._table_text_search_config = text_search_config
+                await conn.execute(self._comment_sql(index_config))
+                self._set_index_config(index_config)
+            if create_index and dimension <= index_config.max_dimension():
+                await conn.execute(self._index_sql(index_config, dimension))
             if self.pg_bigm:
                 await conn.execute(SQL_CREATE_INDEX_PG_BIGM.format(table_name=self.table_name, index_hash=self.index_hash))
         finally:
-            await conn.close()
+            await self._release_async_connection(conn)
 
 
 class PGVectorFactory(AbstractVectorFactory):
-    def init_vector(self, collection_name: str, attributes: list, embeddings: Embeddings) -> PGVector:
-        return PGVector(
+    def init_vector(self, collection_name: str, attributes: list, embeddings: Embeddings, layout: Optional[str] = None) -> PGVector:
+        """layout overrides PGVECTOR_LAYOUT: "table" (one table per collection) or "shared" (see shared.py)"""
+        layout = layout or vector_config.PGVECTOR_LAYOUT
+        if layout == "shared":
+            from .shared import SharedPGVector
+
+            vector_cls = SharedPGVector
+        elif layout == "table":
+            vector_cls = PGVector
+        else:
+            raise ValueError(f"Unsupported PGVECTOR_LAYOUT {layout!r}, expected table or shared")
+        return vector_cls(
             collection_name=collection_name,
             config=PGVectorConfig(
                 host=vector_config.PGVECTOR_HOST or "localhost",
@@ -645,5 +1460,10 @@ class PGVectorFactory(AbstractVectorFactory):
                 min_connection=vector_config.PGVECTOR_MIN_CONNECTION,
                 max_connection=vector_config.PGVECTOR_MAX_CONNECTION,
                 pg_bigm=vector_config.PGVECTOR_PG_BIGM,
+                statement_cache_size=vector_config.PGVECTOR_STATEMENT_CACHE_SIZE,
+                max_queries=vector_config.PGVECTOR_MAX_QUERIES,
+                max_inactive_connection_lifetime=vector_config.PGVECTOR_MAX_INACTIVE_CONNECTION_LIFETIME,
+                acquire_timeout=vector_config.PGVECTOR_ACQUIRE_TIMEOUT,
+                text_search_config=vector_config.PGVECTOR_TEXT_SEARCH_CONFIG or None,
             ),
         )
@@ -0,0 +1,417 @@
+import hashlib
+import logging
+import uuid
+from typing import Any, Dict, Optional
+
+import asyncpg
+import psycopg2.errors
+
+from ..base import Document
+from ..configs import vector_config
+from .filter import SQLParams, compile_search_filter
+from .pgvector import (
+    PGVector,
+    PGVectorConfig,
+    VectorIndexConfig,
+    SQL_CREATE_INDEX_TSV,
+    SQL_CREATE_INDEX_META,
+    SQL_CREATE_INDEX_PG_BIGM,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+SQL_CREATE_REGISTRY = """
+CREATE TABLE IF NOT EXISTS vector_collections (
+    name TEXT PRIMARY KEY,
+    dimension INT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+SQL_GET_DIMENSION = "SELECT dimension FROM vector_collections WHERE name = {placeholder}"
+
+SQL_REGISTER_COLLECTION = """
+INSERT INTO vector_collections (name, dimension) VALUES ({placeholders})
+ON CONFLICT (name) DO NOTHING
+"""
+
+SQL_CREATE_SHARED_TABLE = """
+CREATE TABLE IF NOT EXISTS {table_name} (
+    collection TEXT NOT NULL,
+    id UUID NOT NULL,
+    text TEXT NOT NULL,
+    meta JSONB NOT NULL,
+    embedding vector({dimension}) NOT NULL,
+    text_tsv tsvector GENERATED ALWAYS AS (to_tsvector('{text_search_config}'::regconfig, coalesce(text, ''))) STORED,
+    PRIMARY KEY (collection, id)
+) PARTITION BY HASH (collection);
+"""
+
+SQL_CREATE_PARTITION = """
+CREATE TABLE IF NOT EXISTS {table_name}_p{remainder} PARTITION OF {table_name}
+FOR VALUES WITH (MODULUS {modulus}, REMAINDER {remainder});
+"""
+
+# Creating collections is rare, one lock serializes the registry and shared table DDL of every process
+SQL_LOCK_DDL = "SELECT pg_advisory_xact_lock(hashtext('vector_collections'))"
+
+
+class SharedPGVector(PGVector):
+    """
+    A collection stored as rows of a shared table instead of a table of its own.
+
+    Every embedding dimension has one table, vector_shared_{dimension}, keyed by (collection, id) and hash
+    partitioned on the collection into PGVECTOR_SHARED_PARTITIONS partitions. vector_collections maps each
+    collection to its dimension. Creating a collection only registers it, deleting it deletes its rows.
+    The vector, text_tsv and meta indexes are defined once on the shared table and built per partition.
+
+    Searches are restricted to the collection, which prunes them to one partition. They are planned for the
+    actual collection, so a small collection is read through the primary key and ranked exactly, a large
+    one through the partition's vector index with an iterative scan. Index parameters belong to the shared
+    table, set by the collection that created it, so areindex is not supported.
+    """
+
+    def __init__(self, collection_name: str, config: PGVectorConfig):
+        super().__init__(collection_name, config)
+        self._row_key = {"collection": collection_name}
+        # Known once the collection's dimension is read from vector_collections
+        self.table_name = None
+        self.dimension: Optional[int] = None
+
+    def _use_dimension(self, dimension: int) -> None:
+        self.dimension = dimension
+        self.table_name = f"vector_shared_{dimension}"
+        self.index_hash = hashlib.md5(self.table_name.encode()).hexdigest()[:8]
+        self.index_name = f"embedding_cosine_v1_idx_{self.index_hash}"
+        # Shared tables are always created with the column
+        self._has_tsv_column = True
+
+    def _forget_dimension(self) -> None:
+        self.dimension = None
+        self.table_name = None
+        self._index_config = None
+
+    def _missing(self) -> ValueError:
+        return ValueError(f"Collection {self._collection_name} does not exist")
+
+    def _lookup_dimension(self) -> Optional[int]:
+        try:
+            with self._get_cursor() as cur:
+                cur.execute(SQL_GET_DIMENSION.format(placeholder="%s"), (self._collection_name,))
+                row = cur.fetchone()
+                return row[0] if row else None
+        except psycopg2.errors.UndefinedTable:
+            # No collection was created in the shared layout yet
+            return None
+
+    async def _alookup_dimension(self) -> Optional[int]:
+        conn = await self._get_async_connection()
+        try:
+            return await conn.fetchval(SQL_GET_DIMENSION.format(placeholder="$1"), self._collection_name)
+        except asyncpg.UndefinedTableError:
+            return None
+        finally:
+            await self._release_async_connection(conn)
+
+    def _resolve(self) -> bool:
+        # Only a found collection is cached, it may be created while this instance is alive
+        if self.table_name is None:
+            dimension = self._lookup_dimension()
+            if dimension is not None:
+                self._use_dimension(dimension)
+        return self.table_name is not None
+
+    async def _aresolve(self) -> bool:
+        if self.table_name is None:
+            dimension = await self._alookup_dimension()
+            if dimension is not None:
+                self._use_dimension(dimension)
+        return self.table_name is not None
+
+    def _shared_table_sql(self, dimension: int, index_config: VectorIndexConfig, text_search_config: str) -> list:
+        """DDL of a new shared table, its partitions and its indexes"""
+        self._table_text_search_config = text_search_config
+        statements = [
+            SQL_CREATE_SHARED_TABLE.format(table_name=self.table_name, dimension=dimension, text_search_config=text_search_config)
+        ]
+        modulus = vector_config.PGVECTOR_SHARED_PARTITIONS
+        for remainder in range(modulus):
+            statements.append(SQL_CREATE_PARTITION.format(table_name=self.table_name, modulus=modulus, remainder=remainder))
+        statements.append(SQL_CREATE_INDEX_TSV.format(concurrently="", table_name=self.table_name, index_hash=self.index_hash))
+        statements.append(SQL_CREATE_INDEX_META.format(concurrently="", table_name=self.table_name, index_hash=self.index_hash))
+        statements.append(self._comment_sql(index_config))
+        if dimension <= index_config.max_dimension():
+            statements.append(self._index_sql(index_config, dimension))
+        if self.pg_bigm:
+            statements.append(SQL_CREATE_INDEX_PG_BIGM.format(table_name=self.table_name, index_hash=self.index_hash))
+        return statements
+
+    def _check_dimension(self, registered: Optional[int], dimension: int) -> None:
+        if registered is not None and registered != dimension:
+            self._forget_dimension()
+            raise ValueError(
+                f"Collection {self._collection_name} already exists with dimension {registered}, got {dimension}"
+            )
+
+    def _create_collection(self, dimension: int, index_config: Any = None):
+        index_config = VectorIndexConfig(**(index_config or {})) if not isinstance(index_config, VectorIndexConfig) else index_config
+        self._use_dimension(dimension)
+        with self._get_cursor() as cur:
+            cur.execute("CREATE EXTENSION IF NOT EXISTS vector")
+            cur.execute(SQL_LOCK_DDL)
+            cur.execute(SQL_CREATE_REGISTRY)
+            cur.execute(SQL_GET_DIMENSION.format(placeholder="%s"), (self._collection_name,))
+            row = cur.fetchone()
+            self._check_dimension(row[0] if row else None, dimension)
+            cur.execute("SELECT to_regclass(%s)", (self.table_name,))
+            if cur.fetchone()[0] is None:
+                for statement in self._shared_table_sql(dimension, index_config, self._new_text_search_config(cur)):
+                    cur.execute(statement)
+                self._set_index_config(index_config)
+            else:
+                # An existing shared table keeps its index settings, they are read on the next search
+                self._index_config = None
+            cur.execute(SQL_REGISTER_COLLECTION.format(placeholders="%s, %s"), (self._collection_name, dimension))
+
+    async def _acreate_collection(self, dimension: int, create_index: bool = True, index_config: Any = None):
+        # create_index does not apply, the vector index is shared with the other collections
+        index_config = VectorIndexConfig(**(index_config or {})) if not isinstance(index_config, VectorIndexConfig) else index_config
+        self._use_dimension(dimension)
+        conn = await self._get_async_connection()
+        try:
+            await conn.execute("CREATE EXTENSION IF NOT EXISTS vector")
+            async with conn.transaction():
+                await conn.execute(SQL_LOCK_DDL)
+                await conn.execute(SQL_CREATE_REGISTRY)
+                self._check_dimension(
+                    await conn.fetchval(SQL_GET_DIMENSION.format(placeholder="$1"), self._collection_name),
+                    dimension
+                )
+                if await conn.fetchval("SELECT to_regclass($1)", self.table_name) is None:
+                    for statement in self._shared_table_sql(dimension, index_config, await self._anew_text_search_config(conn)):
+                        await conn.execute(statement)
+                    self._set_index_config(index_config)
+                else:
+                    self._index_config = None
+                await conn.execute(SQL_REGISTER_COLLECTION.format(placeholders="$1, $2"), self._collection_name, dimension)
+        finally:
+            await self._release_async_connection(conn)
+
+    def collection_exists(self) -> bool:
+        try:
+            return self._lookup_dimension() is not None
+        except Exception as e:
+            logger.warning(f"Error checking if collection exists: {e}")
+            return False
+
+    async def acollection_exists(self) -> bool:
+        try:
+            return await self._alookup_dimension() is not None
+        except Exception as e:
+            logger.warning(f"Error checking if collection exists: {e}")
+            return False
+
+    def add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
+        if not self._resolve():
+            raise self._missing()
+        return super().add_texts(documents, embeddings, **kwargs)
+
+    async def aadd_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
+        if not await self._aresolve():
+            raise self._missing()
+        return await super().aadd_texts(documents, embeddings, **kwargs)
+
+    async def abulk_add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
+        """COPY into the shared table, the vector index is never dropped since other collections use it"""
+        if not await self._aresolve():
+            raise self._missing()
+        return await super().abulk_add_texts(documents, embeddings, **dict(kwargs, defer_index=False))
+
+    async def adrop_vector_index(self) -> None:
+        logger.info(f"Keeping the shared vector index while loading {self._collection_name}")
+
+    async def acreate_vector_index(self) -> None:
+        if await self._aresolve():
+            await super().acreate_vector_index()
+
+    async def _adimension(self, conn) -> int:
+        return self.dimension
+
+    async def aget_index_config(self) -> Dict[str, Any]:
+        if not await self._aresolve():
+            raise self._missing()
+        return await super().aget_index_config()
+
+    async def areindex(self, index_config: Any) -> Dict[str, Any]:
+        raise ValueError(
+            "Collections in the shared layout share the index of their table, pass ef_search/probes per search instead"
+        )
+
+    def _search_settings(self, index_config: VectorIndexConfig, kwargs: Dict[str, Any]) -> list:
+        # A generic plan does not know how many rows the collection has, plan every search for its collection
+        return super()._search_settings(index_config, kwargs) + [("plan_cache_mode", "force_custom_plan")]
+
+    def _is_filtered(self, kwargs: Dict[str, Any]) -> bool:
+        # Other collections share the partition, the collection condition is a filter on the index scan
+        return True
+
+    def _search_filter(self, kwargs: Dict[str, Any], params: SQLParams) -> str:
+        condition = compile_search_filter(kwargs, params)
+        collection = f"collection = {params.add(self._collection_name)}"
+        return f"{collection} AND {condition}" if condition else collection
+
+    def text_exists(self, id: str) -> bool:
+        try:
+            doc_id = uuid.UUID(id) if not isinstance(id, uuid.UUID) else id
+        except (ValueError, AttributeError):
+            return False
+        if not self._resolve():
+            return False
+        with self._get_cursor() as cur:
+            cur.execute(
+                f"SELECT id FROM {self.table_name} WHERE collection = %s AND id = %s",
+                (self._collection_name, str(doc_id))
+            )
+            return cur.fetchone() is not None
+
+    async def atext_exists(self, id: str) -> bool:
+        try:
+            doc_id = uuid.UUID(id) if not isinstance(id, uuid.UUID) else id
+        except (ValueError, AttributeError):
+            return False
+        if not await self._aresolve():
+            return False
+        conn = await self._get_async_connection()
+        try:
+            result = await conn.fetchrow(
+                f"SELECT id FROM {self.table_name} WHERE collection = $1 AND id = $2",
+                self._collection_name, str(doc_id)
+            )
+            return result is not None
+        finally:
+            await self._release_async_connection(conn)
+
+    def get_by_ids(self, ids: list[str]) -> list[Document]:
+        if not ids or not self._resolve():
+            return []
+        with self._get_cursor() as cur:
+            cur.execute(
+                f"SELECT meta, text FROM {self.table_name} WHERE collection = %s AND id IN %s",
+                (self._collection_name, tuple(ids))
+            )
+            return [Document(page_content=record[1], metadata=record[0]) for record in cur]
+
+    async def aget_by_ids(self, ids: list[str]) -> list[Document]:
+        if not ids or not await self._aresolve():
+            return []
+        conn = await self._get_async_connection()
+        try:
+            records = await conn.fetch(
+                f"SELECT meta, text FROM {self.table_name} WHERE collection = $1 AND id = ANY($2::uuid[])",
+                self._collection_name, ids
+            )
+            return [Document(page_content=record[1], metadata=record[0]) for record in records]
+        finally:
+            await self._release_async_connection(conn)
+
+    def delete_by_ids(self, ids: list[str]) -> None:
+        if not ids or not self._resolve():
+            return
+        with self._get_cursor() as cur:
+            cur.execute(
+                f"DELETE FROM {self.table_name} WHERE collection = %s AND id IN %s",
+                (self._collection_name, tuple(ids))
+            )
+
+    async def adelete_by_ids(self, ids: list[str]) -> None:
+        if not ids or not await self._aresolve():
+            return
+        conn = await self._get_async_connection()
+        try:
+            await conn.execute(
+                f"DELETE FROM {self.table_name} WHERE collection = $1 AND id = ANY($2::uuid[])",
+                self._collection_name, ids
+            )
+        finally:
+            await self._release_async_connection(conn)
+
+    def delete_by_metadata_field(self, key: str, value: str) -> None:
+        if not self._resolve():
+            return
+        with self._get_cursor() as cur:
+            cur.execute(
+                f"DELETE FROM {self.table_name} WHERE collection = %s AND meta->>%s = %s",
+                (self._collection_name, key, value)
+            )
+
+    async def adelete_by_metadata_field(self, key: str, value: str) -> None:
+        if not await self._aresolve():
+            return
+        conn = await self._get_async_connection()
+        try:
+            await conn.execute(
+                f"DELETE FROM {self.table_name} WHERE collection = $1 AND meta->>$2 = $3",
+                self._collection_name, key, value
+            )
+        finally:
+            await self._release_async_connection(conn)
+
+    def search_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
+        if not self._resolve():
+            raise self._missing()
+        return super().search_by_vector(query_vector, **kwargs)
+
+    async def asearch_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
+        if not await self._aresolve():
+            raise self._missing()
+        return await super().asearch_by_vector(query_vector, **kwargs)
+
+    def batch_search_by_vector(self, query_vectors: list[list[float]], **kwargs: Any) -> list[list[Document]]:
+        if not self._resolve():
+            raise self._missing()
+        return super().batch_search_by_vector(query_vectors, **kwargs)
+
+    async def abatch_search_by_vector(self, query_vectors: list[list[float]], **kwargs: Any) -> list[list[Document]]:
+        if not await self._aresolve():
+            raise self._missing()
+        return await super().abatch_search_by_vector(query_vectors, **kwargs)
+
+    def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
+        if not self._resolve():
+            raise self._missing()
+        return super().search_by_full_text(query, **kwargs)
+
+    async def asearch_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
+        if not await self._aresolve():
+            raise self._missing()
+        return await super().asearch_by_full_text(query, **kwargs)
+
+    async def amigrate_full_text(self) -> bool:
+        # Shared tables are created with the text_tsv column and its index
+        return False
+
+    async def acreate_metadata_index(self) -> None:
+        # Created with the shared table
+        pass
+
+    def delete(self) -> None:
+        if not self._resolve():
+            return
+        with self._get_cursor() as cur:
+            cur.execute(f"DELETE FROM {self.table_name} WHERE collection = %s", (self._collection_name,))
+            cur.execute("DELETE FROM vector_collections WHERE name = %s", (self._collection_name,))
+        self._forget_dimension()
+
+    async def adelete(self) -> None:
+        if not await self._aresolve():
+            return
+        conn = await self._get_async_connection()
+        try:
+            async with conn.transaction():
+                await conn.execute(f"DELETE FROM {self.table_name} WHERE collection = $1", self._collection_name)
+                await conn.execute("DELETE FROM vector_collections WHERE name = $1", self._collection_name)
+        finally:
+            await self._release_async_connection(conn)
+        self._forget_dimension()
@@ -38,6 +38,10 @@ class BaseVector(ABC):
     def aadd_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
         raise NotImplementedError
 
+    async def abulk_add_texts(self, documents: list[Document], embeddings: list[list[float]], **kwargs):
+        # Stores without a bulk load path fall back to the regular insert
+        return await self.aadd_texts(documents=documents, embeddings=embeddings, **kwargs)
+
     @abstractmethod
     def text_exists(self, id: str) -> bool:
         raise NotImplementedError
@@ -76,6 +80,13 @@ class BaseVector(ABC):
     async def asearch_by_vector(self, query_vector: list[float], **kwargs: Any) -> list[Document]:
         raise NotImplementedError
 
+    def batch_search_by_vector(self, query_vectors: list[list[float]], **kwargs: Any) -> list[list[Document]]:
+        # Stores without a batched query run one search per vector
+        return [self.search_by_vector(query_vector, **kwargs) for query_vector in query_vectors]
+
+    async def abatch_search_by_vector(self, query_vectors: list[list[float]], **kwargs: Any) -> list[list[Document]]:
+        return [await self.asearch_by_vector(query_vector, **kwargs) for query_vector in query_vectors]
+
     @abstractmethod
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         raise NotImplementedError
@@ -84,6 +95,12 @@ class BaseVector(ABC):
     async def asearch_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         raise NotImplementedError
 
+    async def aget_index_config(self) -> dict:
+        raise NotImplementedError
+
+    async def areindex(self, index_config: Any) -> dict:
+        raise NotImplementedError
+
     @abstractmethod
     def delete(self) -> None:
         raise NotImplementedError
@@ -1,6 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Any, Optional
 import os
+import asyncio
 import logging
 from .vector_base import BaseVector
 from .vector_type import VectorType
@@ -89,6 +90,13 @@ class Vector:
         doc_ids = await self._vector_processor.aadd_texts(documents=documents, embeddings=embeddings, **kwargs)
         return doc_ids
 
+    async def abulk_add_texts(self, documents: list[Document], **kwargs):
+        if kwargs.get("duplicate_check", False):
+            documents = await self._afilter_duplicate_texts(documents)
+
+        embeddings = await self._embeddings.aembed_documents([document.page_content for document in documents])
+        return await self._vector_processor.abulk_add_texts(documents=documents, embeddings=embeddings, **kwargs)
+
     def text_exists(self, id: str) -> bool:
         return self._vector_processor.text_exists(id)
 
@@ -112,9 +120,22 @@ class Vector:
         return self._vector_processor.search_by_vector(query_vector, **kwargs)
 
     async def asearch_by_vector(self, query: str, **kwargs: Any) -> list[Document]:
-        query_vector = await self._embeddings.aembed_query(query)
+        # Callers searching several collections embed the query once and pass it as query_vector
+        query_vector = kwargs.pop("query_vector", None) or await self._embeddings.aembed_query(query)
         return await self._vector_processor.asearch_by_vector(query_vector, **kwargs)
 
+    def batch_search_by_vector(self, queries: list[str], **kwargs: Any) -> list[list[Document]]:
+        query_vectors = [self._embeddings.embed_query(query) for query in queries]
+        return self._vector_processor.batch_search_by_vector(query_vectors, **kwargs)
+
+    async def abatch_search_by_vector(self, queries: list[str], **kwargs: Any) -> list[list[Document]]:
+        # Concurrent query embeddings are coalesced by the embedding front end when it batches
+        query_vectors = await asyncio.gather(*(self._embeddings.aembed_query(query) for query in queries))
+        return await self._vector_processor.abatch_search_by_vector(list(query_vectors), **kwargs)
+
+    async def aembed_query(self, query: str) -> list[float]:
+        return await self._embeddings.aembed_query(query)
+
     def search_by_full_text(self, query: str, **kwargs: Any) -> list[Document]:
         return self._vector_processor.search_by_full_text(query, **kwargs)
 